@@ -0,0 +1,73 @@
+"""Compare memory and traversal speed of dataclass ASTs and `AstArena`."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.arena import AstArena, NodeKind  # noqa: E402
+from icl.ast import AstNode, IdentifierExpr, Program  # noqa: E402
+from icl.lexer import TableLexer  # noqa: E402
+from icl.parser import Parser  # noqa: E402
+
+
+def _corpus(repeat: int) -> str:
+    examples = Path(__file__).resolve().parents[1] / "examples"
+    text = "\n".join(path.read_text(encoding="utf-8") for path in sorted(examples.glob("*.icl")))
+    return "\n".join([text] * repeat)
+
+
+def _count_identifiers(program: Program) -> int:
+    count = 0
+    stack: list[object] = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, AstNode):
+            if isinstance(node, IdentifierExpr):
+                count += 1
+            stack.extend(value for value in vars(node).values() if isinstance(value, (list, AstNode)))
+    return count
+
+
+def _count_arena_identifiers(arena: AstArena) -> int:
+    kinds = arena.kinds
+    identifier = NodeKind.IDENTIFIER
+    return sum(1 for handle in arena.subtree(arena.root or 0) if kinds[handle] == identifier)
+
+
+def _retained_kib(build) -> tuple[object, float]:
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained / 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500, help="Copies of the example corpus to parse.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per traversal (best is reported).")
+    args = parser.parse_args()
+
+    tokens = TableLexer(_corpus(args.repeat)).tokenize_buffer()
+    program, program_kib = _retained_kib(lambda: Parser(tokens).parse_program())
+    arena, arena_kib = _retained_kib(lambda: Parser(tokens).parse_arena())
+    assert isinstance(program, Program) and isinstance(arena, AstArena)
+    print(f"nodes:   {len(arena)}")
+    print(f"memory:  dataclasses {program_kib:8.0f} KiB   arena {arena_kib:8.0f} KiB")
+
+    dataclass_best = min(timeit.repeat(lambda: _count_identifiers(program), number=1, repeat=args.runs))
+    arena_best = min(timeit.repeat(lambda: _count_arena_identifiers(arena), number=1, repeat=args.runs))
+    print(f"walk:    dataclasses {dataclass_best * 1000:8.2f} ms   arena {arena_best * 1000:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
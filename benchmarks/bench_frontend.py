@@ -0,0 +1,58 @@
+"""Compare the fused IR build with separate source-map, type-inference, IR and feature walks."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.fused import FusedIRBuilder  # noqa: E402
+from icl.graph import IntentGraphBuilder  # noqa: E402
+from icl.ir import IRBuilder  # noqa: E402
+from icl.lexer import TableLexer  # noqa: E402
+from icl.lowering import collect_ir_features  # noqa: E402
+from icl.parser import Parser  # noqa: E402
+from icl.resolver import resolve_program  # noqa: E402
+from icl.semantic import SemanticAnalyzer, infer_types  # noqa: E402
+
+
+def _module(functions: int) -> str:
+    lines = ["scale := 3;", "fn f0(a:Num):Num { ret a; }"]
+    for idx in range(1, functions):
+        lines.append(
+            f"fn f{idx}(a:Num):Num {{ b := a * scale + {idx}; if b > {idx}.5 ? {{ ret @f{idx - 1}(b); }} ret b - 1; }}"
+        )
+    lines.append(f'@print("result"); @print(@f{functions - 1}(1));')
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=2000, help="Functions in the generated module.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs (best is reported).")
+    args = parser.parse_args()
+
+    program = Parser(TableLexer(_module(args.functions)).tokenize_buffer()).parse_program()
+    semantic = SemanticAnalyzer().analyze(program)
+    resolution = resolve_program(program)
+
+    def separate() -> None:
+        IntentGraphBuilder().build(program)
+        module = IRBuilder(semantic, resolution, infer_types(program, resolution)).build(program)
+        collect_ir_features(module)
+
+    def fused() -> None:
+        FusedIRBuilder(semantic, resolution).build(program)
+
+    separate_time = min(timeit.repeat(separate, number=1, repeat=args.runs))
+    fused_time = min(timeit.repeat(fused, number=1, repeat=args.runs))
+    print(f"separate: {separate_time * 1000:8.2f} ms  {len(program.statements)} statements")
+    print(f"   fused: {fused_time * 1000:8.2f} ms  {separate_time / fused_time:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+"""Compare throughput of the registered ICL lexer engines."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.lexer import LEXER_ENGINES, TableLexer, create_lexer  # noqa: E402
+
+
+def _corpus(repeat: int) -> str:
+    examples = Path(__file__).resolve().parents[1] / "examples"
+    text = "\n".join(path.read_text(encoding="utf-8") for path in sorted(examples.glob("*.icl")))
+    return "\n".join([text] * repeat)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="Copies of the example corpus to lex.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per engine (best is reported).")
+    args = parser.parse_args()
+
+    source = _corpus(args.repeat)
+    print(f"corpus: {len(source)} chars")
+    for engine in sorted(LEXER_ENGINES):
+        token_count = len(create_lexer(source, engine=engine).tokenize())
+        best = min(timeit.repeat(lambda: create_lexer(source, engine=engine).tokenize(), number=1, repeat=args.runs))
+        rate = len(source) / best / 1e6
+        print(f"{engine:>6}: {best * 1000:8.2f} ms  {rate:6.2f} Mchar/s  {token_count} tokens")
+
+    best = min(timeit.repeat(lambda: TableLexer(source).tokenize_buffer(), number=1, repeat=args.runs))
+    print(f"buffer: {best * 1000:8.2f} ms  {len(source) / best / 1e6:6.2f} Mchar/s  (TokenBuffer, no Token objects)")
+
+    print(f"memory: list[Token] {_retained_kib(lambda: create_lexer(source).tokenize()):8.0f} KiB")
+    print(f"memory: TokenBuffer {_retained_kib(lambda: TableLexer(source).tokenize_buffer()):8.0f} KiB")
+    return 0
+
+
+def _retained_kib(build) -> float:
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / 1024
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""Measure ICL parser throughput and Python calls per token.
+
+Each input is also parsed with `_RecursiveDescentParser`, which keeps the
+statement parser but restores the precedence-climbing expression parser
+the table-driven one replaced, to show the before/after difference.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+from pathlib import Path
+import pstats
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.ast import BinaryExpr, Expr, UnaryExpr  # noqa: E402
+from icl.lexer import TableLexer  # noqa: E402
+from icl.parser import _PRECEDENCE, _PREFIX_HANDLERS, Parser  # noqa: E402
+from icl.tokens import TokenBuffer, TokenType  # noqa: E402
+
+
+class _RecursiveDescentParser(Parser):
+    """Parser with the previous expression parser: one frame per precedence level and unary operator."""
+
+    def _parse_expression(self, min_prec: int = 1) -> Expr:
+        expr = self._parse_unary()
+        while True:
+            prec = _PRECEDENCE.get(self._peek().token_type)
+            if prec is None or prec < min_prec:
+                return expr
+            op = self._advance()
+            right = self._parse_expression(prec + 1)
+            expr = BinaryExpr(
+                span=self._merge_spans(expr.span, right.span),
+                left=expr,
+                operator=op.value,
+                right=right,
+                node_id=self._next_node_id(),
+            )
+
+    def _parse_unary(self) -> Expr:
+        if self._match(TokenType.NOT, TokenType.MINUS, TokenType.PLUS):
+            op = self._previous()
+            operand = self._parse_unary()
+            return UnaryExpr(
+                span=self._merge_spans(op.span, operand.span),
+                operator=op.value,
+                operand=operand,
+                node_id=self._next_node_id(),
+            )
+        expr = self._parse_primary()
+        while self._match(TokenType.LPAR):
+            expr = self._parse_call(expr)
+        return expr
+
+    def _parse_primary(self) -> Expr:
+        tok = self._peek()
+        handler = _PREFIX_HANDLERS.get(tok.token_type)
+        if handler is None:
+            return self._parse_operand()  # raises PAR001
+        self._advance()
+        return handler(self, tok)
+
+
+def _corpus(repeat: int) -> str:
+    examples = Path(__file__).resolve().parents[1] / "examples"
+    text = "\n".join(path.read_text(encoding="utf-8") for path in sorted(examples.glob("*.icl")))
+    return "\n".join([text] * repeat)
+
+
+def _operator_chain(terms: int) -> str:
+    return "x := " + " + ".join(f"a{idx} * {idx} < b{idx} || !c{idx}" for idx in range(terms)) + ";"
+
+
+def _calls_per_token(parser_cls: type[Parser], tokens: TokenBuffer) -> float:
+    profile = cProfile.Profile()
+    profile.enable()
+    parser_cls(tokens, workers=1).parse_program()
+    profile.disable()
+    return pstats.Stats(profile).total_calls / len(tokens)  # type: ignore[attr-defined]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="Copies of the example corpus to parse.")
+    parser.add_argument("--terms", type=int, default=10000, help="Terms in the operator-chain expression.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per input (best is reported).")
+    args = parser.parse_args()
+
+    inputs = {
+        "corpus": _corpus(args.repeat),
+        "chain": _operator_chain(args.terms),
+    }
+    parsers = {"before": _RecursiveDescentParser, "after": Parser}
+    for name, source in inputs.items():
+        tokens = TableLexer(source).tokenize_buffer()
+        timings = {}
+        for label, parser_cls in parsers.items():
+            best = min(
+                timeit.repeat(lambda: parser_cls(tokens, workers=1).parse_program(), number=1, repeat=args.runs)
+            )
+            timings[label] = best
+            rate = len(tokens) / best / 1e3
+            calls = _calls_per_token(parser_cls, tokens)
+            print(
+                f"{name:>6} {label:>6}: {best * 1000:8.2f} ms  {rate:7.1f} Ktok/s  "
+                f"{calls:5.1f} calls/token  {len(tokens)} tokens"
+            )
+        print(f"{name:>6} speedup: {timings['before'] / timings['after']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+"""Compare full semantic analysis with incremental re-analysis after an edit."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.incremental import IncrementalDocument  # noqa: E402
+from icl.semantic import SemanticAnalyzer  # noqa: E402
+
+
+def _module(functions: int) -> str:
+    lines = ["scale := 3;", "fn f0(a:Num):Num { ret a; }"]
+    for idx in range(1, functions):
+        lines.append(f"fn f{idx}(a:Num):Num {{ b := a * scale + {idx}; ret @f{idx - 1}(b) - 1; }}")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=5000, help="Functions in the generated module.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs (best is reported).")
+    args = parser.parse_args()
+
+    doc = IncrementalDocument(_module(args.functions), "bench.icl")
+    program = doc.program
+    full = min(timeit.repeat(lambda: SemanticAnalyzer().analyze(program), number=1, repeat=args.runs))
+
+    analyzer = SemanticAnalyzer()
+    previous = analyzer.analyze(program)
+    body = f"ret @f{args.functions // 2 - 1}(b) - 1;"
+    start = doc.text.index(body)
+    edited = doc.edit(start, start + len(body), body.replace("- 1", "- 2"))
+    incremental = min(timeit.repeat(lambda: analyzer.reanalyze(edited, previous), number=1, repeat=args.runs))
+
+    print(f"       full: {full * 1000:8.2f} ms  {len(program.statements)} statements")
+    print(f"incremental: {incremental * 1000:8.2f} ms  {analyzer.reanalyzed_statements} re-analyzed")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
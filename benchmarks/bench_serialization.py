@@ -0,0 +1,63 @@
+"""Compare binary module encoding with the `ir_to_dict` + JSON path (and pickle)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import pickle
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.ir import ir_to_dict  # noqa: E402
+from icl.lowering import lowered_to_dict  # noqa: E402
+from icl.main import compile_source  # noqa: E402
+from icl.serialization import module_from_binary, module_to_binary  # noqa: E402
+
+
+def _module(functions: int) -> str:
+    lines = ["scale := 3;", "fn f0(a:Num):Num { ret a; }"]
+    for idx in range(1, functions):
+        lines.append(
+            f"fn f{idx}(a:Num):Num {{ b := a * scale + {idx}; if b > {idx}.5 ? {{ ret @f{idx - 1}(b); }} ret b - 1; }}"
+        )
+    lines.append(f'@print("result"); @print(@f{functions - 1}(1));')
+    return "\n".join(lines) + "\n"
+
+
+def _best(func, runs: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=runs))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=2000, help="Functions in the generated module.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs (best is reported).")
+    args = parser.parse_args()
+
+    artifacts = compile_source(_module(args.functions), target="python")
+    for label, module, to_dict in (("ir", artifacts.ir, ir_to_dict), ("lowered", artifacts.lowered, lowered_to_dict)):
+        text = json.dumps(to_dict(module))
+        data = module_to_binary(module)
+        json_encode = _best(lambda: json.dumps(to_dict(module)), args.runs)
+        json_decode = _best(lambda: json.loads(text), args.runs)
+        binary_encode = _best(lambda: module_to_binary(module), args.runs)
+        binary_decode = _best(lambda: module_from_binary(data), args.runs)
+        pickled = pickle.dumps(module)
+        pickle_encode = _best(lambda: pickle.dumps(module), args.runs)
+        pickle_decode = _best(lambda: pickle.loads(pickled), args.runs)
+        print(f"{label}:")
+        for name, size, encode, decode in (
+            ("json", len(text), json_encode, json_decode),
+            ("binary", len(data), binary_encode, binary_decode),
+            ("pickle", len(pickled), pickle_encode, pickle_decode),
+        ):
+            print(f"  {name:>6}: {size / 1024:9.1f} KiB  encode {encode * 1000:8.2f} ms  decode {decode * 1000:8.2f} ms")
+    print("JSON decoding stops at plain dicts; binary decoding rebuilds the dataclasses.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
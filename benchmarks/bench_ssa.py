@@ -0,0 +1,58 @@
+"""Time SSA construction and the -O2 pipeline at two module sizes to show they scale linearly."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.fused import FusedIRBuilder  # noqa: E402
+from icl.ir import IRModule  # noqa: E402
+from icl.lexer import TableLexer  # noqa: E402
+from icl.optimize import IRPassManager  # noqa: E402
+from icl.parser import Parser  # noqa: E402
+from icl.resolver import resolve_program  # noqa: E402
+from icl.semantic import SemanticAnalyzer  # noqa: E402
+from icl.ssa import build_ssa  # noqa: E402
+
+
+def _module(functions: int) -> str:
+    lines = ["scale := 3;", "fn f0(a:Num):Num { ret a; }"]
+    for idx in range(1, functions):
+        lines.append(
+            f"fn f{idx}(a:Num):Num {{ b := a * scale + {idx}; c := b; loop i in 0..3 {{ b := b - i; }} "
+            f"if b > {idx}.5 ? {{ c := b; }} : {{ ret @f{idx - 1}(c); }} ret c - 1; }}"
+        )
+    lines.append(f'@print("result"); @print(@f{functions - 1}(1));')
+    return "\n".join(lines) + "\n"
+
+
+def _build_ir(source: str) -> IRModule:
+    program = Parser(TableLexer(source).tokenize_buffer()).parse_program()
+    return FusedIRBuilder(SemanticAnalyzer().analyze(program), resolve_program(program)).build(program)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=1000, help="Functions in the smaller generated module.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs (best is reported).")
+    args = parser.parse_args()
+
+    previous: tuple[float, float] | None = None
+    for functions in (args.functions, args.functions * 2):
+        module = _build_ir(_module(functions))
+        ssa_time = min(timeit.repeat(lambda: build_ssa(module), number=1, repeat=args.runs))
+        o2_time = min(timeit.repeat(lambda: IRPassManager(2).run(module), number=1, repeat=args.runs))
+        growth = ""
+        if previous is not None:
+            growth = f"  x{ssa_time / previous[0]:.2f} / x{o2_time / previous[1]:.2f} for 2x the code"
+        print(f"{functions:>6} functions: ssa {ssa_time * 1000:8.2f} ms  -O2 {o2_time * 1000:8.2f} ms{growth}")
+        previous = (ssa_time, o2_time)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+"""Time the visitor-based walkers on a large module and compare dispatch with an `isinstance` ladder."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from icl.ir import IRBuilder  # noqa: E402
+from icl.lowering import (  # noqa: E402
+    LoweredAssignment,
+    LoweredBinary,
+    LoweredCall,
+    LoweredExpressionStmt,
+    LoweredFunction,
+    LoweredIf,
+    LoweredLambda,
+    LoweredLiteral,
+    LoweredLoop,
+    LoweredRef,
+    LoweredReturn,
+    LoweredUnary,
+    Lowerer,
+    collect_ir_features,
+    lowered_to_graph,
+)
+from icl.main import _emit_program_compact, compile_source  # noqa: E402
+from icl.visitor import NodeVisitor  # noqa: E402
+
+
+def _module(functions: int) -> str:
+    lines = ["scale := 3;", "fn f0(a:Num):Num { ret a; }"]
+    for idx in range(1, functions):
+        lines.append(
+            f"fn f{idx}(a:Num):Num {{ b := a * scale + {idx}; loop i in 0..3 {{ b := b - -i; }} "
+            f"if b > {idx}.5 ? {{ ret @f{idx - 1}(b); }} ret b - 1; }}"
+        )
+    lines.append(f'@print("result"); @print(@f{functions - 1}(1));')
+    return "\n".join(lines) + "\n"
+
+
+def _ladder_count(node: object) -> int:
+    # The shape every walker had before `NodeVisitor`: statements first, then expressions.
+    if isinstance(node, LoweredAssignment):
+        return 1 + _ladder_count(node.value)
+    if isinstance(node, LoweredExpressionStmt):
+        return 1 + _ladder_count(node.expr)
+    if isinstance(node, LoweredIf):
+        total = 1 + _ladder_count(node.condition)
+        return total + sum(_ladder_count(item) for item in node.then_block + node.else_block)
+    if isinstance(node, LoweredLoop):
+        total = 1 + _ladder_count(node.start) + _ladder_count(node.end)
+        return total + sum(_ladder_count(item) for item in node.body)
+    if isinstance(node, LoweredFunction):
+        return 1 + sum(_ladder_count(item) for item in node.body)
+    if isinstance(node, LoweredReturn):
+        return 1 + (_ladder_count(node.value) if node.value is not None else 0)
+    if isinstance(node, LoweredLiteral):
+        return 1
+    if isinstance(node, LoweredRef):
+        return 1
+    if isinstance(node, LoweredUnary):
+        return 1 + _ladder_count(node.operand)
+    if isinstance(node, LoweredBinary):
+        return 1 + _ladder_count(node.left) + _ladder_count(node.right)
+    if isinstance(node, LoweredCall):
+        return 1 + _ladder_count(node.callee) + sum(_ladder_count(arg) for arg in node.args or [])
+    if isinstance(node, LoweredLambda):
+        return 1 + (_ladder_count(node.body) if node.body is not None else 0)
+    return 0
+
+
+class _VisitorCount(NodeVisitor):
+    def visit_LoweredAssignment(self, node: LoweredAssignment) -> int:
+        return 1 + self.visit(node.value)
+
+    def visit_LoweredExpressionStmt(self, node: LoweredExpressionStmt) -> int:
+        return 1 + self.visit(node.expr)
+
+    def visit_LoweredIf(self, node: LoweredIf) -> int:
+        total = 1 + self.visit(node.condition)
+        return total + sum(self.visit(item) for item in node.then_block + node.else_block)
+
+    def visit_LoweredLoop(self, node: LoweredLoop) -> int:
+        total = 1 + self.visit(node.start) + self.visit(node.end)
+        return total + sum(self.visit(item) for item in node.body)
+
+    def visit_LoweredFunction(self, node: LoweredFunction) -> int:
+        return 1 + sum(self.visit(item) for item in node.body)
+
+    def visit_LoweredReturn(self, node: LoweredReturn) -> int:
+        return 1 + (self.visit(node.value) if node.value is not None else 0)
+
+    def visit_LoweredLiteral(self, node: LoweredLiteral) -> int:
+        return 1
+
+    def visit_LoweredRef(self, node: LoweredRef) -> int:
+        return 1
+
+    def visit_LoweredUnary(self, node: LoweredUnary) -> int:
+        return 1 + self.visit(node.operand)
+
+    def visit_LoweredBinary(self, node: LoweredBinary) -> int:
+        return 1 + self.visit(node.left) + self.visit(node.right)
+
+    def visit_LoweredCall(self, node: LoweredCall) -> int:
+        return 1 + self.visit(node.callee) + sum(self.visit(arg) for arg in node.args or [])
+
+    def visit_LoweredLambda(self, node: LoweredLambda) -> int:
+        return 1 + (self.visit(node.body) if node.body is not None else 0)
+
+    def generic_visit(self, node: object) -> int:
+        return 0
+
+
+def _best(func, runs: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=runs))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=2000, help="Functions in the generated module.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs (best is reported).")
+    args = parser.parse_args()
+
+    source = _module(args.functions)
+    artifacts = compile_source(source, target="python")
+    program = artifacts.program
+    ir_module = artifacts.ir
+    lowered = Lowerer().lower(ir_module, target="python")
+
+    rows = [
+        ("ir build", lambda: IRBuilder(artifacts.semantic).build(program)),
+        ("lower", lambda: Lowerer().lower(ir_module, target="python")),
+        ("ir features", lambda: collect_ir_features(ir_module)),
+        ("lowered graph", lambda: lowered_to_graph(lowered)),
+        ("compact emit", lambda: _emit_program_compact(program)),
+    ]
+    for label, func in rows:
+        print(f"{label:>14}: {_best(func, args.runs) * 1000:8.2f} ms")
+
+    ladder = _best(lambda: sum(_ladder_count(stmt) for stmt in lowered.statements), args.runs)
+    counter = _VisitorCount()
+    visitor = _best(lambda: sum(counter.visit(stmt) for stmt in lowered.statements), args.runs)
+    nodes = sum(_ladder_count(stmt) for stmt in lowered.statements)
+    print(f"{'ladder walk':>14}: {ladder * 1000:8.2f} ms  {nodes} lowered nodes")
+    print(f"{'visitor walk':>14}: {visitor * 1000:8.2f} ms  {ladder / visitor:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
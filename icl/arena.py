@@ -0,0 +1,387 @@
+"""Flat AST arena addressed by integer node handles."""
+
+from __future__ import annotations
+
+from array import array
+from enum import IntEnum
+from typing import Any, Callable, Iterable
+
+from icl.ast import (
+    AssignmentStmt,
+    AstNode,
+    BinaryExpr,
+    CallExpr,
+    ExpressionStmt,
+    FunctionDefStmt,
+    IdentifierExpr,
+    IfStmt,
+    LambdaExpr,
+    LiteralExpr,
+    LoopStmt,
+    MacroStmt,
+    Param,
+    Program,
+    ReturnStmt,
+    Stmt,
+    UnaryExpr,
+    child_nodes,
+)
+from icl.source_map import SourceFile, SourceSpan, merge_spans
+
+
+class NodeKind(IntEnum):
+    """Node kinds stored in `AstArena.kinds`."""
+
+    PROGRAM = 0
+    ASSIGNMENT = 1
+    EXPRESSION = 2
+    IF = 3
+    LOOP = 4
+    FUNCTION_DEF = 5
+    RETURN = 6
+    MACRO = 7
+    IDENTIFIER = 8
+    LITERAL = 9
+    UNARY = 10
+    BINARY = 11
+    LAMBDA = 12
+    CALL = 13
+
+
+# `span_sources` entry for spans that are not offset-based.
+_NO_SOURCE = 0xFFFFFFFF
+
+
+class AstArena:
+    """AST stored in parallel arrays, one entry per node.
+
+    Nodes are numbered in post-order, so a node's handle is larger than all
+    of its descendants' and every subtree occupies the contiguous handle range
+    `subtree(handle)`. Per node the arena keeps its kind, the source offsets
+    of its span, its children (a slice of the shared `children` array) and a
+    payload: an index into the interned `values` table holding names,
+    operators and literal values, plus the node's `node_id`. Handles are plain integers, so they stay
+    valid across pickling.
+
+    Dataclass views (`node`, `program`) are built on first request and cached;
+    `handle_of` maps a view back to its handle.
+
+    Child layout per kind: PROGRAM statements; ASSIGNMENT, EXPRESSION,
+    UNARY and LAMBDA their one expression; IF condition, then block, else
+    block (the payload is the then-block length); LOOP start, end, body;
+    FUNCTION_DEF body statements or the expression body; RETURN the optional
+    value; MACRO arguments; BINARY left, right; CALL callee, arguments.
+    """
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.span_sources = array("I")
+        self.firsts = array("I")
+        self.child_starts = array("I")
+        self.child_counts = array("I")
+        self.payloads = array("I")
+        self.node_ids = array("q")
+        self.children = array("I")
+        self.values: list[Any] = []
+        self.sources: list[SourceFile] = []
+        self.root: int | None = None
+        # Spans without a line index (e.g. built by plugins), by handle.
+        self._coordinate_spans: dict[int, SourceSpan] = {}
+        self._value_index: dict[tuple[type, Any], int] = {}
+        self._source_index: dict[int, int] = {}
+        self._views: dict[int, AstNode] = {}
+        self._handles: dict[int, int] = {}
+
+    @classmethod
+    def from_program(cls, program: Program) -> AstArena:
+        """Store a dataclass program."""
+        arena = cls()
+        arena.root = arena.add(program)
+        return arena
+
+    @classmethod
+    def from_statements(cls, statements: Iterable[Stmt], eof_span: SourceSpan) -> AstArena:
+        """Store top-level statements as they are produced, then the program root.
+
+        Only one statement's dataclasses are alive at a time. The program span
+        matches `Parser.parse_program`: the first to last statement, or
+        `eof_span` for an empty program.
+        """
+        arena = cls()
+        handles = array("I")
+        first_span: SourceSpan | None = None
+        last_span = eof_span
+        for stmt in statements:
+            if first_span is None:
+                first_span = stmt.span
+            last_span = stmt.span
+            handles.append(arena.add(stmt))
+        span = eof_span if first_span is None else merge_spans(first_span, last_span)
+        arena.root = arena._append(NodeKind.PROGRAM, span, handles, None, -1)
+        return arena
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def kind(self, handle: int) -> NodeKind:
+        return NodeKind(self.kinds[handle])
+
+    def span(self, handle: int) -> SourceSpan:
+        source_index = self.span_sources[handle]
+        if source_index == _NO_SOURCE:
+            return self._coordinate_spans[handle]
+        return SourceSpan.from_offsets(self.sources[source_index], self.starts[handle], self.ends[handle])
+
+    def payload(self, handle: int) -> Any:
+        return self.values[self.payloads[handle]]
+
+    def child_handles(self, handle: int) -> array:
+        """Children of `handle` in layout order."""
+        start = self.child_starts[handle]
+        return self.children[start : start + self.child_counts[handle]]
+
+    def subtree(self, handle: int) -> range:
+        """Handles of `handle` and all its descendants, in post-order."""
+        return range(self.firsts[handle], handle + 1)
+
+    @property
+    def statements(self) -> array:
+        """Handles of the top-level statements."""
+        if self.root is None:
+            return array("I")
+        return self.child_handles(self.root)
+
+    def rebind(self, source: SourceFile) -> None:
+        """Point every offset-based span at `source`.
+
+        Used after unpickling an arena built from a copy of `source`, such as
+        one returned by a worker process. Cached views are dropped.
+        """
+        self.sources = [source] * len(self.sources)
+        self._source_index = {id(source): 0} if self.sources else {}
+        self._views = {}
+        self._handles = {}
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the arrays (excluding `values` and spans)."""
+        arrays = (
+            self.kinds,
+            self.starts,
+            self.ends,
+            self.span_sources,
+            self.firsts,
+            self.child_starts,
+            self.child_counts,
+            self.payloads,
+            self.node_ids,
+            self.children,
+        )
+        return sum(item.itemsize * len(item) for item in arrays)
+
+    def add(self, node: AstNode) -> int:
+        """Store `node` and its descendants; return its handle.
+
+        Runs with an explicit stack, so arbitrarily deep expressions are fine.
+        """
+        handles: list[int] = []
+        # Entries are (node, its children, number of handles before them).
+        stack: list[tuple[AstNode, list[AstNode], int]] = [(node, child_nodes(node), 0)]
+        while stack:
+            current, children, mark = stack[-1]
+            done = len(handles) - mark
+            if done < len(children):
+                child = children[done]
+                stack.append((child, child_nodes(child), len(handles)))
+                continue
+            stack.pop()
+            kind, payload = _ENCODERS[type(current)](current)
+            child_handles = handles[mark:]
+            del handles[mark:]
+            handles.append(self._append(kind, current.span, child_handles, payload, current.node_id))
+        return handles[0]
+
+    def _append(
+        self,
+        kind: NodeKind,
+        span: SourceSpan,
+        child_handles: Iterable[int],
+        payload: Any,
+        node_id: int,
+    ) -> int:
+        handle = len(self.kinds)
+        self.kinds.append(kind)
+        source = span.source
+        if source is None:
+            self.starts.append(0)
+            self.ends.append(0)
+            self.span_sources.append(_NO_SOURCE)
+            self._coordinate_spans[handle] = span
+        else:
+            base = source.base
+            self.starts.append(span.start - base)  # type: ignore[operator]
+            self.ends.append(span.end - base)  # type: ignore[operator]
+            self.span_sources.append(self._intern_source(source))
+        start = len(self.children)
+        self.children.extend(child_handles)
+        count = len(self.children) - start
+        self.child_starts.append(start)
+        self.child_counts.append(count)
+        self.firsts.append(self.firsts[self.children[start]] if count else handle)
+        self.payloads.append(self._intern_value(payload))
+        self.node_ids.append(node_id)
+        return handle
+
+    def _intern_source(self, source: SourceFile) -> int:
+        index = self._source_index.get(id(source))
+        if index is None:
+            index = len(self.sources)
+            self.sources.append(source)
+            self._source_index[id(source)] = index
+        return index
+
+    def _intern_value(self, value: Any) -> int:
+        # Keyed by type too, so `1`, `1.0` and `True` stay distinct.
+        key = (type(value), repr(value) if isinstance(value, float) else value)
+        index = self._value_index.get(key)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self._value_index[key] = index
+        return index
+
+    def node(self, handle: int) -> AstNode:
+        """Dataclass view of `handle`, built (with its subtree) on first use."""
+        view = self._views.get(handle)
+        if view is not None:
+            return view
+        views = self._views
+        view_handles = self._handles
+        kinds = self.kinds
+        payloads = self.payloads
+        values = self.values
+        starts = self.starts
+        ends = self.ends
+        span_sources = self.span_sources
+        sources = self.sources
+        child_starts = self.child_starts
+        child_counts = self.child_counts
+        children = self.children
+        from_offsets = SourceSpan.from_offsets
+        node_ids = self.node_ids
+        decoders = _DECODERS
+        for current in self.subtree(handle):
+            if current in views:
+                continue
+            first_child = child_starts[current]
+            child_views = [views[child] for child in children[first_child : first_child + child_counts[current]]]
+            source_index = span_sources[current]
+            if source_index == _NO_SOURCE:
+                span = self._coordinate_spans[current]
+            else:
+                span = from_offsets(sources[source_index], starts[current], ends[current])
+            view = decoders[kinds[current]](span, child_views, values[payloads[current]])
+            view.node_id = node_ids[current]
+            views[current] = view
+            view_handles[id(view)] = current
+        return views[handle]
+
+    def program(self) -> Program:
+        """Dataclass view of the whole program."""
+        if self.root is None:
+            raise ValueError("Arena has no program root.")
+        return self.node(self.root)  # type: ignore[return-value]
+
+    def handle_of(self, view: AstNode) -> int:
+        """Handle of a view returned by `node` or `program`."""
+        handle = self._handles.get(id(view))
+        if handle is None:
+            raise KeyError("Node is not a view of this arena.")
+        return handle
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # Views and identity-keyed indexes are rebuilt on demand.
+        state["_views"] = {}
+        state["_handles"] = {}
+        state["_source_index"] = {}
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._source_index = {id(source): index for index, source in enumerate(self.sources)}
+
+
+def _params_payload(params: list[Param]) -> tuple[tuple[str, str | None], ...]:
+    return tuple((param.name, param.type_hint) for param in params)
+
+
+def _params_view(params: tuple[tuple[str, str | None], ...]) -> list[Param]:
+    return [Param(name=name, type_hint=type_hint) for name, type_hint in params]
+
+
+_ENCODERS: dict[type, Callable[[Any], tuple[NodeKind, Any]]] = {
+    Program: lambda node: (NodeKind.PROGRAM, None),
+    AssignmentStmt: lambda node: (NodeKind.ASSIGNMENT, (node.name, node.type_hint)),
+    ExpressionStmt: lambda node: (NodeKind.EXPRESSION, None),
+    IfStmt: lambda node: (NodeKind.IF, len(node.then_block)),
+    LoopStmt: lambda node: (NodeKind.LOOP, node.iterator),
+    FunctionDefStmt: lambda node: (
+        NodeKind.FUNCTION_DEF,
+        (node.name, _params_payload(node.params), node.return_type, node.expr_body is not None),
+    ),
+    ReturnStmt: lambda node: (NodeKind.RETURN, None),
+    MacroStmt: lambda node: (NodeKind.MACRO, node.name),
+    IdentifierExpr: lambda node: (NodeKind.IDENTIFIER, node.name),
+    LiteralExpr: lambda node: (NodeKind.LITERAL, node.value),
+    UnaryExpr: lambda node: (NodeKind.UNARY, node.operator),
+    BinaryExpr: lambda node: (NodeKind.BINARY, node.operator),
+    LambdaExpr: lambda node: (NodeKind.LAMBDA, (_params_payload(node.params), node.return_type)),
+    CallExpr: lambda node: (NodeKind.CALL, node.at_prefixed),
+}
+
+
+def _function_view(span: SourceSpan, children: list[Any], payload: Any) -> FunctionDefStmt:
+    name, params, return_type, has_expr_body = payload
+    return FunctionDefStmt(
+        span=span,
+        name=name,
+        params=_params_view(params),
+        body=[] if has_expr_body else children,
+        expr_body=children[0] if has_expr_body else None,
+        return_type=return_type,
+    )
+
+
+_DECODERS: dict[int, Callable[[SourceSpan, list[Any], Any], AstNode]] = {
+    NodeKind.PROGRAM: lambda span, children, payload: Program(span=span, statements=children),
+    NodeKind.ASSIGNMENT: lambda span, children, payload: AssignmentStmt(
+        span=span, name=payload[0], value=children[0], type_hint=payload[1]
+    ),
+    NodeKind.EXPRESSION: lambda span, children, payload: ExpressionStmt(span=span, expr=children[0]),
+    NodeKind.IF: lambda span, children, payload: IfStmt(
+        span=span,
+        condition=children[0],
+        then_block=children[1 : 1 + payload],
+        else_block=children[1 + payload :],
+    ),
+    NodeKind.LOOP: lambda span, children, payload: LoopStmt(
+        span=span, iterator=payload, start=children[0], end=children[1], body=children[2:]
+    ),
+    NodeKind.FUNCTION_DEF: _function_view,
+    NodeKind.RETURN: lambda span, children, payload: ReturnStmt(span=span, value=children[0] if children else None),
+    NodeKind.MACRO: lambda span, children, payload: MacroStmt(span=span, name=payload, args=children),
+    NodeKind.IDENTIFIER: lambda span, children, payload: IdentifierExpr(span=span, name=payload),
+    NodeKind.LITERAL: lambda span, children, payload: LiteralExpr(span=span, value=payload),
+    NodeKind.UNARY: lambda span, children, payload: UnaryExpr(span=span, operator=payload, operand=children[0]),
+    NodeKind.BINARY: lambda span, children, payload: BinaryExpr(
+        span=span, left=children[0], operator=payload, right=children[1]
+    ),
+    NodeKind.LAMBDA: lambda span, children, payload: LambdaExpr(
+        span=span, params=_params_view(payload[0]), body=children[0], return_type=payload[1]
+    ),
+    NodeKind.CALL: lambda span, children, payload: CallExpr(
+        span=span, callee=children[0], args=children[1:], at_prefixed=payload
+    ),
+}
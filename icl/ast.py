@@ -3,16 +3,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable, Iterator
 
 from icl.source_map import SourceSpan
 
 
 @dataclass
 class AstNode:
-    """Base class for AST nodes with provenance span."""
+    """Base class for AST nodes with provenance span.
+
+    `node_id` is assigned by the parser in creation (post-)order, so it is
+    deterministic for a given source, survives copies and pickling, and keys
+    per-node results such as `SemanticResult.inferred_expr_types`. Nodes built
+    elsewhere keep -1 until `assign_node_ids` numbers them.
+    """
 
     span: SourceSpan
+    node_id: int = field(default=-1, kw_only=True, compare=False, repr=False)
 
 
 @dataclass
@@ -101,6 +108,19 @@ class MacroStmt(Stmt):
     args: list[Expr]
 
 
+@dataclass
+class ErrorStmt(Stmt):
+    """Recovery placeholder for a statement that failed to parse.
+
+    Only produced by `Parser(collect_errors=True)`. `name` is the variable or
+    function the statement appears to define, so later uses do not report it
+    as undefined.
+    """
+
+    name: str | None = None
+    is_function: bool = False
+
+
 @dataclass
 class IdentifierExpr(Expr):
     """Identifier reference expression."""
@@ -148,3 +168,49 @@ class CallExpr(Expr):
     callee: Expr
     args: list[Expr]
     at_prefixed: bool = False
+
+
+_CHILD_NODES: dict[type, Callable[[Any], list[AstNode]]] = {
+    Program: lambda node: list(node.statements),
+    AssignmentStmt: lambda node: [node.value],
+    ExpressionStmt: lambda node: [node.expr],
+    IfStmt: lambda node: [node.condition, *node.then_block, *node.else_block],
+    LoopStmt: lambda node: [node.start, node.end, *node.body],
+    FunctionDefStmt: lambda node: list(node.body) if node.expr_body is None else [node.expr_body],
+    ReturnStmt: lambda node: [] if node.value is None else [node.value],
+    MacroStmt: lambda node: list(node.args),
+    ErrorStmt: lambda node: [],
+    IdentifierExpr: lambda node: [],
+    LiteralExpr: lambda node: [],
+    UnaryExpr: lambda node: [node.operand],
+    BinaryExpr: lambda node: [node.left, node.right],
+    LambdaExpr: lambda node: [node.body],
+    CallExpr: lambda node: [node.callee, *node.args],
+}
+
+
+def child_nodes(node: AstNode) -> list[AstNode]:
+    """Direct children of `node` in source order."""
+    return _CHILD_NODES[type(node)](node)
+
+
+def iter_nodes(root: AstNode) -> Iterator[AstNode]:
+    """Yield `root` and its descendants in pre-order, without recursion."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(child_nodes(node)))
+
+
+def assign_node_ids(root: AstNode, node_ids: Iterator[int]) -> None:
+    """Give nodes without an id, or sharing one with an earlier node, a fresh id.
+
+    Plugins build nodes without ids and may reuse copies of a subtree; after
+    this every node under `root` has a distinct id taken from `node_ids`.
+    """
+    seen: set[int] = set()
+    for node in iter_nodes(root):
+        if node.node_id < 0 or node.node_id in seen:
+            node.node_id = next(node_ids)
+        seen.add(node.node_id)
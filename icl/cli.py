@@ -8,11 +8,12 @@ import sys
 from pathlib import Path
 
 from icl.contract_tests import run_contract_suite
-from icl.errors import CompilerError, Diagnostic, format_diagnostic
+from icl.errors import CompilerError, Diagnostic, DiagnosticsError, format_diagnostic
 from icl.graph import IntentGraph, diff_graphs
 from icl.main import (
     build_pack_registry,
     build_plugin_manager,
+    check_source,
     compile_file,
     compile_source,
     compile_targets,
@@ -53,7 +54,24 @@ def build_parser() -> argparse.ArgumentParser:
     compile_parser.add_argument("-o", "--output", help="Output file path (single target) or directory (multi-target)")
     compile_parser.add_argument("--emit-graph", help="Write intent graph JSON (single target only)")
     compile_parser.add_argument("--emit-sourcemap", help="Write source map JSON")
-    compile_parser.add_argument("--optimize", action="store_true", help="Enable graph optimizations")
+    compile_parser.add_argument("--optimize", action="store_true", help="Enable IR optimizations (same as -O1)")
+    compile_parser.add_argument(
+        "-O",
+        dest="opt_level",
+        type=int,
+        choices=[0, 1, 2],
+        help="IR optimization level: 0 none, 1 one pass of each optimization, 2 repeat until stable.",
+    )
+    compile_parser.add_argument(
+        "--drop-unused-functions",
+        action="store_true",
+        help="Remove functions whose calls were all inlined or evaluated (with -O1/-O2).",
+    )
+    compile_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Compile one top-level statement at a time and write output as it is produced (single target).",
+    )
     compile_parser.add_argument("--debug", action="store_true", help="Emit debug info to stderr")
     compile_parser.add_argument("--natural", action="store_true", help="Enable natural alias normalization.")
     compile_parser.add_argument(
@@ -176,6 +194,9 @@ def run(argv: list[str] | None = None) -> int:
 
     try:
         if args.command == "compile":
+            if args.stream:
+                return _run_stream_compile(args)
+
             source, filename = _resolve_source(args.input, args.code)
             if args.input and args.code:
                 raise argparse.ArgumentTypeError("Provide either file input or --code, not both.")
@@ -198,6 +219,8 @@ def run(argv: list[str] | None = None) -> int:
                         plugin_manager=manager,
                         pack_registry=pack_registry,
                         optimize=args.optimize,
+                        opt_level=args.opt_level,
+                        drop_unused_functions=args.drop_unused_functions,
                         debug=args.debug,
                         emit_graph_path=args.emit_graph,
                         emit_sourcemap_path=args.emit_sourcemap,
@@ -210,6 +233,8 @@ def run(argv: list[str] | None = None) -> int:
                         plugin_manager=manager,
                         pack_registry=pack_registry,
                         optimize=args.optimize,
+                        opt_level=args.opt_level,
+                        drop_unused_functions=args.drop_unused_functions,
                         debug=args.debug,
                         emit_graph_path=args.emit_graph,
                         emit_sourcemap_path=args.emit_sourcemap,
@@ -228,9 +253,26 @@ def run(argv: list[str] | None = None) -> int:
                         print(
                             "debug: folded="
                             f"{artifacts.optimization.folded_operations} "
-                            f"dead_assignments={artifacts.optimization.removed_assignments}",
+                            f"dead_assignments={artifacts.optimization.removed_assignments} "
+                            f"pruned_branches={artifacts.optimization.pruned_branches} "
+                            f"inlined_calls={artifacts.optimization.inlined_calls} "
+                            f"evaluated_calls={artifacts.optimization.evaluated_calls} "
+                            f"propagated_constants={artifacts.optimization.propagated_constants} "
+                            f"propagated_copies={artifacts.optimization.propagated_copies} "
+                            f"removed_loops={artifacts.optimization.removed_loops} "
+                            f"reduced_loops={artifacts.optimization.reduced_loops} "
+                            f"unrolled_loops={artifacts.optimization.unrolled_loops} "
+                            f"hoisted_expressions={artifacts.optimization.hoisted_expressions} "
+                            f"removed_functions={artifacts.optimization.removed_functions}",
                             file=sys.stderr,
                         )
+                    if artifacts.passes is not None:
+                        for record in artifacts.passes.records:
+                            print(
+                                f"debug: pass {record.name} {record.seconds * 1000:.3f}ms "
+                                f"nodes={record.nodes_after} delta={record.node_delta:+d}",
+                                file=sys.stderr,
+                            )
 
                 if not args.output:
                     sys.stdout.write(artifacts.code)
@@ -246,6 +288,8 @@ def run(argv: list[str] | None = None) -> int:
                 plugin_manager=manager,
                 pack_registry=pack_registry,
                 optimize=args.optimize,
+                opt_level=args.opt_level,
+                drop_unused_functions=args.drop_unused_functions,
                 debug=args.debug,
             )
 
@@ -282,7 +326,7 @@ def run(argv: list[str] | None = None) -> int:
                 natural_aliases=args.natural,
                 alias_mode=args.alias_mode,
             )
-            compile_source(source, filename=filename, target="python", plugin_manager=manager)
+            check_source(source, filename=filename, plugin_manager=manager)
             print("OK")
             return 0
 
@@ -403,8 +447,9 @@ def run(argv: list[str] | None = None) -> int:
         raise argparse.ArgumentTypeError(f"Unsupported command '{args.command}'.")
 
     except CompilerError as err:
-        diag = err.to_diagnostic()
-        print(format_diagnostic(diag), file=sys.stderr)
+        diagnostics = err.diagnostics if isinstance(err, DiagnosticsError) else [err.to_diagnostic()]
+        for diag in diagnostics:
+            print(format_diagnostic(diag), file=sys.stderr)
         return 1
     except argparse.ArgumentTypeError as err:
         diag = Diagnostic(code="CLI001", message=str(err), span=None, hint="Run icl --help for usage.")
@@ -416,6 +461,48 @@ def run(argv: list[str] | None = None) -> int:
         return 3
 
 
+def _run_stream_compile(args: argparse.Namespace) -> int:
+    from icl.streaming import compile_stream, read_chunks
+
+    if args.input and args.code:
+        raise argparse.ArgumentTypeError("Use either input file path or --code, not both.")
+    targets = _resolve_compile_targets(args.target, args.targets)
+    if len(targets) != 1:
+        raise argparse.ArgumentTypeError("--stream supports a single target only.")
+    if args.emit_graph or args.emit_sourcemap or args.optimize or args.opt_level:
+        raise argparse.ArgumentTypeError(
+            "--stream cannot be combined with --emit-graph, --emit-sourcemap, --optimize, or -O1/-O2."
+        )
+
+    if args.input:
+        chunks = read_chunks(args.input)
+        filename = str(Path(args.input))
+    elif args.code is not None:
+        chunks = iter([args.code])
+        filename = "<inline>"
+    else:
+        raise argparse.ArgumentTypeError("No source provided. Pass input file path or --code.")
+
+    manager = build_plugin_manager(args.plugin, natural_aliases=args.natural, alias_mode=args.alias_mode)
+    code_chunks = compile_stream(
+        chunks,
+        filename=filename,
+        target=targets[0],
+        plugin_manager=manager,
+        pack_registry=build_pack_registry(args.pack),
+        debug=args.debug,
+    )
+    if args.output:
+        with Path(args.output).open("w", encoding="utf-8") as handle:
+            for code in code_chunks:
+                handle.write(code)
+    else:
+        for code in code_chunks:
+            sys.stdout.write(code)
+            sys.stdout.flush()
+    return 0
+
+
 def _resolve_compile_targets(target: str | None, targets_args: list[str]) -> list[str]:
     targets: list[str] = []
     if target:
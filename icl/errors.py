@@ -72,6 +72,18 @@ class CLIError(CompilerError):
     """Raised by CLI usage or orchestration failures."""
 
 
+class DiagnosticsError(CompilerError):
+    """A compiler error together with every diagnostic found for the source.
+
+    The error's own code, message and span are those of `error`, the first
+    failure of strict compilation.
+    """
+
+    def __init__(self, error: CompilerError, diagnostics: list[Diagnostic]) -> None:
+        super().__init__(code=error.code, message=error.message, span=error.span, hint=error.hint)
+        self.diagnostics = diagnostics
+
+
 def format_diagnostic(diag: Diagnostic) -> str:
     """Format diagnostic into a stable human-readable line."""
     if diag.span is None:
@@ -21,6 +21,10 @@ class ExpansionContext:
 class BackendEmitter(ABC):
     """Abstract target language backend contract."""
 
+    # Backends that can render top-level statements independently set this and
+    # implement `begin_stream`/`emit_statements`.
+    supports_streaming = False
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -30,6 +34,13 @@ class BackendEmitter(ABC):
     def emit_module(self, graph: IntentGraph, context: ExpansionContext) -> str:
         """Emit full source text for a module graph."""
 
+    def begin_stream(self, context: ExpansionContext) -> None:
+        """Reset per-module state before statements are emitted incrementally."""
+
+    def emit_statements(self, graph: IntentGraph, context: ExpansionContext) -> str:
+        """Emit source for a partial module graph, keeping state from earlier calls."""
+        raise NotImplementedError(f"Backend '{self.name}' does not support streaming emission.")
+
     @staticmethod
     def indent(text: str, level: int, unit: str = "    ") -> str:
         """Indent all non-empty lines by level."""
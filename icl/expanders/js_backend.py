@@ -11,6 +11,8 @@ from icl.graph import IntentGraph
 class JavaScriptBackend(BackendEmitter):
     """Expands Intent Graph into executable JavaScript source."""
 
+    supports_streaming = True
+
     @property
     def name(self) -> str:
         return "js"
@@ -24,6 +26,17 @@ class JavaScriptBackend(BackendEmitter):
             lines.extend(self._emit_stmt(graph, stmt_id, indent=0))
         return "\n".join(lines).rstrip() + "\n"
 
+    def begin_stream(self, context: ExpansionContext) -> None:
+        self._declared = set()
+
+    def emit_statements(self, graph: IntentGraph, context: ExpansionContext) -> str:
+        if graph.root_id is None:
+            return ""
+        lines: list[str] = []
+        for stmt_id in graph.child_ids(graph.root_id, "contains"):
+            lines.extend(self._emit_stmt(graph, stmt_id, indent=0))
+        return "\n".join(lines) + "\n" if lines else ""
+
     def _emit_stmt(self, graph: IntentGraph, node_id: str, indent: int) -> list[str]:
         node = graph.nodes[node_id]
         kind = node.kind
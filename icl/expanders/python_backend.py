@@ -9,6 +9,8 @@ from icl.graph import IntentGraph
 class PythonBackend(BackendEmitter):
     """Expands Intent Graph into executable Python source."""
 
+    supports_streaming = True
+
     @property
     def name(self) -> str:
         return "python"
@@ -22,6 +24,14 @@ class PythonBackend(BackendEmitter):
             lines.extend(self._emit_stmt(graph, stmt_id, indent=0))
         return "\n".join(lines).rstrip() + "\n"
 
+    def emit_statements(self, graph: IntentGraph, context: ExpansionContext) -> str:
+        if graph.root_id is None:
+            return ""
+        lines: list[str] = []
+        for stmt_id in graph.child_ids(graph.root_id, "contains"):
+            lines.extend(self._emit_stmt(graph, stmt_id, indent=0))
+        return "\n".join(lines) + "\n" if lines else ""
+
     def _emit_stmt(self, graph: IntentGraph, node_id: str, indent: int) -> list[str]:
         node = graph.nodes[node_id]
         kind = node.kind
@@ -8,6 +8,10 @@ from icl.expanders.base import BackendEmitter, ExpansionContext
 from icl.graph import IntentGraph
 
 
+# Range of an unsuffixed Rust integer literal.
+_I32_MIN = -(2**31)
+_I32_MAX = 2**31 - 1
+
 class RustBackend(BackendEmitter):
     """Expands Intent Graph into runnable Rust source for core ICL constructs."""
 
@@ -21,7 +25,9 @@ class RustBackend(BackendEmitter):
 
         self._function_return_types: dict[str, str] = {}
         self._function_param_types: dict[str, list[str]] = {}
-        self._scope_stack: list[dict[str, str]] = []
+        # Rust types of visible symbols, innermost scope last. Keys are the
+        # resolver's slots where nodes carry a `binding`, and names otherwise.
+        self._scope_stack: list[dict[int | str, str]] = []
         self._current_function_return: str | None = None
 
         function_ids: list[str] = []
@@ -57,11 +63,16 @@ class RustBackend(BackendEmitter):
         for fn_id in function_ids:
             node = graph.nodes[fn_id]
             name = str(node.attrs.get("name", "func"))
-            params = node.attrs.get("params", [])
-            param_types = [self._symbolic_to_rust(param.get("type_hint")) for param in params]
-            return_type = self._symbolic_to_rust(node.attrs.get("return_type"))
-            self._function_param_types[name] = param_types
-            self._function_return_types[name] = return_type
+            self._collect_signature(name, node.attrs)
+
+    def _collect_signature(self, name: str, attrs: dict) -> None:
+        params = attrs.get("params", [])
+        self._function_param_types[name] = [
+            self._declared_type(param.get("inferred_type"), param.get("type_hint")) for param in params
+        ]
+        self._function_return_types[name] = self._declared_type(
+            attrs.get("inferred_return_type"), attrs.get("return_type")
+        )
 
     def _emit_function(self, graph: IntentGraph, node_id: str, indent: int) -> list[str]:
         node = graph.nodes[node_id]
@@ -81,7 +92,7 @@ class RustBackend(BackendEmitter):
         for idx, param in enumerate(params):
             p_name = str(param.get("name"))
             p_type = self._function_param_types.get(name, ["f64"] * len(params))[idx]
-            self._define_symbol(p_name, p_type)
+            self._define_symbol(p_name, p_type, slot=idx)
 
         prev_return = self._current_function_return
         self._current_function_return = return_type
@@ -110,16 +121,22 @@ class RustBackend(BackendEmitter):
             value_id = graph.child_ids(node_id, "value")[0]
             value_src, value_ty = self._emit_expr(graph, value_id)
             name = str(node.attrs["name"])
+            binding = node.attrs.get("binding")
 
-            existing_ty = self._resolve_symbol(name)
+            existing_ty = self._resolve_symbol(name, binding)
             if existing_ty is not None:
                 if existing_ty == "Fn":
                     return [self.indent(f"{name} = {value_src};", indent)], False
                 coerced = self._coerce(value_src, value_ty, existing_ty)
                 return [self.indent(f"{name} = {coerced};", indent)], False
 
+            if graph.nodes[value_id].kind == "LambdaIntent":
+                # Calls through the variable coerce arguments like direct calls.
+                self._collect_signature(name, graph.nodes[value_id].attrs)
             inferred = self._normalize_decl_type(value_ty)
-            self._define_symbol(name, inferred)
+            if value_ty != "Fn" and node.attrs.get("inferred_type") in self._CONCRETE_TYPES:
+                inferred = self._symbolic_to_rust(node.attrs["inferred_type"])
+            self._define_symbol(name, inferred, binding=binding)
             if inferred == "Fn":
                 return [self.indent(f"let mut {name} = {value_src};", indent)], False
             coerced = self._coerce(value_src, value_ty, inferred)
@@ -177,7 +194,7 @@ class RustBackend(BackendEmitter):
 
             lines = [self.indent(f"for {it} in ({start_i64})..({end_i64}) {{", indent)]
             self._push_scope()
-            self._define_symbol(it, "i64")
+            self._define_symbol(it, "i64", slot=0)
             for body_id in graph.child_ids(node_id, "contains_body"):
                 body_lines, _ = self._emit_stmt(graph, body_id, indent + 1)
                 lines.extend(body_lines)
@@ -214,11 +231,16 @@ class RustBackend(BackendEmitter):
                 return ("true" if value else "false"), "bool"
             if isinstance(value, str):
                 return f"{json.dumps(value)}.to_string()", "String"
+            if isinstance(value, int):
+                # Unsuffixed integer literals are `i32` to rustc.
+                if not _I32_MIN <= value <= _I32_MAX:
+                    return f"{value}i64", "i64"
+                return str(value), "i64"
             return self._render_number(value), "f64"
 
         if kind == "RefIntent":
             name = str(node.attrs.get("name"))
-            return name, self._resolve_symbol(name) or "f64"
+            return name, self._resolve_symbol(name, node.attrs.get("binding")) or "f64"
 
         if kind == "OperationIntent":
             operator = str(node.attrs.get("operator"))
@@ -229,6 +251,8 @@ class RustBackend(BackendEmitter):
                 if operator == "!":
                     operand_src = self._coerce(operand_src, operand_ty, "bool")
                     return f"(!{operand_src})", "bool"
+                if operand_ty == "i64":
+                    return f"({operator}{operand_src})", "i64"
                 operand_src = self._coerce(operand_src, operand_ty, "f64")
                 return f"({operator}{operand_src})", "f64"
 
@@ -240,6 +264,8 @@ class RustBackend(BackendEmitter):
                     left_str = self._to_string_expr(left_src, left_ty)
                     right_str = self._to_string_expr(right_src, right_ty)
                     return f"format!(\"{{}}{{}}\", {left_str}, {right_str})", "String"
+                if operator != "/" and left_ty == "i64" and right_ty == "i64":
+                    return f"({left_src} {operator} {right_src})", "i64"
                 left_num = self._coerce(left_src, left_ty, "f64")
                 right_num = self._coerce(right_src, right_ty, "f64")
                 if operator == "%":
@@ -253,12 +279,14 @@ class RustBackend(BackendEmitter):
                 if right_ty == "String" and left_ty != "String":
                     left_src = self._to_string_expr(left_src, left_ty)
                     left_ty = "String"
-                if self._is_numeric(left_ty) and self._is_numeric(right_ty):
+                if self._is_numeric(left_ty) and self._is_numeric(right_ty) and left_ty != right_ty:
                     left_src = self._coerce(left_src, left_ty, "f64")
                     right_src = self._coerce(right_src, right_ty, "f64")
                 return f"({left_src} {operator} {right_src})", "bool"
 
             if operator in {"<", "<=", ">", ">="}:
+                if left_ty == "i64" and right_ty == "i64":
+                    return f"({left_src} {operator} {right_src})", "bool"
                 left_num = self._coerce(left_src, left_ty, "f64")
                 right_num = self._coerce(right_src, right_ty, "f64")
                 return f"({left_num} {operator} {right_num})", "bool"
@@ -295,15 +323,19 @@ class RustBackend(BackendEmitter):
 
             rendered_params: list[str] = []
             self._push_scope()
-            for param in params:
+            for idx, param in enumerate(params):
                 param_name = str(param.get("name"))
-                param_type = self._symbolic_to_rust(param.get("type_hint"))
-                self._define_symbol(param_name, param_type)
+                param_type = self._declared_type(param.get("inferred_type"), param.get("type_hint"))
+                self._define_symbol(param_name, param_type, slot=idx)
+                if param.get("inferred_type") in self._CONCRETE_TYPES:
+                    param_name = f"{param_name}: {param_type}"
                 rendered_params.append(param_name)
 
             body_src = "0.0"
             if body_ids:
-                body_src, _ = self._emit_expr(graph, body_ids[0])
+                body_src, body_ty = self._emit_expr(graph, body_ids[0])
+                if node.attrs.get("inferred_return_type") in self._CONCRETE_TYPES:
+                    body_src = self._coerce(body_src, body_ty, self._symbolic_to_rust(node.attrs["inferred_return_type"]))
             self._pop_scope()
 
             return f"|{', '.join(rendered_params)}| {body_src}", "Fn"
@@ -316,23 +348,54 @@ class RustBackend(BackendEmitter):
     def _pop_scope(self) -> None:
         self._scope_stack.pop()
 
-    def _define_symbol(self, name: str, rust_type: str) -> None:
+    def _define_symbol(
+        self,
+        name: str,
+        rust_type: str,
+        *,
+        slot: int | None = None,
+        binding: list[int] | None = None,
+    ) -> None:
         if not self._scope_stack:
             self._push_scope()
         self._scope_stack[-1][name] = rust_type
-
-    def _resolve_symbol(self, name: str) -> str | None:
+        if binding is not None:
+            depth, slot = binding
+            if depth < len(self._scope_stack):
+                self._scope_stack[-1 - depth][slot] = rust_type
+        elif slot is not None:
+            self._scope_stack[-1][slot] = rust_type
+
+    def _resolve_symbol(self, name: str, binding: list[int] | None = None) -> str | None:
+        if binding is not None:
+            # Resolved names index their scope directly; scopes outside the
+            # function being emitted (module names seen from a fn) are absent.
+            depth, slot = binding
+            if depth < len(self._scope_stack):
+                return self._scope_stack[-1 - depth].get(slot)
+            return None
         for scope in reversed(self._scope_stack):
             if name in scope:
                 return scope[name]
         return None
 
+    # Inferred types that are emitted as-is rather than from annotations.
+    _CONCRETE_TYPES = frozenset({"Int", "Float", "Str", "Bool"})
+
+    @classmethod
+    def _declared_type(cls, inferred: str | None, type_hint: str | None) -> str:
+        if inferred in cls._CONCRETE_TYPES:
+            return cls._symbolic_to_rust(inferred)
+        return cls._symbolic_to_rust(type_hint)
+
     @staticmethod
     def _symbolic_to_rust(type_hint: str | None) -> str:
         mapping = {
             None: "f64",
             "Any": "f64",
             "Num": "f64",
+            "Int": "i64",
+            "Float": "f64",
             "Bool": "bool",
             "Str": "String",
             "Void": "()",
@@ -354,6 +417,8 @@ class RustBackend(BackendEmitter):
             return expr_src
 
         if to_ty == "f64" and from_ty == "i64":
+            if expr_src.isdigit():
+                return f"{expr_src}.0"
             return f"({expr_src} as f64)"
         if to_ty == "i64" and from_ty == "f64":
             return f"({expr_src} as i64)"
@@ -0,0 +1,101 @@
+"""Fused frontend walk: type inference, IR build, feature collection and source map together."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from icl.ast import (
+    AssignmentStmt,
+    CallExpr,
+    Expr,
+    FunctionDefStmt,
+    IdentifierExpr,
+    LambdaExpr,
+    MacroStmt,
+    Program,
+)
+from icl.graph import intent_kind
+from icl.ir import IRBuilder, IRExpressionStmt, IRModule, IRNode
+from icl.lowering import ir_node_features
+from icl.resolver import Resolution
+from icl.semantic import SemanticResult, TypeInference
+from icl.source_map import SourceMap
+
+
+class FusedIRBuilder(IRBuilder):
+    """`IRBuilder` that also does the work of `infer_types`, `IntentGraphBuilder` and `collect_ir_features`.
+
+    One walk over the AST gathers type constraints, builds IR, records the
+    source map `IntentGraphBuilder` would (same node ids and notes, without
+    building the graph) and collects IR features. Solved types are only known
+    after the walk, so nodes are built with the semantic types and patched
+    before content hashes are computed. The module equals
+    `IRBuilder(semantic, resolution, infer_types(program, resolution))`.
+    """
+
+    def __init__(
+        self,
+        semantic: SemanticResult | None,
+        resolution: Resolution,
+        source_map: SourceMap | None = None,
+    ) -> None:
+        super().__init__(semantic, resolution)
+        self._inference = TypeInference(resolution)
+        self._source_map = source_map or SourceMap()
+        self._map_counter = 0
+        # Identifier callee of the call being visited; the graph folds it into the call node.
+        self._callee: Expr | None = None
+        self._built: list[tuple[Any, IRNode]] = []
+        self.features: set[str] = set()
+
+    @property
+    def source_map(self) -> SourceMap:
+        """Return source map populated during build."""
+        return self._source_map
+
+    def build(self, program: Program) -> IRModule:
+        """Create a typed IR module, the source map and features in one walk."""
+        self._record_span(program, "module")
+        module = self._build_module(program)
+        self._types = self._inference.finish()
+        self._apply_types()
+        return module
+
+    def visit(self, node: Any) -> Any:
+        if node is None:
+            built = self._dispatch[type(node)](self, node)
+            self.features.update(ir_node_features(built))
+            return built
+        if node is self._callee:
+            self._callee = None
+        else:
+            self._record_span(node, intent_kind(node))
+        if isinstance(node, CallExpr) and isinstance(node.callee, IdentifierExpr):
+            self._callee = node.callee
+        self._inference.enter(node)
+        built = self._dispatch[type(node)](self, node)
+        self._inference.leave(node)
+        self._built.append((node, built))
+        self.features.update(ir_node_features(built))
+        return built
+
+    def visit_MacroStmt(self, stmt: MacroStmt) -> IRExpressionStmt:
+        built = super().visit_MacroStmt(stmt)
+        # The call and callee are made here, not by visiting AST nodes.
+        self.features.update(ir_node_features(built.expr))
+        self.features.update(ir_node_features(built.expr.callee))
+        return built
+
+    def _apply_types(self) -> None:
+        for node, built in self._built:
+            if isinstance(node, Expr):
+                built.expr_type = self._expr_type(node)
+            if isinstance(node, AssignmentStmt):
+                built.inferred_type = self._symbol_type(node)
+            elif isinstance(node, (FunctionDefStmt, LambdaExpr)):
+                built.params = self._build_params(node, node.params)
+                built.inferred_return_type = self._return_type(node)
+
+    def _record_span(self, node: Any, note: str) -> None:
+        self._map_counter += 1
+        self._source_map.add(node_id=f"n{self._map_counter}", span=node.span, note=note)
@@ -148,6 +148,31 @@ class IntentGraph:
         return graph
 
 
+_INTENT_KINDS: dict[type, str] = {
+    AssignmentStmt: "AssignmentIntent",
+    ExpressionStmt: "ExpressionIntent",
+    IfStmt: "ControlIntent",
+    LoopStmt: "LoopIntent",
+    FunctionDefStmt: "FuncIntent",
+    ReturnStmt: "ReturnIntent",
+    MacroStmt: "ExpansionIntent",
+    LiteralExpr: "LiteralIntent",
+    IdentifierExpr: "RefIntent",
+    UnaryExpr: "OperationIntent",
+    BinaryExpr: "OperationIntent",
+    CallExpr: "CallIntent",
+    LambdaExpr: "LambdaIntent",
+}
+
+
+def intent_kind(node: Stmt | Expr) -> str:
+    """Kind of the graph node `IntentGraphBuilder` creates for `node`."""
+    kind = _INTENT_KINDS.get(type(node))
+    if kind is not None:
+        return kind
+    return "UnknownIntent" if isinstance(node, Stmt) else "UnknownExprIntent"
+
+
 class IntentGraphBuilder:
     """Builds Intent Graph plus source map from AST."""
 
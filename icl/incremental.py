@@ -0,0 +1,322 @@
+"""Incremental lexing and parsing of a document under small text edits."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+import itertools
+
+from icl.ast import Program, Stmt
+from icl.errors import CompilerError, LexError, ParseError
+from icl.lexer import TableLexer
+from icl.parser import Parser, fold_parse_errors
+from icl.source_map import SourceFile, merge_spans
+from icl.tokens import TOKEN_TYPE_CODES, TokenType
+
+
+_COLON_CODE = TOKEN_TYPE_CODES[TokenType.COLON]
+_RBRACE_CODE = TOKEN_TYPE_CODES[TokenType.RBRACE]
+_TERMINATOR_CODES = frozenset({TOKEN_TYPE_CODES[TokenType.SEMICOLON], _RBRACE_CODE})
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """Replacement of `source[start:end]` with `text`."""
+
+    start: int
+    end: int
+    text: str
+
+    def apply(self, source: str) -> str:
+        """Return `source` with the edit applied."""
+        return source[: self.start] + self.text + source[self.end :]
+
+
+@dataclass
+class _Segment:
+    """Text owned by one top-level statement.
+
+    A segment runs from the end of the previous statement (including its
+    trailing semicolons) to the end of its own. `offset` is relative to the
+    window's `base`. Segments without a statement hold text that failed to
+    lex or parse (see `errors`) or, last in the document, trailing trivia.
+    """
+
+    offset: int
+    window: SourceFile
+    statement: Stmt | None = None
+    errors: list[CompilerError] = field(default_factory=list)
+
+    @property
+    def start(self) -> int:
+        return self.window.base + self.offset
+
+
+class _NeedsWiderRegion(Exception):
+    """Raised when a re-lexed region does not sit on statement boundaries."""
+
+    def __init__(self, backward: bool) -> None:
+        super().__init__()
+        self.backward = backward
+
+
+def _segment_start(segment: _Segment) -> int:
+    return segment.start
+
+
+class IncrementalDocument:
+    """Parsed document updated in place by text edits.
+
+    Each top-level statement owns a segment of the text with its own line
+    index window. An edit re-lexes and re-parses only the segments it touches,
+    widening the damaged region until it starts and ends on a top-level `;`
+    or `}`. Statements outside the region are kept as-is; the windows after it
+    are shifted so their spans resolve against the new text. Reused
+    statements are shared with earlier programs, whose spans therefore follow
+    the latest text.
+    """
+
+    def __init__(self, source: str, filename: str = "<input>") -> None:
+        self.filename = filename
+        self.text = source
+        # Work done by the last update, for diagnostics and tests.
+        self.reparsed_statements = 0
+        self.relexed_chars = 0
+        self._segments: list[_Segment] = []
+        # Node ids stay unique across every parser run on this document.
+        self._node_ids = itertools.count()
+        self._program_id = next(self._node_ids)
+        # Statements of `_segments` in order, and how many segments hold errors.
+        self._statements: list[Stmt] = []
+        self._broken = 0
+        self._splice(0, 0, self._parse_region(0, len(source), line=1, column=1, final=True))
+        self.relexed_chars = len(source)
+
+    @property
+    def program(self) -> Program:
+        """Current program; raises the document's first lex or parse error."""
+        errors = self.errors
+        if errors:
+            lex_errors = [error for error in errors if isinstance(error, LexError)]
+            if lex_errors:
+                raise lex_errors[0]
+            raise fold_parse_errors(errors)  # type: ignore[arg-type]
+
+        statements = list(self._statements)
+        if statements:
+            span = merge_spans(statements[0].span, statements[-1].span)
+        else:
+            tail = self._segments[-1]
+            end = len(self.text) - tail.window.base
+            span = tail.window.span(end, end)
+        return Program(span=span, statements=statements, node_id=self._program_id)
+
+    @property
+    def errors(self) -> list[CompilerError]:
+        """Lex and parse errors in document order."""
+        if not self._broken:
+            return []
+        return [error for segment in self._segments for error in segment.errors]
+
+    def edit(self, start: int, end: int, text: str) -> Program:
+        """Replace `text[start:end]` and return the updated program."""
+        return self.apply(TextEdit(start=start, end=end, text=text))
+
+    def apply(self, edit: TextEdit) -> Program:
+        """Apply `edit`, re-parse the statements it touches and return the program."""
+        if not 0 <= edit.start <= edit.end <= len(self.text):
+            raise ValueError(f"Edit range {edit.start}..{edit.end} is outside the document.")
+
+        segments = self._segments
+        # Segments touching the edit, plus one character either side so tokens
+        # that merge across the edit boundary are re-lexed.
+        first = max(bisect_right(segments, edit.start - 1, key=_segment_start) - 1, 0)
+        last = bisect_right(segments, edit.end, key=_segment_start)
+        delta = len(edit.text) - (edit.end - edit.start)
+        self.text = edit.apply(self.text)
+
+        while True:
+            region_start = segments[first].start
+            # Statements must resume after a `;` or `}`, and parse errors may
+            # depend on the first token of the following segment.
+            if region_start > 0 and (self.text[region_start - 1] not in ";}" or segments[first - 1].errors):
+                first -= 1
+                continue
+            final = last == len(segments)
+            region_end = len(self.text) if final else segments[last].start + delta
+            head = segments[first]
+            line, column = head.window.position(head.offset)
+            try:
+                replacement = self._parse_region(
+                    region_start,
+                    region_end,
+                    line=line,
+                    column=column,
+                    final=final,
+                    before_error=not final and bool(segments[last].errors),
+                )
+            except _NeedsWiderRegion as wider:
+                if wider.backward:
+                    first -= 1
+                else:
+                    last += 1
+                continue
+            break
+
+        if not final:
+            self._shift(segments[last:], replacement, delta)
+        self._splice(first, last, replacement)
+        self.relexed_chars = region_end - region_start
+        return self.program
+
+    def _splice(self, first: int, last: int, replacement: list[_Segment]) -> None:
+        """Replace `_segments[first:last]`, keeping the statement list in step."""
+        segments = self._segments
+        removed = segments[first:last]
+        if self._broken:
+            index = sum(1 for segment in segments[:first] if segment.statement is not None)
+        else:
+            # Only the trailing segment lacks a statement.
+            index = first
+        count = sum(1 for segment in removed if segment.statement is not None)
+        statements = [segment.statement for segment in replacement if segment.statement is not None]
+        self._statements[index : index + count] = statements
+        self._broken += sum(1 for segment in replacement if segment.errors)
+        self._broken -= sum(1 for segment in removed if segment.errors)
+        segments[first:last] = replacement
+        self.reparsed_statements = len(statements)
+
+    def _parse_region(
+        self,
+        start: int,
+        end: int,
+        *,
+        line: int,
+        column: int,
+        final: bool,
+        before_error: bool = False,
+    ) -> list[_Segment]:
+        """Lex and parse `text[start:end]` into segments.
+
+        Unless `final`, the region must end with a top-level terminator that
+        the following segment cannot continue; otherwise `_NeedsWiderRegion`
+        asks the caller to retry with a larger region. Only a segment that
+        failed to parse (`before_error`) can continue a trailing `}`, as the
+        `: { ... }` of an `if`.
+        """
+        # Past the start of the file, also lex the `;` or `}` before the region
+        # so error recovery sees the same previous token as a full parse.
+        lead = 1 if start > 0 else 0
+        origin = start - lead
+        text = self.text[origin:end]
+        lexer = TableLexer(text, filename=self.filename, line=line, column=column - lead)
+        try:
+            tokens = lexer.tokenize_buffer()
+        except LexError as err:
+            if not final and err.code == "LEX002":
+                raise _NeedsWiderRegion(backward=False) from err
+            return [self._lex_error_segment(text, origin, lead, line, column - lead, err)]
+
+        source = tokens.source
+        source.base = origin
+        count = len(tokens) - 1
+        if lead and count > lead and self.text[origin] == "}" and tokens.types[lead] == _COLON_CODE:
+            # `: { ... }` continues the preceding `if` statement.
+            raise _NeedsWiderRegion(backward=True)
+        if not final and (
+            count == lead
+            or tokens.ends[count - 1] != len(text)
+            or tokens.types[count - 1] not in _TERMINATOR_CODES
+            or (before_error and tokens.types[count - 1] == _RBRACE_CODE)
+        ):
+            raise _NeedsWiderRegion(backward=False)
+
+        parser = Parser(tokens, node_ids=self._node_ids)
+        parser.pos = lead
+        segments: list[_Segment] = []
+        offset = lead
+        while True:
+            window = self._open_window(source, offset)
+            tokens.rebind(window)
+            errors: list[CompilerError] = []
+            try:
+                stmt = parser.parse_top_level_statement()
+            except ParseError as err:
+                if not final and parser.pos >= count:
+                    raise _NeedsWiderRegion(backward=False) from err
+                # The offending token may open the next segment; keep its
+                # line in this window too.
+                failed_at = tokens.ends[parser.pos]
+                parser.recover()
+                stmt = None
+                errors.append(err)
+            if stmt is None and not errors:
+                break
+            stop = tokens.ends[parser.pos - 1]
+            self._close_window(window, source, max(stop, failed_at) if errors else stop)
+            segments.append(_Segment(offset=offset, window=window, statement=stmt, errors=errors))
+            offset = stop
+
+        if final:
+            window = self._open_window(source, offset)
+            self._close_window(window, source, len(text))
+            segments.append(_Segment(offset=offset, window=window))
+        elif not segments:
+            # Only semicolons are left; they belong with a neighbour.
+            raise _NeedsWiderRegion(backward=start > 0)
+        elif offset < len(text):
+            # Semicolons left after recovering from an error.
+            self._close_window(segments[-1].window, source, len(text))
+        return segments
+
+    def _lex_error_segment(
+        self, text: str, origin: int, offset: int, line: int, column: int, err: LexError
+    ) -> _Segment:
+        window = SourceFile(self.filename, first_line=line, line_start=1 - column, base=origin)
+        newline = text.find("\n")
+        while newline != -1:
+            window.add_line_start(newline + 1)
+            newline = text.find("\n", newline + 1)
+        error = err
+        if err.span is not None and err.span.start is not None:
+            span = window.span(err.span.start, err.span.end)
+            error = LexError(code=err.code, message=err.message, span=span, hint=err.hint)
+        return _Segment(offset=offset, window=window, errors=[error])
+
+    def _open_window(self, source: SourceFile, offset: int) -> SourceFile:
+        line, column = source.position(offset)
+        return SourceFile(self.filename, first_line=line, line_start=offset - column + 1, base=source.base)
+
+    @staticmethod
+    def _close_window(window: SourceFile, source: SourceFile, end: int) -> None:
+        """Copy the line starts of `source` up to `end` that `window` lacks."""
+        line_starts = source.line_starts
+        first = bisect_right(line_starts, window.line_starts[-1])
+        window.line_starts.extend(line_starts[first : bisect_right(line_starts, end)])
+
+    @staticmethod
+    def _shift(following: list[_Segment], replacement: list[_Segment], delta: int) -> None:
+        """Move the windows after a re-parsed region to their new positions."""
+        old_window = following[0].window
+        old_line = old_window.first_line
+        old_line_start = old_window.base + old_window.line_starts[0]
+
+        region = replacement[-1].window
+        new_line = region.first_line + len(region.line_starts) - 1
+        new_line_start = region.base + region.line_starts[-1]
+        line_delta = new_line - old_line
+        # Windows that open on the line the region ends on also move sideways.
+        column_fix = new_line_start - old_line_start - delta
+        index = 0
+        if column_fix:
+            while index < len(following) and following[index].window.first_line == old_line:
+                following[index].window.line_starts[0] += column_fix
+                index += 1
+        if line_delta:
+            for segment in following:
+                window = segment.window
+                window.first_line += line_delta
+                window.base += delta
+        elif delta:
+            for segment in following:
+                segment.window.base += delta
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, is_dataclass
-from typing import Any
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
+from functools import cache
+import hashlib
+from typing import Any, Iterator
 
 from icl.ast import (
     AssignmentStmt,
@@ -24,19 +26,29 @@ from icl.ast import (
     Stmt,
     UnaryExpr,
 )
-from icl.semantic import SemanticResult
+from icl.resolver import Binding, Resolution
+from icl.semantic import InferredTypes, SemanticResult
 from icl.source_map import SourceSpan
+from icl.visitor import NodeVisitor
 
 
-IR_SCHEMA_VERSION = "2.0"
+IR_SCHEMA_VERSION = "3.0"
 
 
 @dataclass
 class IRNode:
-    """Base IR node with optional source span provenance."""
+    """Base IR node with optional source span provenance.
+
+    `content_hash` is a structural digest of the node and everything below
+    it, independent of `ir_id` and spans, so equal code hashes equally
+    across builds and files. It is empty until `assign_content_hashes` runs,
+    which only the consumers of hashes (binary encoding, callers comparing
+    modules) do; run it again after changing hashed IR in place.
+    """
 
     ir_id: str
     span: SourceSpan | None
+    content_hash: str = field(default="", kw_only=True, compare=False, repr=False)
 
 
 @dataclass
@@ -57,6 +69,8 @@ class IRParam:
 
     name: str
     type_hint: str | None = None
+    # Concrete type from `TypeInference`, when one was solved.
+    inferred_type: str | None = None
 
 
 @dataclass
@@ -73,6 +87,9 @@ class IRAssignment(IRStmt):
     name: str
     type_hint: str | None
     value: IRExpr
+    binding: Binding | None = None
+    # Concrete type of the assigned variable across all its assignments.
+    inferred_type: str | None = None
 
 
 @dataclass
@@ -102,6 +119,7 @@ class IRFunction(IRStmt):
     body: list[IRStmt]
     expr_body: IRExpr | None
     return_type: str | None
+    inferred_return_type: str | None = None
 
 
 @dataclass
@@ -112,11 +130,14 @@ class IRReturn(IRStmt):
 @dataclass
 class IRLiteral(IRExpr):
     value: Any = None
+    # Operator of the expression this literal was constant-folded from.
+    folded_from: str | None = None
 
 
 @dataclass
 class IRRef(IRExpr):
     name: str = ""
+    binding: Binding | None = None
 
 
 @dataclass
@@ -144,23 +165,41 @@ class IRLambda(IRExpr):
     params: list[IRParam] | None = None
     body: IRExpr | None = None
     return_type: str | None = None
+    inferred_return_type: str | None = None
+
 
+class IRBuilder(NodeVisitor):
+    """Lowers AST into target-agnostic IR.
 
-class IRBuilder:
-    """Lowers AST into target-agnostic IR."""
+    With `types`, expressions carry concrete `Int`/`Float` types instead of
+    `Num`, and parameters, assignments and returns their solved types.
+    """
 
-    def __init__(self, semantic: SemanticResult | None = None) -> None:
+    def __init__(
+        self,
+        semantic: SemanticResult | None = None,
+        resolution: Resolution | None = None,
+        types: InferredTypes | None = None,
+    ) -> None:
         self._semantic = semantic
+        # Name bindings by AST node id; shared, not copied, so a resolver may
+        # keep adding to it between `build_statement` calls.
+        self._bindings = resolution.bindings if resolution is not None else {}
+        self._param_symbols = resolution.param_symbols if resolution is not None else {}
+        self._types = types
         self._counter = 0
 
     def build(self, program: Program) -> IRModule:
         """Create an IR module from parsed AST."""
-        statements = [self._build_stmt(stmt) for stmt in program.statements]
+        return self._build_module(program)
+
+    def _build_module(self, program: Program) -> IRModule:
+        statements = [self.visit(stmt) for stmt in program.statements]
 
         inferred: dict[str, str] = {}
         if self._semantic is not None:
-            for expr_id, type_name in self._semantic.inferred_expr_types.items():
-                inferred[str(expr_id)] = type_name
+            for node_id, type_name in self._semantic.inferred_expr_types.items():
+                inferred[str(node_id)] = type_name
 
         return IRModule(
             ir_id=self._new_id("mod"),
@@ -170,155 +209,288 @@ class IRBuilder:
             inferred_types=inferred,
         )
 
-    def _build_stmt(self, stmt: Stmt) -> IRStmt:
-        if isinstance(stmt, AssignmentStmt):
-            return IRAssignment(
-                ir_id=self._new_id("stmt"),
-                span=stmt.span,
-                name=stmt.name,
-                type_hint=stmt.type_hint,
-                value=self._build_expr(stmt.value),
-            )
+    def build_statement(self, stmt: Stmt, semantic: SemanticResult | None = None) -> IRStmt:
+        """Build IR for one top-level statement, continuing this builder's ids."""
+        if semantic is not None:
+            self._semantic = semantic
+        return self.visit(stmt)
+
+    def visit_AssignmentStmt(self, stmt: AssignmentStmt) -> IRStmt:
+        return IRAssignment(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            name=stmt.name,
+            type_hint=stmt.type_hint,
+            value=self.visit(stmt.value),
+            binding=self._bindings.get(stmt.node_id),
+            inferred_type=self._symbol_type(stmt),
+        )
 
-        if isinstance(stmt, ExpressionStmt):
-            return IRExpressionStmt(
-                ir_id=self._new_id("stmt"),
-                span=stmt.span,
-                expr=self._build_expr(stmt.expr),
-            )
+    def visit_ExpressionStmt(self, stmt: ExpressionStmt) -> IRStmt:
+        return IRExpressionStmt(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            expr=self.visit(stmt.expr),
+        )
 
-        if isinstance(stmt, IfStmt):
-            return IRIf(
-                ir_id=self._new_id("stmt"),
-                span=stmt.span,
-                condition=self._build_expr(stmt.condition),
-                then_block=[self._build_stmt(item) for item in stmt.then_block],
-                else_block=[self._build_stmt(item) for item in stmt.else_block],
-            )
+    def visit_IfStmt(self, stmt: IfStmt) -> IRStmt:
+        return IRIf(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            condition=self.visit(stmt.condition),
+            then_block=[self.visit(item) for item in stmt.then_block],
+            else_block=[self.visit(item) for item in stmt.else_block],
+        )
 
-        if isinstance(stmt, LoopStmt):
-            return IRLoop(
-                ir_id=self._new_id("stmt"),
-                span=stmt.span,
-                iterator=stmt.iterator,
-                start=self._build_expr(stmt.start),
-                end=self._build_expr(stmt.end),
-                body=[self._build_stmt(item) for item in stmt.body],
-            )
+    def visit_LoopStmt(self, stmt: LoopStmt) -> IRStmt:
+        return IRLoop(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            iterator=stmt.iterator,
+            start=self.visit(stmt.start),
+            end=self.visit(stmt.end),
+            body=[self.visit(item) for item in stmt.body],
+        )
 
-        if isinstance(stmt, FunctionDefStmt):
-            params = [IRParam(name=param.name, type_hint=param.type_hint) for param in stmt.params]
-            return IRFunction(
-                ir_id=self._new_id("stmt"),
-                span=stmt.span,
-                name=stmt.name,
-                params=params,
-                body=[self._build_stmt(item) for item in stmt.body],
-                expr_body=self._build_expr(stmt.expr_body) if stmt.expr_body is not None else None,
-                return_type=stmt.return_type,
-            )
+    def visit_FunctionDefStmt(self, stmt: FunctionDefStmt) -> IRStmt:
+        params = self._build_params(stmt, stmt.params)
+        return IRFunction(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            name=stmt.name,
+            params=params,
+            body=[self.visit(item) for item in stmt.body],
+            expr_body=self.visit(stmt.expr_body) if stmt.expr_body is not None else None,
+            return_type=stmt.return_type,
+            inferred_return_type=self._return_type(stmt),
+        )
 
-        if isinstance(stmt, ReturnStmt):
-            return IRReturn(
-                ir_id=self._new_id("stmt"),
-                span=stmt.span,
-                value=self._build_expr(stmt.value) if stmt.value is not None else None,
-            )
+    def visit_ReturnStmt(self, stmt: ReturnStmt) -> IRStmt:
+        return IRReturn(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            value=self.visit(stmt.value) if stmt.value is not None else None,
+        )
 
-        if isinstance(stmt, MacroStmt):
-            # Macros should be fully expanded before IR build.
-            return IRExpressionStmt(
-                ir_id=self._new_id("stmt"),
+    def visit_MacroStmt(self, stmt: MacroStmt) -> IRStmt:
+        # Macros should be fully expanded before IR build.
+        return IRExpressionStmt(
+            ir_id=self._new_id("stmt"),
+            span=stmt.span,
+            expr=IRCall(
+                ir_id=self._new_id("expr"),
                 span=stmt.span,
-                expr=IRCall(
+                expr_type="Any",
+                callee=IRRef(
                     ir_id=self._new_id("expr"),
                     span=stmt.span,
-                    expr_type="Any",
-                    callee=IRRef(
-                        ir_id=self._new_id("expr"),
-                        span=stmt.span,
-                        expr_type="Fn",
-                        name=f"__macro_{stmt.name}",
-                    ),
-                    args=[self._build_expr(arg) for arg in stmt.args],
-                    at_prefixed=True,
+                    expr_type="Fn",
+                    name=f"__macro_{stmt.name}",
                 ),
-            )
+                args=[self.visit(arg) for arg in stmt.args],
+                at_prefixed=True,
+            ),
+        )
 
-        raise TypeError(f"Unsupported AST statement in IRBuilder: {type(stmt).__name__}")
+    def visit_NoneType(self, expr: None) -> IRExpr:
+        # An absent expression builds a `Void` literal.
+        return IRLiteral(ir_id=self._new_id("expr"), span=None, expr_type="Void", value=None)
 
-    def _build_expr(self, expr: Expr | None) -> IRExpr:
-        if expr is None:
-            return IRLiteral(ir_id=self._new_id("expr"), span=None, expr_type="Void", value=None)
+    def visit_LiteralExpr(self, expr: LiteralExpr) -> IRExpr:
+        return IRLiteral(
+            ir_id=self._new_id("expr"),
+            span=expr.span,
+            expr_type=self._expr_type(expr),
+            value=expr.value,
+        )
 
-        inferred_type = None
-        if self._semantic is not None:
-            inferred_type = self._semantic.inferred_expr_types.get(id(expr))
+    def visit_IdentifierExpr(self, expr: IdentifierExpr) -> IRExpr:
+        return IRRef(
+            ir_id=self._new_id("expr"),
+            span=expr.span,
+            expr_type=self._expr_type(expr),
+            name=expr.name,
+            binding=self._bindings.get(expr.node_id),
+        )
 
-        if isinstance(expr, LiteralExpr):
-            return IRLiteral(
-                ir_id=self._new_id("expr"),
-                span=expr.span,
-                expr_type=inferred_type,
-                value=expr.value,
-            )
+    def visit_UnaryExpr(self, expr: UnaryExpr) -> IRExpr:
+        return IRUnary(
+            ir_id=self._new_id("expr"),
+            span=expr.span,
+            expr_type=self._expr_type(expr),
+            operator=expr.operator,
+            operand=self.visit(expr.operand),
+        )
 
-        if isinstance(expr, IdentifierExpr):
-            return IRRef(
-                ir_id=self._new_id("expr"),
-                span=expr.span,
-                expr_type=inferred_type,
-                name=expr.name,
-            )
+    def visit_BinaryExpr(self, expr: BinaryExpr) -> IRExpr:
+        return IRBinary(
+            ir_id=self._new_id("expr"),
+            span=expr.span,
+            expr_type=self._expr_type(expr),
+            left=self.visit(expr.left),
+            operator=expr.operator,
+            right=self.visit(expr.right),
+        )
 
-        if isinstance(expr, UnaryExpr):
-            return IRUnary(
-                ir_id=self._new_id("expr"),
-                span=expr.span,
-                expr_type=inferred_type,
-                operator=expr.operator,
-                operand=self._build_expr(expr.operand),
-            )
+    def visit_CallExpr(self, expr: CallExpr) -> IRExpr:
+        return IRCall(
+            ir_id=self._new_id("expr"),
+            span=expr.span,
+            expr_type=self._expr_type(expr),
+            callee=self.visit(expr.callee),
+            args=[self.visit(arg) for arg in expr.args],
+            at_prefixed=expr.at_prefixed,
+        )
 
-        if isinstance(expr, BinaryExpr):
-            return IRBinary(
-                ir_id=self._new_id("expr"),
-                span=expr.span,
-                expr_type=inferred_type,
-                left=self._build_expr(expr.left),
-                operator=expr.operator,
-                right=self._build_expr(expr.right),
-            )
+    def visit_LambdaExpr(self, expr: LambdaExpr) -> IRExpr:
+        return IRLambda(
+            ir_id=self._new_id("expr"),
+            span=expr.span,
+            expr_type=self._expr_type(expr),
+            params=self._build_params(expr, expr.params),
+            body=self.visit(expr.body),
+            return_type=expr.return_type,
+            inferred_return_type=self._return_type(expr),
+        )
 
-        if isinstance(expr, CallExpr):
-            return IRCall(
-                ir_id=self._new_id("expr"),
-                span=expr.span,
-                expr_type=inferred_type,
-                callee=self._build_expr(expr.callee),
-                args=[self._build_expr(arg) for arg in expr.args],
-                at_prefixed=expr.at_prefixed,
-            )
+    def generic_visit(self, node: Any) -> IRNode:
+        kind = "statement" if isinstance(node, Stmt) else "expression"
+        raise TypeError(f"Unsupported AST {kind} in IRBuilder: {type(node).__name__}")
 
-        if isinstance(expr, LambdaExpr):
-            return IRLambda(
-                ir_id=self._new_id("expr"),
-                span=expr.span,
-                expr_type=inferred_type,
-                params=[IRParam(name=param.name, type_hint=param.type_hint) for param in expr.params],
-                body=self._build_expr(expr.body),
-                return_type=expr.return_type,
+    def _expr_type(self, expr: Expr) -> str | None:
+        inferred_type = None
+        if self._semantic is not None:
+            inferred_type = self._semantic.inferred_expr_types.get(expr.node_id)
+        if self._types is not None:
+            inferred_type = self._types.expr_types.get(expr.node_id, inferred_type)
+        return inferred_type
+
+    def _build_params(self, owner: FunctionDefStmt | LambdaExpr, params: list[Param]) -> list[IRParam]:
+        symbols = self._param_symbols.get(owner.node_id, [])
+        types = self._types.symbol_types if self._types is not None else {}
+        return [
+            IRParam(
+                name=param.name,
+                type_hint=param.type_hint,
+                inferred_type=types.get(symbols[idx]) if idx < len(symbols) else None,
             )
+            for idx, param in enumerate(params)
+        ]
+
+    def _symbol_type(self, stmt: AssignmentStmt) -> str | None:
+        binding = self._bindings.get(stmt.node_id)
+        if self._types is None or binding is None:
+            return None
+        return self._types.symbol_types.get(binding.symbol)
 
-        raise TypeError(f"Unsupported AST expression in IRBuilder: {type(expr).__name__}")
+    def _return_type(self, function: FunctionDefStmt | LambdaExpr) -> str | None:
+        return self._types.return_types.get(function.node_id) if self._types is not None else None
 
     def _new_id(self, prefix: str) -> str:
         self._counter += 1
         return f"{prefix}{self._counter}"
 
 
+# Provenance and bookkeeping fields left out of content hashes. Module
+# `inferred_types` is keyed by AST node ids; the same types are on the nodes.
+_UNHASHED_FIELDS = frozenset({"ir_id", "span", "content_hash", "inferred_types"})
+# Fields whose nodes sit one resolver scope deeper than their parent.
+_SCOPE_FIELDS = frozenset(
+    {
+        (IRIf, "then_block"),
+        (IRIf, "else_block"),
+        (IRLoop, "body"),
+        (IRFunction, "body"),
+        (IRFunction, "expr_body"),
+        (IRLambda, "body"),
+    }
+)
+
+
+def assign_content_hashes(root: IRNode) -> str:
+    """Set `content_hash` on `root` and every IR node below it; return the root's.
+
+    One post-order pass: each node hashes its own fields together with its
+    children's already computed digests. `root` is taken to sit at module
+    level, so reads of module names hash by name rather than by slot.
+    """
+    stack: list[tuple[IRNode, bool, int]] = [(root, False, 0)]
+    while stack:
+        node, children_done, depth = stack.pop()
+        if children_done:
+            node.content_hash = _node_hash(node, depth)
+            continue
+        stack.append((node, True, depth))
+        stack.extend((child, False, child_depth) for child, child_depth in _scoped_children(node, depth))
+    return root.content_hash
+
+
+def iter_ir_nodes(root: IRNode) -> Iterator[IRNode]:
+    """Yield `root` and every IR node below it in pre-order, without recursion."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(_ir_children(node))))
+
+
+@cache
+def _hashed_fields(node_type: type) -> tuple[str, ...]:
+    return tuple(item.name for item in fields(node_type) if item.name not in _UNHASHED_FIELDS)
+
+
+def _ir_children(node: IRNode) -> Iterator[IRNode]:
+    for name in _hashed_fields(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, IRNode):
+            yield value
+        elif isinstance(value, list):
+            yield from (item for item in value if isinstance(item, IRNode))
+
+
+def _scoped_children(node: IRNode, depth: int) -> Iterator[tuple[IRNode, int]]:
+    """Yield the children of `node` with the scope depth each one sits at."""
+    for name in _hashed_fields(type(node)):
+        value = getattr(node, name)
+        child_depth = depth + 1 if (type(node), name) in _SCOPE_FIELDS else depth
+        if isinstance(value, IRNode):
+            yield value, child_depth
+        elif isinstance(value, list):
+            yield from ((item, child_depth) for item in value if isinstance(item, IRNode))
+
+
+def _node_hash(node: IRNode, depth: int) -> str:
+    digest = hashlib.blake2b(type(node).__name__.encode(), digest_size=16)
+    for name in _hashed_fields(type(node)):
+        digest.update(b"\0" + _hash_token(getattr(node, name), depth).encode())
+    return digest.hexdigest()
+
+
+def _hash_token(value: Any, depth: int) -> str:
+    if isinstance(value, IRNode):
+        return value.content_hash
+    if isinstance(value, list):
+        return "[" + ",".join(_hash_token(item, depth) for item in value) + "]"
+    if isinstance(value, IRParam):
+        return repr((value.name, value.type_hint, value.inferred_type))
+    if isinstance(value, Binding):
+        # Module slots and symbol ids depend on the rest of the module, so a
+        # module-level binding hashes by the name its node already carries;
+        # bindings local to a body keep their lexical address.
+        if value.depth >= depth:
+            return "module"
+        return repr((value.depth, value.slot))
+    # repr keeps 1, 1.0 and True apart.
+    return repr(value)
+
+
 def ir_to_dict(node: Any) -> Any:
-    """Serialize IR dataclasses recursively into JSON-compatible mappings."""
+    """Serialize IR dataclasses recursively into JSON-compatible mappings.
+
+    An `IRModule` is content-hashed first if it is not already.
+    """
+    if isinstance(node, IRModule) and not node.content_hash:
+        assign_content_hashes(node)
     if isinstance(node, list):
         return [ir_to_dict(item) for item in node]
     if isinstance(node, dict):
@@ -6,10 +6,11 @@ from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass, field
 import importlib
 from types import ModuleType
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from icl.errors import CLIError
-from icl.lowering import LoweredModule
+from icl.ir import IR_SCHEMA_VERSION
+from icl.lowering import LoweredModule, LoweredStmt, required_helpers
 
 
 VALID_STABILITIES = {"experimental", "beta", "stable"}
@@ -69,6 +70,33 @@ class LanguagePack(ABC):
     def emit(self, lowered: LoweredModule, context: EmissionContext) -> str:
         """Emit language source from lowered module."""
 
+    @property
+    def buffers_stream(self) -> bool:
+        """Whether `emit_stream` holds all statements until the input ends.
+
+        Streaming compilation then solves whole-module types before lowering,
+        so buffered output matches `emit`.
+        """
+        return True
+
+    def emit_stream(self, statements: Iterable[LoweredStmt], context: EmissionContext) -> Iterator[str]:
+        """Emit language source incrementally from top-level lowered statements.
+
+        The default buffers the whole module and defers to `emit`; packs whose
+        output can be rendered statement by statement override this.
+        """
+        collected = list(statements)
+        module = LoweredModule(
+            lowered_id="lmod_stream",
+            span=None,
+            ir_schema_version=IR_SCHEMA_VERSION,
+            target=context.target,
+            statements=collected,
+            required_helpers=required_helpers(collected, target=context.target),
+            diagnostics=[],
+        )
+        yield self.emit(module, context)
+
     def scaffold(self, emitted_code: str, context: EmissionContext) -> OutputBundle:
         """Default scaffolding for single-file outputs."""
         filename = self.manifest.scaffolding.get("primary", f"main.{self.manifest.file_extension}")
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Final
+import mmap
+import re
+from typing import Final, Iterable, Iterator, NoReturn
 
-from icl.errors import LexError
+from icl.errors import CLIError, LexError
 from icl.source_map import SourceSpan
-from icl.tokens import KEYWORDS, Token, TokenType
+from icl.tokens import KEYWORDS, TOKEN_TYPE_CODES, Token, TokenBuffer, TokenType
 
 
 _SINGLE_CHAR_TOKENS: Final[dict[str, TokenType]] = {
@@ -30,6 +32,25 @@ _SINGLE_CHAR_TOKENS: Final[dict[str, TokenType]] = {
     "!": TokenType.NOT,
 }
 
+_MULTI_CHAR_TOKENS: Final[dict[str, TokenType]] = {
+    ":=": TokenType.ASSIGN,
+    "=>": TokenType.ARROW,
+    "..": TokenType.RANGE,
+    "==": TokenType.EQ,
+    "!=": TokenType.NE,
+    "<=": TokenType.LE,
+    ">=": TokenType.GE,
+    "&&": TokenType.AND,
+    "||": TokenType.OR,
+}
+
+_STRING_ESCAPES: Final[dict[str, str]] = {
+    "n": "\n",
+    "t": "\t",
+    '"': '"',
+    "\\": "\\",
+}
+
 
 class Lexer:
     """Converts ICL source text into a token stream."""
@@ -94,18 +115,7 @@ class Lexer:
     def _lex_multi_char_operator(self) -> Token | None:
         start_line, start_col = self.line, self.column
         pair = self._peek() + self._peek(1)
-        mapping: dict[str, TokenType] = {
-            ":=": TokenType.ASSIGN,
-            "=>": TokenType.ARROW,
-            "..": TokenType.RANGE,
-            "==": TokenType.EQ,
-            "!=": TokenType.NE,
-            "<=": TokenType.LE,
-            ">=": TokenType.GE,
-            "&&": TokenType.AND,
-            "||": TokenType.OR,
-        }
-        token_type = mapping.get(pair)
+        token_type = _MULTI_CHAR_TOKENS.get(pair)
         if token_type is None:
             return None
         self._advance()
@@ -157,13 +167,7 @@ class Lexer:
                 if self._is_eof():
                     break
                 esc = self._advance()
-                escapes = {
-                    "n": "\n",
-                    "t": "\t",
-                    '"': '"',
-                    "\\": "\\",
-                }
-                value_chars.append(escapes.get(esc, esc))
+                value_chars.append(_STRING_ESCAPES.get(esc, esc))
                 continue
             value_chars.append(ch)
 
@@ -215,3 +219,425 @@ class Lexer:
             end_line=end_line,
             end_column=end_col,
         )
+
+
+# One alternation per token family, tried in the same priority order as
+# `Lexer.tokenize`. Identifier and number classes are ASCII-only; anything
+# outside ASCII is handed to `TableLexer._lex_unicode` so results match the
+# scanning lexer's `str.isalpha`/`str.isdigit` rules exactly.
+_MASTER_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"""
+      (?P<ws>[\ \t\r\n]+)
+    | (?P<comment>//[^\n]*)
+    | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<number>[0-9]+(?:\.[0-9]+)?)
+    | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+    | (?P<op2>:=|=>|\.\.|==|!=|<=|>=|&&|\|\|)
+    | (?P<op1>[:?,;(){}@\#+\-*/%<>!])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_IDENT_CODE: Final[int] = TOKEN_TYPE_CODES[TokenType.IDENT]
+_NUMBER_CODE: Final[int] = TOKEN_TYPE_CODES[TokenType.NUMBER]
+_STRING_CODE: Final[int] = TOKEN_TYPE_CODES[TokenType.STRING]
+_KEYWORD_CODES: Final[dict[str, int]] = {text: TOKEN_TYPE_CODES[kind] for text, kind in KEYWORDS.items()}
+_OPERATOR_CODES: Final[dict[str, int]] = {
+    text: TOKEN_TYPE_CODES[kind] for text, kind in {**_SINGLE_CHAR_TOKENS, **_MULTI_CHAR_TOKENS}.items()
+}
+
+_ESCAPE_PATTERN: Final[re.Pattern[str]] = re.compile(r"\\(.)", re.DOTALL)
+
+# Mapped files are read raw, so a lone `\r` also ends a comment and a line,
+# as it would after a text-mode read.
+_BYTES_PATTERN: Final[re.Pattern[bytes]] = re.compile(
+    _MASTER_PATTERN.pattern.replace(r"//[^\n]*", r"//[^\r\n]*").encode("ascii"),
+    re.VERBOSE | re.DOTALL,
+)
+_BYTES_LINE_BREAK: Final[re.Pattern[bytes]] = re.compile(rb"\r\n?|\n")
+_TEXT_LINE_BREAK: Final[re.Pattern[str]] = re.compile(r"\r\n?|\n")
+# Word that may hold non-ASCII identifier or digit characters; it always ends
+# on an ASCII byte, so it never splits a UTF-8 sequence.
+_UNICODE_RUN: Final[re.Pattern[bytes]] = re.compile(rb"[\x80-\xffA-Za-z0-9_.]+")
+_KEYWORD_BYTE_CODES: Final[dict[bytes, int]] = {text.encode("ascii"): code for text, code in _KEYWORD_CODES.items()}
+_OPERATOR_BYTE_CODES: Final[dict[bytes, int]] = {text.encode("ascii"): code for text, code in _OPERATOR_CODES.items()}
+
+
+class TableLexer:
+    """Master-pattern lexer producing the same token stream as `Lexer`.
+
+    Tokens are matched with one compiled alternation instead of per-character
+    `_peek`/`_advance` calls and written straight into a compact `TokenBuffer`;
+    line/column coordinates come from the buffer's line-offset table. The
+    scanner can also run over text that arrives in chunks (see `iter_tokens`).
+    """
+
+    def __init__(
+        self,
+        source: str,
+        filename: str = "<input>",
+        *,
+        line: int = 1,
+        column: int = 1,
+        collect_errors: bool = False,
+    ) -> None:
+        self.source = source
+        self.filename = filename
+        # With `collect_errors`, lex errors are recorded here and the
+        # offending text skipped instead of raising.
+        self.errors: list[LexError] | None = [] if collect_errors else None
+        # Absolute offset of the scan buffer start, current line number, and
+        # absolute offset where that line starts. `line`/`column` place the
+        # start of `source` within a larger file.
+        self._base = 0
+        self._line = line
+        self._line_start = 1 - column
+
+    def tokenize(self) -> list[Token]:
+        """Tokenize full source and return the token stream."""
+        return list(self.tokenize_buffer())
+
+    def tokenize_buffer(self) -> TokenBuffer:
+        """Tokenize full source into a compact `TokenBuffer` ending with EOF."""
+        tokens, _ = self._scan(self.source, final=True)
+        end = len(self.source)
+        tokens.append(TokenType.EOF, "", end, end)
+        return tokens
+
+    def _scan(self, text: str, *, final: bool) -> tuple[TokenBuffer, int]:
+        """Lex `text` from its start and return tokens plus characters consumed.
+
+        Unless `final` is set, scanning stops before any token that ends within
+        one character of the text end, since more input could extend it.
+        """
+        base = self._base
+        tokens = TokenBuffer(self.filename, first_line=self._line, line_start=self._line_start)
+        add_type = tokens.types.append
+        add_start = tokens.starts.append
+        add_end = tokens.ends.append
+        add_value = tokens.value_ids.append
+        intern = tokens.intern
+        add_line = tokens.add_line_start
+        keyword_codes = _KEYWORD_CODES
+        length = len(text)
+        match_at = _MASTER_PATTERN.match
+        pos = 0
+
+        while pos < length:
+            match = match_at(text, pos)
+            if match is None:
+                if not final and (text[pos] == '"' or pos + 1 >= length):
+                    break
+                if text[pos] == '"':
+                    if self.errors is None:
+                        self._raise_unterminated(tokens, text, pos)
+                    pos = self._skip_unterminated(tokens, text, pos)
+                    continue
+                if not text[pos].isascii():
+                    try:
+                        end, token_type = self._scan_unicode(tokens, text, pos)
+                    except LexError as err:
+                        if self.errors is None:
+                            raise
+                        self.errors.append(err)
+                        pos += 1
+                        continue
+                    if not final and end + 1 >= length:
+                        break
+                    add_type(TOKEN_TYPE_CODES[token_type])
+                    add_start(base + pos)
+                    add_end(base + end)
+                    add_value(intern(text[pos:end]))
+                    pos = end
+                    continue
+                error = self._unexpected(tokens, text, pos)
+                if self.errors is None:
+                    raise error
+                self.errors.append(error)
+                pos += 1
+                continue
+
+            end = match.end()
+            if not final and end + 1 >= length:
+                break
+
+            kind = match.lastgroup
+            if kind == "ws":
+                newline = text.find("\n", pos, end)
+                while newline != -1:
+                    add_line(base + newline + 1)
+                    newline = text.find("\n", newline + 1, end)
+                pos = end
+                continue
+            if kind == "comment":
+                pos = end
+                continue
+
+            value = match.group()
+            if kind == "ident" or kind == "number":
+                if end < length and not text[end].isascii():
+                    end, token_type = self._scan_unicode(tokens, text, pos)
+                    if not final and end + 1 >= length:
+                        break
+                    code = TOKEN_TYPE_CODES[token_type]
+                    value = text[pos:end]
+                elif kind == "ident":
+                    code = keyword_codes.get(value, _IDENT_CODE)
+                else:
+                    code = _NUMBER_CODE
+            elif kind == "string":
+                code = _STRING_CODE
+                newline = value.find("\n")
+                while newline != -1:
+                    add_line(base + pos + newline + 1)
+                    newline = value.find("\n", newline + 1)
+                value = _decode_string_body(value[1:-1])
+            else:
+                code = _OPERATOR_CODES[value]
+
+            add_type(code)
+            add_start(base + pos)
+            add_end(base + end)
+            add_value(intern(value))
+            pos = end
+
+        self._base = base + pos
+        self._line, self._line_start = tokens.last_line()
+        return tokens, pos
+
+    def _scan_unicode(self, tokens: TokenBuffer, text: str, pos: int) -> tuple[int, TokenType]:
+        """Slow path mirroring `Lexer` for tokens touching non-ASCII text."""
+        length = len(text)
+        ch = text[pos]
+        end = pos + 1
+
+        if ch.isalpha() or ch == "_":
+            while end < length and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            return end, KEYWORDS.get(text[pos:end], TokenType.IDENT)
+
+        if ch.isdigit():
+            seen_dot = False
+            while end < length:
+                nxt = text[end]
+                if nxt.isdigit():
+                    end += 1
+                    continue
+                if nxt == "." and not seen_dot and end + 1 < length and text[end + 1].isdigit():
+                    seen_dot = True
+                    end += 1
+                    continue
+                break
+            return end, TokenType.NUMBER
+
+        self._raise_unexpected(tokens, text, pos)
+
+    def _raise_unexpected(self, tokens: TokenBuffer, text: str, pos: int) -> NoReturn:
+        raise self._unexpected(tokens, text, pos)
+
+    def _unexpected(self, tokens: TokenBuffer, text: str, pos: int) -> LexError:
+        start = self._base + pos
+        return LexError(
+            code="LEX001",
+            message=f"Unexpected character {text[pos]!r}.",
+            span=tokens.source.span(start, start + 1),
+            hint="Remove the character or escape it inside a string literal.",
+        )
+
+    def _skip_unterminated(self, tokens: TokenBuffer, text: str, pos: int) -> int:
+        """Record an unterminated string and resume lexing on the next line."""
+        assert self.errors is not None
+        end = text.find("\n", pos)
+        end = len(text) if end == -1 else end
+        start = self._base + pos
+        self.errors.append(
+            LexError(
+                code="LEX002",
+                message="Unterminated string literal.",
+                span=tokens.source.span(start, self._base + end),
+                hint="Close the string with a double quote.",
+            )
+        )
+        return end
+
+    def _raise_unterminated(self, tokens: TokenBuffer, text: str, pos: int) -> NoReturn:
+        newline = text.find("\n", pos)
+        while newline != -1:
+            tokens.add_line_start(self._base + newline + 1)
+            newline = text.find("\n", newline + 1)
+        raise LexError(
+            code="LEX002",
+            message="Unterminated string literal.",
+            span=tokens.source.span(self._base + pos, self._base + len(text)),
+            hint="Close the string with a double quote.",
+        )
+
+
+class BytesLexer(TableLexer):
+    """`TableLexer` over raw UTF-8 bytes, such as a `MappedSource` buffer.
+
+    The buffer is scanned in place with a bytes version of the master pattern
+    and only token values are decoded. Token offsets and line starts are still
+    counted in characters, so spans match lexing the decoded text.
+    """
+
+    def __init__(
+        self,
+        data: bytes | mmap.mmap,
+        filename: str = "<input>",
+        *,
+        line: int = 1,
+        column: int = 1,
+    ) -> None:
+        super().__init__("", filename, line=line, column=column)
+        self.data = data
+
+    def tokenize_buffer(self) -> TokenBuffer:
+        """Tokenize the buffer into a compact `TokenBuffer` ending with EOF."""
+        tokens, end = self._scan_bytes(self.data)
+        tokens.append(TokenType.EOF, "", end, end)
+        return tokens
+
+    def _scan_bytes(self, data: bytes | mmap.mmap) -> tuple[TokenBuffer, int]:
+        """Lex all of `data` and return tokens plus its length in characters."""
+        tokens = TokenBuffer(self.filename, first_line=self._line, line_start=self._line_start)
+        add_type = tokens.types.append
+        add_start = tokens.starts.append
+        add_end = tokens.ends.append
+        add_value = tokens.value_ids.append
+        intern = tokens.intern
+        add_line = tokens.add_line_start
+        keyword_codes = _KEYWORD_BYTE_CODES
+        operator_codes = _OPERATOR_BYTE_CODES
+        length = len(data)
+        match_at = _BYTES_PATTERN.match
+        pos = 0
+        # Bytes consumed beyond characters consumed, i.e. the UTF-8
+        # continuation bytes seen so far; character offset = pos - extra.
+        extra = 0
+
+        while pos < length:
+            match = match_at(data, pos)
+            if match is None:
+                if data[pos] < 0x80:
+                    self._raise_bytes_error(tokens, data, pos, extra)
+                pos, extra = self._add_unicode(tokens, data, pos, extra)
+                continue
+
+            end = match.end()
+            kind = match.lastgroup
+            if kind == "ws":
+                for line_break in _BYTES_LINE_BREAK.finditer(data, pos, end):
+                    add_line(line_break.end() - extra)
+                pos = end
+                continue
+            if kind == "comment":
+                comment = data[pos:end]
+                if not comment.isascii():
+                    extra += len(comment) - len(str(comment, "utf-8"))
+                pos = end
+                continue
+
+            value = match.group()
+            if kind == "string":
+                text = str(value, "utf-8")
+                start = pos - extra
+                for line_break in _TEXT_LINE_BREAK.finditer(text):
+                    add_line(start + line_break.end())
+                extra += len(value) - len(text)
+                add_type(_STRING_CODE)
+                add_start(start)
+                add_end(end - extra)
+                # The file is read raw, so translate newlines as text mode would.
+                add_value(intern(_decode_string_body(_normalize_newlines(text[1:-1]))))
+                pos = end
+                continue
+
+            if kind == "ident" or kind == "number":
+                if end < length and data[end] >= 0x80:
+                    pos, extra = self._add_unicode(tokens, data, pos, extra)
+                    continue
+                code = keyword_codes.get(value, _IDENT_CODE) if kind == "ident" else _NUMBER_CODE
+            else:
+                code = operator_codes[value]
+
+            add_type(code)
+            add_start(pos - extra)
+            add_end(end - extra)
+            add_value(intern(value.decode("ascii")))
+            pos = end
+
+        self._base = length - extra
+        self._line, self._line_start = tokens.last_line()
+        return tokens, length - extra
+
+    def _add_unicode(self, tokens: TokenBuffer, data: bytes | mmap.mmap, pos: int, extra: int) -> tuple[int, int]:
+        """Decode the word at `pos` and lex one token from it with `_scan_unicode`."""
+        run = _UNICODE_RUN.match(data, pos)
+        assert run is not None
+        text = str(run.group(), "utf-8")
+        start = pos - extra
+        self._base = start
+        end, token_type = self._scan_unicode(tokens, text, 0)
+        value = text[:end]
+        size = len(value.encode("utf-8"))
+        tokens.append(token_type, value, start, start + end)
+        return pos + size, extra + size - end
+
+    def _raise_bytes_error(self, tokens: TokenBuffer, data: bytes | mmap.mmap, pos: int, extra: int) -> NoReturn:
+        self._base = pos - extra
+        if data[pos] == ord('"'):
+            self._raise_unterminated(tokens, str(data[pos:], "utf-8"), 0)
+        self._raise_unexpected(tokens, chr(data[pos]), 0)
+
+
+def iter_tokens(chunks: Iterable[str], filename: str = "<input>") -> Iterator[Token]:
+    """Lazily tokenize source text that arrives as a sequence of chunks.
+
+    Yields the same tokens as tokenizing the concatenated chunks at once while
+    only buffering the unconsumed tail of the input.
+    """
+    lexer = TableLexer("", filename=filename)
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        tokens, consumed = lexer._scan(pending, final=False)
+        yield from tokens
+        pending = pending[consumed:]
+
+    tokens, consumed = lexer._scan(pending, final=True)
+    tokens.append(TokenType.EOF, "", lexer._base, lexer._base)
+    yield from tokens
+
+
+LEXER_ENGINES: Final[dict[str, type[Lexer] | type[TableLexer]]] = {
+    "scan": Lexer,
+    "table": TableLexer,
+}
+
+
+def create_lexer(source: str, filename: str = "<input>", engine: str = "scan") -> Lexer | TableLexer:
+    """Instantiate the lexer implementation registered under `engine`."""
+    lexer_cls = LEXER_ENGINES.get(engine)
+    if lexer_cls is None:
+        raise CLIError(
+            code="LEX003",
+            message=f"Unknown lexer engine '{engine}'.",
+            span=None,
+            hint=f"Available engines: {', '.join(sorted(LEXER_ENGINES))}",
+        )
+    return lexer_cls(source, filename=filename)
+
+
+def _normalize_newlines(text: str) -> str:
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _decode_string_body(body: str) -> str:
+    if "\\" not in body:
+        return body
+    return _ESCAPE_PATTERN.sub(lambda match: _STRING_ESCAPES.get(match.group(1), match.group(1)), body)
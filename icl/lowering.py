@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, is_dataclass
-from typing import Any
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from typing import Any, Iterator
 
 from icl.errors import ExpansionError
 from icl.graph import IntentGraph
@@ -11,20 +11,25 @@ from icl.ir import (
     IRAssignment,
     IRBinary,
     IRCall,
-    IRExpr,
     IRExpressionStmt,
     IRFunction,
     IRIf,
+    IR_SCHEMA_VERSION,
     IRLambda,
     IRLiteral,
     IRLoop,
     IRModule,
+    IRNode,
+    IRParam,
     IRRef,
     IRReturn,
     IRStmt,
     IRUnary,
+    iter_ir_nodes,
 )
+from icl.resolver import Binding
 from icl.source_map import SourceSpan
+from icl.visitor import NodeVisitor
 
 
 @dataclass
@@ -63,6 +68,8 @@ class LoweredAssignment(LoweredStmt):
     name: str
     type_hint: str | None
     value: LoweredExpr
+    binding: Binding | None = None
+    inferred_type: str | None = None
 
 
 @dataclass
@@ -91,6 +98,7 @@ class LoweredFunction(LoweredStmt):
     params: list[dict[str, str | None]]
     return_type: str | None
     body: list[LoweredStmt]
+    inferred_return_type: str | None = None
 
 
 @dataclass
@@ -101,11 +109,13 @@ class LoweredReturn(LoweredStmt):
 @dataclass
 class LoweredLiteral(LoweredExpr):
     value: Any = None
+    folded_from: str | None = None
 
 
 @dataclass
 class LoweredRef(LoweredExpr):
     name: str = ""
+    binding: Binding | None = None
 
 
 @dataclass
@@ -132,31 +142,35 @@ class LoweredLambda(LoweredExpr):
     params: list[dict[str, str | None]] | None = None
     body: LoweredExpr | None = None
     return_type: str | None = None
+    inferred_return_type: str | None = None
 
 
-class Lowerer:
+class Lowerer(NodeVisitor):
     """Lowers canonical IR into target-shaped lowered nodes."""
 
     def __init__(self) -> None:
         self._counter = 0
 
-    def lower(self, module: IRModule, *, target: str, feature_coverage: dict[str, bool] | None = None) -> LoweredModule:
-        """Lower IR module for a specific target."""
-        feature_coverage = feature_coverage or {}
+    def lower(
+        self,
+        module: IRModule,
+        *,
+        target: str,
+        feature_coverage: dict[str, bool] | None = None,
+        features: set[str] | None = None,
+    ) -> LoweredModule:
+        """Lower IR module for a specific target.
+
+        `features` are the module's `collect_ir_features`, when the caller
+        already has them (`FusedIRBuilder` collects them while building).
+        """
         diagnostics: list[str] = []
+        if features is None:
+            features = collect_ir_features(module)
+        self._check_features(module, features, target=target, feature_coverage=feature_coverage or {})
 
-        features = collect_ir_features(module)
-        missing = sorted(feature for feature in features if not feature_coverage.get(feature, True))
-        if missing:
-            raise ExpansionError(
-                code="LOW001",
-                message=f"Target '{target}' does not support required features: {', '.join(missing)}.",
-                span=module.span,
-                hint="Choose a compatible target or reduce source feature usage.",
-            )
-
-        statements = [self._lower_stmt(stmt, target=target, diagnostics=diagnostics) for stmt in module.statements]
-        helpers = self._required_helpers(statements, target=target)
+        statements = [self.visit(stmt) for stmt in module.statements]
+        helpers = required_helpers(statements, target=target)
 
         return LoweredModule(
             lowered_id=self._new_id("lmod"),
@@ -168,438 +182,512 @@ class Lowerer:
             diagnostics=diagnostics,
         )
 
-    def _lower_stmt(self, stmt: IRStmt, *, target: str, diagnostics: list[str]) -> LoweredStmt:
-        if isinstance(stmt, IRAssignment):
-            return LoweredAssignment(
-                lowered_id=self._new_id("lstmt"),
-                span=stmt.span,
-                name=stmt.name,
-                type_hint=stmt.type_hint,
-                value=self._lower_expr(stmt.value, target=target, diagnostics=diagnostics),
+    def lower_statement(
+        self,
+        stmt: IRStmt,
+        *,
+        target: str,
+        feature_coverage: dict[str, bool] | None = None,
+    ) -> LoweredStmt:
+        """Lower one top-level IR statement for streaming emission."""
+        fragment = IRModule(
+            ir_id=stmt.ir_id,
+            span=stmt.span,
+            schema_version=IR_SCHEMA_VERSION,
+            statements=[stmt],
+            inferred_types={},
+        )
+        features = collect_ir_features(fragment)
+        self._check_features(fragment, features, target=target, feature_coverage=feature_coverage or {})
+        return self.visit(stmt)
+
+    @staticmethod
+    def _check_features(
+        module: IRModule,
+        features: set[str],
+        *,
+        target: str,
+        feature_coverage: dict[str, bool],
+    ) -> None:
+        missing = sorted(feature for feature in features if not feature_coverage.get(feature, True))
+        if missing:
+            raise ExpansionError(
+                code="LOW001",
+                message=f"Target '{target}' does not support required features: {', '.join(missing)}.",
+                span=module.span,
+                hint="Choose a compatible target or reduce source feature usage.",
             )
 
-        if isinstance(stmt, IRExpressionStmt):
-            return LoweredExpressionStmt(
-                lowered_id=self._new_id("lstmt"),
-                span=stmt.span,
-                expr=self._lower_expr(stmt.expr, target=target, diagnostics=diagnostics),
-            )
+    def visit_IRAssignment(self, stmt: IRAssignment) -> LoweredStmt:
+        return LoweredAssignment(
+            lowered_id=self._new_id("lstmt"),
+            span=stmt.span,
+            name=stmt.name,
+            type_hint=stmt.type_hint,
+            value=self.visit(stmt.value),
+            binding=stmt.binding,
+            inferred_type=stmt.inferred_type,
+        )
 
-        if isinstance(stmt, IRIf):
-            return LoweredIf(
-                lowered_id=self._new_id("lstmt"),
-                span=stmt.span,
-                condition=self._lower_expr(stmt.condition, target=target, diagnostics=diagnostics),
-                then_block=[self._lower_stmt(item, target=target, diagnostics=diagnostics) for item in stmt.then_block],
-                else_block=[self._lower_stmt(item, target=target, diagnostics=diagnostics) for item in stmt.else_block],
-            )
+    def visit_IRExpressionStmt(self, stmt: IRExpressionStmt) -> LoweredStmt:
+        return LoweredExpressionStmt(
+            lowered_id=self._new_id("lstmt"),
+            span=stmt.span,
+            expr=self.visit(stmt.expr),
+        )
 
-        if isinstance(stmt, IRLoop):
-            return LoweredLoop(
-                lowered_id=self._new_id("lstmt"),
-                span=stmt.span,
-                iterator=stmt.iterator,
-                start=self._lower_expr(stmt.start, target=target, diagnostics=diagnostics),
-                end=self._lower_expr(stmt.end, target=target, diagnostics=diagnostics),
-                body=[self._lower_stmt(item, target=target, diagnostics=diagnostics) for item in stmt.body],
-            )
+    def visit_IRIf(self, stmt: IRIf) -> LoweredStmt:
+        return LoweredIf(
+            lowered_id=self._new_id("lstmt"),
+            span=stmt.span,
+            condition=self.visit(stmt.condition),
+            then_block=[self.visit(item) for item in stmt.then_block],
+            else_block=[self.visit(item) for item in stmt.else_block],
+        )
 
-        if isinstance(stmt, IRFunction):
-            body = [self._lower_stmt(item, target=target, diagnostics=diagnostics) for item in stmt.body]
-            if stmt.expr_body is not None:
-                body.append(
-                    LoweredReturn(
-                        lowered_id=self._new_id("lstmt"),
-                        span=stmt.expr_body.span,
-                        value=self._lower_expr(stmt.expr_body, target=target, diagnostics=diagnostics),
-                    )
+    def visit_IRLoop(self, stmt: IRLoop) -> LoweredStmt:
+        return LoweredLoop(
+            lowered_id=self._new_id("lstmt"),
+            span=stmt.span,
+            iterator=stmt.iterator,
+            start=self.visit(stmt.start),
+            end=self.visit(stmt.end),
+            body=[self.visit(item) for item in stmt.body],
+        )
+
+    def visit_IRFunction(self, stmt: IRFunction) -> LoweredStmt:
+        body = [self.visit(item) for item in stmt.body]
+        if stmt.expr_body is not None:
+            body.append(
+                LoweredReturn(
+                    lowered_id=self._new_id("lstmt"),
+                    span=stmt.expr_body.span,
+                    value=self.visit(stmt.expr_body),
                 )
-            params = [{"name": param.name, "type_hint": param.type_hint} for param in stmt.params]
-            return LoweredFunction(
-                lowered_id=self._new_id("lstmt"),
-                span=stmt.span,
-                name=stmt.name,
-                params=params,
-                return_type=stmt.return_type,
-                body=body,
             )
+        return LoweredFunction(
+            lowered_id=self._new_id("lstmt"),
+            span=stmt.span,
+            name=stmt.name,
+            params=[_lower_param(param) for param in stmt.params],
+            return_type=stmt.return_type,
+            body=body,
+            inferred_return_type=stmt.inferred_return_type,
+        )
 
-        if isinstance(stmt, IRReturn):
-            return LoweredReturn(
-                lowered_id=self._new_id("lstmt"),
-                span=stmt.span,
-                value=self._lower_expr(stmt.value, target=target, diagnostics=diagnostics) if stmt.value else None,
-            )
+    def visit_IRReturn(self, stmt: IRReturn) -> LoweredStmt:
+        return LoweredReturn(
+            lowered_id=self._new_id("lstmt"),
+            span=stmt.span,
+            value=self.visit(stmt.value) if stmt.value else None,
+        )
 
-        raise ExpansionError(
-            code="LOW002",
-            message=f"Unsupported IR statement in lowering: '{type(stmt).__name__}'.",
-            span=getattr(stmt, "span", None),
-            hint="Extend lowering rules or disable unsupported language features for this target.",
+    def visit_IRLiteral(self, expr: IRLiteral) -> LoweredExpr:
+        return LoweredLiteral(
+            lowered_id=self._new_id("lexpr"),
+            span=expr.span,
+            expr_type=expr.expr_type,
+            value=expr.value,
+            folded_from=expr.folded_from,
         )
 
-    def _lower_expr(self, expr: IRExpr, *, target: str, diagnostics: list[str]) -> LoweredExpr:
-        if isinstance(expr, IRLiteral):
-            return LoweredLiteral(
-                lowered_id=self._new_id("lexpr"),
-                span=expr.span,
-                expr_type=expr.expr_type,
-                value=expr.value,
-            )
+    def visit_IRRef(self, expr: IRRef) -> LoweredExpr:
+        return LoweredRef(
+            lowered_id=self._new_id("lexpr"),
+            span=expr.span,
+            expr_type=expr.expr_type,
+            name=expr.name,
+            binding=expr.binding,
+        )
 
-        if isinstance(expr, IRRef):
-            return LoweredRef(
-                lowered_id=self._new_id("lexpr"),
-                span=expr.span,
-                expr_type=expr.expr_type,
-                name=expr.name,
-            )
+    def visit_IRUnary(self, expr: IRUnary) -> LoweredExpr:
+        return LoweredUnary(
+            lowered_id=self._new_id("lexpr"),
+            span=expr.span,
+            expr_type=expr.expr_type,
+            operator=expr.operator,
+            operand=self.visit(expr.operand),
+        )
 
-        if isinstance(expr, IRUnary):
-            return LoweredUnary(
-                lowered_id=self._new_id("lexpr"),
-                span=expr.span,
-                expr_type=expr.expr_type,
-                operator=expr.operator,
-                operand=self._lower_expr(expr.operand, target=target, diagnostics=diagnostics),
-            )
+    def visit_IRBinary(self, expr: IRBinary) -> LoweredExpr:
+        return LoweredBinary(
+            lowered_id=self._new_id("lexpr"),
+            span=expr.span,
+            expr_type=expr.expr_type,
+            left=self.visit(expr.left),
+            operator=expr.operator,
+            right=self.visit(expr.right),
+        )
 
-        if isinstance(expr, IRBinary):
-            return LoweredBinary(
-                lowered_id=self._new_id("lexpr"),
-                span=expr.span,
-                expr_type=expr.expr_type,
-                left=self._lower_expr(expr.left, target=target, diagnostics=diagnostics),
-                operator=expr.operator,
-                right=self._lower_expr(expr.right, target=target, diagnostics=diagnostics),
-            )
+    def visit_IRCall(self, expr: IRCall) -> LoweredExpr:
+        return LoweredCall(
+            lowered_id=self._new_id("lexpr"),
+            span=expr.span,
+            expr_type=expr.expr_type,
+            callee=self.visit(expr.callee),
+            args=[self.visit(arg) for arg in (expr.args or [])],
+        )
 
-        if isinstance(expr, IRCall):
-            return LoweredCall(
-                lowered_id=self._new_id("lexpr"),
-                span=expr.span,
-                expr_type=expr.expr_type,
-                callee=self._lower_expr(expr.callee, target=target, diagnostics=diagnostics),
-                args=[self._lower_expr(arg, target=target, diagnostics=diagnostics) for arg in (expr.args or [])],
-            )
+    def visit_IRLambda(self, expr: IRLambda) -> LoweredExpr:
+        return LoweredLambda(
+            lowered_id=self._new_id("lexpr"),
+            span=expr.span,
+            expr_type=expr.expr_type,
+            params=[_lower_param(param) for param in (expr.params or [])],
+            body=self.visit(expr.body),
+            return_type=expr.return_type,
+            inferred_return_type=expr.inferred_return_type,
+        )
 
-        if isinstance(expr, IRLambda):
-            return LoweredLambda(
-                lowered_id=self._new_id("lexpr"),
-                span=expr.span,
-                expr_type=expr.expr_type,
-                params=[{"name": param.name, "type_hint": param.type_hint} for param in (expr.params or [])],
-                body=self._lower_expr(expr.body, target=target, diagnostics=diagnostics),
-                return_type=expr.return_type,
+    def generic_visit(self, node: Any) -> LoweredNode:
+        if isinstance(node, IRStmt):
+            raise ExpansionError(
+                code="LOW002",
+                message=f"Unsupported IR statement in lowering: '{type(node).__name__}'.",
+                span=getattr(node, "span", None),
+                hint="Extend lowering rules or disable unsupported language features for this target.",
             )
-
         raise ExpansionError(
             code="LOW003",
-            message=f"Unsupported IR expression in lowering: '{type(expr).__name__}'.",
-            span=getattr(expr, "span", None),
+            message=f"Unsupported IR expression in lowering: '{type(node).__name__}'.",
+            span=getattr(node, "span", None),
             hint="Extend expression lowering support for this target.",
         )
 
-    def _required_helpers(self, statements: list[LoweredStmt], *, target: str) -> list[str]:
-        helpers: set[str] = set()
-        if target in {"web", "js", "typescript"}:
-            if _contains_print_call(statements):
-                helpers.add("print")
-        return sorted(helpers)
-
     def _new_id(self, prefix: str) -> str:
         self._counter += 1
         return f"{prefix}{self._counter}"
 
 
+def required_helpers(statements: list[LoweredStmt], *, target: str) -> list[str]:
+    """Return runtime helpers the lowered statements need on `target`."""
+    helpers: set[str] = set()
+    if target in {"web", "js", "typescript"}:
+        if _contains_print_call(statements):
+            helpers.add("print")
+    return sorted(helpers)
+
+
 def _contains_print_call(statements: list[LoweredStmt]) -> bool:
-    for stmt in statements:
-        if isinstance(stmt, LoweredExpressionStmt):
-            if _expr_has_print(stmt.expr):
-                return True
-        elif isinstance(stmt, LoweredIf):
-            if _contains_print_call(stmt.then_block) or _contains_print_call(stmt.else_block):
-                return True
-        elif isinstance(stmt, LoweredLoop):
-            if _contains_print_call(stmt.body):
-                return True
-        elif isinstance(stmt, LoweredFunction):
-            if _contains_print_call(stmt.body):
-                return True
-        elif isinstance(stmt, LoweredReturn) and stmt.value is not None:
-            if _expr_has_print(stmt.value):
-                return True
-        elif isinstance(stmt, LoweredAssignment):
-            if _expr_has_print(stmt.value):
-                return True
-    return False
-
-
-def _expr_has_print(expr: LoweredExpr) -> bool:
-    if isinstance(expr, LoweredCall):
+    return any(_PRINT_CALLS.visit(stmt) for stmt in statements)
+
+
+class _PrintCallFinder(NodeVisitor):
+    """Whether a lowered subtree calls `print`."""
+
+    def visit_LoweredExpressionStmt(self, stmt: LoweredExpressionStmt) -> bool:
+        return self.visit(stmt.expr)
+
+    def visit_LoweredIf(self, stmt: LoweredIf) -> bool:
+        return _contains_print_call(stmt.then_block) or _contains_print_call(stmt.else_block)
+
+    def visit_LoweredLoop(self, stmt: LoweredLoop) -> bool:
+        return _contains_print_call(stmt.body)
+
+    def visit_LoweredFunction(self, stmt: LoweredFunction) -> bool:
+        return _contains_print_call(stmt.body)
+
+    def visit_LoweredReturn(self, stmt: LoweredReturn) -> bool:
+        return stmt.value is not None and self.visit(stmt.value)
+
+    def visit_LoweredAssignment(self, stmt: LoweredAssignment) -> bool:
+        return self.visit(stmt.value)
+
+    def visit_LoweredCall(self, expr: LoweredCall) -> bool:
         callee = expr.callee
         if isinstance(callee, LoweredRef) and callee.name == "print":
             return True
-        if callee is not None and _expr_has_print(callee):
+        if callee is not None and self.visit(callee):
             return True
-        return any(_expr_has_print(arg) for arg in (expr.args or []))
+        return any(self.visit(arg) for arg in (expr.args or []))
 
-    if isinstance(expr, LoweredUnary) and expr.operand is not None:
-        return _expr_has_print(expr.operand)
+    def visit_LoweredUnary(self, expr: LoweredUnary) -> bool:
+        return expr.operand is not None and self.visit(expr.operand)
 
-    if isinstance(expr, LoweredBinary):
-        left_has = expr.left is not None and _expr_has_print(expr.left)
-        right_has = expr.right is not None and _expr_has_print(expr.right)
+    def visit_LoweredBinary(self, expr: LoweredBinary) -> bool:
+        left_has = expr.left is not None and self.visit(expr.left)
+        right_has = expr.right is not None and self.visit(expr.right)
         return left_has or right_has
 
-    if isinstance(expr, LoweredLambda) and expr.body is not None:
-        return _expr_has_print(expr.body)
+    def visit_LoweredLambda(self, expr: LoweredLambda) -> bool:
+        return expr.body is not None and self.visit(expr.body)
 
-    return False
+    def generic_visit(self, node: Any) -> bool:
+        return False
+
+
+_PRINT_CALLS = _PrintCallFinder()
 
 
 def collect_ir_features(module: IRModule) -> set[str]:
     """Collect declared features required by IR module."""
-
     features: set[str] = set()
+    for node in iter_ir_nodes(module):
+        features.update(ir_node_features(node))
+    return features
 
-    def walk_stmt(stmt: IRStmt) -> None:
-        if isinstance(stmt, IRAssignment):
-            features.add("assignment")
-            if stmt.type_hint is not None:
-                features.add("typed_annotation")
-            walk_expr(stmt.value)
-            return
-
-        if isinstance(stmt, IRExpressionStmt):
-            features.add("expression_stmt")
-            walk_expr(stmt.expr)
-            return
-
-        if isinstance(stmt, IRIf):
-            features.add("if")
-            walk_expr(stmt.condition)
-            for item in stmt.then_block:
-                walk_stmt(item)
-            for item in stmt.else_block:
-                walk_stmt(item)
-            return
-
-        if isinstance(stmt, IRLoop):
-            features.add("loop")
-            walk_expr(stmt.start)
-            walk_expr(stmt.end)
-            for item in stmt.body:
-                walk_stmt(item)
-            return
-
-        if isinstance(stmt, IRFunction):
-            features.add("function")
-            for item in stmt.body:
-                walk_stmt(item)
-            if stmt.expr_body is not None:
-                walk_expr(stmt.expr_body)
-            return
-
-        if isinstance(stmt, IRReturn):
-            features.add("return")
-            if stmt.value is not None:
-                walk_expr(stmt.value)
-            return
-
-    def walk_expr(expr: IRExpr) -> None:
-        if isinstance(expr, IRLiteral):
-            features.add("literal")
-            return
-
-        if isinstance(expr, IRRef):
-            features.add("reference")
-            return
-
-        if isinstance(expr, IRUnary):
-            features.add("unary")
-            walk_expr(expr.operand)
-            return
-
-        if isinstance(expr, IRBinary):
-            if expr.operator in {"&&", "||"}:
-                features.add("logic")
-            elif expr.operator in {"==", "!=", "<", "<=", ">", ">="}:
-                features.add("comparison")
-            else:
-                features.add("arithmetic")
-            walk_expr(expr.left)
-            walk_expr(expr.right)
-            return
-
-        if isinstance(expr, IRCall):
-            features.add("call")
-            if expr.at_prefixed:
-                features.add("at_call")
-            walk_expr(expr.callee)
-            for arg in (expr.args or []):
-                walk_expr(arg)
-            return
-
-        if isinstance(expr, IRLambda):
-            features.add("lambda")
-            if expr.body is not None:
-                walk_expr(expr.body)
-            return
-
-    for stmt in module.statements:
-        walk_stmt(stmt)
 
-    return features
+def ir_node_features(node: IRNode) -> tuple[str, ...]:
+    """Features used by `node` itself, not counting its children."""
+    return _NODE_FEATURES.visit(node)
+
+
+class _NodeFeatures(NodeVisitor):
+    """The language features each IR node type uses."""
+
+    def visit_IRAssignment(self, stmt: IRAssignment) -> tuple[str, ...]:
+        if stmt.type_hint is not None:
+            return ("assignment", "typed_annotation")
+        return ("assignment",)
+
+    def visit_IRExpressionStmt(self, stmt: IRExpressionStmt) -> tuple[str, ...]:
+        return ("expression_stmt",)
+
+    def visit_IRIf(self, stmt: IRIf) -> tuple[str, ...]:
+        return ("if",)
+
+    def visit_IRLoop(self, stmt: IRLoop) -> tuple[str, ...]:
+        return ("loop",)
+
+    def visit_IRFunction(self, stmt: IRFunction) -> tuple[str, ...]:
+        return ("function",)
+
+    def visit_IRReturn(self, stmt: IRReturn) -> tuple[str, ...]:
+        return ("return",)
+
+    def visit_IRLiteral(self, expr: IRLiteral) -> tuple[str, ...]:
+        return ("literal",)
+
+    def visit_IRRef(self, expr: IRRef) -> tuple[str, ...]:
+        return ("reference",)
+
+    def visit_IRUnary(self, expr: IRUnary) -> tuple[str, ...]:
+        return ("unary",)
+
+    def visit_IRBinary(self, expr: IRBinary) -> tuple[str, ...]:
+        if expr.operator in {"&&", "||"}:
+            return ("logic",)
+        if expr.operator in {"==", "!=", "<", "<=", ">", ">="}:
+            return ("comparison",)
+        return ("arithmetic",)
+
+    def visit_IRCall(self, expr: IRCall) -> tuple[str, ...]:
+        if expr.at_prefixed:
+            return ("call", "at_call")
+        return ("call",)
+
+    def visit_IRLambda(self, expr: IRLambda) -> tuple[str, ...]:
+        return ("lambda",)
+
+    def generic_visit(self, node: Any) -> tuple[str, ...]:
+        return ()
+
+
+_NODE_FEATURES = _NodeFeatures()
 
 
 def lowered_to_graph(module: LoweredModule) -> IntentGraph:
     """Convert lowered module into IntentGraph for emitters/optimizers."""
+    return _GraphBuilder().build(module)
 
-    graph = IntentGraph()
-    counter = 0
-
-    def new_node_id() -> str:
-        nonlocal counter
-        counter += 1
-        return f"n{counter}"
-
-    module_id = new_node_id()
-    graph.add_node(node_id=module_id, kind="ModuleIntent", attrs={"name": "module", "target": module.target})
-    graph.root_id = module_id
-
-    def build_stmt(stmt: LoweredStmt, parent_id: str, edge_type: str, order: int) -> None:
-        if isinstance(stmt, LoweredAssignment):
-            node_id = new_node_id()
-            graph.add_node(
-                node_id=node_id,
-                kind="AssignmentIntent",
-                attrs={"name": stmt.name, "type_hint": stmt.type_hint},
-            )
-            value_id = build_expr(stmt.value)
-            graph.add_edge(node_id, value_id, "value", order=0)
-
-        elif isinstance(stmt, LoweredExpressionStmt):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="ExpressionIntent", attrs={})
-            expr_id = build_expr(stmt.expr)
-            graph.add_edge(node_id, expr_id, "expr", order=0)
-
-        elif isinstance(stmt, LoweredIf):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="ControlIntent", attrs={"control": "if"})
-            cond_id = build_expr(stmt.condition)
-            graph.add_edge(node_id, cond_id, "condition", order=0)
-            for idx, then_stmt in enumerate(stmt.then_block):
-                build_stmt(then_stmt, node_id, "contains_then", idx)
-            for idx, else_stmt in enumerate(stmt.else_block):
-                build_stmt(else_stmt, node_id, "contains_else", idx)
-
-        elif isinstance(stmt, LoweredLoop):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="LoopIntent", attrs={"iterator": stmt.iterator})
-            start_id = build_expr(stmt.start)
-            end_id = build_expr(stmt.end)
-            graph.add_edge(node_id, start_id, "start", order=0)
-            graph.add_edge(node_id, end_id, "end", order=1)
-            for idx, body_stmt in enumerate(stmt.body):
-                build_stmt(body_stmt, node_id, "contains_body", idx)
-
-        elif isinstance(stmt, LoweredFunction):
-            node_id = new_node_id()
-            graph.add_node(
-                node_id=node_id,
-                kind="FuncIntent",
-                attrs={
+
+class _GraphBuilder(NodeVisitor):
+    """Builds an `IntentGraph`; each handler adds its node and subtree and returns the node id."""
+
+    def __init__(self) -> None:
+        self.graph = IntentGraph()
+        self._counter = 0
+
+    def build(self, module: LoweredModule) -> IntentGraph:
+        module_id = self._new_node_id()
+        self.graph.add_node(node_id=module_id, kind="ModuleIntent", attrs={"name": "module", "target": module.target})
+        self.graph.root_id = module_id
+        for idx, stmt in enumerate(module.statements):
+            self._add_stmt(stmt, module_id, "contains", idx)
+        return self.graph
+
+    def _add_stmt(self, stmt: LoweredStmt, parent_id: str, edge_type: str, order: int) -> None:
+        node_id = self.visit(stmt)
+        self.graph.add_edge(parent_id, node_id, edge_type=edge_type, order=order)
+
+    def _new_node_id(self) -> str:
+        self._counter += 1
+        return f"n{self._counter}"
+
+    def visit_LoweredAssignment(self, stmt: LoweredAssignment) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(
+            node_id=node_id,
+            kind="AssignmentIntent",
+            attrs=_with_binding(
+                _with_inferred({"name": stmt.name, "type_hint": stmt.type_hint}, "inferred_type", stmt.inferred_type),
+                stmt.binding,
+            ),
+        )
+        value_id = self.visit(stmt.value)
+        self.graph.add_edge(node_id, value_id, "value", order=0)
+        return node_id
+
+    def visit_LoweredExpressionStmt(self, stmt: LoweredExpressionStmt) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="ExpressionIntent", attrs={})
+        expr_id = self.visit(stmt.expr)
+        self.graph.add_edge(node_id, expr_id, "expr", order=0)
+        return node_id
+
+    def visit_LoweredIf(self, stmt: LoweredIf) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="ControlIntent", attrs={"control": "if"})
+        cond_id = self.visit(stmt.condition)
+        self.graph.add_edge(node_id, cond_id, "condition", order=0)
+        for idx, then_stmt in enumerate(stmt.then_block):
+            self._add_stmt(then_stmt, node_id, "contains_then", idx)
+        for idx, else_stmt in enumerate(stmt.else_block):
+            self._add_stmt(else_stmt, node_id, "contains_else", idx)
+        return node_id
+
+    def visit_LoweredLoop(self, stmt: LoweredLoop) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="LoopIntent", attrs={"iterator": stmt.iterator})
+        start_id = self.visit(stmt.start)
+        end_id = self.visit(stmt.end)
+        self.graph.add_edge(node_id, start_id, "start", order=0)
+        self.graph.add_edge(node_id, end_id, "end", order=1)
+        for idx, body_stmt in enumerate(stmt.body):
+            self._add_stmt(body_stmt, node_id, "contains_body", idx)
+        return node_id
+
+    def visit_LoweredFunction(self, stmt: LoweredFunction) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(
+            node_id=node_id,
+            kind="FuncIntent",
+            attrs=_with_inferred(
+                {
                     "name": stmt.name,
                     "params": stmt.params,
                     "return_type": stmt.return_type,
                     "expr_body": False,
                 },
-            )
-            for idx, body_stmt in enumerate(stmt.body):
-                build_stmt(body_stmt, node_id, "contains_body", idx)
+                "inferred_return_type",
+                stmt.inferred_return_type,
+            ),
+        )
+        for idx, body_stmt in enumerate(stmt.body):
+            self._add_stmt(body_stmt, node_id, "contains_body", idx)
+        return node_id
 
-        elif isinstance(stmt, LoweredReturn):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="ReturnIntent", attrs={})
-            if stmt.value is not None:
-                value_id = build_expr(stmt.value)
-                graph.add_edge(node_id, value_id, "value", order=0)
+    def visit_LoweredReturn(self, stmt: LoweredReturn) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="ReturnIntent", attrs={})
+        if stmt.value is not None:
+            value_id = self.visit(stmt.value)
+            self.graph.add_edge(node_id, value_id, "value", order=0)
+        return node_id
 
-        else:
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="UnknownIntent", attrs={"stmt": type(stmt).__name__})
-
-        graph.add_edge(parent_id, node_id, edge_type=edge_type, order=order)
-
-    def build_expr(expr: LoweredExpr) -> str:
-        if isinstance(expr, LoweredLiteral):
-            node_id = new_node_id()
-            graph.add_node(
-                node_id=node_id,
-                kind="LiteralIntent",
-                attrs={"value": expr.value, "value_type": type(expr.value).__name__},
-            )
-            return node_id
-
-        if isinstance(expr, LoweredRef):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="RefIntent", attrs={"name": expr.name})
-            return node_id
-
-        if isinstance(expr, LoweredUnary):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="OperationIntent", attrs={"operator": expr.operator, "arity": 1})
-            operand_id = build_expr(expr.operand)
-            graph.add_edge(node_id, operand_id, "operand", order=0)
-            return node_id
-
-        if isinstance(expr, LoweredBinary):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="OperationIntent", attrs={"operator": expr.operator, "arity": 2})
-            left_id = build_expr(expr.left)
-            right_id = build_expr(expr.right)
-            graph.add_edge(node_id, left_id, "operand", order=0)
-            graph.add_edge(node_id, right_id, "operand", order=1)
-            return node_id
-
-        if isinstance(expr, LoweredCall):
-            node_id = new_node_id()
-            graph.add_node(node_id=node_id, kind="CallIntent", attrs={})
-            if isinstance(expr.callee, LoweredRef):
-                graph.nodes[node_id].attrs["callee_name"] = expr.callee.name
-            elif expr.callee is not None:
-                callee_id = build_expr(expr.callee)
-                graph.add_edge(node_id, callee_id, "callee", order=0)
-            for idx, arg in enumerate(expr.args or []):
-                arg_id = build_expr(arg)
-                graph.add_edge(node_id, arg_id, "arg", order=idx)
-            return node_id
-
-        if isinstance(expr, LoweredLambda):
-            node_id = new_node_id()
-            graph.add_node(
-                node_id=node_id,
-                kind="LambdaIntent",
-                attrs={
+    def visit_LoweredLiteral(self, expr: LoweredLiteral) -> str:
+        node_id = self._new_node_id()
+        attrs = {"value": expr.value, "value_type": type(expr.value).__name__}
+        if expr.folded_from is not None:
+            attrs["folded_from"] = expr.folded_from
+        self.graph.add_node(node_id=node_id, kind="LiteralIntent", attrs=attrs)
+        return node_id
+
+    def visit_LoweredRef(self, expr: LoweredRef) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="RefIntent", attrs=_with_binding({"name": expr.name}, expr.binding))
+        return node_id
+
+    def visit_LoweredUnary(self, expr: LoweredUnary) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="OperationIntent", attrs={"operator": expr.operator, "arity": 1})
+        operand_id = self.visit(expr.operand)
+        self.graph.add_edge(node_id, operand_id, "operand", order=0)
+        return node_id
+
+    def visit_LoweredBinary(self, expr: LoweredBinary) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="OperationIntent", attrs={"operator": expr.operator, "arity": 2})
+        left_id = self.visit(expr.left)
+        right_id = self.visit(expr.right)
+        self.graph.add_edge(node_id, left_id, "operand", order=0)
+        self.graph.add_edge(node_id, right_id, "operand", order=1)
+        return node_id
+
+    def visit_LoweredCall(self, expr: LoweredCall) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(node_id=node_id, kind="CallIntent", attrs={})
+        if isinstance(expr.callee, LoweredRef):
+            self.graph.nodes[node_id].attrs["callee_name"] = expr.callee.name
+        elif expr.callee is not None:
+            callee_id = self.visit(expr.callee)
+            self.graph.add_edge(node_id, callee_id, "callee", order=0)
+        for idx, arg in enumerate(expr.args or []):
+            arg_id = self.visit(arg)
+            self.graph.add_edge(node_id, arg_id, "arg", order=idx)
+        return node_id
+
+    def visit_LoweredLambda(self, expr: LoweredLambda) -> str:
+        node_id = self._new_node_id()
+        self.graph.add_node(
+            node_id=node_id,
+            kind="LambdaIntent",
+            attrs=_with_inferred(
+                {
                     "params": expr.params or [],
                     "return_type": expr.return_type,
                 },
-            )
-            if expr.body is not None:
-                body_id = build_expr(expr.body)
-                graph.add_edge(node_id, body_id, "body", order=0)
-            return node_id
+                "inferred_return_type",
+                expr.inferred_return_type,
+            ),
+        )
+        if expr.body is not None:
+            body_id = self.visit(expr.body)
+            self.graph.add_edge(node_id, body_id, "body", order=0)
+        return node_id
 
-        node_id = new_node_id()
-        graph.add_node(node_id=node_id, kind="UnknownExprIntent", attrs={"expr": type(expr).__name__})
+    def generic_visit(self, node: Any) -> str:
+        node_id = self._new_node_id()
+        if isinstance(node, LoweredStmt):
+            self.graph.add_node(node_id=node_id, kind="UnknownIntent", attrs={"stmt": type(node).__name__})
+        else:
+            self.graph.add_node(node_id=node_id, kind="UnknownExprIntent", attrs={"expr": type(node).__name__})
         return node_id
 
-    for idx, stmt in enumerate(module.statements):
-        build_stmt(stmt, module_id, "contains", idx)
 
-    return graph
+def _with_binding(attrs: dict[str, Any], binding: Binding | None) -> dict[str, Any]:
+    # Graph attrs stay JSON-shaped: the lexical address as `[depth, slot]`.
+    if binding is not None:
+        attrs["binding"] = [binding.depth, binding.slot]
+    return attrs
+
+
+def _with_inferred(attrs: dict[str, Any], key: str, inferred: str | None) -> dict[str, Any]:
+    # Solved types are only attached when inference ran, keeping graphs of
+    # hand-built IR unchanged.
+    if inferred is not None:
+        attrs[key] = inferred
+    return attrs
+
+
+def _lower_param(param: IRParam) -> dict[str, str | None]:
+    return _with_inferred({"name": param.name, "type_hint": param.type_hint}, "inferred_type", param.inferred_type)
+
+
+def iter_lowered_nodes(root: LoweredNode) -> Iterator[LoweredNode]:
+    """Yield `root` and every lowered node below it in pre-order, without recursion."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        children: list[LoweredNode] = []
+        for item in fields(node):
+            value = getattr(node, item.name)
+            if isinstance(value, LoweredNode):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(child for child in value if isinstance(child, LoweredNode))
+        stack.extend(reversed(children))
 
 
 def lowered_to_dict(node: Any) -> Any:
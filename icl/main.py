@@ -2,15 +2,15 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 from icl.ast import (
     AssignmentStmt,
     BinaryExpr,
     CallExpr,
-    Expr,
+    ErrorStmt,
     ExpressionStmt,
     FunctionDefStmt,
     IdentifierExpr,
@@ -19,37 +19,58 @@ from icl.ast import (
     LiteralExpr,
     LoopStmt,
     MacroStmt,
+    Param,
     Program,
     ReturnStmt,
     Stmt,
     UnaryExpr,
+    assign_node_ids,
 )
-from icl.graph import IntentGraph, IntentGraphBuilder
-from icl.ir import IRBuilder, IRModule, ir_to_dict
+from icl.errors import CompilerError, Diagnostic, DiagnosticsError
+from icl.fused import FusedIRBuilder
+from icl.graph import IntentGraph
+from icl.ir import IRModule, ir_to_dict
 from icl.language_pack import EmissionContext, OutputBundle, PackRegistry, load_pack_specs
-from icl.lexer import Lexer
+from icl.lexer import BytesLexer, TableLexer
 from icl.lowering import LoweredModule, Lowerer, lowered_to_dict, lowered_to_graph
-from icl.optimize import GraphOptimizer, OptimizationReport
+from icl.mapped_source import MappedSource
+from icl.optimize import IRPassManager, OptimizationReport
 from icl.packs import build_builtin_pack_registry
 from icl.parser import Parser
+from icl.passes import (
+    STAGE_AST,
+    STAGE_CODE,
+    STAGE_IR,
+    STAGE_LOWERED,
+    STAGE_TOKENS,
+    PassContext,
+    PassManager,
+    PassRecord,
+    PassReport,
+)
 from icl.plugin import PluginManager, load_plugins
+from icl.resolver import resolve_program
 from icl.scaffolder import scaffold_output, write_bundle
 from icl.semantic import SemanticAnalyzer, SemanticResult
 from icl.serialization import write_graph, write_source_map
-from icl.source_map import SourceMap
-from icl.tokens import Token
+from icl.source_map import SourceMap, SourceSpan
+from icl.tokens import Token, TokenBuffer
+from icl.visitor import NodeVisitor
 
 
 @dataclass
 class FrontendArtifacts:
     """Pipeline output from source through semantic analysis."""
 
-    tokens: list[Token]
+    tokens: Sequence[Token]
     program: Program
     semantic: SemanticResult
     ir: IRModule
     source_map: SourceMap
     plugin_metadata: dict[str, Any]
+    passes: PassReport
+    # `collect_ir_features(ir)`, gathered while building it.
+    features: set[str] | None = None
 
 
 @dataclass
@@ -68,7 +89,7 @@ class TargetArtifacts:
 class CompileArtifacts:
     """Full compiler artifacts for debugging and downstream tooling."""
 
-    tokens: list[Token]
+    tokens: Sequence[Token]
     program: Program
     semantic: SemanticResult
     ir: IRModule
@@ -79,19 +100,21 @@ class CompileArtifacts:
     bundle: OutputBundle
     optimization: OptimizationReport | None = None
     plugin_metadata: dict[str, Any] | None = None
+    passes: PassReport | None = None
 
 
 @dataclass
 class MultiTargetArtifacts:
     """Shared frontend + many target emissions from one source."""
 
-    tokens: list[Token]
+    tokens: Sequence[Token]
     program: Program
     semantic: SemanticResult
     ir: IRModule
     source_map: SourceMap
     targets: dict[str, TargetArtifacts]
     plugin_metadata: dict[str, Any]
+    passes: PassReport
 
 
 def default_plugin_manager() -> PluginManager:
@@ -139,7 +162,7 @@ def build_pack_registry(pack_specs: list[str] | None = None) -> PackRegistry:
 
 
 def compile_source(
-    source: str,
+    source: str | MappedSource,
     *,
     filename: str = "<input>",
     target: str = "python",
@@ -150,12 +173,19 @@ def compile_source(
     pack_registry: PackRegistry | None = None,
     pack_specs: list[str] | None = None,
     optimize: bool = False,
+    opt_level: int | None = None,
+    drop_unused_functions: bool = False,
     debug: bool = False,
+    pass_metrics: bool = False,
     emit_graph_path: str | Path | None = None,
     emit_sourcemap_path: str | Path | None = None,
     output_path: str | Path | None = None,
 ) -> CompileArtifacts:
-    """Compile source text into one target using v2 frontend + lowering pipeline."""
+    """Compile source text into one target using v2 frontend + lowering pipeline.
+
+    `source` may also be a `MappedSource`, which is lexed straight from the
+    mapped bytes unless a syntax plugin needs the decoded text.
+    """
 
     multi = compile_targets(
         source,
@@ -168,7 +198,10 @@ def compile_source(
         pack_registry=pack_registry,
         pack_specs=pack_specs,
         optimize=optimize,
+        opt_level=opt_level,
+        drop_unused_functions=drop_unused_functions,
         debug=debug,
+        pass_metrics=pass_metrics,
     )
 
     target_artifacts = multi.targets[target]
@@ -193,11 +226,12 @@ def compile_source(
         bundle=target_artifacts.bundle,
         optimization=target_artifacts.optimization,
         plugin_metadata=multi.plugin_metadata,
+        passes=multi.passes,
     )
 
 
 def compile_targets(
-    source: str,
+    source: str | MappedSource,
     *,
     filename: str = "<input>",
     targets: list[str],
@@ -208,9 +242,20 @@ def compile_targets(
     pack_registry: PackRegistry | None = None,
     pack_specs: list[str] | None = None,
     optimize: bool = False,
+    opt_level: int | None = None,
+    drop_unused_functions: bool = False,
     debug: bool = False,
+    pass_metrics: bool = False,
 ) -> MultiTargetArtifacts:
-    """Compile source once and emit for multiple targets."""
+    """Compile source once and emit for multiple targets.
+
+    IR passes run once, before lowering, so every target emits the optimized
+    module. `opt_level` (0-2) takes precedence; `optimize=True` means level 1.
+    `drop_unused_functions` removes functions whose calls were all inlined or evaluated.
+    Every phase and pass is timed into `MultiTargetArtifacts.passes`; node
+    counts, which each cost a tree walk, are only taken with `pass_metrics`
+    or `debug`.
+    """
 
     manager = plugin_manager or build_plugin_manager(
         plugin_specs,
@@ -219,32 +264,54 @@ def compile_targets(
     )
     registry = pack_registry or build_pack_registry(pack_specs)
 
-    frontend = _run_frontend(source, filename=filename, plugin_manager=manager)
+    report = PassReport(node_counts=pass_metrics or debug)
+    frontend = _run_frontend(source, filename=filename, plugin_manager=manager, report=report)
+    level = opt_level if opt_level is not None else int(optimize)
+    ir = frontend.ir
+    features = frontend.features
+    optimization_report: OptimizationReport | None = None
+    ir_passes = manager.passes(STAGE_IR)
+    if level > 0 or ir_passes:
+        ir, optimization = IRPassManager(level, drop_unused_functions=drop_unused_functions).run(ir, extra_passes=ir_passes, report=report)
+        # Passes may remove code, and with it features.
+        features = None
+        if level > 0:
+            optimization_report = optimization
+    lowered_passes = manager.passes(STAGE_LOWERED)
 
     target_results: dict[str, TargetArtifacts] = {}
     lowerer = Lowerer()
     for target in targets:
         pack = registry.get(target)
-        lowered = lowerer.lower(
-            frontend.ir,
-            target=pack.manifest.target,
-            feature_coverage=pack.manifest.feature_coverage,
-        )
-
-        graph = lowered_to_graph(lowered)
-        optimization_report: OptimizationReport | None = None
-        if optimize:
-            graph, optimization_report = GraphOptimizer().optimize(graph)
-
-        code = pack.emit(
-            lowered,
-            EmissionContext(
+        with report.measure("lower", STAGE_LOWERED, target=target) as record:
+            lowered = lowerer.lower(
+                ir,
                 target=pack.manifest.target,
-                debug=debug,
-                metadata={"filename": filename, "source_target": target},
-            ),
-        )
-        bundle = scaffold_output(pack, code, target=pack.manifest.target, debug=debug)
+                feature_coverage=pack.manifest.feature_coverage,
+                features=features,
+            )
+        record.nodes_visited = report.size(ir)
+        record.nodes_after = report.size(lowered)
+        if lowered_passes:
+            PassManager(STAGE_LOWERED, lowered_passes).run(lowered, PassContext(report=report, target=target))
+        lowered_size = report.size(lowered)
+
+        with report.measure("graph", STAGE_LOWERED, target=target) as record:
+            graph = lowered_to_graph(lowered)
+        record.nodes_visited = lowered_size
+        record.nodes_after = len(graph.nodes)
+
+        with report.measure("emit", STAGE_CODE, target=target) as record:
+            code = pack.emit(
+                lowered,
+                EmissionContext(
+                    target=pack.manifest.target,
+                    debug=debug,
+                    metadata={"filename": filename, "source_target": target},
+                ),
+            )
+            bundle = scaffold_output(pack, code, target=pack.manifest.target, debug=debug)
+        record.nodes_visited = lowered_size
 
         target_results[target] = TargetArtifacts(
             target=target,
@@ -259,10 +326,11 @@ def compile_targets(
         tokens=frontend.tokens,
         program=frontend.program,
         semantic=frontend.semantic,
-        ir=frontend.ir,
+        ir=ir,
         source_map=frontend.source_map,
         targets=target_results,
         plugin_metadata=frontend.plugin_metadata,
+        passes=report,
     )
 
 
@@ -278,33 +346,37 @@ def compile_file(
     pack_registry: PackRegistry | None = None,
     pack_specs: list[str] | None = None,
     optimize: bool = False,
+    opt_level: int | None = None,
+    drop_unused_functions: bool = False,
     debug: bool = False,
     emit_graph_path: str | Path | None = None,
     emit_sourcemap_path: str | Path | None = None,
 ) -> CompileArtifacts:
     """Compile an input `.icl` file for one target."""
     path = Path(input_path)
-    source = path.read_text(encoding="utf-8")
-    return compile_source(
-        source,
-        filename=str(path),
-        target=target,
-        output_path=output_path,
-        plugin_manager=plugin_manager,
-        plugin_specs=plugin_specs,
-        natural_aliases=natural_aliases,
-        alias_mode=alias_mode,
-        pack_registry=pack_registry,
-        pack_specs=pack_specs,
-        optimize=optimize,
-        debug=debug,
-        emit_graph_path=emit_graph_path,
-        emit_sourcemap_path=emit_sourcemap_path,
-    )
+    with MappedSource(path) as source:
+        return compile_source(
+            source,
+            filename=str(path),
+            target=target,
+            output_path=output_path,
+            plugin_manager=plugin_manager,
+            plugin_specs=plugin_specs,
+            natural_aliases=natural_aliases,
+            alias_mode=alias_mode,
+            pack_registry=pack_registry,
+            pack_specs=pack_specs,
+            optimize=optimize,
+            opt_level=opt_level,
+            drop_unused_functions=drop_unused_functions,
+            debug=debug,
+            emit_graph_path=emit_graph_path,
+            emit_sourcemap_path=emit_sourcemap_path,
+        )
 
 
 def check_source(
-    source: str,
+    source: str | MappedSource,
     *,
     filename: str = "<input>",
     plugin_manager: PluginManager | None = None,
@@ -313,23 +385,87 @@ def check_source(
     alias_mode: str = "core",
     pack_registry: PackRegistry | None = None,
 ) -> CompileArtifacts:
-    """Run compiler pipeline through lowering for default python target."""
-    return compile_source(
-        source,
-        filename=filename,
-        target="python",
-        plugin_manager=plugin_manager,
-        plugin_specs=plugin_specs,
+    """Run compiler pipeline through lowering for default python target.
+
+    On failure a `DiagnosticsError` is raised that also lists every lexer,
+    parser and semantic diagnostic (see `collect_diagnostics`).
+    """
+    manager = plugin_manager or build_plugin_manager(
+        plugin_specs,
         natural_aliases=natural_aliases,
         alias_mode=alias_mode,
-        pack_registry=pack_registry,
-        optimize=False,
-        debug=False,
     )
+    try:
+        return compile_source(
+            source,
+            filename=filename,
+            target="python",
+            plugin_manager=manager,
+            pack_registry=pack_registry,
+            optimize=False,
+            debug=False,
+        )
+    except CompilerError as err:
+        diagnostics = collect_diagnostics(source, filename=filename, plugin_manager=manager)
+        if not diagnostics:
+            raise
+        raise DiagnosticsError(err, diagnostics) from err
+
+
+def collect_diagnostics(
+    source: str | MappedSource,
+    *,
+    filename: str = "<input>",
+    plugin_manager: PluginManager | None = None,
+    plugin_specs: list[str] | None = None,
+    natural_aliases: bool = False,
+    alias_mode: str = "core",
+) -> list[Diagnostic]:
+    """Run the lexer, parser, macro expansion and semantic analysis, returning every diagnostic.
+
+    Each phase recovers from its errors (failed statements become
+    `ErrorStmt` placeholders), so one pass reports what strict compilation
+    finds one error at a time. An empty list means the frontend accepts the
+    source.
+    """
+    manager = plugin_manager or build_plugin_manager(
+        plugin_specs,
+        natural_aliases=natural_aliases,
+        alias_mode=alias_mode,
+    )
+    text = source.text() if isinstance(source, MappedSource) else source
+    try:
+        text = manager.preprocess_source(text)
+    except CompilerError as err:
+        return [err.to_diagnostic()]
+
+    lexer = TableLexer(text, filename=filename, collect_errors=True)
+    parser = Parser(lexer.tokenize_buffer(), collect_errors=True)
+    program = parser.parse_program()
+    errors: list[CompilerError] = [*(lexer.errors or []), *parser.errors]
+    try:
+        program = manager.transform_program(program)
+    except CompilerError as err:
+        return [error.to_diagnostic() for error in [*errors, err]]
+
+    statements: list[Stmt] = []
+    for stmt in program.statements:
+        try:
+            statements.extend(manager.expand_macros(replace(program, statements=[stmt])).statements)
+        except CompilerError as err:
+            errors.append(err)
+            statements.append(ErrorStmt(span=stmt.span))
+    program = replace(program, statements=statements)
+    assign_node_ids(program, parser.node_ids)
+
+    analyzer = SemanticAnalyzer(collect_errors=True)
+    analyzer.analyze(program)
+    errors.extend(analyzer.errors)
+    return [error.to_diagnostic() for error in errors]
 
 
 def explain_source(
-    source: str,
+    source: str | MappedSource,
     *,
     filename: str = "<input>",
     target: str = "python",
@@ -365,120 +501,175 @@ def explain_source(
     }
 
 
-def compress_source(source: str, *, filename: str = "<input>") -> str:
+def compress_source(source: str | MappedSource, *, filename: str = "<input>") -> str:
     """Canonical compact ICL pretty-printer for compression mode."""
-    tokens = Lexer(source, filename=filename).tokenize()
+    tokens = tokenize_source(source, filename=filename)
     program = Parser(tokens).parse_program()
     return _emit_program_compact(program)
 
 
-def _run_frontend(source: str, *, filename: str, plugin_manager: PluginManager) -> FrontendArtifacts:
-    prepared_source = plugin_manager.preprocess_source(source)
-    plugin_metadata = plugin_manager.metadata_snapshot()
-
-    tokens = Lexer(prepared_source, filename=filename).tokenize()
-    program = Parser(tokens).parse_program()
-    program = plugin_manager.transform_program(program)
-    program = plugin_manager.expand_macros(program)
+def tokenize_source(source: str | MappedSource, *, filename: str = "<input>") -> TokenBuffer:
+    """Lex source text, or a mapped file straight from its bytes."""
+    if isinstance(source, MappedSource):
+        return BytesLexer(source.data, filename=filename).tokenize_buffer()
+    return TableLexer(source, filename=filename).tokenize_buffer()
 
-    semantic = SemanticAnalyzer().analyze(program)
 
-    graph_builder = IntentGraphBuilder()
-    graph_builder.build(program)
-    source_map = graph_builder.source_map
+def _run_frontend(
+    source: str | MappedSource,
+    *,
+    filename: str,
+    plugin_manager: PluginManager,
+    report: PassReport | None = None,
+) -> FrontendArtifacts:
+    report = report if report is not None else PassReport()
+    if isinstance(source, MappedSource) and plugin_manager.has_syntax_plugins():
+        source = source.text()
+    if isinstance(source, str):
+        if plugin_manager.has_syntax_plugins():
+            with report.measure("preprocess", STAGE_TOKENS):
+                source = plugin_manager.preprocess_source(source)
+        else:
+            source = plugin_manager.preprocess_source(source)
+    plugin_metadata = plugin_manager.metadata_snapshot()
 
-    ir = IRBuilder(semantic).build(program)
+    with report.measure("lex", STAGE_TOKENS) as record:
+        tokens = tokenize_source(source, filename=filename)
+    record.nodes_after = len(tokens)
+
+    with report.measure("parse", STAGE_AST) as record:
+        parser = Parser(tokens)
+        program = parser.parse_program()
+    record.nodes_visited = len(tokens)
+    record.nodes_after = parsed_size = report.size(program)
+
+    with report.measure("expand", STAGE_AST) as record:
+        program = plugin_manager.transform_program(program)
+        program = plugin_manager.expand_macros(program)
+    record.nodes_visited = record.nodes_before = parsed_size
+    record.nodes_after = report.size(program)
+    ast_passes = plugin_manager.passes(STAGE_AST)
+    if ast_passes:
+        PassManager(STAGE_AST, ast_passes).run(program, PassContext(report=report))
+    # Plugin-built nodes carry no id yet; semantic results are keyed by it.
+    assign_node_ids(program, parser.node_ids)
+    ast_size = report.size(program)
+
+    with report.measure("semantic", STAGE_AST) as record:
+        semantic = SemanticAnalyzer().analyze(program)
+    _unchanged(record, ast_size)
+
+    with report.measure("resolve", STAGE_AST) as record:
+        resolution = resolve_program(program)
+    _unchanged(record, ast_size)
+
+    # Type inference, the source map and IR features come out of the IR build walk.
+    with report.measure("ir-build", STAGE_IR) as record:
+        builder = FusedIRBuilder(semantic, resolution)
+        ir = builder.build(program)
+    record.nodes_visited = ast_size
+    record.nodes_after = report.size(ir)
 
     return FrontendArtifacts(
         tokens=tokens,
         program=program,
         semantic=semantic,
         ir=ir,
-        source_map=source_map,
+        source_map=builder.source_map,
         plugin_metadata=plugin_metadata,
+        passes=report,
+        features=builder.features,
     )
 
 
+def _unchanged(record: PassRecord, size: int) -> None:
+    # Analyses read the whole program and leave its size as it was.
+    record.nodes_visited = record.nodes_before = record.nodes_after = size
+
+
 def _emit_program_compact(program: Program) -> str:
-    return "\n".join(_emit_stmt_compact(stmt) for stmt in program.statements).strip() + "\n"
+    emitter = _CompactEmitter()
+    return "\n".join(emitter.visit(stmt) for stmt in program.statements).strip() + "\n"
+
 
+class _CompactEmitter(NodeVisitor):
+    """Canonical compact ICL text for each AST node."""
 
-def _emit_stmt_compact(stmt: Stmt) -> str:
-    if isinstance(stmt, AssignmentStmt):
+    def _params(self, params: list[Param]) -> str:
+        return ",".join(f"{param.name}:{param.type_hint}" if param.type_hint else param.name for param in params)
+
+    def visit_AssignmentStmt(self, stmt: AssignmentStmt) -> str:
         if stmt.type_hint:
-            return f"{stmt.name}:{stmt.type_hint}:={_emit_expr_compact(stmt.value)}"
-        return f"{stmt.name}:={_emit_expr_compact(stmt.value)}"
+            return f"{stmt.name}:{stmt.type_hint}:={self.visit(stmt.value)}"
+        return f"{stmt.name}:={self.visit(stmt.value)}"
 
-    if isinstance(stmt, ExpressionStmt):
-        return _emit_expr_compact(stmt.expr)
+    def visit_ExpressionStmt(self, stmt: ExpressionStmt) -> str:
+        return self.visit(stmt.expr)
 
-    if isinstance(stmt, ReturnStmt):
+    def visit_ReturnStmt(self, stmt: ReturnStmt) -> str:
         if stmt.value is None:
             return "ret"
-        return f"ret {_emit_expr_compact(stmt.value)}"
+        return f"ret {self.visit(stmt.value)}"
 
-    if isinstance(stmt, LoopStmt):
-        body = ";".join(_emit_stmt_compact(item) for item in stmt.body)
-        return f"loop {stmt.iterator} in {_emit_expr_compact(stmt.start)}..{_emit_expr_compact(stmt.end)}{{{body}}}"
+    def visit_LoopStmt(self, stmt: LoopStmt) -> str:
+        body = ";".join(self.visit(item) for item in stmt.body)
+        return f"loop {stmt.iterator} in {self.visit(stmt.start)}..{self.visit(stmt.end)}{{{body}}}"
 
-    if isinstance(stmt, IfStmt):
-        then_part = ";".join(_emit_stmt_compact(item) for item in stmt.then_block)
-        else_part = ";".join(_emit_stmt_compact(item) for item in stmt.else_block)
+    def visit_IfStmt(self, stmt: IfStmt) -> str:
+        then_part = ";".join(self.visit(item) for item in stmt.then_block)
+        else_part = ";".join(self.visit(item) for item in stmt.else_block)
         if else_part:
-            return f"if {_emit_expr_compact(stmt.condition)}?{{{then_part}}}:{{{else_part}}}"
-        return f"if {_emit_expr_compact(stmt.condition)}?{{{then_part}}}"
+            return f"if {self.visit(stmt.condition)}?{{{then_part}}}:{{{else_part}}}"
+        return f"if {self.visit(stmt.condition)}?{{{then_part}}}"
 
-    if isinstance(stmt, FunctionDefStmt):
-        params = ",".join(f"{p.name}:{p.type_hint}" if p.type_hint else p.name for p in stmt.params)
+    def visit_FunctionDefStmt(self, stmt: FunctionDefStmt) -> str:
+        params = self._params(stmt.params)
         suffix = f":{stmt.return_type}" if stmt.return_type else ""
         if stmt.expr_body is not None:
-            return f"fn {stmt.name}({params}){suffix}=>{_emit_expr_compact(stmt.expr_body)}"
-        body = ";".join(_emit_stmt_compact(item) for item in stmt.body)
+            return f"fn {stmt.name}({params}){suffix}=>{self.visit(stmt.expr_body)}"
+        body = ";".join(self.visit(item) for item in stmt.body)
         return f"fn {stmt.name}({params}){suffix}{{{body}}}"
 
-    if isinstance(stmt, MacroStmt):
-        args = ",".join(_emit_expr_compact(arg) for arg in stmt.args)
+    def visit_MacroStmt(self, stmt: MacroStmt) -> str:
+        args = ",".join(self.visit(arg) for arg in stmt.args)
         return f"#{stmt.name}({args})"
 
-    return "/*unsupported*/"
-
-
-def _emit_expr_compact(expr: Expr) -> str:
-    if isinstance(expr, LiteralExpr):
+    def visit_LiteralExpr(self, expr: LiteralExpr) -> str:
         if isinstance(expr.value, bool):
             return "true" if expr.value else "false"
         if isinstance(expr.value, str):
             return f'"{expr.value}"'
         return str(expr.value)
 
-    if isinstance(expr, IdentifierExpr):
+    def visit_IdentifierExpr(self, expr: IdentifierExpr) -> str:
         return expr.name
 
-    if isinstance(expr, UnaryExpr):
-        return f"{expr.operator}{_emit_expr_compact(expr.operand)}"
+    def visit_UnaryExpr(self, expr: UnaryExpr) -> str:
+        return f"{expr.operator}{self.visit(expr.operand)}"
 
-    if isinstance(expr, BinaryExpr):
-        return f"({_emit_expr_compact(expr.left)}{expr.operator}{_emit_expr_compact(expr.right)})"
+    def visit_BinaryExpr(self, expr: BinaryExpr) -> str:
+        return f"({self.visit(expr.left)}{expr.operator}{self.visit(expr.right)})"
 
-    if isinstance(expr, LambdaExpr):
-        params = ",".join(
-            f"{param.name}:{param.type_hint}" if param.type_hint else param.name
-            for param in expr.params
-        )
+    def visit_LambdaExpr(self, expr: LambdaExpr) -> str:
         suffix = f":{expr.return_type}" if expr.return_type else ""
-        return f"lam({params}){suffix}=>{_emit_expr_compact(expr.body)}"
+        return f"lam({self._params(expr.params)}){suffix}=>{self.visit(expr.body)}"
 
-    if isinstance(expr, CallExpr):
-        callee = _emit_expr_compact(expr.callee)
+    def visit_CallExpr(self, expr: CallExpr) -> str:
+        callee = self.visit(expr.callee)
         prefix = "@" if expr.at_prefixed and isinstance(expr.callee, IdentifierExpr) else ""
-        args = ",".join(_emit_expr_compact(arg) for arg in expr.args)
+        args = ",".join(self.visit(arg) for arg in expr.args)
         return f"{prefix}{callee}({args})"
 
-    return "?"
+    def generic_visit(self, node: Any) -> str:
+        return "/*unsupported*/" if isinstance(node, Stmt) else "?"
 
 
 def ast_to_dict(node: Any) -> Any:
-    """Serialize AST dataclasses recursively into JSON-compatible dicts."""
+    """Serialize AST dataclasses recursively into JSON-compatible dicts.
+
+    Node ids are parser bookkeeping and are left out, so equal trees
+    serialize equally however they were parsed.
+    """
     if isinstance(node, list):
         return [ast_to_dict(item) for item in node]
     if hasattr(node, "to_dict"):
@@ -487,12 +678,22 @@ def ast_to_dict(node: Any) -> Any:
         except TypeError:
             pass
     if hasattr(node, "__dataclass_fields__"):
-        payload = asdict(node)
+        payload = _spans_to_dicts(asdict(node))
         payload["node_type"] = type(node).__name__
         return payload
     return node
 
 
+def _spans_to_dicts(value: Any) -> Any:
+    if isinstance(value, SourceSpan):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: _spans_to_dicts(item) for key, item in value.items() if key != "node_id"}
+    if isinstance(value, list):
+        return [_spans_to_dicts(item) for item in value]
+    return value
+
+
 if __name__ == "__main__":
     from icl.cli import run
 
@@ -0,0 +1,54 @@
+"""Memory-mapped source files for the bytes-level lexer."""
+
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+from types import TracebackType
+
+
+class MappedSource:
+    """UTF-8 source file mapped read-only into memory.
+
+    `data` exposes the file as a bytes-like buffer that `BytesLexer` scans in
+    place, so large inputs are never decoded as a whole. `text()` decodes the
+    full file for stages that need a `str` (such as syntax plugins).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._map: mmap.mmap | None = None
+        with self.path.open("rb") as handle:
+            # Empty files cannot be mapped.
+            if self.path.stat().st_size:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def data(self) -> mmap.mmap | bytes:
+        """Raw file contents."""
+        return self._map if self._map is not None else b""
+
+    def text(self) -> str:
+        """Decode the whole file with newlines translated, as text-mode reads do."""
+        text = str(self.data, "utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
+
+    def close(self) -> None:
+        """Release the mapping."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __enter__(self) -> MappedSource:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
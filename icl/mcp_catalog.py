@@ -40,6 +40,8 @@ def tools_list() -> list[dict[str, Any]]:
                     "target": {"type": "string"},
                     "targets": {"type": "array", "items": {"type": "string"}},
                     "optimize": {"type": "boolean"},
+                    "opt_level": {"type": "integer", "enum": [0, 1, 2]},
+                    "drop_unused_functions": {"type": "boolean"},
                     "debug": {"type": "boolean"},
                     "include_graph": {"type": "boolean"},
                     "include_source_map": {"type": "boolean"},
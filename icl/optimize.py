@@ -1,21 +1,1752 @@
-"""Graph-level optimization passes for ICL Intent Graph."""
+"""IR optimization pipeline and graph-level optimization passes."""
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import itertools
+import math
+from typing import Any, Callable, Final, Iterator
 import copy
 
 from icl.graph import IntentGraph
+from icl.ir import (
+    IRAssignment,
+    IRBinary,
+    IRCall,
+    IRExpr,
+    IRExpressionStmt,
+    IRFunction,
+    IRIf,
+    IRLambda,
+    IRLiteral,
+    IRLoop,
+    IRModule,
+    IRNode,
+    IRParam,
+    IRRef,
+    IRReturn,
+    IRStmt,
+    IRUnary,
+    assign_content_hashes,
+)
+from icl.passes import STAGE_IR, CompilerPass, OptimizationReport, PassContext, PassManager, PassReport
+from icl.resolver import Binding
+from icl.semantic import TYPE_BOOL, TYPE_FLOAT, TYPE_INT, TYPE_STR
+from icl.ssa import SSA_ASSIGN, build_ssa
+from icl.visitor import NodeVisitor
+
+
+# Levels accepted by `IRPassManager` and the CLI's `-O` flag.
+OPT_LEVELS: Final[tuple[int, ...]] = (0, 1, 2)
+# Folded integers stay exactly representable in every target (JS numbers).
+_MAX_SAFE_INTEGER: Final[int] = 2**53
+# Largest function or lambda body, in IR nodes, that `InliningPass` inlines.
+INLINE_MAX_NODES: Final[int] = 16
+# Steps `PartialEvaluationPass` spends on one call before giving up.
+PARTIAL_EVAL_MAX_STEPS: Final[int] = 10_000
+# Python type of a constant per IR expression type.
+_LITERAL_TYPES: Final[dict[str, type]] = {TYPE_INT: int, TYPE_FLOAT: float, TYPE_BOOL: bool, TYPE_STR: str}
+# Types `CopyPropagationPass` propagates: plain values in every target.
+_COPIED_TYPES: Final[frozenset[str]] = frozenset({TYPE_INT, TYPE_FLOAT, TYPE_BOOL})
+# Most iterations, and IR nodes after unrolling, of a loop `LoopOptimizationPass` unrolls.
+UNROLL_MAX_TRIPS: Final[int] = 8
+UNROLL_MAX_NODES: Final[int] = 64
+# Operators that fail on a zero right operand in some target.
+_FAILING_OPERATORS: Final[frozenset[str]] = frozenset({"/", "%"})
+
+
+class IRPass(CompilerPass):
+    """Built-in IR optimization, recording its actions in an `OptimizationReport`."""
+
+    stage = STAGE_IR
+
+    def run(self, unit: IRModule, context: PassContext) -> bool:
+        return self.optimize(unit, context.optimization)
+
+    @abstractmethod
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        """Transform `module` in place and record what was done in `report`."""
+
+
+class ConstantFoldingPass(IRPass):
+    """Replaces operations on literals with their result.
+
+    Only folds where every target computes the same value: no division by
+    zero, `%` on non-negative operands, integers within JS's exact range,
+    finite floats and no zero that JS would produce as `-0` (`-(0)`,
+    `0 * -1`). `false && e` and `true || e` short-circuit to the literal.
+    """
+
+    name = "constant-folding"
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        folded_before = report.folded_operations
+
+        def fold(expr: IRExpr) -> IRExpr:
+            result = _fold_expr(expr)
+            if result is expr:
+                return expr
+            operator = getattr(expr, "operator", "")
+            report.folded_operations += 1
+            report.notes.append(f"Folded {expr.ir_id} ({operator}).")
+            return result
+
+        for stmt in _walk_stmts(module.statements):
+            _rewrite_stmt_exprs(stmt, fold)
+        return report.folded_operations != folded_before
+
+
+class BranchPruningPass(IRPass):
+    """Drops code that can never run.
+
+    An `if` on a literal condition keeps only the taken block, splicing it
+    into the enclosing block when it declares no names of its own. Statements
+    after a `ret` in the same block are removed.
+    """
+
+    name = "branch-pruning"
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        pruned_before = report.pruned_branches
+        module.statements = self._prune_block(module.statements, report)
+        return report.pruned_branches != pruned_before
+
+    def _prune_block(self, block: list[IRStmt], report: OptimizationReport) -> list[IRStmt]:
+        pruned: list[IRStmt] = []
+        for stmt in block:
+            for child in _child_blocks(stmt):
+                child[:] = self._prune_block(child, report)
+            if isinstance(stmt, IRIf) and isinstance(stmt.condition, IRLiteral) and type(stmt.condition.value) is bool:
+                pruned.extend(self._prune_if(stmt, report))
+            else:
+                pruned.append(stmt)
+            if isinstance(stmt, IRReturn):
+                unreachable = [item for item in block[block.index(stmt) + 1 :] if not isinstance(item, IRFunction)]
+                if unreachable:
+                    report.pruned_branches += 1
+                    report.notes.append(f"Removed {len(unreachable)} unreachable statement(s) after {stmt.ir_id}.")
+                pruned.extend(item for item in block[block.index(stmt) + 1 :] if isinstance(item, IRFunction))
+                break
+        return pruned
+
+    @staticmethod
+    def _prune_if(stmt: IRIf, report: OptimizationReport) -> list[IRStmt]:
+        taken = stmt.then_block if stmt.condition.value else stmt.else_block
+        report.pruned_branches += 1
+        report.notes.append(f"Pruned {'else' if stmt.condition.value else 'then'} branch of {stmt.ir_id}.")
+        if _splice_block(taken):
+            return taken
+        # The block keeps its scope: run it under an always-true `if`.
+        stmt.condition.value = True
+        stmt.then_block = taken
+        stmt.else_block = []
+        return [stmt] if taken else []
+
+
+class LoopOptimizationPass(IRPass):
+    """Removes, unrolls and hoists code out of `IRLoop`s.
+
+    A loop whose bounds are integer literals with `start >= end` never runs
+    and is removed. With `unroll`, a loop of at most `UNROLL_MAX_TRIPS`
+    iterations and `UNROLL_MAX_NODES` nodes once unrolled is replaced by a
+    copy of its body per iteration, the iterator read as a literal; only
+    bodies that declare no names and make no lambdas or functions, and
+    iterators whose name no other variable has (Python's loop variable
+    outlives the loop), are unrolled.
+
+    With `reduce`, a loop whose body only accumulates into outer `Int`
+    variables (`acc := acc + e`, `acc := acc * e`) with `e` affine in the
+    iterator is replaced by closed-form updates. Literal bounds give the
+    iteration count and the sum of the iterator as literals; products need
+    literal factors too and are computed. Other bounds only allow terms
+    constant in the iterator, `acc := acc + q * (end - start)` under an
+    `if start < end`, since the sum of the iterator needs integer division.
+
+    With `hoist`, a non-trivial `end` bound (JS re-evaluates it each
+    iteration) and loop-invariant expressions of the body's statements are
+    computed once before the loop into fresh variables. Invariant means no
+    calls and only reads of variables the loop never assigns; only `Int`,
+    `Float` and `Bool` values are hoisted, and `/` or `%` only from loops
+    that are known to run, so hoisting never adds a failure.
+    """
+
+    name = "loop-optimization"
+
+    def __init__(self, *, reduce: bool = True, unroll: bool = True, hoist: bool = True) -> None:
+        self.reduce = reduce
+        self.unroll = unroll
+        self.hoist = hoist
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        before = (report.removed_loops, report.reduced_loops, report.unrolled_loops, report.hoisted_expressions)
+        _LoopOptimizer(module, report, reduce=self.reduce, unroll=self.unroll, hoist=self.hoist).run()
+        return (report.removed_loops, report.reduced_loops, report.unrolled_loops, report.hoisted_expressions) != before
+
+
+class DeadStoreEliminationPass(IRPass):
+    """Removes assignments whose value no read can observe.
+
+    Works on the module's SSA form (`icl/ssa.py`), so each assignment is
+    judged on its own: it is dead when its version is never read, directly
+    or through a phi, its variable is not read from a nested function or
+    lambda, and its value contains no call. A variable's first assignment
+    declares it in some targets, so it is only removed with all the others
+    or when the next one is in the same block.
+    """
+
+    name = "dead-store-elimination"
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        ssa = build_ssa(module)
+        live = ssa.live_defs()
+        dead = {
+            id(definition.node)
+            for definition in ssa.defs
+            if definition.kind == SSA_ASSIGN and definition not in live and _is_pure(definition.node.value)
+        }
+        if not dead:
+            return False
+        # Each variable's assignments in source order, with their blocks.
+        assignments: dict[int, list[tuple[IRAssignment, list[IRStmt]]]] = {}
+        for stmt, block in _walk_stmts_with_blocks(module.statements):
+            if isinstance(stmt, IRAssignment) and stmt.binding is not None:
+                assignments.setdefault(stmt.binding.symbol, []).append((stmt, block))
+        for items in assignments.values():
+            if all(id(stmt) in dead for stmt, _ in items):
+                continue
+            for (stmt, block), (_, next_block) in zip(items, items[1:]):
+                if id(stmt) not in dead or block is not next_block:
+                    dead.discard(id(stmt))
+                    break
+
+        removed_before = report.removed_assignments
+        for block in _walk_blocks(module.statements):
+            kept = []
+            for stmt in block:
+                if id(stmt) in dead:
+                    report.removed_assignments += 1
+                    report.notes.append(f"Removed dead store {stmt.ir_id} ({stmt.name}).")
+                else:
+                    kept.append(stmt)
+            block[:] = kept
+        return report.removed_assignments != removed_before
+
+
+class ConstantPropagationPass(IRPass):
+    """Replaces reads of variables that always hold one literal with the literal.
+
+    A read's version comes from the SSA form: an assignment of a literal, or
+    a phi whose operands all hold the same literal. Reads whose type differs
+    from the literal's are kept, since typed targets would convert them, and
+    so are reads of a name another variable or a loop iterator shares
+    (Python's iterator stays bound after its loop).
+    """
+
+    name = "constant-propagation"
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        ssa = build_ssa(module)
+        propagated_before = report.propagated_constants
+
+        def propagate(expr: IRExpr) -> IRExpr:
+            definition = ssa.reaching(expr) if isinstance(expr, IRRef) else None
+            literal = ssa.constant(definition) if definition is not None else None
+            if literal is None or literal.expr_type != expr.expr_type or not ssa.unique_name(expr.name):
+                return expr
+            report.propagated_constants += 1
+            report.notes.append(f"Propagated {definition.label} into {expr.ir_id}.")
+            return IRLiteral(ir_id=expr.ir_id, span=expr.span, expr_type=expr.expr_type, value=literal.value)
+
+        for stmt in _walk_stmts(module.statements):
+            _rewrite_stmt_exprs(stmt, propagate)
+        return report.propagated_constants != propagated_before
+
+
+class CopyPropagationPass(IRPass):
+    """Replaces reads of a copy (`y := x`) with reads of the copied variable.
+
+    Only where the SSA form shows `x` still holds the copied version, `x`'s
+    name belongs to one variable and no loop iterator (so no target can
+    mistake it for another)
+    and the value is an `Int`, `Float` or `Bool`, which every target copies.
+    """
+
+    name = "copy-propagation"
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        ssa = build_ssa(module)
+        propagated_before = report.propagated_copies
+
+        def propagate(expr: IRExpr) -> IRExpr:
+            binding = ssa.copies.get(id(expr)) if isinstance(expr, IRRef) else None
+            if binding is None or expr.expr_type not in _COPIED_TYPES:
+                return expr
+            definition = ssa.reaching(expr)
+            source: IRRef = definition.node.value
+            if source.expr_type != expr.expr_type or not ssa.unique_name(source.name):
+                return expr
+            report.propagated_copies += 1
+            report.notes.append(f"Propagated copy {definition.label} of {source.name} into {expr.ir_id}.")
+            return IRRef(ir_id=expr.ir_id, span=expr.span, expr_type=expr.expr_type, name=source.name, binding=binding)
+
+        for stmt in _walk_stmts(module.statements):
+            _rewrite_stmt_exprs(stmt, propagate)
+        return report.propagated_copies != propagated_before
+
+
+class InliningPass(IRPass):
+    """Replaces calls to small expression-bodied functions with their body.
+
+    Candidates are module-level `fn f(...) => expr` definitions and lambdas
+    assigned once to a name, whose body has at most `INLINE_MAX_NODES` nodes,
+    no calls (so no recursion) and no lambdas, and only resolved names. A call
+    is inlined when its arguments have the parameters' inferred types and
+    substituting them keeps evaluation: at most one argument has calls and it
+    is used exactly once, not behind `&&`/`||`; other arguments that are not
+    literals or names are used at most once.
+
+    The body's free names are re-addressed for the call site. A variable that
+    would capture one of them there is renamed; captures by a parameter or
+    loop iterator keep the call. With `remove_unused`, functions whose every
+    use was inlined are removed.
+    """
+
+    name = "inlining"
+
+    def __init__(self, *, remove_unused: bool = False) -> None:
+        self.remove_unused = remove_unused
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        inlined_before = report.inlined_calls
+        removed_before = report.removed_functions
+        inliner = _Inliner(module, report)
+        inliner.run()
+        if self.remove_unused:
+            _remove_unused_functions(module, inliner.inlined_functions, report)
+        return report.inlined_calls != inlined_before or report.removed_functions != removed_before
+
+
+class PartialEvaluationPass(IRPass):
+    """Evaluates calls to pure functions whose arguments are constant.
+
+    A module-level function is pure when it reads only its own parameters
+    and locals, makes no lambdas and calls only pure functions, none of them
+    recursively; `print` and other unresolved callees are impure. A call
+    whose arguments are constant expressions is run by an IR interpreter
+    with the rules of `ConstantFoldingPass`, within `PARTIAL_EVAL_MAX_STEPS`
+    steps, and replaced by an `IRLiteral` when the result has the call's
+    type. With `remove_unused`, evaluated functions nothing calls any more
+    are removed.
+    """
+
+    name = "partial-evaluation"
+
+    def __init__(self, *, remove_unused: bool = False) -> None:
+        self.remove_unused = remove_unused
+
+    def optimize(self, module: IRModule, report: OptimizationReport) -> bool:
+        evaluated_before = report.evaluated_calls
+        removed_before = report.removed_functions
+        evaluator = _PartialEvaluator(module, report)
+        evaluator.run()
+        if self.remove_unused:
+            _remove_unused_functions(module, evaluator.evaluated_functions, report)
+        return report.evaluated_calls != evaluated_before or report.removed_functions != removed_before
 
 
 @dataclass
-class OptimizationReport:
-    """Summary of optimization actions applied to a graph."""
+class _Scope:
+    """A scope on the inliner's chain: the names it fixes and the code it holds."""
+
+    fixed_names: tuple[str, ...]
+    statements: list[IRStmt]
+    exprs: list[IRExpr]
+
+
+class _CallSiteRewriter(NodeVisitor, ABC):
+    """Walks a module with its scope chain and rewrites calls in place, arguments first.
+
+    Statement handlers return None, expression handlers the new expression;
+    subclasses rewrite each call in `_rewrite_call`.
+    """
+
+    def __init__(self, module: IRModule, report: OptimizationReport) -> None:
+        self._module = module
+        self._report = report
+        self._chain: list[_Scope] = []
+        self._assignments: dict[int, list[IRAssignment]] = {}
+        for stmt in _walk_stmts(module.statements):
+            if isinstance(stmt, IRAssignment) and stmt.binding is not None:
+                self._assignments.setdefault(stmt.binding.symbol, []).append(stmt)
+        self._functions: dict[str, IRFunction | None] = {}
+        for stmt in module.statements:
+            if isinstance(stmt, IRFunction):
+                # A name defined twice is not rewritten.
+                self._functions[stmt.name] = None if stmt.name in self._functions else stmt
+
+    def run(self) -> None:
+        self._visit_block(self._module.statements, _Scope((), self._module.statements, []))
+
+    def _visit_block(self, block: list[IRStmt], scope: _Scope) -> None:
+        self._chain.append(scope)
+        for stmt in block:
+            self.visit(stmt)
+        self._chain.pop()
+
+    def visit_IRAssignment(self, stmt: IRAssignment) -> None:
+        stmt.value = self.visit(stmt.value)
+
+    def visit_IRExpressionStmt(self, stmt: IRExpressionStmt) -> None:
+        stmt.expr = self.visit(stmt.expr)
+
+    def visit_IRIf(self, stmt: IRIf) -> None:
+        stmt.condition = self.visit(stmt.condition)
+        self._visit_block(stmt.then_block, _Scope((), stmt.then_block, []))
+        self._visit_block(stmt.else_block, _Scope((), stmt.else_block, []))
+
+    def visit_IRLoop(self, stmt: IRLoop) -> None:
+        stmt.start = self.visit(stmt.start)
+        stmt.end = self.visit(stmt.end)
+        self._visit_block(stmt.body, _Scope((stmt.iterator,), stmt.body, []))
+
+    def visit_IRFunction(self, stmt: IRFunction) -> None:
+        params = tuple(param.name for param in stmt.params)
+        scope = _Scope(params, stmt.body, [stmt.expr_body] if stmt.expr_body is not None else [])
+        self._visit_block(stmt.body, scope)
+        if stmt.expr_body is not None:
+            self._chain.append(scope)
+            stmt.expr_body = self.visit(stmt.expr_body)
+            self._chain.pop()
+
+    def visit_IRReturn(self, stmt: IRReturn) -> None:
+        if stmt.value is not None:
+            stmt.value = self.visit(stmt.value)
+
+    def visit_IRUnary(self, expr: IRUnary) -> IRExpr:
+        if expr.operand is not None:
+            expr.operand = self.visit(expr.operand)
+        return expr
+
+    def visit_IRBinary(self, expr: IRBinary) -> IRExpr:
+        if expr.left is not None:
+            expr.left = self.visit(expr.left)
+        if expr.right is not None:
+            expr.right = self.visit(expr.right)
+        return expr
+
+    def visit_IRLambda(self, expr: IRLambda) -> IRExpr:
+        if expr.body is not None:
+            self._chain.append(_Scope(tuple(param.name for param in expr.params or []), [], [expr.body]))
+            expr.body = self.visit(expr.body)
+            self._chain.pop()
+        return expr
+
+    def visit_IRCall(self, expr: IRCall) -> IRExpr:
+        if expr.callee is not None:
+            expr.callee = self.visit(expr.callee)
+        expr.args = [self.visit(arg) for arg in expr.args or []]
+        return self._rewrite_call(expr)
+
+    def generic_visit(self, node: Any) -> Any:
+        return node
+
+    @abstractmethod
+    def _rewrite_call(self, call: IRCall) -> IRExpr:
+        """The expression that replaces `call`, whose arguments are already rewritten."""
+
+    def _module_function(self, callee: IRRef) -> IRFunction | None:
+        """The module-level function `callee` names, if it is defined once and never assigned."""
+        function = self._functions.get(callee.name)
+        if function is None or callee.binding.symbol in self._assignments:
+            return None
+        if callee.binding.depth != len(self._chain) - 1:
+            return None
+        return function
+
+
+class _Inliner(_CallSiteRewriter):
+    def __init__(self, module: IRModule, report: OptimizationReport) -> None:
+        super().__init__(module, report)
+        self._refs: dict[int, list[IRRef]] = {}
+        self._names: set[str] = set()
+        for stmt in _walk_stmts(module.statements):
+            self._names.update(_declared_names(stmt))
+            for expr in _stmt_exprs(stmt):
+                self._index_refs(expr)
+        self._lambdas = {
+            symbol: assignments[0].value
+            for symbol, assignments in self._assignments.items()
+            if len(assignments) == 1
+            and isinstance(assignments[0].value, IRLambda)
+            and assignments[0].binding.depth == 0
+        }
+        # Lambdas whose assignment has run; earlier calls keep failing at runtime.
+        self._defined: set[int] = set()
+        self.inlined_functions: dict[int, IRFunction] = {}
+
+    def visit_IRAssignment(self, stmt: IRAssignment) -> None:
+        super().visit_IRAssignment(stmt)
+        if stmt.binding is not None and stmt.binding.symbol in self._lambdas:
+            self._defined.add(stmt.binding.symbol)
+
+    def _rewrite_call(self, call: IRCall) -> IRExpr:
+        callee = call.callee
+        if not isinstance(callee, IRRef) or callee.binding is None:
+            return call
+        symbol = callee.binding.symbol
+        function: IRFunction | None = None
+        target = self._lambdas.get(symbol)
+        if target is not None:
+            if symbol not in self._defined:
+                return call
+            params, body = target.params or [], target.body
+        else:
+            function = self._module_function(callee)
+            if function is None or function.expr_body is None:
+                return call
+            params, body = function.params, function.expr_body
+        args = call.args or []
+        if body is None or not self._inlinable(call, params, body, args):
+            return call
+
+        outer = callee.binding.depth
+        renames: set[tuple[int, str]] = set()
+        for ref in _walk_expr(body):
+            if isinstance(ref, IRRef) and ref.binding.depth > 0:
+                capturing = self._capturing(ref, outer + ref.binding.depth - 1)
+                if capturing is None:
+                    return call
+                renames.update((symbol, ref.name) for symbol in capturing)
+        for symbol, name in sorted(renames):
+            self._rename(symbol, name)
+
+        def substitute(node: IRExpr) -> IRExpr:
+            if isinstance(node, IRRef):
+                binding = node.binding
+                if binding.depth == 0:
+                    return copy.deepcopy(args[binding.slot])
+                node.binding = Binding(outer + binding.depth - 1, binding.slot, binding.symbol)
+            return node
+
+        inlined = _rewrite_expr(copy.deepcopy(body), substitute)
+        for index, node in enumerate(_walk_expr(inlined)):
+            node.ir_id = f"{call.ir_id}.{index}" if index else call.ir_id
+        inlined.span = call.span
+        self._index_refs(inlined)
+        if function is not None:
+            self.inlined_functions[symbol] = function
+        self._report.inlined_calls += 1
+        self._report.notes.append(f"Inlined call {call.ir_id} to {callee.name}.")
+        return inlined
+
+    def _inlinable(self, call: IRCall, params: list[IRParam], body: IRExpr, args: list[IRExpr]) -> bool:
+        if len(args) != len(params) or body.expr_type != call.expr_type:
+            return False
+        nodes = list(_walk_expr(body))
+        if len(nodes) > INLINE_MAX_NODES:
+            return False
+        uses = [0] * len(params)
+        guarded = {
+            node.binding.slot
+            for expr in nodes
+            if isinstance(expr, IRBinary) and expr.operator in {"&&", "||"}
+            for node in _walk_expr(expr.right)
+            if isinstance(node, IRRef) and node.binding is not None and node.binding.depth == 0
+        }
+        for node in nodes:
+            if isinstance(node, (IRCall, IRLambda)):
+                return False
+            if isinstance(node, IRRef):
+                if node.binding is None:
+                    return False
+                if node.binding.depth == 0:
+                    uses[node.binding.slot] += 1
+        impure = 0
+        for slot, (param, arg, count) in enumerate(zip(params, args, uses)):
+            if arg.expr_type != param.inferred_type:
+                return False
+            if not _is_pure(arg):
+                impure += 1
+                if count != 1 or slot in guarded:
+                    return False
+            elif count > 1 and not isinstance(arg, (IRLiteral, IRRef)):
+                return False
+        return impure <= 1
+
+    def _capturing(self, ref: IRRef, depth: int) -> set[int] | None:
+        """Variables that would capture `ref`'s name used `depth` scopes in from its symbol.
+
+        Any declaration inside the scope holding the symbol counts, since
+        backends with function-wide locals see it throughout. None means a
+        parameter or iterator captures it and cannot be renamed.
+        """
+        if depth == 0:
+            return set()
+        inner = self._chain[-depth]
+        if ref.name in inner.fixed_names:
+            return None
+        capturing: set[int] = set()
+        exprs = list(inner.exprs)
+        for stmt in _walk_stmts(inner.statements):
+            if ref.name in _fixed_names(stmt):
+                return None
+            if isinstance(stmt, IRAssignment) and stmt.name == ref.name and stmt.binding is not None:
+                if stmt.binding.symbol != ref.binding.symbol:
+                    capturing.add(stmt.binding.symbol)
+            exprs.extend(_stmt_exprs(stmt))
+        for expr in exprs:
+            if any(ref.name in _fixed_names(node) for node in _walk_expr(expr)):
+                return None
+        return capturing
+
+    def _rename(self, symbol: int, name: str) -> None:
+        suffix = 1
+        while f"{name}_{suffix}" in self._names:
+            suffix += 1
+        fresh = f"{name}_{suffix}"
+        self._names.add(fresh)
+        for stmt in self._assignments.get(symbol, []):
+            stmt.name = fresh
+        for ref in self._refs.get(symbol, []):
+            ref.name = fresh
+        self._report.notes.append(f"Renamed {name} to {fresh} to inline past it.")
+
+    def _index_refs(self, expr: IRExpr) -> None:
+        for node in _walk_expr(expr):
+            if isinstance(node, IRRef) and node.binding is not None:
+                self._refs.setdefault(node.binding.symbol, []).append(node)
+
+
+class _PartialEvaluator(_CallSiteRewriter):
+    def __init__(self, module: IRModule, report: OptimizationReport) -> None:
+        super().__init__(module, report)
+        # Checked functions: False while a check is in progress, so recursion is impure.
+        self._purity: dict[str, bool] = {}
+        self.evaluated_functions: dict[int, IRFunction] = {}
+
+    def _rewrite_call(self, call: IRCall) -> IRExpr:
+        callee = call.callee
+        if not isinstance(callee, IRRef) or callee.binding is None:
+            return call
+        function = self._module_function(callee)
+        expected = _LITERAL_TYPES.get(call.expr_type or "")
+        if function is None or expected is None or not self._is_pure(function.name):
+            return call
+        interpreter = _Interpreter(self._pure_function, PARTIAL_EVAL_MAX_STEPS)
+        try:
+            value = interpreter.call(function, [interpreter.constant(arg) for arg in call.args or []])
+        except _StepBudgetExhausted:
+            self._report.notes.append(f"Stopped evaluating call {call.ir_id} to {callee.name}: step budget exhausted.")
+            return call
+        except _Unevaluable:
+            return call
+        if type(value) is not expected:
+            return call
+        self.evaluated_functions[callee.binding.symbol] = function
+        self._report.evaluated_calls += 1
+        self._report.notes.append(f"Evaluated call {call.ir_id} to {callee.name}.")
+        return IRLiteral(ir_id=call.ir_id, span=call.span, expr_type=call.expr_type, value=value)
+
+    def _pure_function(self, name: str) -> IRFunction | None:
+        return self._functions.get(name) if self._purity.get(name) else None
+
+    def _is_pure(self, name: str) -> bool:
+        if name in self._purity:
+            return self._purity[name]
+        self._purity[name] = False
+        function = self._functions.get(name)
+        callees: list[IRRef] = []
+        pure = function is not None and _reads_only_locals(function.body, function.expr_body, 0, callees)
+        pure = pure and all(
+            callee.binding.symbol not in self._assignments and self._is_pure(callee.name) for callee in callees
+        )
+        self._purity[name] = pure
+        return pure
+
+
+def _reads_only_locals(block: list[IRStmt], expr_body: IRExpr | None, nesting: int, callees: list[IRRef]) -> bool:
+    """Whether code `nesting` scopes inside a function reads only the function's names.
+
+    Calls must name a module-level function directly; their callees are
+    collected into `callees`.
+    """
+    exprs = [expr_body] if expr_body is not None else []
+    for stmt in block:
+        if isinstance(stmt, IRFunction):
+            return False
+        exprs.extend(_stmt_exprs(stmt))
+        for child in _child_blocks(stmt):
+            if not _reads_only_locals(child, None, nesting + 1, callees):
+                return False
+    for expr in exprs:
+        called: set[int] = set()
+        for node in _walk_expr(expr):
+            if isinstance(node, IRLambda):
+                return False
+            if isinstance(node, IRCall):
+                callee = node.callee
+                if not isinstance(callee, IRRef) or callee.binding is None or callee.binding.depth != nesting + 1:
+                    return False
+                called.add(id(callee))
+                callees.append(callee)
+            elif isinstance(node, IRRef) and id(node) not in called:
+                if node.binding is None or node.binding.depth > nesting:
+                    return False
+    return True
+
+
+class _Unevaluable(Exception):
+    """The code cannot be evaluated at compile time the way every target would run it."""
+
+
+class _StepBudgetExhausted(_Unevaluable):
+    """Evaluation took more than its step budget."""
+
+
+# Returned by statements that finish without `ret`.
+_NO_RETURN: Final[object] = object()
+
+
+class _Interpreter(NodeVisitor):
+    """Runs pure IR functions on constant values.
+
+    Scopes are dicts from slot to value, innermost last, under a `None`
+    module scope whose variables cannot be read. Each visited node costs a
+    step and each string result a step per character.
+    """
+
+    def __init__(self, functions: Callable[[str], IRFunction | None], budget: int) -> None:
+        self._functions = functions
+        self._steps = budget
+        self._chain: list[dict[int, Any] | None] = [None]
+
+    def constant(self, expr: IRExpr) -> Any:
+        """The value of `expr` where no variable can be read."""
+        chain, self._chain = self._chain, [None]
+        try:
+            return self.visit(expr)
+        finally:
+            self._chain = chain
+
+    def call(self, function: IRFunction, args: list[Any]) -> Any:
+        if len(args) != len(function.params):
+            raise _Unevaluable
+        chain, self._chain = self._chain, [None, dict(enumerate(args))]
+        try:
+            result = self._run(function.body)
+            if result is _NO_RETURN:
+                if function.expr_body is None:
+                    raise _Unevaluable
+                result = self.visit(function.expr_body)
+        finally:
+            self._chain = chain
+        return result
+
+    def visit(self, node: Any) -> Any:
+        self._steps -= 1
+        if self._steps < 0:
+            raise _StepBudgetExhausted
+        return self._dispatch[type(node)](self, node)
+
+    def _run(self, block: list[IRStmt]) -> Any:
+        for stmt in block:
+            result = self.visit(stmt)
+            if result is not _NO_RETURN:
+                return result
+        return _NO_RETURN
+
+    def _run_scope(self, block: list[IRStmt], scope: dict[int, Any]) -> Any:
+        self._chain.append(scope)
+        try:
+            return self._run(block)
+        finally:
+            self._chain.pop()
+
+    def _scope(self, binding: Binding | None) -> dict[int, Any]:
+        if binding is None or binding.depth >= len(self._chain):
+            raise _Unevaluable
+        scope = self._chain[-1 - binding.depth]
+        if scope is None:
+            raise _Unevaluable
+        return scope
+
+    def visit_IRAssignment(self, stmt: IRAssignment) -> Any:
+        value = self.visit(stmt.value)
+        self._scope(stmt.binding)[stmt.binding.slot] = value
+        return _NO_RETURN
+
+    def visit_IRExpressionStmt(self, stmt: IRExpressionStmt) -> Any:
+        self.visit(stmt.expr)
+        return _NO_RETURN
+
+    def visit_IRIf(self, stmt: IRIf) -> Any:
+        condition = self.visit(stmt.condition)
+        if type(condition) is not bool:
+            raise _Unevaluable
+        return self._run_scope(stmt.then_block if condition else stmt.else_block, {})
+
+    def visit_IRLoop(self, stmt: IRLoop) -> Any:
+        start = self.visit(stmt.start)
+        end = self.visit(stmt.end)
+        if type(start) is not int or type(end) is not int:
+            raise _Unevaluable
+        for index in range(start, end):
+            scope = {0: index}
+            result = self._run_scope(stmt.body, scope)
+            if result is not _NO_RETURN:
+                return result
+            # Some targets re-read the bound and the iterator each iteration.
+            if scope[0] != index or self.visit(stmt.end) != end:
+                raise _Unevaluable
+        return _NO_RETURN
+
+    def visit_IRReturn(self, stmt: IRReturn) -> Any:
+        if stmt.value is None:
+            raise _Unevaluable
+        return self.visit(stmt.value)
+
+    def visit_IRLiteral(self, expr: IRLiteral) -> Any:
+        if type(expr.value) not in _LITERAL_TYPES.values():
+            raise _Unevaluable
+        return expr.value
+
+    def visit_IRRef(self, expr: IRRef) -> Any:
+        scope = self._scope(expr.binding)
+        if expr.binding.slot not in scope:
+            raise _Unevaluable
+        return scope[expr.binding.slot]
+
+    def visit_IRUnary(self, expr: IRUnary) -> Any:
+        return self._checked(_fold_unary(expr.operator, self.visit(expr.operand)))
+
+    def visit_IRBinary(self, expr: IRBinary) -> Any:
+        left = self.visit(expr.left)
+        if expr.operator in {"&&", "||"}:
+            if type(left) is not bool:
+                raise _Unevaluable
+            if left == (expr.operator == "||"):
+                return left
+            right = self.visit(expr.right)
+            if type(right) is not bool:
+                raise _Unevaluable
+            return right
+        return self._checked(_fold_values(expr.operator, left, self.visit(expr.right)))
+
+    def visit_IRCall(self, expr: IRCall) -> Any:
+        callee = expr.callee
+        if not isinstance(callee, IRRef) or callee.binding is None or callee.binding.depth != len(self._chain) - 1:
+            raise _Unevaluable
+        function = self._functions(callee.name)
+        if function is None:
+            raise _Unevaluable
+        return self.call(function, [self.visit(arg) for arg in expr.args or []])
+
+    def generic_visit(self, node: Any) -> Any:
+        raise _Unevaluable
+
+    def _checked(self, value: Any) -> Any:
+        if value is _NOT_FOLDED:
+            raise _Unevaluable
+        if type(value) is str:
+            self._steps -= len(value)
+            if self._steps < 0:
+                raise _StepBudgetExhausted
+        return value
+
+
+class _LoopOptimizer:
+    """Rewrites the loops of a module, innermost first, for `LoopOptimizationPass`."""
+
+    def __init__(
+        self, module: IRModule, report: OptimizationReport, *, reduce: bool, unroll: bool, hoist: bool
+    ) -> None:
+        self._module = module
+        self._report = report
+        self._reduce = reduce
+        self._unroll = unroll
+        self._hoist = hoist
+        self._names: set[str] = set()
+        symbols = [-1]
+        iterator_symbols: set[int] = set()
+        for stmt in _walk_stmts(module.statements):
+            self._names.update(_declared_names(stmt))
+            if isinstance(stmt, IRAssignment) and stmt.binding is not None:
+                symbols.append(stmt.binding.symbol)
+            if isinstance(stmt, IRLoop):
+                iterator_symbols.update(ref.binding.symbol for ref in _iterator_reads(stmt.body))
+        # Names of variables other than loop iterators, which unrolling would expose.
+        self._variable_names: set[str] = set()
+        for stmt in _walk_stmts(module.statements):
+            if isinstance(stmt, IRAssignment):
+                self._variable_names.add(stmt.name)
+            for expr in _stmt_exprs(stmt):
+                for node in _walk_expr(expr):
+                    if isinstance(node, IRRef):
+                        if node.binding is not None:
+                            symbols.append(node.binding.symbol)
+                        if node.binding is None or node.binding.symbol not in iterator_symbols:
+                            self._variable_names.add(node.name)
+        self._next_symbol = max(symbols) + 1
+
+    def run(self) -> None:
+        self._optimize_block(self._module.statements, 0)
+
+    def _optimize_block(self, block: list[IRStmt], fixed_slots: int) -> None:
+        """Rewrite the loops in `block`, whose scope starts with `fixed_slots` parameters or iterators."""
+        for stmt in block:
+            if isinstance(stmt, IRIf):
+                self._optimize_block(stmt.then_block, 0)
+                self._optimize_block(stmt.else_block, 0)
+            elif isinstance(stmt, IRLoop):
+                self._optimize_block(stmt.body, 1)
+            elif isinstance(stmt, IRFunction):
+                self._optimize_block(stmt.body, len(stmt.params))
+        if not any(isinstance(stmt, IRLoop) for stmt in block):
+            return
+        # Module functions are declared first, so they hold the first slots.
+        slots = [fixed_slots + sum(isinstance(stmt, IRFunction) for stmt in block) - 1]
+        slots.extend(ref.binding.slot for ref in _scope_refs(block, 0))
+        slots.extend(
+            stmt.binding.slot
+            for stmt in block
+            if isinstance(stmt, IRAssignment) and stmt.binding is not None and stmt.binding.depth == 0
+        )
+        self._next_slot = max(slots) + 1
+        rewritten: list[IRStmt] = []
+        for stmt in block:
+            if isinstance(stmt, IRLoop):
+                rewritten.extend(self._optimize_loop(stmt))
+            else:
+                rewritten.append(stmt)
+        block[:] = rewritten
+
+    def _optimize_loop(self, loop: IRLoop) -> list[IRStmt]:
+        """The statements replacing `loop` in its block."""
+        trips = None
+        if isinstance(loop.start, IRLiteral) and isinstance(loop.end, IRLiteral):
+            if type(loop.start.value) is int and type(loop.end.value) is int:
+                trips = max(loop.end.value - loop.start.value, 0)
+        if trips == 0:
+            self._report.removed_loops += 1
+            self._report.notes.append(f"Removed zero-trip loop {loop.ir_id}.")
+            return []
+        if self._reduce:
+            reduced = self._reduced(loop, trips)
+            if reduced is not None:
+                self._report.reduced_loops += 1
+                self._report.notes.append(f"Reduced loop {loop.ir_id} to closed form.")
+                return reduced
+        if self._unroll and trips is not None and trips <= UNROLL_MAX_TRIPS:
+            unrolled = self._unrolled(loop, trips)
+            if unrolled is not None:
+                self._report.unrolled_loops += 1
+                self._report.notes.append(f"Unrolled loop {loop.ir_id} ({trips} iterations).")
+                return unrolled
+        if not self._hoist:
+            return [loop]
+        hoisted: list[IRStmt] = []
+        assigned = {
+            stmt.binding.symbol
+            for stmt in _walk_stmts(loop.body)
+            if isinstance(stmt, IRAssignment) and stmt.binding is not None
+        }
+        end_fails = any(getattr(node, "operator", None) in _FAILING_OPERATORS for node in _walk_expr(loop.end))
+        if (
+            isinstance(loop.end, (IRUnary, IRBinary))
+            and self._invariant(loop.end, assigned, 0, True)
+            and (_is_pure(loop.start) or not end_fails)
+        ):
+            loop.end = self._hoisted(loop.end, f"{loop.iterator}_end", 0, hoisted)
+            self._report.notes.append(f"Hoisted the bound of {loop.ir_id} into {loop.end.name}.")
+
+        runs = trips is not None
+
+        def hoist(expr: IRExpr) -> IRExpr:
+            if isinstance(expr, (IRUnary, IRBinary)) and self._invariant(expr, assigned, 1, runs):
+                ref = self._hoisted(expr, f"{loop.iterator}_inv", 1, hoisted)
+                self._report.notes.append(f"Hoisted {expr.ir_id} out of {loop.ir_id} into {ref.name}.")
+                return ref
+            if isinstance(expr, IRUnary) and expr.operand is not None:
+                expr.operand = hoist(expr.operand)
+            elif isinstance(expr, IRBinary):
+                expr.left = hoist(expr.left)
+                # The right operand of `&&`/`||` may not run.
+                if expr.operator not in {"&&", "||"}:
+                    expr.right = hoist(expr.right)
+            elif isinstance(expr, IRCall):
+                expr.args = [hoist(arg) for arg in expr.args or []]
+            return expr
+
+        for stmt in loop.body:
+            if not isinstance(stmt, IRFunction):
+                _replace_stmt_exprs(stmt, hoist)
+        return [*hoisted, loop]
+
+    def _reduced(self, loop: IRLoop, trips: int | None) -> list[IRStmt] | None:
+        """`loop` as closed-form updates of its accumulators, if its body is only reductions.
+
+        Each statement must be `acc := acc + e`, `acc := e + acc`, `acc := acc - e`
+        or a product of the same shape on a distinct outer `Int` variable,
+        with `e` affine in the iterator (`p * i + q`, `p` and `q` invariant)
+        and reading no accumulator.
+        """
+        if not loop.body or loop.iterator in self._variable_names:
+            return None
+        reductions: list[tuple[IRAssignment, str, IRExpr]] = []
+        for stmt in loop.body:
+            reduction = _reduction(stmt)
+            if reduction is None or any(stmt.binding.symbol == other.binding.symbol for other, _, _ in reductions):
+                return None
+            reductions.append(reduction)
+        accumulators = {stmt.binding.symbol for stmt, _, _ in reductions}
+        for bound in (loop.start, loop.end):
+            if bound.expr_type != TYPE_INT or any(
+                isinstance(node, (IRCall, IRLambda))
+                or (isinstance(node, IRRef) and (node.binding is None or node.binding.symbol in accumulators))
+                for node in _walk_expr(bound)
+            ):
+                return None
+        ids = (f"{loop.ir_id}.{index}" for index in itertools.count())
+        closed: list[tuple[IRAssignment, str, IRExpr]] = []
+        for stmt, operator, term in reductions:
+            affine = _affine(term, accumulators, ids)
+            if affine is None:
+                return None
+            slope, offset = affine
+            if operator == "*":
+                factor = _literal_product(slope, offset, loop, trips)
+                if factor is None:
+                    return None
+                value: IRExpr | None = _int_literal(factor, next(ids), stmt.span)
+            elif trips is not None:
+                first = loop.start.value
+                total = trips * (2 * first + trips - 1) // 2
+                if not _closed_sum_is_exact((slope, total), (offset, trips)):
+                    return None
+                value = _affine_sum(
+                    _affine_product(slope, _int_literal(total, next(ids), stmt.span), ids),
+                    _affine_product(offset, _int_literal(trips, next(ids), stmt.span), ids),
+                    ids,
+                )
+            elif slope is None:
+                # Without integer division only terms constant in `i` have a closed form here.
+                count: IRExpr = _readdressed(copy.deepcopy(loop.end), 1)
+                if not (isinstance(loop.start, IRLiteral) and loop.start.value == 0):
+                    count = IRBinary(
+                        ir_id=next(ids),
+                        span=loop.span,
+                        expr_type=TYPE_INT,
+                        left=count,
+                        operator="-",
+                        right=_readdressed(copy.deepcopy(loop.start), 1),
+                    )
+                value = _affine_product(offset, count, ids)
+            else:
+                return None
+            if value is None:
+                continue
+            if isinstance(value, IRUnary) and value.operator == "-" and operator == "+":
+                operator, value = "-", value.operand
+            closed.append((stmt, operator, value))
+        # Nothing is rewritten until every statement has a closed form.
+        updates: list[IRAssignment] = []
+        for stmt, operator, value in closed:
+            accumulator = IRRef(
+                ir_id=next(ids), span=stmt.span, expr_type=TYPE_INT, name=stmt.name, binding=stmt.binding
+            )
+            stmt.value = IRBinary(
+                ir_id=stmt.value.ir_id,
+                span=stmt.value.span,
+                expr_type=TYPE_INT,
+                left=accumulator,
+                operator=operator,
+                right=value,
+            )
+            updates.append(stmt)
+        if not updates:
+            return []
+        if trips is None:
+            # Guarded by the bounds, the updates stay one scope in, as in the body.
+            condition = IRBinary(
+                ir_id=next(ids), span=loop.span, expr_type=TYPE_BOOL, left=loop.start, operator="<", right=loop.end
+            )
+            return [IRIf(ir_id=loop.ir_id, span=loop.span, condition=condition, then_block=updates, else_block=[])]
+        for stmt in updates:
+            _readdressed(stmt.value, -1)
+            stmt.binding = Binding(stmt.binding.depth - 1, stmt.binding.slot, stmt.binding.symbol)
+        return updates
+
+    def _unrolled(self, loop: IRLoop, trips: int) -> list[IRStmt] | None:
+        if loop.iterator in self._variable_names:
+            return None
+        size = sum(
+            1 + sum(len(list(_walk_expr(expr))) for expr in _stmt_exprs(stmt)) for stmt in _walk_stmts(loop.body)
+        )
+        if size * trips > UNROLL_MAX_NODES:
+            return None
+        for stmt in _walk_stmts(loop.body):
+            if isinstance(stmt, IRFunction) or any(
+                isinstance(node, IRLambda) for expr in _stmt_exprs(stmt) for node in _walk_expr(expr)
+            ):
+                return None
+        unrolled: list[IRStmt] = []
+        for index in range(trips):
+            body = copy.deepcopy(loop.body)
+            reads = {id(ref) for ref in _iterator_reads(body)}
+            value = loop.start.value + index
+
+            def substitute(expr: IRExpr) -> IRExpr:
+                if id(expr) in reads:
+                    return IRLiteral(ir_id=expr.ir_id, span=expr.span, expr_type=expr.expr_type, value=value)
+                return expr
+
+            for stmt in _walk_stmts(body):
+                _rewrite_stmt_exprs(stmt, substitute)
+            # The iterator is the loop scope's only name unless the body declares others.
+            if not _splice_block(body):
+                return None
+            for stmt in _walk_stmts(body):
+                for node in [stmt, *(item for expr in _stmt_exprs(stmt) for item in _walk_expr(expr))]:
+                    node.ir_id = f"{node.ir_id}.{index}"
+            unrolled.extend(body)
+        return unrolled
+
+    def _invariant(self, expr: IRExpr, assigned: set[int], nesting: int, runs: bool) -> bool:
+        """Whether `expr`, `nesting` scopes inside the loop's block, can be computed once before the loop."""
+        if expr.expr_type not in _COPIED_TYPES:
+            return False
+        reads = False
+        for node in _walk_expr(expr):
+            if isinstance(node, (IRCall, IRLambda)):
+                return False
+            if isinstance(node, IRRef):
+                if node.binding is None or node.binding.depth < nesting or node.binding.symbol in assigned:
+                    return False
+                reads = True
+            elif not runs and getattr(node, "operator", None) in _FAILING_OPERATORS:
+                return False
+        return reads
+
+    def _hoisted(self, expr: IRExpr, base: str, nesting: int, hoisted: list[IRStmt]) -> IRRef:
+        """Assign `expr` to a fresh variable in `hoisted` and return a read of it from `nesting` scopes in."""
+        suffix = 1
+        while f"{base}_{suffix}" in self._names:
+            suffix += 1
+        name = f"{base}_{suffix}"
+        self._names.add(name)
+        symbol, slot = self._next_symbol, self._next_slot
+        self._next_symbol += 1
+        self._next_slot += 1
+        if nesting:
+            for node in _walk_expr(expr):
+                if isinstance(node, IRRef):
+                    binding = node.binding
+                    node.binding = Binding(binding.depth - nesting, binding.slot, binding.symbol)
+        hoisted.append(
+            IRAssignment(
+                ir_id=f"{expr.ir_id}.hoist",
+                span=expr.span,
+                name=name,
+                type_hint=None,
+                value=expr,
+                binding=Binding(0, slot, symbol),
+                inferred_type=expr.expr_type,
+            )
+        )
+        self._report.hoisted_expressions += 1
+        return IRRef(
+            ir_id=f"{expr.ir_id}.ref",
+            span=expr.span,
+            expr_type=expr.expr_type,
+            name=name,
+            binding=Binding(nesting, slot, symbol),
+        )
+
+
+def _reduction(stmt: IRStmt) -> tuple[IRAssignment, str, IRExpr] | None:
+    """`stmt`, its operator and the term combined into the accumulator, if it is a reduction step.
+
+    Sums may add and subtract several terms around the accumulator
+    (`acc := acc + a - b`); the term is then their combination.
+    """
+    if not isinstance(stmt, IRAssignment) or stmt.binding is None or stmt.binding.depth == 0:
+        return None
+    value = stmt.value
+    if stmt.inferred_type != TYPE_INT or not isinstance(value, IRBinary) or value.expr_type != TYPE_INT:
+        return None
+    symbol = stmt.binding.symbol
+
+    def is_accumulator(expr: IRExpr | None) -> bool:
+        return isinstance(expr, IRRef) and expr.binding is not None and expr.binding.symbol == symbol
+
+    if value.operator == "*":
+        if is_accumulator(value.left):
+            return stmt, "*", value.right
+        if is_accumulator(value.right):
+            return stmt, "*", value.left
+        return None
+    term = _additive_term(value, is_accumulator)
+    if term is None or term is value:
+        return None
+    return stmt, "+", term if term is not _NO_TERM else _int_literal(0, value.ir_id, value.span)
+
+
+# Term of an accumulator read on its own, adding nothing.
+_NO_TERM: Final[Any] = object()
+
+
+def _additive_term(expr: IRExpr, is_accumulator: Callable[[IRExpr | None], bool]) -> Any:
+    """`expr` minus the accumulator it adds once through `+` and `-`.
+
+    Returns `expr` itself when it does not add the accumulator and None
+    when it reads it some other way.
+    """
+    if is_accumulator(expr):
+        return _NO_TERM
+    if isinstance(expr, IRBinary) and expr.operator in {"+", "-"}:
+        left = _additive_term(expr.left, is_accumulator)
+        right = _additive_term(expr.right, is_accumulator)
+        if left is None or right is None or (left is not expr.left and right is not expr.right):
+            return None
+        if right is not expr.right:
+            # `a - acc` subtracts the accumulator.
+            if expr.operator == "-":
+                return None
+            left, right = right, left
+        if left is expr.left and right is expr.right:
+            return expr
+        if right is _NO_TERM:
+            return left
+        if left is _NO_TERM:
+            if expr.operator == "+":
+                return right
+            return IRUnary(ir_id=expr.ir_id, span=expr.span, expr_type=expr.expr_type, operator="-", operand=right)
+        return IRBinary(
+            ir_id=expr.ir_id, span=expr.span, expr_type=expr.expr_type, left=left, operator=expr.operator, right=right
+        )
+    if any(is_accumulator(node) for node in _walk_expr(expr)):
+        return None
+    return expr
+
+
+def _affine(expr: IRExpr, accumulators: set[int], ids: Iterator[str]) -> tuple[IRExpr | None, IRExpr | None] | None:
+    """`expr` in a loop body as `(p, q)` with `expr == p * i + q`, None standing for 0.
+
+    `p` and `q` are built from `expr`'s invariant parts, still addressed
+    from the body; None when `expr` is not affine in the iterator `i` or
+    reads an accumulator.
+    """
+    if expr.expr_type != TYPE_INT:
+        return None
+    nodes = list(_walk_expr(expr))
+    if any(isinstance(node, (IRCall, IRLambda)) for node in nodes):
+        return None
+    for node in nodes:
+        if isinstance(node, IRRef) and (node.binding is None or node.binding.symbol in accumulators):
+            return None
+    if isinstance(expr, IRRef) and expr.binding.depth == 0:
+        # The body holds only reductions, so its scope's one name is the iterator.
+        return _int_literal(1, next(ids), expr.span), None
+    if not any(isinstance(node, IRRef) and node.binding.depth == 0 for node in nodes):
+        if isinstance(expr, IRLiteral) and expr.value == 0:
+            return None, None
+        return None, expr
+    if isinstance(expr, IRUnary) and expr.operator == "-":
+        inner = _affine(expr.operand, accumulators, ids)
+        if inner is None:
+            return None
+        return tuple(_affine_negated(part, ids) for part in inner)
+    if not isinstance(expr, IRBinary) or expr.operator not in {"+", "-", "*"}:
+        return None
+    left = _affine(expr.left, accumulators, ids)
+    right = _affine(expr.right, accumulators, ids)
+    if left is None or right is None:
+        return None
+    if expr.operator == "*":
+        if left[0] is None:
+            return _affine_product(right[0], left[1], ids), _affine_product(right[1], left[1], ids)
+        if right[0] is None:
+            return _affine_product(left[0], right[1], ids), _affine_product(left[1], right[1], ids)
+        return None
+    if expr.operator == "-":
+        right = (_affine_negated(right[0], ids), _affine_negated(right[1], ids))
+    return _affine_sum(left[0], right[0], ids), _affine_sum(left[1], right[1], ids)
+
+
+def _affine_sum(left: IRExpr | None, right: IRExpr | None, ids: Iterator[str]) -> IRExpr | None:
+    if left is None or right is None:
+        return right if left is None else left
+    return IRBinary(ir_id=next(ids), span=left.span, expr_type=TYPE_INT, left=left, operator="+", right=right)
+
+
+def _affine_product(left: IRExpr | None, right: IRExpr | None, ids: Iterator[str]) -> IRExpr | None:
+    if left is None or right is None:
+        return None
+    if isinstance(left, IRLiteral) and left.value == 1:
+        return copy.deepcopy(right)
+    if isinstance(right, IRLiteral) and right.value == 1:
+        return copy.deepcopy(left)
+    return IRBinary(
+        ir_id=next(ids),
+        span=left.span,
+        expr_type=TYPE_INT,
+        left=copy.deepcopy(left),
+        operator="*",
+        right=copy.deepcopy(right),
+    )
+
+
+def _affine_negated(expr: IRExpr | None, ids: Iterator[str]) -> IRExpr | None:
+    if expr is None:
+        return None
+    return IRUnary(ir_id=next(ids), span=expr.span, expr_type=TYPE_INT, operator="-", operand=expr)
+
+
+def _literal_product(slope: IRExpr | None, offset: IRExpr | None, loop: IRLoop, trips: int | None) -> int | None:
+    """The product of `slope * i + offset` over the loop's literal range, if every partial product is exact."""
+    coefficients = []
+    for part in (slope, offset):
+        if part is not None and not (isinstance(part, IRLiteral) and type(part.value) is int):
+            return None
+        coefficients.append(part.value if part is not None else 0)
+    if trips is None:
+        return None
+    product = 1
+    for index in range(loop.start.value, loop.end.value):
+        product *= coefficients[0] * index + coefficients[1]
+        if abs(product) > _MAX_SAFE_INTEGER:
+            return None
+    return product
+
+
+def _closed_sum_is_exact(*terms: tuple[IRExpr | None, int]) -> bool:
+    """Whether `sum(factor * count)` and its parts stay within the exact float range.
+
+    JS adds in doubles, so a closed form past 2**53 rounds differently from
+    the loop it replaces. Factors that are not constant are only known at
+    run time and are not checked.
+    """
+    value: int | None = 0
+    for factor, count in terms:
+        if abs(count) > _MAX_SAFE_INTEGER:
+            return False
+        if factor is None:
+            continue
+        constant = _constant_int(factor)
+        if constant is None:
+            if count:
+                value = None
+            continue
+        if abs(constant) > _MAX_SAFE_INTEGER or abs(constant * count) > _MAX_SAFE_INTEGER:
+            return False
+        if value is not None:
+            value += constant * count
+    return value is None or abs(value) <= _MAX_SAFE_INTEGER
+
+
+def _constant_int(expr: IRExpr) -> int | None:
+    """The value of `expr` if it is built only from `Int` literals, `-`, `+` and `*`."""
+    if isinstance(expr, IRLiteral):
+        return expr.value if type(expr.value) is int else None
+    if isinstance(expr, IRUnary) and expr.operator == "-":
+        operand = _constant_int(expr.operand)
+        return None if operand is None else -operand
+    if isinstance(expr, IRBinary) and expr.operator in {"+", "-", "*"}:
+        left = _constant_int(expr.left)
+        right = _constant_int(expr.right)
+        if left is None or right is None:
+            return None
+        if expr.operator == "+":
+            return left + right
+        return left - right if expr.operator == "-" else left * right
+    return None
+
+
+def _int_literal(value: int, ir_id: str, span: Any) -> IRLiteral:
+    return IRLiteral(ir_id=ir_id, span=span, expr_type=TYPE_INT, value=value)
+
+
+def _readdressed(expr: IRExpr, shift: int) -> IRExpr:
+    """`expr` with its resolved reads moved `shift` scopes deeper (negative: outwards)."""
+    for node in _walk_expr(expr):
+        if isinstance(node, IRRef) and node.binding is not None:
+            binding = node.binding
+            node.binding = Binding(binding.depth + shift, binding.slot, binding.symbol)
+    return expr
+
+
+def _iterator_reads(body: list[IRStmt]) -> Iterator[IRRef]:
+    """Reads of a loop's iterator, the first slot of its scope, in the loop's `body`."""
+    return (ref for ref in _scope_refs(body, 0) if ref.binding.slot == 0)
+
+
+def _scope_refs(block: list[IRStmt], nesting: int) -> Iterator[IRRef]:
+    """Reads in `block`, `nesting` scopes inside a scope, that resolve to that scope."""
+    for stmt in block:
+        for expr in _stmt_exprs(stmt):
+            yield from _scope_expr_refs(expr, nesting + 1 if isinstance(stmt, IRFunction) else nesting)
+        for child in _child_blocks(stmt):
+            yield from _scope_refs(child, nesting + 1)
+
+
+def _scope_expr_refs(expr: IRExpr | None, nesting: int) -> Iterator[IRRef]:
+    if isinstance(expr, IRLambda):
+        yield from _scope_expr_refs(expr.body, nesting + 1)
+    elif isinstance(expr, IRRef):
+        if expr.binding is not None and expr.binding.depth == nesting:
+            yield expr
+    elif isinstance(expr, IRUnary):
+        yield from _scope_expr_refs(expr.operand, nesting)
+    elif isinstance(expr, IRBinary):
+        yield from _scope_expr_refs(expr.left, nesting)
+        yield from _scope_expr_refs(expr.right, nesting)
+    elif isinstance(expr, IRCall):
+        yield from _scope_expr_refs(expr.callee, nesting)
+        for arg in expr.args or []:
+            yield from _scope_expr_refs(arg, nesting)
+
+
+def _remove_unused_functions(module: IRModule, functions: dict[int, IRFunction], report: OptimizationReport) -> None:
+    """Remove the module-level `functions` (keyed by symbol) that nothing refers to any more."""
+    if not functions:
+        return
+    read_symbols = {
+        node.binding.symbol
+        for stmt in _walk_stmts(module.statements)
+        for expr in _stmt_exprs(stmt)
+        for node in _walk_expr(expr)
+        if isinstance(node, IRRef) and node.binding is not None
+    }
+    for symbol, function in functions.items():
+        if symbol not in read_symbols:
+            module.statements[:] = [stmt for stmt in module.statements if stmt is not function]
+            report.removed_functions += 1
+            report.notes.append(f"Removed unused function {function.ir_id} ({function.name}).")
+
+
+def _fixed_names(node: IRNode) -> tuple[str, ...]:
+    """Names `node` declares that cannot be renamed: parameters and loop iterators."""
+    if isinstance(node, IRLoop):
+        return (node.iterator,)
+    if isinstance(node, IRFunction):
+        return tuple(param.name for param in node.params)
+    if isinstance(node, IRLambda):
+        return tuple(param.name for param in node.params or [])
+    return ()
+
+
+def _declared_names(stmt: IRStmt) -> set[str]:
+    names = set(_fixed_names(stmt))
+    if isinstance(stmt, (IRAssignment, IRFunction)):
+        names.add(stmt.name)
+    for expr in _stmt_exprs(stmt):
+        for node in _walk_expr(expr):
+            names.update(_fixed_names(node))
+            if isinstance(node, IRRef):
+                names.add(node.name)
+    return names
+
+
+class IRPassManager:
+    """Runs the IR passes for an optimization level between IR build and lowering.
+
+    `-O0` runs no built-in pass; `-O1` runs inlining, folding, partial
+    evaluation, branch pruning, zero-trip loop removal and dead-store
+    elimination once; `-O2` adds constant and copy propagation, loop
+    reduction, unrolling and hoisting and repeats them until the IR stops
+    changing. Extra passes (e.g. from plugins) are scheduled after these.
+    `drop_unused_functions` removes functions left unused by inlining or
+    partial evaluation.
+    """
+
+    def __init__(self, level: int = 1, *, drop_unused_functions: bool = False) -> None:
+        if level not in OPT_LEVELS:
+            raise ValueError(f"Unsupported optimization level {level}; expected one of {', '.join(map(str, OPT_LEVELS))}.")
+        self.level = level
+        self.drop_unused_functions = drop_unused_functions
+
+    def passes(self) -> list[CompilerPass]:
+        """Built-in passes run by this level, in order."""
+        if self.level == 0:
+            return []
+        propagation: list[CompilerPass] = [ConstantPropagationPass(), CopyPropagationPass()] if self.level >= 2 else []
+        return [
+            InliningPass(remove_unused=self.drop_unused_functions),
+            *propagation,
+            ConstantFoldingPass(),
+            PartialEvaluationPass(remove_unused=self.drop_unused_functions),
+            BranchPruningPass(),
+            LoopOptimizationPass(reduce=self.level >= 2, unroll=self.level >= 2, hoist=self.level >= 2),
+            DeadStoreEliminationPass(),
+        ]
+
+    def run(
+        self,
+        module: IRModule,
+        *,
+        extra_passes: list[CompilerPass] | None = None,
+        report: PassReport | None = None,
+    ) -> tuple[IRModule, OptimizationReport]:
+        """Return an optimized copy of `module` and what was done to it.
+
+        Each pass run is recorded in `report` when given. If `module` carries
+        content hashes, the optimized copy is rehashed.
+        """
+        manager = PassManager(STAGE_IR, [*self.passes(), *(extra_passes or [])])
+        context = PassContext(report=report if report is not None else PassReport())
+        if not len(manager):
+            return module, context.optimization
+        optimized = copy.deepcopy(module)
+        manager.run(optimized, context, until_stable=self.level >= 2)
+        if module.content_hash:
+            assign_content_hashes(optimized)
+        return optimized, context.optimization
+
+
+def optimize_ir(module: IRModule, level: int = 1) -> tuple[IRModule, OptimizationReport]:
+    """Optimize `module` at `level`; see `IRPassManager`."""
+    return IRPassManager(level).run(module)
+
+
+def _child_blocks(stmt: IRStmt) -> Iterator[list[IRStmt]]:
+    if isinstance(stmt, IRIf):
+        yield stmt.then_block
+        yield stmt.else_block
+    elif isinstance(stmt, (IRLoop, IRFunction)):
+        yield stmt.body
+
+
+def _walk_blocks(block: list[IRStmt]) -> Iterator[list[IRStmt]]:
+    yield block
+    for stmt in block:
+        for child in _child_blocks(stmt):
+            yield from _walk_blocks(child)
+
+
+def _walk_stmts_with_blocks(block: list[IRStmt]) -> Iterator[tuple[IRStmt, list[IRStmt]]]:
+    """Statements in source order, each with the block holding it."""
+    for stmt in block:
+        yield stmt, block
+        for child in _child_blocks(stmt):
+            yield from _walk_stmts_with_blocks(child)
+
+
+def _walk_stmts(block: list[IRStmt]) -> Iterator[IRStmt]:
+    for stmt in block:
+        yield stmt
+        for child in _child_blocks(stmt):
+            yield from _walk_stmts(child)
+
+
+def _stmt_exprs(stmt: IRStmt) -> list[IRExpr]:
+    if isinstance(stmt, IRAssignment):
+        return [stmt.value]
+    if isinstance(stmt, IRExpressionStmt):
+        return [stmt.expr]
+    if isinstance(stmt, IRIf):
+        return [stmt.condition]
+    if isinstance(stmt, IRLoop):
+        return [stmt.start, stmt.end]
+    if isinstance(stmt, IRFunction):
+        return [stmt.expr_body] if stmt.expr_body is not None else []
+    if isinstance(stmt, IRReturn):
+        return [stmt.value] if stmt.value is not None else []
+    return []
+
+
+def _rewrite_stmt_exprs(stmt: IRStmt, rewrite: Callable[[IRExpr], IRExpr]) -> None:
+    """Rewrite the expressions directly held by `stmt`, children before parents."""
+    _replace_stmt_exprs(stmt, lambda expr: _rewrite_expr(expr, rewrite))
+
+
+def _replace_stmt_exprs(stmt: IRStmt, replace: Callable[[IRExpr], IRExpr]) -> None:
+    """Replace each expression directly held by `stmt` with `replace(expr)`."""
+    if isinstance(stmt, IRAssignment):
+        stmt.value = replace(stmt.value)
+    elif isinstance(stmt, IRExpressionStmt):
+        stmt.expr = replace(stmt.expr)
+    elif isinstance(stmt, IRIf):
+        stmt.condition = replace(stmt.condition)
+    elif isinstance(stmt, IRLoop):
+        stmt.start = replace(stmt.start)
+        stmt.end = replace(stmt.end)
+    elif isinstance(stmt, IRFunction) and stmt.expr_body is not None:
+        stmt.expr_body = replace(stmt.expr_body)
+    elif isinstance(stmt, IRReturn) and stmt.value is not None:
+        stmt.value = replace(stmt.value)
+
+
+def _rewrite_expr(expr: IRExpr, rewrite: Callable[[IRExpr], IRExpr]) -> IRExpr:
+    if isinstance(expr, IRUnary) and expr.operand is not None:
+        expr.operand = _rewrite_expr(expr.operand, rewrite)
+    elif isinstance(expr, IRBinary):
+        if expr.left is not None:
+            expr.left = _rewrite_expr(expr.left, rewrite)
+        if expr.right is not None:
+            expr.right = _rewrite_expr(expr.right, rewrite)
+    elif isinstance(expr, IRCall):
+        if expr.callee is not None:
+            expr.callee = _rewrite_expr(expr.callee, rewrite)
+        expr.args = [_rewrite_expr(arg, rewrite) for arg in (expr.args or [])]
+    elif isinstance(expr, IRLambda) and expr.body is not None:
+        expr.body = _rewrite_expr(expr.body, rewrite)
+    return rewrite(expr)
+
+
+def _walk_expr(expr: IRExpr | None) -> Iterator[IRExpr]:
+    if expr is None:
+        return
+    yield expr
+    if isinstance(expr, IRUnary):
+        yield from _walk_expr(expr.operand)
+    elif isinstance(expr, IRBinary):
+        yield from _walk_expr(expr.left)
+        yield from _walk_expr(expr.right)
+    elif isinstance(expr, IRCall):
+        yield from _walk_expr(expr.callee)
+        for arg in expr.args or []:
+            yield from _walk_expr(arg)
+    elif isinstance(expr, IRLambda):
+        yield from _walk_expr(expr.body)
+
+
+def _is_pure(expr: IRExpr) -> bool:
+    return not any(isinstance(node, IRCall) for node in _walk_expr(expr))
+
+
+def _is_number(value: Any) -> bool:
+    return type(value) is int or type(value) is float
+
+
+def _fold_expr(expr: IRExpr) -> IRExpr:
+    if isinstance(expr, IRUnary) and isinstance(expr.operand, IRLiteral):
+        folded = _fold_unary(expr.operator, expr.operand.value)
+        return expr if folded is _NOT_FOLDED else _folded(expr, folded)
+    if not isinstance(expr, IRBinary) or not isinstance(expr.left, IRLiteral):
+        return expr
+    left = expr.left.value
+    operator = expr.operator
+    if operator in {"&&", "||"} and type(left) is bool:
+        # `false && e` / `true || e` never evaluate `e`.
+        if left == (operator == "||"):
+            return _folded(expr, left)
+        if isinstance(expr.right, IRLiteral) and type(expr.right.value) is bool:
+            return _folded(expr, expr.right.value)
+        return expr
+    if not isinstance(expr.right, IRLiteral):
+        return expr
+    right = expr.right.value
+    folded = _fold_values(operator, left, right)
+    return expr if folded is _NOT_FOLDED else _folded(expr, folded)
+
+
+_NOT_FOLDED: Final[object] = object()
+
+
+def _fold_unary(operator: str, value: Any) -> Any:
+    if operator == "!" and type(value) is bool:
+        return not value
+    if operator == "-" and _is_number(value) and value != 0:
+        return -value
+    return _NOT_FOLDED
+
+
+def _fold_values(operator: str, left: Any, right: Any) -> Any:
+    if operator == "+" and type(left) is str and type(right) is str:
+        return left + right
+    if operator in {"==", "!="}:
+        same_kind = (_is_number(left) and _is_number(right)) or type(left) is type(right)
+        if not same_kind:
+            return _NOT_FOLDED
+        return (left == right) == (operator == "==")
+    if not (_is_number(left) and _is_number(right)):
+        return _NOT_FOLDED
+    if operator == "<":
+        return left < right
+    if operator == "<=":
+        return left <= right
+    if operator == ">":
+        return left > right
+    if operator == ">=":
+        return left >= right
+    if operator == "+":
+        result = left + right
+    elif operator == "-":
+        result = left - right
+    elif operator == "*":
+        result = left * right
+    elif operator == "/" and right != 0:
+        result = left / right
+    elif operator == "%" and left >= 0 and right > 0:
+        result = left % right
+    else:
+        return _NOT_FOLDED
+    if result == 0 and operator in {"*", "/"} and (left < 0 or right < 0):
+        # JS signs this zero (`-0`); Python ints have no negative zero.
+        return _NOT_FOLDED
+    if type(result) is int and abs(result) > _MAX_SAFE_INTEGER:
+        return _NOT_FOLDED
+    if type(result) is float and not math.isfinite(result):
+        return _NOT_FOLDED
+    return result
+
+
+def _folded(expr: IRExpr, value: Any) -> IRLiteral:
+    return IRLiteral(
+        ir_id=expr.ir_id,
+        span=expr.span,
+        expr_type=expr.expr_type,
+        value=value,
+        folded_from=getattr(expr, "operator", None),
+    )
+
+
+def _splice_block(block: list[IRStmt]) -> bool:
+    """Re-address `block`'s bindings for the enclosing scope, if it declares nothing.
+
+    Returns False, changing nothing, when some binding refers to the block's
+    own scope.
+    """
+    bindings: list[tuple[Any, int]] = []
+    if not _collect_bindings(block, 0, bindings):
+        return False
+    for node, nesting in bindings:
+        binding: Binding = node.binding
+        if binding.depth > nesting:
+            node.binding = Binding(binding.depth - 1, binding.slot, binding.symbol)
+    return True
+
+
+def _collect_bindings(block: list[IRStmt], nesting: int, out: list[tuple[Any, int]]) -> bool:
+    for stmt in block:
+        if isinstance(stmt, IRAssignment) and stmt.binding is not None:
+            if stmt.binding.depth == nesting:
+                return False
+            out.append((stmt, nesting))
+        for expr in _stmt_exprs(stmt):
+            if not _collect_expr_bindings(expr, nesting, out):
+                return False
+        if isinstance(stmt, IRFunction):
+            # The function's own binding is what the block declares.
+            return False
+        for child in _child_blocks(stmt):
+            if not _collect_bindings(child, nesting + 1, out):
+                return False
+    return True
+
 
-    folded_operations: int = 0
-    removed_assignments: int = 0
-    notes: list[str] = field(default_factory=list)
+def _collect_expr_bindings(expr: IRExpr | None, nesting: int, out: list[tuple[Any, int]]) -> bool:
+    for node in _walk_expr(expr):
+        if isinstance(node, IRLambda):
+            if not _collect_expr_bindings(node.body, nesting + 1, out):
+                return False
+            continue
+        if isinstance(node, IRRef) and node.binding is not None:
+            if node.binding.depth == nesting:
+                return False
+            out.append((node, nesting))
+    return True
 
 
 class GraphOptimizer:
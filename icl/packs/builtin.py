@@ -4,17 +4,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import json
+from typing import Iterable, Iterator
 
 from icl.expanders.base import ExpansionContext
 from icl.expanders.js_backend import JavaScriptBackend
 from icl.expanders.python_backend import PythonBackend
 from icl.expanders.rust_backend import RustBackend
+from icl.ir import IR_SCHEMA_VERSION
 from icl.language_pack import EmissionContext, LanguagePack, OutputBundle, PackManifest, PackRegistry
 from icl.lowering import (
     LoweredAssignment,
     LoweredBinary,
     LoweredCall,
-    LoweredExpr,
     LoweredExpressionStmt,
     LoweredFunction,
     LoweredIf,
@@ -28,6 +29,7 @@ from icl.lowering import (
     LoweredUnary,
     lowered_to_graph,
 )
+from icl.visitor import NodeVisitor
 
 
 COMMON_FEATURES = {
@@ -76,6 +78,16 @@ class LegacyBackendPack(LanguagePack):
             ExpansionContext(target=context.target, debug=context.debug, metadata=context.metadata),
         )
 
+    @property
+    def buffers_stream(self) -> bool:
+        return not self._backend.supports_streaming
+
+    def emit_stream(self, statements: Iterable[LoweredStmt], context: EmissionContext) -> Iterator[str]:
+        if not self._backend.supports_streaming:
+            yield from super().emit_stream(statements, context)
+            return
+        yield from _stream_backend(self._backend, statements, context)
+
 
 class JavaScriptPack(LanguagePack):
     """Stable JavaScript pack with runtime helper injection for runnable output."""
@@ -110,12 +122,16 @@ class JavaScriptPack(LanguagePack):
         if "print" not in lowered.required_helpers:
             return body
 
-        helper = (
-            "function print(value) {\n"
-            "  console.log(value);\n"
-            "}\n\n"
-        )
-        return helper + body
+        return _JS_PRINT_HELPER + body
+
+    @property
+    def buffers_stream(self) -> bool:
+        return False
+
+    def emit_stream(self, statements: Iterable[LoweredStmt], context: EmissionContext) -> Iterator[str]:
+        # Helper use is unknown until the input ends, so streamed output always carries it.
+        yield _JS_PRINT_HELPER
+        yield from _stream_backend(self._backend, statements, context)
 
 
 class WebPack(LanguagePack):
@@ -149,18 +165,17 @@ class WebPack(LanguagePack):
             ExpansionContext(target="js", debug=context.debug, metadata=context.metadata),
         )
         if "print" in lowered.required_helpers:
-            helper = (
-                "const __icl_output = document.getElementById('icl-output');\n"
-                "function print(value) {\n"
-                "  if (__icl_output) {\n"
-                "    __icl_output.textContent += String(value) + '\\n';\n"
-                "  }\n"
-                "  console.log(value);\n"
-                "}\n\n"
-            )
-            return helper + code
+            return _WEB_PRINT_HELPER + code
         return code
 
+    @property
+    def buffers_stream(self) -> bool:
+        return False
+
+    def emit_stream(self, statements: Iterable[LoweredStmt], context: EmissionContext) -> Iterator[str]:
+        yield _WEB_PRINT_HELPER
+        yield from _stream_backend(self._js_backend, statements, context, target="js")
+
     def scaffold(self, emitted_code: str, context: EmissionContext) -> OutputBundle:
         html = """<!doctype html>
 <html lang=\"en\">
@@ -231,6 +246,7 @@ class PseudoPack(LanguagePack):
 
     def __init__(self, profile: PseudoProfile) -> None:
         self._profile = profile
+        self._emitter = _PseudoEmitter(profile)
         self._manifest = PackManifest(
             pack_id=f"icl.experimental.{profile.target}",
             version="2.0.0",
@@ -251,92 +267,169 @@ class PseudoPack(LanguagePack):
         return self._manifest
 
     def emit(self, lowered: LoweredModule, context: EmissionContext) -> str:
-        lines = [
-            f"{self._profile.comment_prefix} experimental ICL pack: {self._profile.target}",
-            f"{self._profile.comment_prefix} semantics-parity target, syntax is best-effort scaffold",
-            "",
-        ]
+        lines = [*self._header_lines(), ""]
         for stmt in lowered.statements:
             lines.extend(self._emit_stmt(stmt, indent=0))
         return "\n".join(lines).rstrip() + "\n"
 
+    @property
+    def buffers_stream(self) -> bool:
+        return False
+
+    def emit_stream(self, statements: Iterable[LoweredStmt], context: EmissionContext) -> Iterator[str]:
+        yield "\n".join(self._header_lines()) + "\n"
+        separator = "\n"
+        for stmt in statements:
+            yield separator + "\n".join(self._emit_stmt(stmt, indent=0)) + "\n"
+            separator = ""
+
+    def _header_lines(self) -> list[str]:
+        return [
+            f"{self._profile.comment_prefix} experimental ICL pack: {self._profile.target}",
+            f"{self._profile.comment_prefix} semantics-parity target, syntax is best-effort scaffold",
+        ]
+
     def _emit_stmt(self, stmt: LoweredStmt, indent: int) -> list[str]:
-        pad = "    " * indent
+        return self._emitter.emit(stmt, indent)
 
-        if isinstance(stmt, LoweredAssignment):
-            return [f"{pad}{self._profile.declaration_prefix}{stmt.name} = {self._emit_expr(stmt.value)};"]
 
-        if isinstance(stmt, LoweredExpressionStmt):
-            return [f"{pad}{self._emit_expr(stmt.expr)};"]
+class _PseudoEmitter(NodeVisitor):
+    """Statement handlers return lines at the current indent; expression handlers return text."""
 
-        if isinstance(stmt, LoweredIf):
-            lines = [f"{pad}if ({self._emit_expr(stmt.condition)}) {{"]
-            for body_stmt in stmt.then_block:
-                lines.extend(self._emit_stmt(body_stmt, indent + 1))
-            lines.append(f"{pad}}}")
-            if stmt.else_block:
-                lines[-1] = f"{pad}}} else {{"
-                for body_stmt in stmt.else_block:
-                    lines.extend(self._emit_stmt(body_stmt, indent + 1))
-                lines.append(f"{pad}}}")
-            return lines
-
-        if isinstance(stmt, LoweredLoop):
-            start = self._emit_expr(stmt.start)
-            end = self._emit_expr(stmt.end)
-            it = stmt.iterator
-            lines = [f"{pad}for ({self._profile.declaration_prefix}{it} = {start}; {it} < {end}; {it}++) {{"]
-            for body_stmt in stmt.body:
-                lines.extend(self._emit_stmt(body_stmt, indent + 1))
-            lines.append(f"{pad}}}")
-            return lines
-
-        if isinstance(stmt, LoweredFunction):
-            params = ", ".join(param["name"] for param in stmt.params)
-            lines = [f"{pad}{self._profile.function_keyword} {stmt.name}({params}) {{"]
-            for body_stmt in stmt.body:
-                lines.extend(self._emit_stmt(body_stmt, indent + 1))
-            if not stmt.body:
-                lines.append(f"{pad}    return 0;")
+    def __init__(self, profile: PseudoProfile) -> None:
+        self._profile = profile
+        self._pad = ""
+
+    def emit(self, stmt: LoweredStmt, indent: int) -> list[str]:
+        self._pad = "    " * indent
+        return self.visit(stmt)
+
+    def _block(self, statements: list[LoweredStmt]) -> list[str]:
+        pad = self._pad
+        self._pad = pad + "    "
+        lines: list[str] = []
+        for stmt in statements:
+            lines.extend(self.visit(stmt))
+        self._pad = pad
+        return lines
+
+    def visit_LoweredAssignment(self, stmt: LoweredAssignment) -> list[str]:
+        return [f"{self._pad}{self._profile.declaration_prefix}{stmt.name} = {self.visit(stmt.value)};"]
+
+    def visit_LoweredExpressionStmt(self, stmt: LoweredExpressionStmt) -> list[str]:
+        return [f"{self._pad}{self.visit(stmt.expr)};"]
+
+    def visit_LoweredIf(self, stmt: LoweredIf) -> list[str]:
+        pad = self._pad
+        lines = [f"{pad}if ({self.visit(stmt.condition)}) {{", *self._block(stmt.then_block)]
+        lines.append(f"{pad}}}")
+        if stmt.else_block:
+            lines[-1] = f"{pad}}} else {{"
+            lines.extend(self._block(stmt.else_block))
             lines.append(f"{pad}}}")
-            return lines
-
-        if isinstance(stmt, LoweredReturn):
-            if stmt.value is None:
-                return [f"{pad}return;"]
-            return [f"{pad}return {self._emit_expr(stmt.value)};"]
-
-        return [f"{pad}{self._profile.comment_prefix} unsupported statement: {type(stmt).__name__}"]
-
-    def _emit_expr(self, expr: LoweredExpr) -> str:
-        if isinstance(expr, LoweredLiteral):
-            if isinstance(expr.value, bool):
-                return "true" if expr.value else "false"
-            return json.dumps(expr.value)
-
-        if isinstance(expr, LoweredRef):
-            return expr.name
+        return lines
+
+    def visit_LoweredLoop(self, stmt: LoweredLoop) -> list[str]:
+        pad = self._pad
+        start = self.visit(stmt.start)
+        end = self.visit(stmt.end)
+        it = stmt.iterator
+        lines = [f"{pad}for ({self._profile.declaration_prefix}{it} = {start}; {it} < {end}; {it}++) {{"]
+        lines.extend(self._block(stmt.body))
+        lines.append(f"{pad}}}")
+        return lines
+
+    def visit_LoweredFunction(self, stmt: LoweredFunction) -> list[str]:
+        pad = self._pad
+        params = ", ".join(param["name"] for param in stmt.params)
+        lines = [f"{pad}{self._profile.function_keyword} {stmt.name}({params}) {{"]
+        lines.extend(self._block(stmt.body))
+        if not stmt.body:
+            lines.append(f"{pad}    return 0;")
+        lines.append(f"{pad}}}")
+        return lines
+
+    def visit_LoweredReturn(self, stmt: LoweredReturn) -> list[str]:
+        if stmt.value is None:
+            return [f"{self._pad}return;"]
+        return [f"{self._pad}return {self.visit(stmt.value)};"]
+
+    def visit_LoweredStmt(self, stmt: LoweredStmt) -> list[str]:
+        return [f"{self._pad}{self._profile.comment_prefix} unsupported statement: {type(stmt).__name__}"]
+
+    def visit_LoweredLiteral(self, expr: LoweredLiteral) -> str:
+        if isinstance(expr.value, bool):
+            return "true" if expr.value else "false"
+        return json.dumps(expr.value)
+
+    def visit_LoweredRef(self, expr: LoweredRef) -> str:
+        return expr.name
+
+    def visit_LoweredUnary(self, expr: LoweredUnary) -> str:
+        return f"({expr.operator}{self.visit(expr.operand)})"
+
+    def visit_LoweredBinary(self, expr: LoweredBinary) -> str:
+        left = self.visit(expr.left)
+        right = self.visit(expr.right)
+        return f"({left} {expr.operator} {right})"
+
+    def visit_LoweredCall(self, expr: LoweredCall) -> str:
+        callee = self.visit(expr.callee)
+        args = ", ".join(self.visit(arg) for arg in expr.args or [])
+        return f"{callee}({args})"
+
+    def visit_LoweredLambda(self, expr: LoweredLambda) -> str:
+        params = ", ".join(param["name"] for param in expr.params or [])
+        return f"(({params}) => {self.visit(expr.body)})"
+
+    def generic_visit(self, node: object) -> str:
+        return "null"
 
-        if isinstance(expr, LoweredUnary):
-            operand = self._emit_expr(expr.operand)
-            return f"({expr.operator}{operand})"
 
-        if isinstance(expr, LoweredBinary):
-            left = self._emit_expr(expr.left)
-            right = self._emit_expr(expr.right)
-            return f"({left} {expr.operator} {right})"
+_JS_PRINT_HELPER = (
+    "function print(value) {\n"
+    "  console.log(value);\n"
+    "}\n\n"
+)
 
-        if isinstance(expr, LoweredCall):
-            callee = self._emit_expr(expr.callee)
-            args = ", ".join(self._emit_expr(arg) for arg in expr.args or [])
-            return f"{callee}({args})"
+_WEB_PRINT_HELPER = (
+    "const __icl_output = document.getElementById('icl-output');\n"
+    "function print(value) {\n"
+    "  if (__icl_output) {\n"
+    "    __icl_output.textContent += String(value) + '\\n';\n"
+    "  }\n"
+    "  console.log(value);\n"
+    "}\n\n"
+)
 
-        if isinstance(expr, LoweredLambda):
-            params = ", ".join(param["name"] for param in expr.params or [])
-            body = self._emit_expr(expr.body)
-            return f"(({params}) => {body})"
 
-        return "null"
+def _stream_backend(
+    backend: PythonBackend | JavaScriptBackend | RustBackend,
+    statements: Iterable[LoweredStmt],
+    context: EmissionContext,
+    *,
+    target: str | None = None,
+) -> Iterator[str]:
+    expansion = ExpansionContext(target=target or context.target, debug=context.debug, metadata=context.metadata)
+    backend.begin_stream(expansion)
+    emitted = False
+    for stmt in statements:
+        fragment = LoweredModule(
+            lowered_id=stmt.lowered_id,
+            span=stmt.span,
+            ir_schema_version=IR_SCHEMA_VERSION,
+            target=context.target,
+            statements=[stmt],
+            required_helpers=[],
+            diagnostics=[],
+        )
+        chunk = backend.emit_statements(lowered_to_graph(fragment), expansion)
+        if chunk:
+            emitted = True
+            yield chunk
+    if not emitted:
+        # Matches `emit_module` output for an empty module.
+        yield "\n"
 
 
 def build_builtin_pack_registry() -> PackRegistry:
@@ -0,0 +1,160 @@
+"""Parallel parsing of top-level statement ranges."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
+import os
+import re
+import sys
+from typing import Final, Iterator
+
+from icl.arena import AstArena
+from icl.ast import Program, Stmt, iter_nodes
+from icl.errors import CompilerError
+from icl.parser import Parser
+from icl.source_map import merge_spans
+from icl.tokens import TOKEN_TYPE_CODES, TokenBuffer, TokenType
+
+
+# Token count from which `Parser(workers=None)` parses in parallel.
+PARALLEL_PARSE_MIN_TOKENS: Final[int] = 200_000
+# Ranges handed out per worker, so uneven statement sizes still balance.
+_RANGES_PER_WORKER: Final[int] = 4
+
+_COLON_CODE: Final[int] = TOKEN_TYPE_CODES[TokenType.COLON]
+_LBRACE_CODE: Final[int] = TOKEN_TYPE_CODES[TokenType.LBRACE]
+_RBRACE_CODE: Final[int] = TOKEN_TYPE_CODES[TokenType.RBRACE]
+# Matches the token codes `statement_boundaries` cares about.
+_STRUCTURE_PATTERN: Final[re.Pattern[bytes]] = re.compile(
+    b"[" + re.escape(bytes([TOKEN_TYPE_CODES[TokenType.SEMICOLON], _LBRACE_CODE, _RBRACE_CODE])) + b"]"
+)
+
+# Token buffer of the current worker process, set by `_init_worker`.
+_worker_tokens: TokenBuffer | None = None
+
+
+def statement_boundaries(tokens: TokenBuffer) -> list[int] | None:
+    """Token indexes right after each top-level `;` or closing `}`.
+
+    Statements never continue past such a token in a valid program, except
+    for the `}` of an `if` block followed by `: {`. Returns None when braces
+    are unbalanced, since the sequential parser's recovery decides those.
+    """
+    codes = tokens.types.tobytes()
+    boundaries: list[int] = []
+    depth = 0
+    for match in _STRUCTURE_PATTERN.finditer(codes):
+        index = match.start()
+        code = codes[index]
+        if code == _LBRACE_CODE:
+            depth += 1
+        elif code == _RBRACE_CODE:
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0 and codes[index + 1] != _COLON_CODE:
+                boundaries.append(index + 1)
+        elif depth == 0:
+            boundaries.append(index + 1)
+    return None if depth else boundaries
+
+
+def split_statement_ranges(tokens: TokenBuffer, parts: int) -> list[tuple[int, int]] | None:
+    """Split the tokens before EOF into at most `parts` ranges of whole statements."""
+    boundaries = statement_boundaries(tokens)
+    if boundaries is None:
+        return None
+    end = len(tokens) - 1
+    target = max(end // max(parts, 1), 1)
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    for boundary in boundaries:
+        if boundary - start >= target and boundary < end:
+            ranges.append((start, boundary))
+            start = boundary
+    ranges.append((start, end))
+    return ranges
+
+
+def free_threaded() -> bool:
+    """Whether this interpreter runs without the GIL."""
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def parse_parallel(
+    tokens: TokenBuffer,
+    *,
+    workers: int | None = None,
+    node_ids: Iterator[int] | None = None,
+) -> Program | None:
+    """Parse statement ranges of `tokens` concurrently and stitch one `Program`.
+
+    Node ids are drawn from `node_ids` exactly as a sequential `Parser` would.
+    Returns None, without drawing any, when the tokens cannot be split or any
+    range fails to parse; the caller then parses sequentially, which reports
+    errors in their usual order with the usual recovery.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_statement_ranges(tokens, workers * _RANGES_PER_WORKER)
+    if ranges is None or len(ranges) < 2:
+        return None
+
+    results: list[list[Stmt] | AstArena | None]
+    if free_threaded():
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda bounds: _parse_range(tokens, *bounds), ranges))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tokens,)) as executor:
+            results = list(executor.map(_parse_range_in_worker, ranges))
+    if any(result is None for result in results):
+        return None
+
+    # Every range numbered its nodes from 0; shift them to follow each other.
+    node_ids = node_ids if node_ids is not None else itertools.count()
+    first_id = next(node_ids)
+    offset = first_id
+    statements: list[Stmt] = []
+    for result in results:
+        if isinstance(result, AstArena):
+            result.rebind(tokens.source)
+            result.node_ids = array("q", [node_id + offset for node_id in result.node_ids])
+            statements.extend(result.program().statements)
+            offset += len(result) - 1
+        else:
+            count = 0
+            for stmt in result or []:
+                for node in iter_nodes(stmt):
+                    node.node_id += offset
+                    count += 1
+            statements.extend(result or [])
+            offset += count
+    if not statements:
+        return None
+    # Draw the ids used above, as the sequential parser would have.
+    deque(itertools.islice(node_ids, offset - first_id), maxlen=0)
+    span = merge_spans(statements[0].span, statements[-1].span)
+    return Program(span=span, statements=statements, node_id=offset)
+
+
+def _parse_range(tokens: TokenBuffer, start: int, end: int) -> list[Stmt] | None:
+    try:
+        return list(Parser(tokens.section(start, end), workers=1).iter_statements())
+    except CompilerError:
+        return None
+
+
+def _init_worker(tokens: TokenBuffer | None) -> None:
+    global _worker_tokens
+    _worker_tokens = tokens
+
+
+def _parse_range_in_worker(bounds: tuple[int, int]) -> AstArena | None:
+    assert _worker_tokens is not None
+    statements = _parse_range(_worker_tokens, *bounds)
+    if statements is None:
+        return None
+    # Only the compact arena is pickled back to the parent.
+    return AstArena.from_statements(statements, eof_span=_worker_tokens.span(len(_worker_tokens) - 1))
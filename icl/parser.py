@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import itertools
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Sequence
 
+from icl.arena import AstArena
 from icl.ast import (
     AssignmentStmt,
     BinaryExpr,
     CallExpr,
+    ErrorStmt,
     Expr,
     ExpressionStmt,
     FunctionDefStmt,
@@ -24,8 +29,8 @@ from icl.ast import (
     UnaryExpr,
 )
 from icl.errors import ParseError
-from icl.source_map import SourceSpan
-from icl.tokens import Token, TokenType
+from icl.source_map import SourceSpan, merge_spans
+from icl.tokens import Token, TokenBuffer, TokenType
 
 
 _PRECEDENCE: dict[TokenType, int] = {
@@ -49,44 +54,116 @@ _PRECEDENCE: dict[TokenType, int] = {
 class Parser:
     """Recursive-descent + Pratt parser for ICL."""
 
-    tokens: list[Token]
+    tokens: Sequence[Token]
+    # Parallel parse workers for `parse_program`: None picks the CPU count for
+    # large `TokenBuffer` inputs, 1 always parses sequentially.
+    workers: int | None = None
+    # Source of `AstNode.node_id`s. Nodes are numbered as they are created,
+    # which is post-order, so ids are deterministic for a token stream; pass a
+    # shared counter to keep ids unique across several parsers.
+    node_ids: Iterator[int] = field(default_factory=itertools.count)
+    # Yield an `ErrorStmt` for each statement that fails to parse and leave
+    # the errors in `errors` instead of raising them.
+    collect_errors: bool = False
 
     def __post_init__(self) -> None:
+        self._next_node_id = self.node_ids.__next__
+        # Token type and value by index. A `TokenBuffer` answers from its
+        # arrays, so lookahead does not build `Token` objects; a `Token` is
+        # only materialized once its span or value is consumed.
+        tokens = self.tokens
+        if isinstance(tokens, TokenBuffer):
+            self._type_at: Callable[[int], TokenType] = tokens.token_type
+            self._value_at: Callable[[int], str] = tokens.value
+        else:
+            self._type_at = lambda index: tokens[index].token_type
+            self._value_at = lambda index: tokens[index].value
         self.pos = 0
+        # Token index where the statement being parsed begins.
+        self.statement_start = 0
+        self.errors: list[ParseError] = []
 
     def parse_program(self) -> Program:
-        """Parse full token stream into a program AST."""
-        statements: list[Stmt] = []
-        errors: list[ParseError] = []
+        """Parse full token stream into a program AST.
+
+        Large token buffers are split into top-level statement ranges that
+        are parsed in parallel (see `icl.parallel`); the result, including
+        spans and any errors, is the same as a sequential parse.
+        """
+        if self._use_parallel():
+            from icl.parallel import parse_parallel
+
+            program = parse_parallel(self.tokens, workers=self.workers, node_ids=self.node_ids)
+            if program is not None:
+                self.pos = len(self.tokens) - 1
+                return program
+        statements = list(self.iter_statements())
+        if statements:
+            span = self._merge_spans(statements[0].span, statements[-1].span)
+        else:
+            span = self._peek().span
+        return Program(span=span, statements=statements, node_id=self._next_node_id())
 
+    def _use_parallel(self) -> bool:
+        if self.workers == 1 or self.pos != 0 or not isinstance(self.tokens, TokenBuffer):
+            return False
+        if self.workers is None:
+            from icl.parallel import PARALLEL_PARSE_MIN_TOKENS
+
+            return len(self.tokens) >= PARALLEL_PARSE_MIN_TOKENS and (os.cpu_count() or 1) > 1
+        return True
+
+    def parse_arena(self) -> AstArena:
+        """Parse full token stream into a flat `AstArena`.
+
+        Statements are moved into the arena as they are parsed, so the
+        dataclass nodes of only one statement are alive at a time.
+        """
+        arena = AstArena.from_statements(self.iter_statements(), eof_span=self.tokens[-1].span)
+        arena.node_ids[arena.root] = self._next_node_id()  # type: ignore[index]
+        return arena
+
+    def iter_statements(self) -> Iterator[Stmt]:
+        """Yield top-level statements as soon as each one is parsed.
+
+        Parse errors are recovered from and collected in `errors`; once the
+        token stream is exhausted the first one is raised, folded with a count
+        of the others. With `collect_errors`, an `ErrorStmt` takes the place of
+        each failed statement and nothing is raised.
+        """
+        errors = self.errors
         while not self._is_at_end():
             self._consume_optional_semicolons()
             if self._is_at_end():
                 break
+            self.statement_start = self.pos
             try:
                 stmt = self._parse_statement()
-                statements.append(stmt)
-                self._consume_optional_semicolons()
             except ParseError as err:
                 errors.append(err)
-                self._synchronize()
+                self.recover()
+                if self.collect_errors:
+                    yield self._error_stmt()
+                continue
+            yield stmt
+            self._consume_optional_semicolons()
 
-        if errors:
-            if len(errors) == 1:
-                raise errors[0]
-            first = errors[0]
-            raise ParseError(
-                code=first.code,
-                message=f"{first.message} (plus {len(errors) - 1} additional parse error(s)).",
-                span=first.span,
-                hint=first.hint,
-            )
+        if errors and not self.collect_errors:
+            raise fold_parse_errors(errors)
 
-        if statements:
-            span = self._merge_spans(statements[0].span, statements[-1].span)
-        else:
-            span = self._peek().span
-        return Program(span=span, statements=statements)
+    def parse_top_level_statement(self) -> Stmt | None:
+        """Parse one top-level statement with its surrounding semicolons.
+
+        Returns None once only semicolons remain before EOF. Unlike
+        `iter_statements`, parse errors propagate without recovery.
+        """
+        self._consume_optional_semicolons()
+        if self._is_at_end():
+            return None
+        self.statement_start = self.pos
+        stmt = self._parse_statement()
+        self._consume_optional_semicolons()
+        return stmt
 
     def _parse_statement(self) -> Stmt:
         if self._match(TokenType.FN):
@@ -103,70 +180,69 @@ class Parser:
             return self._parse_assignment_stmt()
 
         expr = self._parse_expression()
-        return ExpressionStmt(span=expr.span, expr=expr)
+        return ExpressionStmt(span=expr.span, expr=expr, node_id=self._next_node_id())
 
     def _parse_assignment_stmt(self) -> AssignmentStmt:
         name_tok = self._consume(TokenType.IDENT, "Expected identifier in assignment.")
         type_hint: str | None = None
 
         if self._match(TokenType.COLON):
-            type_tok = self._consume(TokenType.IDENT, "Expected type name after ':'.")
-            type_hint = type_tok.value
+            type_hint = self._consume_value(TokenType.IDENT, "Expected type name after ':'.")
 
-        self._consume(TokenType.ASSIGN, "Expected ':=' in assignment.")
+        self._expect(TokenType.ASSIGN, "Expected ':=' in assignment.")
         value = self._parse_expression()
         span = self._merge_spans(name_tok.span, value.span)
-        return AssignmentStmt(span=span, name=name_tok.value, value=value, type_hint=type_hint)
+        return AssignmentStmt(span=span, name=name_tok.value, value=value, type_hint=type_hint, node_id=self._next_node_id())
 
     def _parse_function_def(self, fn_token: Token) -> FunctionDefStmt:
-        name_tok = self._consume(TokenType.IDENT, "Expected function name after 'fn'.")
-        self._consume(TokenType.LPAR, "Expected '(' after function name.")
+        name = self._consume_value(TokenType.IDENT, "Expected function name after 'fn'.")
+        self._expect(TokenType.LPAR, "Expected '(' after function name.")
         params: list[Param] = []
 
         if not self._check(TokenType.RPAR):
             while True:
-                param_name = self._consume(TokenType.IDENT, "Expected parameter name.")
+                param_name = self._consume_value(TokenType.IDENT, "Expected parameter name.")
                 param_type: str | None = None
                 if self._match(TokenType.COLON):
-                    param_type_tok = self._consume(TokenType.IDENT, "Expected parameter type after ':'.")
-                    param_type = param_type_tok.value
-                params.append(Param(name=param_name.value, type_hint=param_type))
+                    param_type = self._consume_value(TokenType.IDENT, "Expected parameter type after ':'.")
+                params.append(Param(name=param_name, type_hint=param_type))
                 if not self._match(TokenType.COMMA):
                     break
 
-        self._consume(TokenType.RPAR, "Expected ')' after function parameters.")
+        self._expect(TokenType.RPAR, "Expected ')' after function parameters.")
 
         return_type: str | None = None
         if self._match(TokenType.COLON):
-            return_type_tok = self._consume(TokenType.IDENT, "Expected return type after ':'.")
-            return_type = return_type_tok.value
+            return_type = self._consume_value(TokenType.IDENT, "Expected return type after ':'.")
 
         if self._match(TokenType.ARROW):
             expr = self._parse_expression()
             span = self._merge_spans(fn_token.span, expr.span)
             return FunctionDefStmt(
                 span=span,
-                name=name_tok.value,
+                name=name,
                 params=params,
                 body=[],
                 expr_body=expr,
                 return_type=return_type,
+                node_id=self._next_node_id(),
             )
 
         body, block_span = self._parse_block()
         span = self._merge_spans(fn_token.span, block_span)
         return FunctionDefStmt(
             span=span,
-            name=name_tok.value,
+            name=name,
             params=params,
             body=body,
             expr_body=None,
             return_type=return_type,
+            node_id=self._next_node_id(),
         )
 
     def _parse_if_stmt(self, if_token: Token) -> IfStmt:
         condition = self._parse_expression()
-        self._consume(TokenType.QUESTION, "Expected '?' after if condition.")
+        self._expect(TokenType.QUESTION, "Expected '?' after if condition.")
         then_block, then_span = self._parse_block()
 
         else_block: list[Stmt] = []
@@ -176,35 +252,36 @@ class Parser:
             end_span = else_span
 
         span = self._merge_spans(if_token.span, end_span)
-        return IfStmt(span=span, condition=condition, then_block=then_block, else_block=else_block)
+        return IfStmt(span=span, condition=condition, then_block=then_block, else_block=else_block, node_id=self._next_node_id())
 
     def _parse_loop_stmt(self, loop_token: Token) -> LoopStmt:
-        iterator_tok = self._consume(TokenType.IDENT, "Expected loop iterator name after 'loop'.")
-        self._consume(TokenType.IN, "Expected 'in' in loop header.")
+        iterator = self._consume_value(TokenType.IDENT, "Expected loop iterator name after 'loop'.")
+        self._expect(TokenType.IN, "Expected 'in' in loop header.")
         start_expr = self._parse_expression()
-        self._consume(TokenType.RANGE, "Expected '..' in loop range.")
+        self._expect(TokenType.RANGE, "Expected '..' in loop range.")
         end_expr = self._parse_expression()
         body, body_span = self._parse_block()
 
         span = self._merge_spans(loop_token.span, body_span)
         return LoopStmt(
             span=span,
-            iterator=iterator_tok.value,
+            iterator=iterator,
             start=start_expr,
             end=end_expr,
             body=body,
+            node_id=self._next_node_id(),
         )
 
     def _parse_return_stmt(self, ret_token: Token) -> ReturnStmt:
         if self._check(TokenType.SEMICOLON) or self._check(TokenType.RBRACE) or self._check(TokenType.EOF):
-            return ReturnStmt(span=ret_token.span, value=None)
+            return ReturnStmt(span=ret_token.span, value=None, node_id=self._next_node_id())
         value = self._parse_expression()
         span = self._merge_spans(ret_token.span, value.span)
-        return ReturnStmt(span=span, value=value)
+        return ReturnStmt(span=span, value=value, node_id=self._next_node_id())
 
     def _parse_macro_stmt(self, hash_token: Token) -> MacroStmt:
-        name_tok = self._consume(TokenType.IDENT, "Expected macro name after '#'.")
-        self._consume(TokenType.LPAR, "Expected '(' after macro name.")
+        name = self._consume_value(TokenType.IDENT, "Expected macro name after '#'.")
+        self._expect(TokenType.LPAR, "Expected '(' after macro name.")
         args: list[Expr] = []
         if not self._check(TokenType.RPAR):
             while True:
@@ -213,7 +290,7 @@ class Parser:
                     break
         end_tok = self._consume(TokenType.RPAR, "Expected ')' after macro arguments.")
         span = self._merge_spans(hash_token.span, end_tok.span)
-        return MacroStmt(span=span, name=name_tok.value, args=args)
+        return MacroStmt(span=span, name=name, args=args, node_id=self._next_node_id())
 
     def _parse_block(self) -> tuple[list[Stmt], SourceSpan]:
         lbrace = self._consume(TokenType.LBRACE, "Expected '{' to start block.")
@@ -228,134 +305,147 @@ class Parser:
         rbrace = self._consume(TokenType.RBRACE, "Expected '}' to close block.")
         return statements, self._merge_spans(lbrace.span, rbrace.span)
 
-    def _parse_expression(self, min_prec: int = 1) -> Expr:
-        expr = self._parse_unary()
+    def _parse_expression(self) -> Expr:
+        """Parse a binary-operator chain with an explicit operator stack.
+
+        Before an operator is pushed, pending operators that bind at least as
+        tightly are reduced, which builds the same left-associative tree as
+        precedence climbing without a Python frame per precedence level.
+        """
+        type_at = self._type_at
+        precedence = _PRECEDENCE
+        expr = self._parse_operand()
+        prec = precedence.get(type_at(self.pos))
+        if prec is None:
+            return expr
 
-        while True:
-            tok = self._peek()
-            prec = _PRECEDENCE.get(tok.token_type)
-            if prec is None or prec < min_prec:
-                break
+        pending: list[tuple[int, str, Expr]] = []
+        while prec is not None:
+            while pending and pending[-1][0] >= prec:
+                _, operator, left = pending.pop()
+                expr = BinaryExpr(span=merge_spans(left.span, expr.span), left=left, operator=operator, right=expr, node_id=self._next_node_id())
+            pending.append((prec, self._value_at(self.pos), expr))
+            self.pos += 1
+            expr = self._parse_operand()
+            prec = precedence.get(type_at(self.pos))
+
+        while pending:
+            _, operator, left = pending.pop()
+            expr = BinaryExpr(span=merge_spans(left.span, expr.span), left=left, operator=operator, right=expr, node_id=self._next_node_id())
+        return expr
+
+    def _parse_operand(self) -> Expr:
+        """Parse prefix operators, one prefix-table expression and its postfix calls."""
+        tokens = self.tokens
+        type_at = self._type_at
+        token_type = type_at(self.pos)
+        unary_ops: list[Token] = []
+        while token_type in _UNARY_OPERATORS:
+            unary_ops.append(tokens[self.pos])
+            self.pos += 1
+            token_type = type_at(self.pos)
 
-            op = self._advance()
-            right = self._parse_expression(prec + 1)
-            span = self._merge_spans(expr.span, right.span)
-            expr = BinaryExpr(span=span, left=expr, operator=op.value, right=right)
+        handler = _PREFIX_HANDLERS.get(token_type)
+        tok = tokens[self.pos]
+        if handler is None:
+            raise ParseError(
+                code="PAR001",
+                message=f"Unexpected token {tok.token_type.name} in expression.",
+                span=tok.span,
+                hint="Use literals, identifiers, calls, or parenthesized expressions.",
+            )
+        self.pos += 1
+        expr = handler(self, tok)
+
+        postfix = _POSTFIX_HANDLERS.get(type_at(self.pos))
+        while postfix is not None:
+            self.pos += 1
+            expr = postfix(self, expr)
+            postfix = _POSTFIX_HANDLERS.get(type_at(self.pos))
 
+        for op in reversed(unary_ops):
+            expr = UnaryExpr(span=merge_spans(op.span, expr.span), operator=op.value, operand=expr, node_id=self._next_node_id())
         return expr
 
-    def _parse_unary(self) -> Expr:
-        if self._match(TokenType.NOT, TokenType.MINUS, TokenType.PLUS):
-            op = self._previous()
-            operand = self._parse_unary()
-            span = self._merge_spans(op.span, operand.span)
-            return UnaryExpr(span=span, operator=op.value, operand=operand)
-        return self._parse_postfix()
-
-    def _parse_postfix(self) -> Expr:
-        expr = self._parse_primary()
-        while self._match(TokenType.LPAR):
-            args: list[Expr] = []
-            if not self._check(TokenType.RPAR):
-                while True:
-                    args.append(self._parse_expression())
-                    if not self._match(TokenType.COMMA):
-                        break
-            rpar = self._consume(TokenType.RPAR, "Expected ')' after call arguments.")
-            span = self._merge_spans(expr.span, rpar.span)
-            expr = CallExpr(span=span, callee=expr, args=args, at_prefixed=False)
+    def _parse_number(self, tok: Token) -> LiteralExpr:
+        value: int | float
+        value = float(tok.value) if "." in tok.value else int(tok.value)
+        return LiteralExpr(span=tok.span, value=value, node_id=self._next_node_id())
+
+    def _parse_string(self, tok: Token) -> LiteralExpr:
+        return LiteralExpr(span=tok.span, value=tok.value, node_id=self._next_node_id())
+
+    def _parse_true(self, tok: Token) -> LiteralExpr:
+        return LiteralExpr(span=tok.span, value=True, node_id=self._next_node_id())
+
+    def _parse_false(self, tok: Token) -> LiteralExpr:
+        return LiteralExpr(span=tok.span, value=False, node_id=self._next_node_id())
+
+    def _parse_identifier(self, tok: Token) -> IdentifierExpr:
+        return IdentifierExpr(span=tok.span, name=tok.value, node_id=self._next_node_id())
+
+    def _parse_at_call(self, at_tok: Token) -> CallExpr:
+        callee_tok = self._consume(TokenType.IDENT, "Expected callee identifier after '@'.")
+        callee = IdentifierExpr(span=callee_tok.span, name=callee_tok.value, node_id=self._next_node_id())
+        self._expect(TokenType.LPAR, "Expected '(' after @callee.")
+        args, end_tok = self._parse_call_arguments()
+        span = self._merge_spans(at_tok.span, end_tok.span)
+        return CallExpr(span=span, callee=callee, args=args, at_prefixed=True, node_id=self._next_node_id())
+
+    def _parse_group(self, lpar: Token) -> Expr:
+        expr = self._parse_expression()
+        self._expect(TokenType.RPAR, "Expected ')' to close grouped expression.")
         return expr
 
-    def _parse_primary(self) -> Expr:
-        if self._match(TokenType.NUMBER):
-            tok = self._previous()
-            value: int | float
-            value = float(tok.value) if "." in tok.value else int(tok.value)
-            return LiteralExpr(span=tok.span, value=value)
-
-        if self._match(TokenType.STRING):
-            tok = self._previous()
-            return LiteralExpr(span=tok.span, value=tok.value)
-
-        if self._match(TokenType.TRUE):
-            tok = self._previous()
-            return LiteralExpr(span=tok.span, value=True)
-
-        if self._match(TokenType.FALSE):
-            tok = self._previous()
-            return LiteralExpr(span=tok.span, value=False)
-
-        if self._match(TokenType.LAM):
-            return self._parse_lambda_expr(self._previous())
-
-        if self._match(TokenType.IDENT):
-            tok = self._previous()
-            return IdentifierExpr(span=tok.span, name=tok.value)
-
-        if self._match(TokenType.AT):
-            at_tok = self._previous()
-            callee_tok = self._consume(TokenType.IDENT, "Expected callee identifier after '@'.")
-            self._consume(TokenType.LPAR, "Expected '(' after @callee.")
-            args: list[Expr] = []
-            if not self._check(TokenType.RPAR):
-                while True:
-                    args.append(self._parse_expression())
-                    if not self._match(TokenType.COMMA):
-                        break
-            end_tok = self._consume(TokenType.RPAR, "Expected ')' after call arguments.")
-            callee = IdentifierExpr(span=callee_tok.span, name=callee_tok.value)
-            span = self._merge_spans(at_tok.span, end_tok.span)
-            return CallExpr(span=span, callee=callee, args=args, at_prefixed=True)
-
-        if self._match(TokenType.LPAR):
-            expr = self._parse_expression()
-            self._consume(TokenType.RPAR, "Expected ')' to close grouped expression.")
-            return expr
+    def _parse_call(self, callee: Expr) -> CallExpr:
+        args, rpar = self._parse_call_arguments()
+        span = self._merge_spans(callee.span, rpar.span)
+        return CallExpr(span=span, callee=callee, args=args, at_prefixed=False, node_id=self._next_node_id())
 
-        tok = self._peek()
-        raise ParseError(
-            code="PAR001",
-            message=f"Unexpected token {tok.token_type.name} in expression.",
-            span=tok.span,
-            hint="Use literals, identifiers, calls, or parenthesized expressions.",
-        )
+    def _parse_call_arguments(self) -> tuple[list[Expr], Token]:
+        """Parse arguments after an opening '(' and return them with the ')'."""
+        args: list[Expr] = []
+        if not self._check(TokenType.RPAR):
+            while True:
+                args.append(self._parse_expression())
+                if not self._match(TokenType.COMMA):
+                    break
+        return args, self._consume(TokenType.RPAR, "Expected ')' after call arguments.")
 
     def _parse_lambda_expr(self, lam_token: Token) -> LambdaExpr:
-        self._consume(TokenType.LPAR, "Expected '(' after 'lam'.")
+        self._expect(TokenType.LPAR, "Expected '(' after 'lam'.")
         params: list[Param] = []
 
         if not self._check(TokenType.RPAR):
             while True:
-                param_name = self._consume(TokenType.IDENT, "Expected lambda parameter name.")
+                param_name = self._consume_value(TokenType.IDENT, "Expected lambda parameter name.")
                 param_type: str | None = None
                 if self._match(TokenType.COLON):
-                    param_type_tok = self._consume(TokenType.IDENT, "Expected parameter type after ':'.")
-                    param_type = param_type_tok.value
-                params.append(Param(name=param_name.value, type_hint=param_type))
+                    param_type = self._consume_value(TokenType.IDENT, "Expected parameter type after ':'.")
+                params.append(Param(name=param_name, type_hint=param_type))
                 if not self._match(TokenType.COMMA):
                     break
 
-        self._consume(TokenType.RPAR, "Expected ')' after lambda parameters.")
+        self._expect(TokenType.RPAR, "Expected ')' after lambda parameters.")
 
         return_type: str | None = None
         if self._match(TokenType.COLON):
-            return_type_tok = self._consume(TokenType.IDENT, "Expected lambda return type after ':'.")
-            return_type = return_type_tok.value
+            return_type = self._consume_value(TokenType.IDENT, "Expected lambda return type after ':'.")
 
-        self._consume(TokenType.ARROW, "Expected '=>' in lambda expression.")
+        self._expect(TokenType.ARROW, "Expected '=>' in lambda expression.")
         body = self._parse_expression()
         span = self._merge_spans(lam_token.span, body.span)
-        return LambdaExpr(span=span, params=params, body=body, return_type=return_type)
+        return LambdaExpr(span=span, params=params, body=body, return_type=return_type, node_id=self._next_node_id())
 
     def _is_assignment_start(self) -> bool:
         if not self._check(TokenType.IDENT):
             return False
-        if self._peek(1).token_type == TokenType.ASSIGN:
+        if self._peek_type(1) == TokenType.ASSIGN:
             return True
         return (
-            self._peek(1).token_type == TokenType.COLON
-            and self._peek(2).token_type == TokenType.IDENT
-            and self._peek(3).token_type == TokenType.ASSIGN
+            self._peek_type(1) == TokenType.COLON
+            and self._peek_type(2) == TokenType.IDENT
+            and self._peek_type(3) == TokenType.ASSIGN
         )
 
     def _consume(self, token_type: TokenType, message: str) -> Token:
@@ -364,51 +454,123 @@ class Parser:
         tok = self._peek()
         raise ParseError(code="PAR002", message=message, span=tok.span, hint="Adjust token order to match grammar.")
 
+    def _consume_value(self, token_type: TokenType, message: str) -> str:
+        """Like `_consume`, returning only the token's value."""
+        self._expect(token_type, message)
+        return self._value_at(self.pos - 1)
+
+    def _expect(self, token_type: TokenType, message: str) -> None:
+        """Like `_consume`, for tokens whose value and span are not needed."""
+        if self._check(token_type):
+            self._skip()
+            return
+        tok = self._peek()
+        raise ParseError(code="PAR002", message=message, span=tok.span, hint="Adjust token order to match grammar.")
+
     def _match(self, *token_types: TokenType) -> bool:
         for token_type in token_types:
             if self._check(token_type):
-                self._advance()
+                self._skip()
                 return True
         return False
 
     def _check(self, token_type: TokenType) -> bool:
-        return self._peek().token_type == token_type
+        try:
+            return self._type_at(self.pos) == token_type
+        except IndexError:
+            return self._type_at(-1) == token_type
 
-    def _advance(self) -> Token:
+    def _skip(self) -> None:
         if not self._is_at_end():
             self.pos += 1
+
+    def _advance(self) -> Token:
+        self._skip()
         return self._previous()
 
     def _peek(self, offset: int = 0) -> Token:
-        idx = self.pos + offset
-        if idx >= len(self.tokens):
+        try:
+            return self.tokens[self.pos + offset]
+        except IndexError:
             return self.tokens[-1]
-        return self.tokens[idx]
+
+    def _peek_type(self, offset: int = 0) -> TokenType:
+        try:
+            return self._type_at(self.pos + offset)
+        except IndexError:
+            return self._type_at(-1)
 
     def _previous(self) -> Token:
         return self.tokens[self.pos - 1]
 
     def _is_at_end(self) -> bool:
-        return self._peek().token_type == TokenType.EOF
+        return self._check(TokenType.EOF)
 
     def _consume_optional_semicolons(self) -> None:
         while self._match(TokenType.SEMICOLON):
             pass
 
+    def recover(self) -> None:
+        """Skip past the statement that just failed to parse."""
+        self._synchronize()
+        if self.pos == self.statement_start:
+            self._advance()
+
+    def _error_stmt(self) -> ErrorStmt:
+        tokens = self.tokens
+        start = self.statement_start
+        first, second = tokens[start], tokens[start + 1]
+        name = None
+        is_function = first.token_type == TokenType.FN and second.token_type == TokenType.IDENT
+        if is_function:
+            name = second.value
+        elif first.token_type == TokenType.IDENT and second.token_type in {TokenType.ASSIGN, TokenType.COLON}:
+            name = first.value
+        span = merge_spans(first.span, tokens[max(self.pos - 1, start)].span)
+        return ErrorStmt(span=span, name=name, is_function=is_function, node_id=self._next_node_id())
+
     def _synchronize(self) -> None:
         while not self._is_at_end():
-            if self._previous().token_type in {TokenType.SEMICOLON, TokenType.RBRACE}:
+            if self._type_at(self.pos - 1) in {TokenType.SEMICOLON, TokenType.RBRACE}:
                 return
-            if self._peek().token_type in {TokenType.FN, TokenType.IF, TokenType.LOOP, TokenType.RET}:
+            if self._peek_type() in {TokenType.FN, TokenType.IF, TokenType.LOOP, TokenType.RET}:
                 return
-            self._advance()
+            self._skip()
 
     @staticmethod
     def _merge_spans(start: SourceSpan, end: SourceSpan) -> SourceSpan:
-        return SourceSpan(
-            file=start.file,
-            line=start.line,
-            column=start.column,
-            end_line=end.end_line,
-            end_column=end.end_column,
-        )
+        return merge_spans(start, end)
+
+
+_UNARY_OPERATORS: frozenset[TokenType] = frozenset({TokenType.NOT, TokenType.MINUS, TokenType.PLUS})
+
+# Expression handlers keyed by token type. Prefix handlers get the token that
+# starts the expression, postfix handlers the expression the token follows;
+# the token is consumed before either is called.
+_PREFIX_HANDLERS: dict[TokenType, Callable[[Parser, Token], Expr]] = {
+    TokenType.NUMBER: Parser._parse_number,
+    TokenType.STRING: Parser._parse_string,
+    TokenType.TRUE: Parser._parse_true,
+    TokenType.FALSE: Parser._parse_false,
+    TokenType.LAM: Parser._parse_lambda_expr,
+    TokenType.IDENT: Parser._parse_identifier,
+    TokenType.AT: Parser._parse_at_call,
+    TokenType.LPAR: Parser._parse_group,
+}
+
+_POSTFIX_HANDLERS: dict[TokenType, Callable[[Parser, Expr], Expr]] = {
+    TokenType.LPAR: Parser._parse_call,
+}
+
+
+def fold_parse_errors(errors: Sequence[ParseError]) -> ParseError:
+    """Return the first error, noting how many others were recovered from."""
+    if len(errors) == 1:
+        return errors[0]
+    first = errors[0]
+    return ParseError(
+        code=first.code,
+        message=f"{first.message} (plus {len(errors) - 1} additional parse error(s)).",
+        span=first.span,
+        hint=first.hint,
+    )
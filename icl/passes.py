@@ -0,0 +1,239 @@
+"""Compiler pass infrastructure with per-pass timing and size instrumentation."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Final, Iterable, Iterator
+
+from icl.ast import AstNode, iter_nodes
+from icl.ir import IRNode, iter_ir_nodes
+from icl.lowering import LoweredNode, iter_lowered_nodes
+
+
+# Forms a `CompilerPass` can transform.
+STAGE_AST: Final[str] = "ast"
+STAGE_IR: Final[str] = "ir"
+STAGE_LOWERED: Final[str] = "lowered"
+PASS_STAGES: Final[tuple[str, ...]] = (STAGE_AST, STAGE_IR, STAGE_LOWERED)
+# Forms only produced by fixed pipeline phases, for `PassRecord.stage`.
+STAGE_TOKENS: Final[str] = "tokens"
+STAGE_CODE: Final[str] = "code"
+
+# Upper bound on re-runs of a fixpoint pass, and on pipeline rounds.
+MAX_FIXPOINT_ITERATIONS: Final[int] = 8
+
+
+@dataclass
+class OptimizationReport:
+    """Summary of optimization actions applied to IR or a graph."""
+
+    folded_operations: int = 0
+    removed_assignments: int = 0
+    pruned_branches: int = 0
+    inlined_calls: int = 0
+    evaluated_calls: int = 0
+    propagated_constants: int = 0
+    propagated_copies: int = 0
+    removed_loops: int = 0
+    reduced_loops: int = 0
+    unrolled_loops: int = 0
+    hoisted_expressions: int = 0
+    removed_functions: int = 0
+    notes: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PassRecord:
+    """Wall time and size change of one pass or pipeline phase.
+
+    `nodes_visited` is the size of the input summed over iterations;
+    `target` is set for per-target phases.
+    """
+
+    name: str
+    stage: str
+    seconds: float = 0.0
+    nodes_visited: int = 0
+    nodes_before: int = 0
+    nodes_after: int = 0
+    iterations: int = 1
+    target: str | None = None
+
+    @property
+    def node_delta(self) -> int:
+        return self.nodes_after - self.nodes_before
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "stage": self.stage,
+            "target": self.target,
+            "ms": round(self.seconds * 1000, 3),
+            "nodes_visited": self.nodes_visited,
+            "nodes_before": self.nodes_before,
+            "nodes_after": self.nodes_after,
+            "node_delta": self.node_delta,
+            "iterations": self.iterations,
+        }
+
+
+@dataclass
+class PassReport:
+    """Records of every pass and phase of a compile, in execution order.
+
+    Node counts cost a walk of the whole unit; with `node_counts` off,
+    records are only timed and their counts stay 0.
+    """
+
+    records: list[PassRecord] = field(default_factory=list)
+    node_counts: bool = True
+
+    def size(self, unit: Any) -> int:
+        """`count_nodes(unit)`, or 0 when node counting is off."""
+        return count_nodes(unit) if self.node_counts else 0
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(record.seconds for record in self.records)
+
+    @contextmanager
+    def measure(self, name: str, stage: str, *, target: str | None = None) -> Iterator[PassRecord]:
+        """Time the body as one record; the caller fills in node counts."""
+        record = PassRecord(name=name, stage=stage, target=target)
+        start = perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = perf_counter() - start
+            self.records.append(record)
+
+    def slowest(self, count: int = 5) -> list[PassRecord]:
+        """The `count` records with the largest wall time."""
+        return sorted(self.records, key=lambda record: record.seconds, reverse=True)[:count]
+
+    def to_dict(self) -> list[dict[str, Any]]:
+        return [record.to_dict() for record in self.records]
+
+
+@dataclass
+class PassContext:
+    """State shared by the passes of one compile."""
+
+    report: PassReport = field(default_factory=PassReport)
+    optimization: OptimizationReport = field(default_factory=OptimizationReport)
+    target: str | None = None
+
+
+class CompilerPass(ABC):
+    """Named in-place transformation of one program form.
+
+    `stage` is the form it runs on (`ast`, `ir` or `lowered`). `requires`
+    names passes that must be scheduled and run before this one; `after`
+    only orders it behind the named passes when they are scheduled. A
+    `fixpoint` pass is re-run until it reports no change.
+    """
+
+    name: str = ""
+    stage: str = STAGE_IR
+    requires: tuple[str, ...] = ()
+    after: tuple[str, ...] = ()
+    fixpoint: bool = False
+
+    @abstractmethod
+    def run(self, unit: Any, context: PassContext) -> bool:
+        """Transform `unit` in place; return whether anything changed."""
+
+
+class PassManager:
+    """Orders and runs the passes of one stage, recording each run."""
+
+    def __init__(self, stage: str, passes: Iterable[CompilerPass] = ()) -> None:
+        if stage not in PASS_STAGES:
+            raise ValueError(f"Unknown pass stage '{stage}'; expected one of {', '.join(PASS_STAGES)}.")
+        self.stage = stage
+        self._passes: list[CompilerPass] = []
+        for compiler_pass in passes:
+            self.add(compiler_pass)
+
+    def __len__(self) -> int:
+        return len(self._passes)
+
+    def add(self, compiler_pass: CompilerPass) -> None:
+        """Schedule `compiler_pass`; names are unique within a manager."""
+        if compiler_pass.stage != self.stage:
+            raise ValueError(
+                f"Pass '{compiler_pass.name}' runs on '{compiler_pass.stage}', not '{self.stage}'."
+            )
+        if any(existing.name == compiler_pass.name for existing in self._passes):
+            raise ValueError(f"Pass '{compiler_pass.name}' is already scheduled.")
+        self._passes.append(compiler_pass)
+
+    def ordered(self) -> list[CompilerPass]:
+        """Scheduled passes, in registration order except where a dependency comes later."""
+        names = {compiler_pass.name for compiler_pass in self._passes}
+        predecessors: dict[str, set[str]] = {}
+        for compiler_pass in self._passes:
+            missing = [name for name in compiler_pass.requires if name not in names]
+            if missing:
+                raise ValueError(f"Pass '{compiler_pass.name}' requires unscheduled pass '{missing[0]}'.")
+            predecessors[compiler_pass.name] = {
+                name for name in (*compiler_pass.requires, *compiler_pass.after) if name in names
+            }
+        ordered: list[CompilerPass] = []
+        placed: set[str] = set()
+        pending = list(self._passes)
+        while pending:
+            ready = next((item for item in pending if predecessors[item.name] <= placed), None)
+            if ready is None:
+                raise ValueError(f"Pass dependencies form a cycle among: {', '.join(item.name for item in pending)}.")
+            pending.remove(ready)
+            ordered.append(ready)
+            placed.add(ready.name)
+        return ordered
+
+    def run(self, unit: Any, context: PassContext, *, until_stable: bool = False) -> bool:
+        """Run every pass once, or whole rounds until none changes; return whether any did."""
+        passes = self.ordered()
+        changed_any = False
+        for _ in range(MAX_FIXPOINT_ITERATIONS if until_stable else 1):
+            changed = False
+            for compiler_pass in passes:
+                changed = self._run_pass(compiler_pass, unit, context) or changed
+            changed_any = changed_any or changed
+            if not changed:
+                break
+        return changed_any
+
+    def _run_pass(self, compiler_pass: CompilerPass, unit: Any, context: PassContext) -> bool:
+        record = PassRecord(name=compiler_pass.name, stage=self.stage, iterations=0, target=context.target)
+        size = context.report.size(unit)
+        record.nodes_before = size
+        changed = False
+        while record.iterations < MAX_FIXPOINT_ITERATIONS:
+            record.iterations += 1
+            record.nodes_visited += size
+            # Only the pass itself is timed, not the node counting.
+            start = perf_counter()
+            step_changed = compiler_pass.run(unit, context)
+            record.seconds += perf_counter() - start
+            changed = changed or step_changed
+            size = context.report.size(unit)
+            if not (compiler_pass.fixpoint and step_changed):
+                break
+        record.nodes_after = size
+        context.report.records.append(record)
+        return changed
+
+
+def count_nodes(unit: Any) -> int:
+    """Number of AST, IR or lowered nodes in `unit`; 0 for anything else."""
+    if isinstance(unit, AstNode):
+        return sum(1 for _ in iter_nodes(unit))
+    if isinstance(unit, IRNode):
+        return sum(1 for _ in iter_ir_nodes(unit))
+    if isinstance(unit, LoweredNode):
+        return sum(1 for _ in iter_lowered_nodes(unit))
+    return 0
@@ -13,6 +13,7 @@ from typing import Any
 from icl.ast import FunctionDefStmt, IfStmt, LoopStmt, MacroStmt, Program, Stmt
 from icl.errors import SemanticError
 from icl.expanders.base import BackendEmitter
+from icl.passes import PASS_STAGES, CompilerPass
 
 
 class BackendPlugin(ABC):
@@ -66,6 +67,7 @@ class PluginManager:
         self._macro_plugins: dict[str, MacroPlugin] = {}
         self._syntax_plugins: list[SyntaxPlugin] = []
         self._syntax_metadata: dict[str, Any] = {}
+        self._passes: list[CompilerPass] = []
 
     def register_backend(self, name: str, emitter: BackendEmitter) -> None:
         """Register target backend emitter by name."""
@@ -83,6 +85,25 @@ class PluginManager:
         """Register syntax extension plugin."""
         self._syntax_plugins.append(plugin)
 
+    def register_pass(self, compiler_pass: CompilerPass) -> None:
+        """Register an AST, IR or lowered pass to run in every compile."""
+        if compiler_pass.stage not in PASS_STAGES:
+            raise SemanticError(
+                code="PLG009",
+                message=f"Pass '{compiler_pass.name}' has unknown stage '{compiler_pass.stage}'.",
+                span=None,
+                hint=f"Use one of: {', '.join(PASS_STAGES)}.",
+            )
+        self._passes.append(compiler_pass)
+
+    def passes(self, stage: str) -> list[CompilerPass]:
+        """Registered passes for `stage`, in registration order."""
+        return [compiler_pass for compiler_pass in self._passes if compiler_pass.stage == stage]
+
+    def has_syntax_plugins(self) -> bool:
+        """Return whether any syntax plugin is registered."""
+        return bool(self._syntax_plugins)
+
     def preprocess_source(self, source: str) -> str:
         """Apply pre-lexing syntax plugin transformations."""
         updated = source
@@ -173,7 +194,7 @@ def load_plugin_spec(manager: PluginManager, spec: str) -> None:
 
     Behavior:
     - `module` implies symbol `register`
-    - symbol may be a callable, plugin instance, backend emitter, or iterable of these
+    - symbol may be a callable, plugin instance, backend emitter, compiler pass, or iterable of these
     - callable may accept either no args or one `PluginManager` arg
     """
     module_name, symbol_name = _split_plugin_spec(spec)
@@ -240,6 +261,10 @@ def _apply_loaded_object(manager: PluginManager, obj: Any, spec: str) -> None:
         manager.register_backend(obj.name, obj)
         return
 
+    if isinstance(obj, CompilerPass):
+        manager.register_pass(obj)
+        return
+
     if isinstance(obj, (list, tuple, set)):
         for item in obj:
             _apply_loaded_object(manager, item, spec)
@@ -258,7 +283,7 @@ def _apply_loaded_object(manager: PluginManager, obj: Any, spec: str) -> None:
         code="PLG006",
         message=f"Unsupported plugin export type '{type(obj).__name__}' for spec '{spec}'.",
         span=None,
-        hint="Export a register function, plugin instance, backend emitter, or iterable.",
+        hint="Export a register function, plugin instance, backend emitter, compiler pass, or iterable.",
     )
 
 
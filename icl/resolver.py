@@ -0,0 +1,274 @@
+"""Name resolution into lexical `(depth, slot)` bindings over a flat symbol table."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+
+from icl.ast import (
+    AssignmentStmt,
+    BinaryExpr,
+    CallExpr,
+    Expr,
+    ExpressionStmt,
+    FunctionDefStmt,
+    IdentifierExpr,
+    IfStmt,
+    LambdaExpr,
+    LiteralExpr,
+    LoopStmt,
+    MacroStmt,
+    Param,
+    Program,
+    ReturnStmt,
+    Stmt,
+    UnaryExpr,
+)
+
+
+SYMBOL_VARIABLE = "variable"
+SYMBOL_PARAM = "param"
+SYMBOL_ITERATOR = "iterator"
+SYMBOL_FUNCTION = "function"
+
+
+@dataclass(frozen=True, slots=True)
+class Binding:
+    """Lexical address of a name: scopes to walk out, then the slot in that scope.
+
+    `symbol` indexes the module's `SymbolTable`.
+    """
+
+    depth: int
+    slot: int
+    symbol: int
+
+
+@dataclass
+class SymbolTable:
+    """All symbols and scopes of a module as flat arrays indexed by id.
+
+    Parameters and a loop's iterator take the first slots of their scope, in
+    declaration order.
+    """
+
+    names: list[str] = field(default_factory=list)
+    kinds: list[str] = field(default_factory=list)
+    # Declaring scope and slot within it, per symbol.
+    scopes: array = field(default_factory=lambda: array("I"))
+    slots: array = field(default_factory=lambda: array("I"))
+    # Enclosing scope per scope; -1 for the module scope.
+    scope_parents: array = field(default_factory=lambda: array("i"))
+    scope_sizes: array = field(default_factory=lambda: array("I"))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_scope(self, parent: int) -> int:
+        """Open a scope under `parent` and return its id."""
+        self.scope_parents.append(parent)
+        self.scope_sizes.append(0)
+        return len(self.scope_parents) - 1
+
+    def add_symbol(self, name: str, kind: str, scope: int) -> int:
+        """Declare `name` in the next free slot of `scope` and return its id."""
+        self.names.append(name)
+        self.kinds.append(kind)
+        self.scopes.append(scope)
+        self.slots.append(self.scope_sizes[scope])
+        self.scope_sizes[scope] += 1
+        return len(self.names) - 1
+
+
+@dataclass
+class Resolution:
+    """Symbol table plus the binding of each resolved AST node, keyed by node id.
+
+    Identifier reads, assignment targets, loop iterators and function
+    definitions are bound; identifiers that do not resolve have no entry.
+    """
+
+    table: SymbolTable = field(default_factory=SymbolTable)
+    bindings: dict[int, Binding] = field(default_factory=dict)
+    # Parameter symbol ids per function definition or lambda node id.
+    param_symbols: dict[int, list[int]] = field(default_factory=dict)
+
+
+class Resolver:
+    """Binds names once, following the runtime scoping every backend emits.
+
+    If, else, loop, function and lambda bodies open scopes. An assignment
+    rebinds a name visible within the enclosing function (or module body)
+    and otherwise declares it in the innermost scope, so block-local names
+    do not leak. Function bodies read, but never rebind, module names.
+    """
+
+    def __init__(self) -> None:
+        self.resolution = Resolution()
+        # Open scopes, innermost last: name -> symbol id, and the scope ids.
+        self._frames: list[dict[str, int]] = []
+        self._frame_scopes: list[int] = []
+        # Frame index where the innermost function body starts.
+        self._function_frame = 0
+        self._released = 0
+
+    def resolve(self, program: Program) -> Resolution:
+        """Resolve a whole module; functions are visible before their definition."""
+        self.begin_module()
+        for stmt in program.statements:
+            if isinstance(stmt, FunctionDefStmt) and stmt.name not in self._frames[0]:
+                self._declare(stmt.name, SYMBOL_FUNCTION)
+        for stmt in program.statements:
+            self._resolve_stmt(stmt)
+        return self.resolution
+
+    def begin_module(self) -> Resolution:
+        """Open the module scope for statement-at-a-time resolution."""
+        self.resolution = Resolution()
+        self._frames = []
+        self._frame_scopes = []
+        # Symbols before this index were kept by `release_statements`.
+        self._released = 0
+        self._push()
+        return self.resolution
+
+    def resolve_statement(self, stmt: Stmt) -> None:
+        """Resolve one top-level statement after `begin_module`."""
+        if isinstance(stmt, FunctionDefStmt) and stmt.name not in self._frames[0]:
+            self._declare(stmt.name, SYMBOL_FUNCTION)
+        self._resolve_stmt(stmt)
+
+    def release_statements(self) -> None:
+        """Forget the bindings and block scopes of statements resolved so far.
+
+        Only the module scope is kept; symbols declared since the last call
+        are renumbered, but keep their slots. Streaming calls this once a
+        statement's IR is built so memory stays flat in module size.
+        """
+        table = self.resolution.table
+        start = self._released
+        declared = list(zip(table.names[start:], table.kinds[start:], table.scopes[start:], table.slots[start:]))
+        for column in (table.names, table.kinds, table.scopes, table.slots):
+            del column[start:]
+        del table.scope_parents[1:]
+        del table.scope_sizes[1:]
+        module_frame = self._frames[0]
+        for name, kind, scope, slot in declared:
+            if scope == 0:
+                module_frame[name] = len(table.names)
+                table.names.append(name)
+                table.kinds.append(kind)
+                table.scopes.append(0)
+                table.slots.append(slot)
+        self._released = len(table)
+        self.resolution.bindings.clear()
+        self.resolution.param_symbols.clear()
+
+    def _resolve_stmt(self, stmt: Stmt) -> None:
+        if isinstance(stmt, AssignmentStmt):
+            self._resolve_expr(stmt.value)
+            binding = self._lookup(stmt.name, self._function_frame)
+            if binding is None:
+                binding = self._declare(stmt.name, SYMBOL_VARIABLE)
+            self._bind(stmt, binding)
+        elif isinstance(stmt, ExpressionStmt):
+            self._resolve_expr(stmt.expr)
+        elif isinstance(stmt, IfStmt):
+            self._resolve_expr(stmt.condition)
+            self._resolve_block(stmt.then_block)
+            if stmt.else_block:
+                self._resolve_block(stmt.else_block)
+        elif isinstance(stmt, LoopStmt):
+            self._resolve_expr(stmt.start)
+            self._resolve_expr(stmt.end)
+            self._push()
+            self._bind(stmt, self._declare(stmt.iterator, SYMBOL_ITERATOR))
+            for item in stmt.body:
+                self._resolve_stmt(item)
+            self._pop()
+        elif isinstance(stmt, FunctionDefStmt):
+            binding = self._lookup(stmt.name, 0)
+            if binding is not None:
+                self._bind(stmt, binding)
+            outer_function = self._function_frame
+            self._function_frame = len(self._frames)
+            self._push()
+            self._declare_params(stmt, stmt.params)
+            for item in stmt.body:
+                self._resolve_stmt(item)
+            if stmt.expr_body is not None:
+                self._resolve_expr(stmt.expr_body)
+            self._pop()
+            self._function_frame = outer_function
+        elif isinstance(stmt, ReturnStmt):
+            if stmt.value is not None:
+                self._resolve_expr(stmt.value)
+        elif isinstance(stmt, MacroStmt):
+            for arg in stmt.args:
+                self._resolve_expr(arg)
+
+    def _resolve_block(self, block: list[Stmt]) -> None:
+        self._push()
+        for item in block:
+            self._resolve_stmt(item)
+        self._pop()
+
+    def _resolve_expr(self, expr: Expr) -> None:
+        if isinstance(expr, IdentifierExpr):
+            binding = self._lookup(expr.name, 0)
+            if binding is not None:
+                self._bind(expr, binding)
+        elif isinstance(expr, LiteralExpr):
+            return
+        elif isinstance(expr, UnaryExpr):
+            self._resolve_expr(expr.operand)
+        elif isinstance(expr, BinaryExpr):
+            self._resolve_expr(expr.left)
+            self._resolve_expr(expr.right)
+        elif isinstance(expr, CallExpr):
+            self._resolve_expr(expr.callee)
+            for arg in expr.args:
+                self._resolve_expr(arg)
+        elif isinstance(expr, LambdaExpr):
+            self._push()
+            self._declare_params(expr, expr.params)
+            self._resolve_expr(expr.body)
+            self._pop()
+
+    def _declare_params(self, owner: Stmt | Expr, params: list[Param]) -> None:
+        symbols = [self._declare(param.name, SYMBOL_PARAM).symbol for param in params]
+        if owner.node_id >= 0:
+            self.resolution.param_symbols[owner.node_id] = symbols
+
+    def _push(self) -> None:
+        parent = self._frame_scopes[-1] if self._frame_scopes else -1
+        self._frames.append({})
+        self._frame_scopes.append(self.resolution.table.add_scope(parent))
+
+    def _pop(self) -> None:
+        self._frames.pop()
+        self._frame_scopes.pop()
+
+    def _declare(self, name: str, kind: str) -> Binding:
+        table = self.resolution.table
+        symbol = table.add_symbol(name, kind, self._frame_scopes[-1])
+        self._frames[-1][name] = symbol
+        return Binding(depth=0, slot=table.slots[symbol], symbol=symbol)
+
+    def _lookup(self, name: str, outermost: int) -> Binding | None:
+        frames = self._frames
+        innermost = len(frames) - 1
+        for index in range(innermost, outermost - 1, -1):
+            symbol = frames[index].get(name)
+            if symbol is not None:
+                return Binding(depth=innermost - index, slot=self.resolution.table.slots[symbol], symbol=symbol)
+        return None
+
+    def _bind(self, node: Stmt | Expr, binding: Binding) -> None:
+        if node.node_id >= 0:
+            self.resolution.bindings[node.node_id] = binding
+
+
+def resolve_program(program: Program) -> Resolution:
+    """Resolve every name of `program`."""
+    return Resolver().resolve(program)
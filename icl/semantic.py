@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable, Iterable
 
 from icl.ast import (
     AssignmentStmt,
     BinaryExpr,
     CallExpr,
+    ErrorStmt,
     Expr,
     ExpressionStmt,
     FunctionDefStmt,
@@ -22,8 +23,10 @@ from icl.ast import (
     ReturnStmt,
     Stmt,
     UnaryExpr,
+    child_nodes,
 )
 from icl.errors import SemanticError
+from icl.resolver import Resolution
 from icl.source_map import SourceSpan
 
 
@@ -33,6 +36,9 @@ TYPE_STR = "Str"
 TYPE_BOOL = "Bool"
 TYPE_VOID = "Void"
 TYPE_FN = "Fn"
+# Concrete numeric types refined from `Num` by `TypeInference`.
+TYPE_INT = "Int"
+TYPE_FLOAT = "Float"
 
 
 @dataclass
@@ -69,33 +75,170 @@ class Scope:
         return None
 
 
+@dataclass
+class StatementDeps:
+    """What one top-level statement saw of, and added to, the global scope."""
+
+    # Global symbols the statement resolved, as they were when it was analyzed.
+    reads: dict[str, SymbolInfo]
+    # Symbol a top-level assignment defined.
+    defined: SymbolInfo | None
+    # Signature registered for a function definition.
+    signature: SymbolInfo | None
+    expr_types: dict[int, str]
+
+
 @dataclass
 class SemanticResult:
     """Semantic model output used by later compiler stages."""
 
     global_scope: Scope
+    # Inferred type per expression, keyed by `AstNode.node_id`.
     inferred_expr_types: dict[int, str]
+    # Dependencies per top-level statement node id, for `SemanticAnalyzer.reanalyze`.
+    dependencies: dict[int, StatementDeps] = field(default_factory=dict)
 
 
 class SemanticAnalyzer:
-    """Performs scope, binding, and type checks."""
-
-    def __init__(self) -> None:
+    """Performs scope, binding, and type checks.
+
+    By default the first `SemanticError` is raised. With `collect_errors`,
+    errors are appended to `errors` instead: a failing expression is typed
+    `Any` and a failing statement skipped, so analysis reaches every
+    statement without cascading reports.
+    """
+
+    def __init__(self, *, collect_errors: bool = False) -> None:
+        self.errors: list[SemanticError] = []
+        self._collect_errors = collect_errors
+        if collect_errors:
+            # Instance attributes shadow the methods, so recursive calls go
+            # through the recovering wrappers and strict analysis pays nothing.
+            self._analyze_stmt = self._analyze_stmt_collecting  # type: ignore[method-assign]
+            self._infer_expr_type = self._infer_expr_type_collecting  # type: ignore[method-assign]
+            self._register_function_signature = self._register_function_signature_collecting  # type: ignore[method-assign]
         self._expr_types: dict[int, str] = {}
+        self._global_scope: Scope | None = None
+        self._signature_lookup: Callable[[str], FunctionDefStmt | None] | None = None
+        self._forward_functions: set[str] = set()
+        self._reads: dict[str, SymbolInfo] = {}
+        # Statements analyzed by the last `reanalyze` call.
+        self.reanalyzed_statements = 0
 
     def analyze(self, program: Program) -> SemanticResult:
         """Run semantic analysis for a full AST."""
         global_scope = Scope(parent=None)
         self._define_builtins(global_scope)
 
+        signatures: dict[int, SymbolInfo] = {}
         for stmt in program.statements:
             if isinstance(stmt, FunctionDefStmt):
                 self._register_function_signature(global_scope, stmt)
+                signatures[stmt.node_id] = global_scope.symbols[stmt.name]
+            elif isinstance(stmt, ErrorStmt) and stmt.is_function and stmt.name not in global_scope.symbols:
+                global_scope.define(SymbolInfo(name=stmt.name, type_name=TYPE_FN, is_function=True, return_type=TYPE_ANY))
 
+        expr_types: dict[int, str] = {}
+        dependencies: dict[int, StatementDeps] = {}
         for stmt in program.statements:
-            self._analyze_stmt(stmt, global_scope, in_function=False, expected_return_type=None)
+            deps = self._analyze_top_level(stmt, global_scope, signatures.get(stmt.node_id))
+            expr_types.update(deps.expr_types)
+            if stmt.node_id >= 0:
+                dependencies[stmt.node_id] = deps
+
+        return SemanticResult(global_scope=global_scope, inferred_expr_types=expr_types, dependencies=dependencies)
 
-        return SemanticResult(global_scope=global_scope, inferred_expr_types=dict(self._expr_types))
+    def reanalyze(
+        self,
+        program: Program,
+        previous: SemanticResult,
+        changed: Iterable[int] = (),
+    ) -> SemanticResult:
+        """Analyze `program` reusing the results of unaffected statements.
+
+        Statements are matched to `previous` by node id. Those missing from it
+        or listed in `changed` are analyzed again, as is any statement for
+        which a global symbol it read, such as a called function's signature,
+        now resolves differently. The result equals `analyze(program)`.
+        """
+        changed_ids = set(changed)
+        old = previous.dependencies
+        global_scope = Scope(parent=None)
+        self._define_builtins(global_scope)
+
+        signatures: dict[int, SymbolInfo] = {}
+        for stmt in program.statements:
+            if isinstance(stmt, FunctionDefStmt):
+                deps = old.get(stmt.node_id)
+                signature = deps.signature if deps is not None and stmt.node_id not in changed_ids else None
+                self._register_function_signature(global_scope, stmt, signature)
+                signatures[stmt.node_id] = global_scope.symbols[stmt.name]
+
+        expr_types: dict[int, str] = {}
+        dependencies: dict[int, StatementDeps] = {}
+        self.reanalyzed_statements = 0
+        symbols = global_scope.symbols
+        for stmt in program.statements:
+            deps = old.get(stmt.node_id)
+            if (
+                deps is None
+                or stmt.node_id in changed_ids
+                or deps.signature is not signatures.get(stmt.node_id)
+                or _reads_changed(deps.reads, symbols)
+            ):
+                deps = self._analyze_top_level(stmt, global_scope, signatures.get(stmt.node_id))
+                self.reanalyzed_statements += 1
+            elif deps.defined is not None:
+                global_scope.define(deps.defined)
+            expr_types.update(deps.expr_types)
+            if stmt.node_id >= 0:
+                dependencies[stmt.node_id] = deps
+
+        return SemanticResult(global_scope=global_scope, inferred_expr_types=expr_types, dependencies=dependencies)
+
+    def begin_module(
+        self,
+        signature_lookup: Callable[[str], FunctionDefStmt | None] | None = None,
+    ) -> Scope:
+        """Create the global scope for statement-at-a-time analysis.
+
+        `signature_lookup` stands in for the up-front signature pass: it is asked
+        for the header of a function defined later in the module whenever a name
+        fails to resolve.
+        """
+        global_scope = Scope(parent=None)
+        self._define_builtins(global_scope)
+        self._global_scope = global_scope
+        self._signature_lookup = signature_lookup
+        self._forward_functions = set()
+        return global_scope
+
+    def analyze_statement(self, stmt: Stmt, scope: Scope) -> SemanticResult:
+        """Analyze one top-level statement against a scope from `begin_module`.
+
+        Only expression types recorded for this statement are returned, so
+        memory does not grow with the number of statements analyzed.
+        """
+        self._expr_types = {}
+        self._reads = {}
+        if isinstance(stmt, FunctionDefStmt):
+            if stmt.name in self._forward_functions:
+                self._forward_functions.discard(stmt.name)
+            else:
+                existing = scope.symbols.get(stmt.name)
+                # A variable rebinding the name is reported as SEM005 below,
+                # matching batch analysis where the signature is registered first.
+                if existing is None or existing.is_function:
+                    self._register_function_signature(scope, stmt)
+        self._analyze_stmt(stmt, scope, in_function=False, expected_return_type=None)
+        return SemanticResult(global_scope=scope, inferred_expr_types=self._expr_types)
+
+    def _analyze_top_level(self, stmt: Stmt, scope: Scope, signature: SymbolInfo | None) -> StatementDeps:
+        self._expr_types = {}
+        self._reads = {}
+        self._analyze_stmt(stmt, scope, in_function=False, expected_return_type=None)
+        defined = scope.symbols[stmt.name] if isinstance(stmt, AssignmentStmt) else None
+        return StatementDeps(reads=self._reads, defined=defined, signature=signature, expr_types=self._expr_types)
 
     def _define_builtins(self, scope: Scope) -> None:
         scope.define(
@@ -109,7 +252,12 @@ class SemanticAnalyzer:
             )
         )
 
-    def _register_function_signature(self, scope: Scope, stmt: FunctionDefStmt) -> None:
+    def _register_function_signature(
+        self,
+        scope: Scope,
+        stmt: FunctionDefStmt,
+        symbol: SymbolInfo | None = None,
+    ) -> None:
         if scope.resolve(stmt.name) and stmt.name in scope.symbols:
             raise SemanticError(
                 code="SEM001",
@@ -117,6 +265,9 @@ class SemanticAnalyzer:
                 span=stmt.span,
                 hint="Use a unique function name or rename the existing function.",
             )
+        if symbol is not None:
+            scope.define(symbol)
+            return
         param_types = [param.type_hint or TYPE_ANY for param in stmt.params]
         scope.define(
             SymbolInfo(
@@ -208,7 +359,7 @@ class SemanticAnalyzer:
             return False
 
         if isinstance(stmt, FunctionDefStmt):
-            fn_symbol = scope.resolve(stmt.name)
+            fn_symbol = self._resolve(scope, stmt.name)
             if fn_symbol is None or not fn_symbol.is_function:
                 raise SemanticError(
                     code="SEM005",
@@ -280,6 +431,12 @@ class SemanticAnalyzer:
                 )
             return True
 
+        if isinstance(stmt, ErrorStmt):
+            # Already reported by the parser; keep what it defines usable.
+            if stmt.name is not None and not stmt.is_function and scope.resolve(stmt.name) is None:
+                scope.define(SymbolInfo(name=stmt.name, type_name=TYPE_ANY))
+            return False
+
         if isinstance(stmt, MacroStmt):
             raise SemanticError(
                 code="SEM010",
@@ -306,7 +463,9 @@ class SemanticAnalyzer:
             return self._record(expr, TYPE_ANY)
 
         if isinstance(expr, IdentifierExpr):
-            symbol = scope.resolve(expr.name)
+            symbol = self._resolve(scope, expr.name)
+            if symbol is None:
+                symbol = self._resolve_forward_function(expr.name)
             if symbol is None:
                 raise SemanticError(
                     code="SEM011",
@@ -406,7 +565,10 @@ class SemanticAnalyzer:
 
             callee_type = self._infer_expr_type(expr.callee, scope)
             if isinstance(expr.callee, IdentifierExpr):
-                symbol = scope.resolve(expr.callee.name)
+                symbol = self._resolve(scope, expr.callee.name)
+                if symbol is None and self._collect_errors:
+                    # The callee was already reported as undefined (SEM011).
+                    return self._record(expr, TYPE_ANY)
                 if symbol is None:
                     raise SemanticError(
                         code="SEM017",
@@ -453,8 +615,63 @@ class SemanticAnalyzer:
             hint="Extend semantic inference for this expression kind.",
         )
 
+    def _analyze_stmt_collecting(
+        self,
+        stmt: Stmt,
+        scope: Scope,
+        in_function: bool,
+        expected_return_type: str | None,
+    ) -> bool:
+        try:
+            return SemanticAnalyzer._analyze_stmt(self, stmt, scope, in_function, expected_return_type)
+        except SemanticError as err:
+            self.errors.append(err)
+            if isinstance(stmt, AssignmentStmt) and scope.resolve(stmt.name) is None:
+                scope.define(SymbolInfo(name=stmt.name, type_name=stmt.type_hint or TYPE_ANY))
+            return False
+
+    def _infer_expr_type_collecting(self, expr: Expr, scope: Scope) -> str:
+        try:
+            return SemanticAnalyzer._infer_expr_type(self, expr, scope)
+        except SemanticError as err:
+            self.errors.append(err)
+            return self._record(expr, TYPE_ANY)
+
+    def _register_function_signature_collecting(
+        self,
+        scope: Scope,
+        stmt: FunctionDefStmt,
+        symbol: SymbolInfo | None = None,
+    ) -> None:
+        try:
+            SemanticAnalyzer._register_function_signature(self, scope, stmt, symbol)
+        except SemanticError as err:
+            self.errors.append(err)
+
+    def _resolve(self, scope: Scope, name: str) -> SymbolInfo | None:
+        current: Scope | None = scope
+        while current is not None:
+            found = current.symbols.get(name)
+            if found is not None:
+                if current.parent is None:
+                    self._reads[name] = found
+                return found
+            current = current.parent
+        return None
+
+    def _resolve_forward_function(self, name: str) -> SymbolInfo | None:
+        if self._signature_lookup is None or self._global_scope is None:
+            return None
+        header = self._signature_lookup(name)
+        if header is None:
+            return None
+        self._register_function_signature(self._global_scope, header)
+        self._forward_functions.add(name)
+        return self._global_scope.resolve(name)
+
     def _record(self, expr: Expr, inferred: str) -> str:
-        self._expr_types[id(expr)] = inferred
+        if expr.node_id >= 0:
+            self._expr_types[expr.node_id] = inferred
         return inferred
 
     @staticmethod
@@ -468,6 +685,323 @@ class SemanticAnalyzer:
         return False
 
 
+@dataclass
+class InferredTypes:
+    """Concrete types solved by `TypeInference`.
+
+    Types are `Int`, `Float`, `Str`, `Bool`, `Fn`, `Void` or `Any`; entries
+    nothing flows into are absent.
+    """
+
+    # Per expression node id.
+    expr_types: dict[int, str] = field(default_factory=dict)
+    # Per resolver symbol id: variables, parameters, iterators, functions.
+    symbol_types: dict[int, str] = field(default_factory=dict)
+    # Per function definition or lambda node id.
+    return_types: dict[int, str] = field(default_factory=dict)
+
+    def param_types(self, resolution: Resolution, owner_id: int) -> list[str | None]:
+        """Parameter types of the function or lambda with node id `owner_id`."""
+        return [self.symbol_types.get(symbol) for symbol in resolution.param_symbols.get(owner_id, [])]
+
+
+def join_types(left: str | None, right: str | None) -> str | None:
+    """Least upper bound of two inferred types; `Int` widens to `Float`."""
+    if left is None or left == right:
+        return right
+    if right is None:
+        return left
+    if left in _NUMERIC_TYPES and right in _NUMERIC_TYPES:
+        return TYPE_FLOAT
+    return TYPE_ANY
+
+
+_NUMERIC_TYPES = frozenset({TYPE_INT, TYPE_FLOAT})
+_BOOL_OPERATORS = frozenset({"==", "!=", "<", "<=", ">", ">=", "&&", "||"})
+
+# Type variable keys: ("sym", symbol id), ("ret", id(fn or lambda)), ("expr", id(expr)).
+_TypeVar = tuple[str, int]
+
+
+@dataclass
+class _Constraint:
+    """`target` is at least `compute()`, which reads the variables in `inputs`."""
+
+    target: _TypeVar
+    inputs: tuple[_TypeVar, ...]
+    compute: Callable[[], str | None]
+
+
+class TypeInference:
+    """Solves concrete types over a type-checked, resolved program.
+
+    Every expression, symbol and function return is a type variable. Values
+    flowing into a variable (assignments, call arguments, returned values)
+    are constraints `variable >= type`, solved to a fixed point over the
+    lattice `Int < Float < Any` (other types only join with themselves to
+    `Any`). Direct calls to functions, and to variables only ever assigned
+    lambdas, pass argument types into parameters; a function or lambda used
+    any other way may be called with anything, so its parameters fall back
+    to their annotation (`Num` as `Float`) or `Any`.
+
+    Constraints are gathered node by node: `enter` each node in pre-order,
+    `leave` it after its children, then `finish`. Which calls reach which
+    functions is only known once the whole program has been seen, so call
+    constraints are resolved in `finish`. `infer` does the walk itself; a
+    builder that already walks the AST can drive `enter`/`leave` instead.
+    """
+
+    def __init__(self, resolution: Resolution) -> None:
+        self._resolution = resolution
+        self._types: dict[_TypeVar, str | None] = {}
+        self._constraints: list[_Constraint] = []
+        self._users: dict[_TypeVar, list[_Constraint]] = {}
+        # Functions and lambdas per symbol that names or holds them.
+        self._callables: dict[int, list[FunctionDefStmt | LambdaExpr]] = {}
+        self._escaped: set[int] = set()
+        self._called: set[int] = set()
+        # Symbols read other than as a direct callee; escaped if they name a callable.
+        self._referenced: set[int] = set()
+        self._callees: set[int] = set()
+        self._assigned_lambdas: set[int] = set()
+        self._calls: list[tuple[CallExpr, _TypeVar]] = []
+        self._returns: list[FunctionDefStmt | LambdaExpr] = []
+        # Nodes whose solved types are reported, in pre-order.
+        self._typed: list[Expr | FunctionDefStmt] = []
+
+    def infer(self, program: Program) -> InferredTypes:
+        """Solve and return the concrete types of `program`."""
+        for stmt in program.statements:
+            self._constrain(stmt)
+        return self.finish()
+
+    def enter(self, node: Stmt | Expr) -> None:
+        """Add the constraints of `node` itself; its children are entered separately."""
+        if isinstance(node, Expr):
+            self._enter_expr(node)
+            return
+        if isinstance(node, AssignmentStmt):
+            symbol = self._symbol(node)
+            if isinstance(node.value, LambdaExpr):
+                self._assigned_lambdas.add(id(node.value))
+            if symbol is not None:
+                if isinstance(node.value, LambdaExpr):
+                    self._callables.setdefault(symbol, []).append(node.value)
+                else:
+                    # Also holds non-lambda values, so calls through it are opaque.
+                    self._escaped.add(symbol)
+                self._flow(("expr", id(node.value)), ("sym", symbol))
+        elif isinstance(node, LoopStmt):
+            symbol = self._symbol(node)
+            if symbol is not None:
+                self._lower(("sym", symbol), TYPE_INT)
+        elif isinstance(node, FunctionDefStmt):
+            self._typed.append(node)
+            self._constrain_hints(node)
+            symbol = self._symbol(node)
+            if symbol is not None:
+                self._callables.setdefault(symbol, []).append(node)
+                self._lower(("sym", symbol), TYPE_FN)
+            self._returns.append(node)
+            if node.expr_body is not None:
+                self._flow(("expr", id(node.expr_body)), ("ret", id(node)))
+        elif isinstance(node, ReturnStmt):
+            if self._returns:
+                target = ("ret", id(self._returns[-1]))
+                if node.value is None:
+                    self._lower(target, TYPE_VOID)
+                else:
+                    self._flow(("expr", id(node.value)), target)
+
+    def leave(self, node: Stmt | Expr) -> None:
+        """Close `node` once all of its children have been entered."""
+        if isinstance(node, FunctionDefStmt):
+            self._returns.pop()
+
+    def finish(self) -> InferredTypes:
+        """Resolve call constraints, solve, and return the concrete types."""
+        self._escaped.update(symbol for symbol in self._referenced if symbol in self._callables)
+        for expr, var in self._calls:
+            self._constrain_call(expr, var)
+        self._seed_uncalled()
+        self._solve()
+        return self._result()
+
+    def _constrain(self, node: Stmt | Expr) -> None:
+        self.enter(node)
+        for child in child_nodes(node):
+            self._constrain(child)
+        self.leave(node)
+
+    def _enter_expr(self, expr: Expr) -> None:
+        self._typed.append(expr)
+        var: _TypeVar = ("expr", id(expr))
+        if isinstance(expr, LiteralExpr):
+            self._lower(var, _literal_type(expr.value))
+        elif isinstance(expr, IdentifierExpr):
+            symbol = self._symbol(expr)
+            if symbol is None:
+                self._lower(var, TYPE_ANY)
+                return
+            if id(expr) not in self._callees:
+                self._referenced.add(symbol)
+            self._flow(("sym", symbol), var)
+        elif isinstance(expr, UnaryExpr):
+            operand: _TypeVar = ("expr", id(expr.operand))
+            if expr.operator == "!":
+                self._lower(var, TYPE_BOOL)
+            else:
+                self._derive(var, (operand,), lambda: self._types.get(operand))
+        elif isinstance(expr, BinaryExpr):
+            left: _TypeVar = ("expr", id(expr.left))
+            right: _TypeVar = ("expr", id(expr.right))
+            if expr.operator in _BOOL_OPERATORS:
+                self._lower(var, TYPE_BOOL)
+            else:
+                operator = expr.operator
+                self._derive(var, (left, right), lambda: _arithmetic_type(operator, self._types.get(left), self._types.get(right)))
+        elif isinstance(expr, CallExpr):
+            if isinstance(expr.callee, IdentifierExpr):
+                self._callees.add(id(expr.callee))
+                symbol = self._symbol(expr.callee)
+                if symbol is not None:
+                    self._called.add(symbol)
+            self._calls.append((expr, var))
+        elif isinstance(expr, LambdaExpr):
+            if id(expr) not in self._assigned_lambdas:
+                self._seed_params(expr)
+            self._constrain_hints(expr)
+            self._lower(var, TYPE_FN)
+            self._flow(("expr", id(expr.body)), ("ret", id(expr)))
+
+    def _seed_uncalled(self) -> None:
+        for symbol, callables in self._callables.items():
+            if symbol in self._escaped or symbol not in self._called:
+                for function in callables:
+                    self._seed_params(function)
+
+    def _seed_params(self, function: FunctionDefStmt | LambdaExpr) -> None:
+        symbols = self._resolution.param_symbols.get(function.node_id, [])
+        for param, symbol in zip(function.params, symbols):
+            self._lower(("sym", symbol), _hint_type(param.type_hint) or TYPE_ANY)
+
+    def _constrain_call(self, expr: CallExpr, var: _TypeVar) -> None:
+        callables: list[FunctionDefStmt | LambdaExpr] = []
+        if isinstance(expr.callee, IdentifierExpr):
+            symbol = self._symbol(expr.callee)
+            if symbol is not None and symbol not in self._escaped:
+                callables = self._callables.get(symbol, [])
+        if not callables:
+            self._lower(var, TYPE_ANY)
+            return
+        args: list[_TypeVar] = [("expr", id(arg)) for arg in expr.args]
+        for function in callables:
+            symbols = self._resolution.param_symbols.get(function.node_id, [])
+            for arg, symbol in zip(args, symbols):
+                self._flow(arg, ("sym", symbol))
+            self._flow(("ret", id(function)), var)
+
+    def _constrain_hints(self, function: FunctionDefStmt | LambdaExpr) -> None:
+        # Non-numeric annotations pin a type; `Num` leaves Int or Float open.
+        symbols = self._resolution.param_symbols.get(function.node_id, [])
+        for param, symbol in zip(function.params, symbols):
+            if param.type_hint in {TYPE_STR, TYPE_BOOL, TYPE_FN}:
+                self._lower(("sym", symbol), param.type_hint)
+        if function.return_type in {TYPE_STR, TYPE_BOOL, TYPE_FN, TYPE_VOID}:
+            self._lower(("ret", id(function)), function.return_type)
+
+    def _lower(self, var: _TypeVar, type_name: str) -> None:
+        self._derive(var, (), lambda: type_name)
+
+    def _flow(self, source: _TypeVar, target: _TypeVar) -> None:
+        self._derive(target, (source,), lambda: self._types.get(source))
+
+    def _derive(self, target: _TypeVar, inputs: tuple[_TypeVar, ...], compute: Callable[[], str | None]) -> None:
+        constraint = _Constraint(target=target, inputs=inputs, compute=compute)
+        self._constraints.append(constraint)
+        for var in inputs:
+            self._users.setdefault(var, []).append(constraint)
+
+    def _solve(self) -> None:
+        types = self._types
+        pending = list(self._constraints)
+        while pending:
+            constraint = pending.pop()
+            current = types.get(constraint.target)
+            joined = join_types(current, constraint.compute())
+            if joined != current:
+                types[constraint.target] = joined
+                pending.extend(self._users.get(constraint.target, ()))
+
+    def _result(self) -> InferredTypes:
+        result = InferredTypes()
+        types = self._types
+        for node in self._typed:
+            if node.node_id < 0:
+                continue
+            if isinstance(node, Expr):
+                found = types.get(("expr", id(node)))
+                if found is not None:
+                    result.expr_types[node.node_id] = found
+            if isinstance(node, (FunctionDefStmt, LambdaExpr)):
+                found = types.get(("ret", id(node)))
+                if found is not None:
+                    result.return_types[node.node_id] = found
+        for (kind, key), found in types.items():
+            if kind == "sym" and found is not None:
+                result.symbol_types[key] = found
+        return result
+
+    def _symbol(self, node: Stmt | Expr) -> int | None:
+        binding = self._resolution.bindings.get(node.node_id)
+        return binding.symbol if binding is not None else None
+
+
+def infer_types(program: Program, resolution: Resolution) -> InferredTypes:
+    """Solve concrete types for a program that passed `SemanticAnalyzer`."""
+    return TypeInference(resolution).infer(program)
+
+
+def _hint_type(type_hint: str | None) -> str | None:
+    if type_hint == TYPE_NUM:
+        return TYPE_FLOAT
+    if type_hint in {TYPE_STR, TYPE_BOOL, TYPE_FN}:
+        return type_hint
+    return None
+
+
+def _literal_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return TYPE_BOOL
+    if isinstance(value, int):
+        return TYPE_INT
+    if isinstance(value, float):
+        return TYPE_FLOAT
+    if isinstance(value, str):
+        return TYPE_STR
+    return TYPE_VOID
+
+
+def _arithmetic_type(operator: str, left: str | None, right: str | None) -> str | None:
+    if left is None or right is None:
+        return None
+    if operator == "+" and TYPE_STR in {left, right}:
+        return TYPE_STR
+    if left not in _NUMERIC_TYPES or right not in _NUMERIC_TYPES:
+        return TYPE_ANY
+    if operator == "/":
+        return TYPE_FLOAT
+    return join_types(left, right)
+
+
+def _reads_changed(reads: dict[str, SymbolInfo], symbols: dict[str, SymbolInfo]) -> bool:
+    for name, symbol in reads.items():
+        current = symbols.get(name)
+        if current is not symbol and current != symbol:
+            return True
+    return False
+
+
 def span_or_none(node: Any) -> SourceSpan | None:
     """Best-effort span extraction helper for diagnostics."""
     return getattr(node, "span", None)
@@ -2,12 +2,47 @@
 
 from __future__ import annotations
 
+from dataclasses import fields
 import json
 from pathlib import Path
-from typing import Any
+import struct
+from typing import Any, Final
 
 from icl.graph import IntentGraph
-from icl.source_map import SourceMap
+from icl.ir import (
+    IRAssignment,
+    IRBinary,
+    IRCall,
+    IRExpressionStmt,
+    IRFunction,
+    IRIf,
+    IRLambda,
+    IRLiteral,
+    IRLoop,
+    IRModule,
+    IRParam,
+    IRRef,
+    IRReturn,
+    IRUnary,
+    assign_content_hashes,
+)
+from icl.lowering import (
+    LoweredAssignment,
+    LoweredBinary,
+    LoweredCall,
+    LoweredExpressionStmt,
+    LoweredFunction,
+    LoweredIf,
+    LoweredLambda,
+    LoweredLiteral,
+    LoweredLoop,
+    LoweredModule,
+    LoweredRef,
+    LoweredReturn,
+    LoweredUnary,
+)
+from icl.resolver import Binding
+from icl.source_map import SourceMap, SourceSpan
 
 
 def graph_to_json(graph: IntentGraph, indent: int = 2) -> str:
@@ -32,3 +67,220 @@ def write_source_map(source_map: SourceMap, path: str | Path) -> None:
     target = Path(path)
     payload: dict[str, Any] = source_map.to_dict()
     target.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+
+# Binary module format: MAGIC, FORMAT_VERSION, the string table (count, then
+# length-prefixed UTF-8 strings), then one tagged value tree. Integers are
+# LEB128 varints, signed ones zigzag-encoded. Bump the version whenever a
+# serialized dataclass changes its fields or `_BINARY_CLASSES` its order.
+BINARY_MAGIC: Final[bytes] = b"ICLB"
+BINARY_FORMAT_VERSION: Final[int] = 2
+
+_BINARY_CLASSES: Final[tuple[type, ...]] = (
+    IRModule,
+    IRParam,
+    IRAssignment,
+    IRExpressionStmt,
+    IRIf,
+    IRLoop,
+    IRFunction,
+    IRReturn,
+    IRLiteral,
+    IRRef,
+    IRUnary,
+    IRBinary,
+    IRCall,
+    IRLambda,
+    LoweredModule,
+    LoweredAssignment,
+    LoweredExpressionStmt,
+    LoweredIf,
+    LoweredLoop,
+    LoweredFunction,
+    LoweredReturn,
+    LoweredLiteral,
+    LoweredRef,
+    LoweredUnary,
+    LoweredBinary,
+    LoweredCall,
+    LoweredLambda,
+)
+_CLASS_CODES: Final[dict[type, int]] = {cls: code for code, cls in enumerate(_BINARY_CLASSES)}
+_CLASS_FIELDS: Final[tuple[tuple[str, ...], ...]] = tuple(
+    tuple(item.name for item in fields(cls)) for cls in _BINARY_CLASSES
+)
+
+_TAG_NONE, _TAG_FALSE, _TAG_TRUE, _TAG_INT, _TAG_FLOAT, _TAG_STR = 0, 1, 2, 3, 4, 5
+_TAG_LIST, _TAG_DICT, _TAG_NODE, _TAG_SPAN, _TAG_BINDING = 6, 7, 8, 9, 10
+_DOUBLE = struct.Struct("<d")
+
+
+def module_to_binary(module: IRModule | LoweredModule) -> bytes:
+    """Encode an IR or lowered module in the compact binary format.
+
+    IR modules are content-hashed first if they are not already, so the
+    encoding carries their hashes.
+    """
+    if isinstance(module, IRModule) and not module.content_hash:
+        assign_content_hashes(module)
+    strings: dict[str, int] = {}
+    body = bytearray()
+    _encode_value(module, body, strings)
+    out = bytearray(BINARY_MAGIC)
+    out.append(BINARY_FORMAT_VERSION)
+    _write_varint(out, len(strings))
+    for text in strings:
+        encoded = text.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+    out += body
+    return bytes(out)
+
+
+def module_from_binary(data: bytes) -> IRModule | LoweredModule:
+    """Decode a module written by `module_to_binary`."""
+    if data[:4] != BINARY_MAGIC:
+        raise ValueError("Not an ICL binary module.")
+    if len(data) < 5 or data[4] != BINARY_FORMAT_VERSION:
+        found = data[4] if len(data) > 4 else None
+        raise ValueError(f"Unsupported ICL binary format version {found}; expected {BINARY_FORMAT_VERSION}.")
+    return _decode(data)
+
+
+def write_module(module: IRModule | LoweredModule, path: str | Path) -> None:
+    """Write a binary-encoded module to path."""
+    Path(path).write_bytes(module_to_binary(module))
+
+
+def read_module(path: str | Path) -> IRModule | LoweredModule:
+    """Read a binary-encoded module from path."""
+    return module_from_binary(Path(path).read_bytes())
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode_value(value: Any, out: bytearray, strings: dict[str, int]) -> None:
+    # `type(...) is` keeps bool apart from int and stays on the fast path.
+    kind = type(value)
+    if kind is str:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        out.append(_TAG_STR)
+        _write_varint(out, index)
+    elif value is None:
+        out.append(_TAG_NONE)
+    elif kind is bool:
+        out.append(_TAG_TRUE if value else _TAG_FALSE)
+    elif kind is int:
+        out.append(_TAG_INT)
+        _write_varint(out, value << 1 if value >= 0 else (~value << 1) | 1)
+    elif kind is float:
+        out.append(_TAG_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif kind is list:
+        out.append(_TAG_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode_value(item, out, strings)
+    elif kind is dict:
+        out.append(_TAG_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode_value(key, out, strings)
+            _encode_value(item, out, strings)
+    elif kind is SourceSpan:
+        out.append(_TAG_SPAN)
+        file, *numbers = value.coordinates()
+        _encode_value(file, out, strings)
+        for number in numbers:
+            _write_varint(out, number)
+    elif kind is Binding:
+        out.append(_TAG_BINDING)
+        _write_varint(out, value.depth)
+        _write_varint(out, value.slot)
+        _write_varint(out, value.symbol)
+    else:
+        code = _CLASS_CODES.get(kind)
+        if code is None:
+            raise ValueError(f"Cannot binary-encode {kind.__name__} values.")
+        out.append(_TAG_NODE)
+        _write_varint(out, code)
+        state = value.__dict__
+        for name in _CLASS_FIELDS[code]:
+            _encode_value(state[name], out, strings)
+
+
+def _decode(data: bytes) -> Any:
+    # Closures over local state: this is the hot loop of cache loads.
+    pos = 5
+    classes = _BINARY_CLASSES
+    class_fields = _CLASS_FIELDS
+    unpack_double = _DOUBLE.unpack_from
+
+    def read_varint() -> int:
+        nonlocal pos
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            return byte
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        return value
+
+    def read_text() -> str:
+        nonlocal pos
+        length = read_varint()
+        pos += length
+        return data[pos - length : pos].decode("utf-8")
+
+    strings = [read_text() for _ in range(read_varint())]
+
+    def read() -> Any:
+        nonlocal pos
+        tag = data[pos]
+        pos += 1
+        if tag == _TAG_STR:
+            return strings[read_varint()]
+        if tag == _TAG_NODE:
+            code = read_varint()
+            cls = classes[code]
+            node = cls.__new__(cls)
+            node.__dict__.update({name: read() for name in class_fields[code]})
+            return node
+        if tag == _TAG_NONE:
+            return None
+        if tag == _TAG_LIST:
+            return [read() for _ in range(read_varint())]
+        if tag == _TAG_INT:
+            raw = read_varint()
+            return ~(raw >> 1) if raw & 1 else raw >> 1
+        if tag == _TAG_SPAN:
+            return SourceSpan(read(), read_varint(), read_varint(), read_varint(), read_varint())
+        if tag == _TAG_TRUE:
+            return True
+        if tag == _TAG_FALSE:
+            return False
+        if tag == _TAG_FLOAT:
+            pos += _DOUBLE.size
+            return unpack_double(data, pos - _DOUBLE.size)[0]
+        if tag == _TAG_DICT:
+            return {read(): read() for _ in range(read_varint())}
+        if tag == _TAG_BINDING:
+            return Binding(read_varint(), read_varint(), read_varint())
+        raise ValueError(f"Unknown ICL binary tag {tag} at byte {pos - 1}.")
+
+    value = read()
+    if pos != len(data):
+        raise ValueError("Trailing bytes after ICL binary module.")
+    return value
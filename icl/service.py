@@ -6,20 +6,22 @@ adapters so non-human clients can call compiler capabilities deterministically.
 
 from __future__ import annotations
 
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 from typing import Any, Callable
 
-from icl.errors import CLIError, CompilerError
+from icl.errors import CLIError, CompilerError, DiagnosticsError
 from icl.graph import IntentGraph, diff_graphs
 from icl.main import (
     build_pack_registry,
     build_plugin_manager,
-    compile_source,
+    check_source,
     compile_targets,
     compress_source,
     default_pack_registry,
     explain_source,
 )
+from icl.mapped_source import MappedSource
 from icl.serialization import graph_from_json
 
 
@@ -29,6 +31,9 @@ def compile_request(payload: dict[str, Any]) -> dict[str, Any]:
     targets = _resolve_targets(payload)
 
     optimize = bool(payload.get("optimize", False))
+    opt_level = payload.get("opt_level")
+    opt_level = None if opt_level is None else int(opt_level)
+    drop_unused_functions = bool(payload.get("drop_unused_functions", False))
     debug = bool(payload.get("debug", False))
     include_graph = bool(payload.get("include_graph", False))
     include_source_map = bool(payload.get("include_source_map", False))
@@ -48,17 +53,21 @@ def compile_request(payload: dict[str, Any]) -> dict[str, Any]:
     )
     pack_registry = build_pack_registry(packs)
 
-    multi = compile_targets(
-        source,
-        filename=filename,
-        targets=targets,
-        plugin_manager=manager,
-        pack_registry=pack_registry,
-        optimize=optimize,
-        debug=debug,
-        natural_aliases=natural_aliases,
-        alias_mode=alias_mode,
-    )
+    with _source_scope(source):
+        multi = compile_targets(
+            source,
+            filename=filename,
+            targets=targets,
+            plugin_manager=manager,
+            pack_registry=pack_registry,
+            optimize=optimize,
+            opt_level=opt_level,
+            drop_unused_functions=drop_unused_functions,
+            debug=debug,
+            pass_metrics=True,
+            natural_aliases=natural_aliases,
+            alias_mode=alias_mode,
+        )
 
     if len(targets) == 1:
         target = targets[0]
@@ -70,6 +79,7 @@ def compile_request(payload: dict[str, Any]) -> dict[str, Any]:
                 "tokens": len(multi.tokens),
                 "nodes": len(emitted.graph.nodes),
                 "edges": len(emitted.graph.edges),
+                "passes": multi.passes.to_dict(),
             },
         }
         if include_graph:
@@ -95,6 +105,16 @@ def compile_request(payload: dict[str, Any]) -> dict[str, Any]:
             result["optimization"] = {
                 "folded_operations": emitted.optimization.folded_operations,
                 "removed_assignments": emitted.optimization.removed_assignments,
+                "pruned_branches": emitted.optimization.pruned_branches,
+                "inlined_calls": emitted.optimization.inlined_calls,
+                "evaluated_calls": emitted.optimization.evaluated_calls,
+                "propagated_constants": emitted.optimization.propagated_constants,
+                "propagated_copies": emitted.optimization.propagated_copies,
+                "removed_loops": emitted.optimization.removed_loops,
+                "reduced_loops": emitted.optimization.reduced_loops,
+                "unrolled_loops": emitted.optimization.unrolled_loops,
+                "hoisted_expressions": emitted.optimization.hoisted_expressions,
+                "removed_functions": emitted.optimization.removed_functions,
                 "notes": emitted.optimization.notes,
             }
         return result
@@ -123,6 +143,16 @@ def compile_request(payload: dict[str, Any]) -> dict[str, Any]:
             payload_item["optimization"] = {
                 "folded_operations": emitted.optimization.folded_operations,
                 "removed_assignments": emitted.optimization.removed_assignments,
+                "pruned_branches": emitted.optimization.pruned_branches,
+                "inlined_calls": emitted.optimization.inlined_calls,
+                "evaluated_calls": emitted.optimization.evaluated_calls,
+                "propagated_constants": emitted.optimization.propagated_constants,
+                "propagated_copies": emitted.optimization.propagated_copies,
+                "removed_loops": emitted.optimization.removed_loops,
+                "reduced_loops": emitted.optimization.reduced_loops,
+                "unrolled_loops": emitted.optimization.unrolled_loops,
+                "hoisted_expressions": emitted.optimization.hoisted_expressions,
+                "removed_functions": emitted.optimization.removed_functions,
                 "notes": emitted.optimization.notes,
             }
         outputs[target] = payload_item
@@ -132,6 +162,7 @@ def compile_request(payload: dict[str, Any]) -> dict[str, Any]:
         "outputs": outputs,
         "metrics": {
             "tokens": len(multi.tokens),
+            "passes": multi.passes.to_dict(),
         },
     }
     if include_source_map:
@@ -153,15 +184,16 @@ def check_request(payload: dict[str, Any]) -> dict[str, Any]:
     plugins = _normalize_plugins(payload.get("plugins"))
     packs = _normalize_plugins(payload.get("packs"))
 
-    artifacts = compile_source(
-        source,
-        filename=filename,
-        target="python",
-        plugin_specs=plugins,
-        pack_specs=packs,
-        natural_aliases=natural_aliases,
-        alias_mode=alias_mode,
-    )
+    # A failure raises `DiagnosticsError`, which carries every diagnostic.
+    with _source_scope(source):
+        artifacts = check_source(
+            source,
+            filename=filename,
+            plugin_specs=plugins,
+            pack_registry=build_pack_registry(packs),
+            natural_aliases=natural_aliases,
+            alias_mode=alias_mode,
+        )
 
     return {
         "ok": True,
@@ -185,13 +217,14 @@ def explain_request(payload: dict[str, Any]) -> dict[str, Any]:
 
     manager = build_plugin_manager(plugins, natural_aliases=natural_aliases, alias_mode=alias_mode)
     pack_registry = build_pack_registry(packs)
-    explained = explain_source(
-        source,
-        filename=filename,
-        target=target,
-        plugin_manager=manager,
-        pack_registry=pack_registry,
-    )
+    with _source_scope(source):
+        explained = explain_source(
+            source,
+            filename=filename,
+            target=target,
+            plugin_manager=manager,
+            pack_registry=pack_registry,
+        )
     if include_alias_trace:
         explained["alias_trace"] = _extract_alias_trace(manager.metadata_snapshot())
     return explained
@@ -200,8 +233,10 @@ def explain_request(payload: dict[str, Any]) -> dict[str, Any]:
 def compress_request(payload: dict[str, Any]) -> dict[str, Any]:
     """Return canonical compact form for source payload."""
     source, filename = _resolve_source_payload(payload)
+    with _source_scope(source):
+        compressed = compress_source(source, filename=filename)
     return {
-        "compressed": compress_source(source, filename=filename),
+        "compressed": compressed,
     }
 
 
@@ -269,7 +304,8 @@ def dispatch(method: str, payload: dict[str, Any] | None = None) -> dict[str, An
     return fn(payload or {})
 
 
-def _resolve_source_payload(payload: dict[str, Any]) -> tuple[str, str]:
+def _resolve_source_payload(payload: dict[str, Any]) -> tuple[str | MappedSource, str]:
+    """Return inline source text, or a memory-mapped `input_path` file."""
     source = payload.get("source")
     input_path = payload.get("input_path")
 
@@ -284,7 +320,7 @@ def _resolve_source_payload(payload: dict[str, Any]) -> tuple[str, str]:
     if input_path is not None:
         path = Path(str(input_path))
         try:
-            return path.read_text(encoding="utf-8"), str(path)
+            return MappedSource(path), str(path)
         except FileNotFoundError as exc:
             raise CLIError(
                 code="SRV003",
@@ -304,6 +340,11 @@ def _resolve_source_payload(payload: dict[str, Any]) -> tuple[str, str]:
     )
 
 
+def _source_scope(source: str | MappedSource) -> AbstractContextManager[Any]:
+    """Context that unmaps a mapped source once the request is compiled."""
+    return source if isinstance(source, MappedSource) else nullcontext()
+
+
 def _resolve_targets(payload: dict[str, Any]) -> list[str]:
     target = payload.get("target")
     targets = payload.get("targets")
@@ -423,7 +464,10 @@ def safe_dispatch(method: str, payload: dict[str, Any] | None = None) -> tuple[b
     try:
         return True, dispatch(method, payload)
     except CompilerError as err:
-        return False, {"error": err.to_diagnostic().to_dict()}
+        response: dict[str, Any] = {"error": err.to_diagnostic().to_dict()}
+        if isinstance(err, DiagnosticsError):
+            response["diagnostics"] = [diag.to_dict() for diag in err.diagnostics]
+        return False, response
     except Exception as err:  # pragma: no cover - defensive fallback
         return False, {
             "error": {
@@ -2,32 +2,225 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_right
+from dataclasses import FrozenInstanceError, dataclass, field
+from itertools import count
 from typing import Any
 
 
-@dataclass(frozen=True)
+_FILE_IDS = count(1)
+
+
+class SourceFile:
+    """Line-start index for one source text, shared by every span into it.
+
+    Offsets are character positions relative to `base` (0 for a whole file).
+    An index may cover only a window of the file (as when lexing in chunks or
+    re-lexing an edited region): `first_line` is the number of the line
+    beginning at the first recorded line start. That start is negative when
+    the window opens mid-line.
+    """
+
+    __slots__ = ("name", "file_id", "base", "first_line", "line_starts")
+
+    def __init__(self, name: str, *, first_line: int = 1, line_start: int = 0, base: int = 0) -> None:
+        self.name = name
+        self.file_id = next(_FILE_IDS)
+        self.base = base
+        self.first_line = first_line
+        self.line_starts = array("i", [line_start])
+
+    @classmethod
+    def from_text(cls, name: str, text: str) -> SourceFile:
+        """Build a complete line index for `text`."""
+        source = cls(name)
+        newline = text.find("\n")
+        while newline != -1:
+            source.line_starts.append(newline + 1)
+            newline = text.find("\n", newline + 1)
+        return source
+
+    def add_line_start(self, offset: int) -> None:
+        """Record that a new line begins at `offset`; offsets must increase."""
+        self.line_starts.append(offset)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the 1-based line and column of an offset."""
+        line_starts = self.line_starts
+        line_index = bisect_right(line_starts, offset) - 1
+        if line_index < 0:
+            line_index = 0
+        return self.first_line + line_index, offset - line_starts[line_index] + 1
+
+    def last_line(self) -> tuple[int, int]:
+        """Return the number and start offset of the last recorded line."""
+        return self.first_line + len(self.line_starts) - 1, self.line_starts[-1]
+
+    def span(self, start: int, end: int) -> SourceSpan:
+        """Return the span covering offsets `[start, end)` of this file."""
+        return SourceSpan.from_offsets(self, start, end)
+
+    def __repr__(self) -> str:
+        return (
+            f"SourceFile(name={self.name!r}, file_id={self.file_id}, base={self.base}, "
+            f"first_line={self.first_line}, lines={len(self.line_starts)})"
+        )
+
+
+_new_span = object.__new__
+_set_slot = object.__setattr__
+_OFFSET_MASK = 0xFFFFFFFF
+
+
 class SourceSpan:
-    """Represents a source range in 1-based coordinates."""
+    """Represents a source range in 1-based coordinates.
+
+    Spans made by the lexer hold only `(file_id, start, end)` offsets into a
+    shared `SourceFile`, and resolve line and column on access. Spans built
+    from explicit coordinates keep those coordinates instead. Both kinds
+    compare, hash, pickle and serialize by their resolved coordinates.
+    """
+
+    # Offset spans pack `start << 32 | end` into `_range`; coordinate spans
+    # have no `_source` and keep their five-tuple there instead.
+    __slots__ = ("_source", "_range")
+
+    def __init__(self, file: str, line: int, column: int, end_line: int, end_column: int) -> None:
+        _set_slot(self, "_source", None)
+        _set_slot(self, "_range", (file, line, column, end_line, end_column))
+
+    @classmethod
+    def from_offsets(cls, source: SourceFile, start: int, end: int) -> SourceSpan:
+        """Create a span covering offsets `[start, end)` of `source`."""
+        span = _new_span(cls)
+        _set_slot(span, "_source", source)
+        _set_slot(span, "_range", start << 32 | end)
+        return span
+
+    @property
+    def source(self) -> SourceFile | None:
+        """Line index this span points into, if it is offset-based."""
+        return self._source
 
-    file: str
-    line: int
-    column: int
-    end_line: int
-    end_column: int
+    @property
+    def file_id(self) -> int | None:
+        return None if self._source is None else self._source.file_id
+
+    @property
+    def start(self) -> int | None:
+        """Absolute start offset, if the span is offset-based."""
+        if self._source is None:
+            return None
+        return self._source.base + (self._range >> 32)
+
+    @property
+    def end(self) -> int | None:
+        """Absolute end offset (exclusive), if the span is offset-based."""
+        if self._source is None:
+            return None
+        return self._source.base + (self._range & _OFFSET_MASK)
+
+    @property
+    def file(self) -> str:
+        if self._source is None:
+            return self._range[0]
+        return self._source.name
+
+    @property
+    def line(self) -> int:
+        if self._source is None:
+            return self._range[1]
+        return self._source.position(self._range >> 32)[0]
+
+    @property
+    def column(self) -> int:
+        if self._source is None:
+            return self._range[2]
+        return self._source.position(self._range >> 32)[1]
+
+    @property
+    def end_line(self) -> int:
+        if self._source is None:
+            return self._range[3]
+        return self._source.position(self._range & _OFFSET_MASK)[0]
+
+    @property
+    def end_column(self) -> int:
+        if self._source is None:
+            return self._range[4]
+        return self._source.position(self._range & _OFFSET_MASK)[1]
+
+    def coordinates(self) -> tuple[str, int, int, int, int]:
+        """Return `(file, line, column, end_line, end_column)`."""
+        source = self._source
+        if source is None:
+            return self._range
+        packed = self._range
+        line, column = source.position(packed >> 32)
+        end_line, end_column = source.position(packed & _OFFSET_MASK)
+        return source.name, line, column, end_line, end_column
 
     def to_dict(self) -> dict[str, Any]:
         """Serialize the span to a JSON-compatible mapping."""
+        file, line, column, end_line, end_column = self.coordinates()
         return {
-            "file": self.file,
-            "line": self.line,
-            "column": self.column,
-            "end_line": self.end_line,
-            "end_column": self.end_column,
+            "file": file,
+            "line": line,
+            "column": column,
+            "end_line": end_line,
+            "end_column": end_column,
         }
 
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self._source is not None and self._source is other._source:
+            return self._range == other._range
+        return self.coordinates() == other.coordinates()
 
-@dataclass
+    def __hash__(self) -> int:
+        return hash(self.coordinates())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Line indexes are process-local; pickles carry resolved coordinates.
+        return (SourceSpan, self.coordinates())
+
+    def __copy__(self) -> SourceSpan:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> SourceSpan:
+        return self
+
+    def __repr__(self) -> str:
+        file, line, column, end_line, end_column = self.coordinates()
+        return (
+            f"SourceSpan(file={file!r}, line={line}, column={column}, "
+            f"end_line={end_line}, end_column={end_column})"
+        )
+
+
+def merge_spans(start: SourceSpan, end: SourceSpan) -> SourceSpan:
+    """Return the span running from the start of `start` to the end of `end`."""
+    source = start._source
+    if source is not None and source is end._source:
+        return SourceSpan.from_offsets(source, start._range >> 32, end._range & _OFFSET_MASK)
+    return SourceSpan(
+        file=start.file,
+        line=start.line,
+        column=start.column,
+        end_line=end.end_line,
+        end_column=end.end_column,
+    )
+
+
+@dataclass(slots=True)
 class SourceMapEntry:
     """Maps a graph node to source code provenance metadata."""
 
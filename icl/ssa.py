@@ -0,0 +1,416 @@
+"""Static single assignment view of IR: versioned definitions, phis and use-def chains."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from icl.ir import (
+    IRAssignment,
+    IRBinary,
+    IRCall,
+    IRExpressionStmt,
+    IRFunction,
+    IRIf,
+    IRLambda,
+    IRLiteral,
+    IRLoop,
+    IRModule,
+    IRRef,
+    IRReturn,
+    IRStmt,
+    IRUnary,
+)
+from icl.resolver import Binding
+from icl.visitor import NodeVisitor
+
+
+SSA_ASSIGN = "assign"
+SSA_PHI = "phi"
+SSA_ENTRY = "entry"
+
+
+@dataclass(eq=False)
+class SSADef:
+    """One version of a variable.
+
+    An `assign` def is an `IRAssignment` (`node`); a `phi` def merges the
+    versions reaching an `if` join or a loop header (`operands`); an `entry`
+    def is the value a function, lambda or module body starts with:
+    parameters, loop iterators, functions and variables of enclosing bodies.
+    `uses` are the `IRRef`s it reaches and `phi_uses` the phis it feeds.
+    """
+
+    symbol: int
+    name: str
+    version: int
+    kind: str
+    node: IRAssignment | None = None
+    operands: list[SSADef] = field(default_factory=list)
+    uses: list[IRRef] = field(default_factory=list)
+    phi_uses: list[SSADef] = field(default_factory=list)
+    # Def of the variable an assignment copies, as it was at the copy.
+    copy_of: SSADef | None = field(default=None, repr=False)
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}.{self.version}"
+
+
+@dataclass
+class SSAForm:
+    """SSA overlay of an `IRModule`; the IR itself is not renamed.
+
+    `use_def` maps each resolved `IRRef`, by identity, to the def reaching
+    it. `copies` gives, for a read of a variable last assigned a copy of
+    another, the binding that reads the copied variable at that point when
+    it still holds the copied version. The form is only valid until the
+    module changes.
+    """
+
+    defs: list[SSADef]
+    use_def: dict[int, SSADef]
+    copies: dict[int, Binding]
+    # Variables read from inside a nested function or lambda.
+    captured: set[int]
+    # Names read without a binding.
+    unbound_names: set[str]
+    # Symbols per variable name.
+    symbols_by_name: dict[str, set[int]]
+    # Names of loop iterators, read or not; Python keeps them bound after the loop.
+    iterator_names: set[str] = field(default_factory=set)
+    _constants: dict[int, IRLiteral | None] = field(default_factory=dict, repr=False)
+
+    def reaching(self, ref: IRRef) -> SSADef | None:
+        """The def whose value `ref` reads, or None for unresolved names."""
+        return self.use_def.get(id(ref))
+
+    def constant(self, definition: SSADef) -> IRLiteral | None:
+        """The literal `definition` always holds: an assigned literal, or one all phi operands agree on."""
+        key = id(definition)
+        if key in self._constants:
+            return self._constants[key]
+        value: IRLiteral | None = None
+        if definition.kind == SSA_ASSIGN and isinstance(definition.node.value, IRLiteral):
+            value = definition.node.value
+        elif definition.kind == SSA_PHI:
+            # Pessimistic on cycles: a phi being evaluated is not constant.
+            self._constants[key] = None
+            values = [self.constant(operand) for operand in definition.operands]
+            first = values[0]
+            if first is not None and all(_same_literal(first, other) for other in values[1:]):
+                value = first
+        self._constants[key] = value
+        return value
+
+    def unique_name(self, name: str) -> bool:
+        """Whether `name` belongs to one variable and no loop iterator, so no target reads another under it."""
+        return len(self.symbols_by_name.get(name, ())) == 1 and name not in self.iterator_names
+
+    def live_defs(self) -> set[SSADef]:
+        """Defs some read may observe: those read directly or through live phis, and captured variables."""
+        work = [
+            definition
+            for definition in self.defs
+            if definition.uses or definition.symbol in self.captured or definition.name in self.unbound_names
+        ]
+        live: set[SSADef] = set(work)
+        while work:
+            definition = work.pop()
+            for operand in definition.operands:
+                if operand not in live:
+                    live.add(operand)
+                    work.append(operand)
+        return live
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "defs": [
+                {
+                    "def": definition.label,
+                    "kind": definition.kind,
+                    "node": definition.node.ir_id if definition.node is not None else None,
+                    "operands": [operand.label for operand in definition.operands],
+                    "uses": [ref.ir_id for ref in definition.uses],
+                }
+                for definition in self.defs
+            ]
+        }
+
+
+def build_ssa(module: IRModule) -> SSAForm:
+    """Build the SSA form of `module`; see `SSABuilder`."""
+    return SSABuilder().build(module)
+
+
+class SSABuilder(NodeVisitor):
+    """Numbers every definition of every variable in one walk over structured IR.
+
+    The module body, each function and each lambda is a separate body: a
+    read of an enclosing body's variable gets that body's entry def, since
+    it runs later. `if` joins and loop headers merge differing versions with
+    phis; a loop header has one for every outer variable its body assigns,
+    whose second operand is the version at the end of the body. Code after
+    `ret` is still numbered, but does not reach joins. Phis whose operands
+    are all one def are folded into it at the end.
+    """
+
+    def __init__(self) -> None:
+        # Open scopes, innermost last, as unique tokens, with the symbols first seen declared in each.
+        self._chain: list[int] = []
+        self._declared: list[list[int]] = []
+        self._scope_count = 0
+        self._scope_of: dict[int, int] = {}
+        # Chain index of the current body's outermost scope.
+        self._body_start = 0
+        self._state: dict[int, SSADef] = {}
+        self._reachable = True
+        self._entries: dict[int, SSADef] = {}
+        self._versions: dict[int, int] = {}
+        self._defs: list[SSADef] = []
+        self._uses: list[tuple[IRRef, SSADef]] = []
+        # Read, def it reads, version of the copied variable at the copy and at the read, binding there.
+        self._copy_checks: list[tuple[IRRef, SSADef, SSADef, Binding]] = []
+        self._captured: set[int] = set()
+        self._unbound_names: set[str] = set()
+        self._symbols_by_name: dict[str, set[int]] = {}
+        self._iterator_names: set[str] = set()
+
+    def build(self, module: IRModule) -> SSAForm:
+        self._push_scope()
+        self._run(module.statements)
+        self._pop_scope()
+        return self._finish()
+
+    def visit_IRAssignment(self, stmt: IRAssignment) -> None:
+        source = self.visit(stmt.value)
+        if stmt.binding is None:
+            return
+        self._note_scope(stmt.binding, stmt.name)
+        definition = self._new_def(stmt.binding.symbol, stmt.name, SSA_ASSIGN, node=stmt)
+        if isinstance(stmt.value, IRRef):
+            definition.copy_of = source
+        self._state[stmt.binding.symbol] = definition
+
+    def visit_IRExpressionStmt(self, stmt: IRExpressionStmt) -> None:
+        self.visit(stmt.expr)
+
+    def visit_IRReturn(self, stmt: IRReturn) -> None:
+        if stmt.value is not None:
+            self.visit(stmt.value)
+        self._reachable = False
+
+    def visit_IRIf(self, stmt: IRIf) -> None:
+        self.visit(stmt.condition)
+        before, reachable = dict(self._state), self._reachable
+        self._run_scope(stmt.then_block)
+        then_state, then_reachable = self._state, self._reachable
+        self._state, self._reachable = before, reachable
+        self._run_scope(stmt.else_block)
+        if not then_reachable:
+            return
+        if not self._reachable:
+            self._state, self._reachable = then_state, True
+            return
+        for symbol in then_state.keys() | self._state.keys():
+            name = (then_state.get(symbol) or self._state[symbol]).name
+            then_def = then_state.get(symbol) or self._entry(symbol, name)
+            else_def = self._state.get(symbol) or self._entry(symbol, name)
+            if then_def is not else_def:
+                self._state[symbol] = self._new_def(symbol, then_def.name, SSA_PHI, operands=[then_def, else_def])
+
+    def visit_IRLoop(self, stmt: IRLoop) -> None:
+        self._iterator_names.add(stmt.iterator)
+        self.visit(stmt.start)
+        phis: dict[int, SSADef] = {}
+        for symbol, name in _assigned_outside(stmt.body, 0).items():
+            before = self._state.get(symbol) or self._entry(symbol, name)
+            phis[symbol] = self._state[symbol] = self._new_def(symbol, name, SSA_PHI, operands=[before])
+        # Some targets re-read the bound every iteration, so it reads the header's versions.
+        self.visit(stmt.end)
+        header, reachable = dict(self._state), self._reachable
+        self._run_scope(stmt.body)
+        if self._reachable:
+            for symbol, phi in phis.items():
+                phi.operands.append(self._state[symbol])
+        self._state, self._reachable = header, reachable
+
+    def visit_IRFunction(self, stmt: IRFunction) -> None:
+        saved = self._enter_body()
+        self._run(stmt.body)
+        if stmt.expr_body is not None:
+            self.visit(stmt.expr_body)
+        self._leave_body(saved)
+
+    def visit_IRLambda(self, expr: IRLambda) -> None:
+        if expr.body is not None:
+            saved = self._enter_body()
+            self.visit(expr.body)
+            self._leave_body(saved)
+
+    def visit_IRRef(self, expr: IRRef) -> SSADef | None:
+        binding = expr.binding
+        if binding is None:
+            self._unbound_names.add(expr.name)
+            return None
+        index = self._note_scope(binding, expr.name)
+        if index < self._body_start:
+            self._captured.add(binding.symbol)
+            definition = self._entry(binding.symbol, expr.name)
+        else:
+            definition = self._state.get(binding.symbol) or self._entry(binding.symbol, expr.name)
+        self._uses.append((expr, definition))
+        if definition.copy_of is not None:
+            self._check_copy(expr, definition)
+        return definition
+
+    def visit_IRUnary(self, expr: IRUnary) -> None:
+        if expr.operand is not None:
+            self.visit(expr.operand)
+
+    def visit_IRBinary(self, expr: IRBinary) -> None:
+        if expr.left is not None:
+            self.visit(expr.left)
+        if expr.right is not None:
+            self.visit(expr.right)
+
+    def visit_IRCall(self, expr: IRCall) -> None:
+        if expr.callee is not None:
+            self.visit(expr.callee)
+        for arg in expr.args or []:
+            self.visit(arg)
+
+    def generic_visit(self, node: Any) -> None:
+        return None
+
+    def _check_copy(self, expr: IRRef, definition: SSADef) -> None:
+        source: IRRef = definition.node.value
+        token = self._scope_of.get(source.binding.symbol)
+        if token not in self._chain:
+            return
+        index = self._chain.index(token)
+        current = self._state.get(source.binding.symbol) or self._entry(source.binding.symbol, source.name)
+        binding = Binding(len(self._chain) - 1 - index, source.binding.slot, source.binding.symbol)
+        self._copy_checks.append((expr, definition.copy_of, current, binding))
+
+    def _run(self, block: list[IRStmt]) -> None:
+        for stmt in block:
+            self.visit(stmt)
+
+    def _run_scope(self, block: list[IRStmt]) -> None:
+        self._push_scope()
+        self._run(block)
+        self._pop_scope()
+
+    def _push_scope(self) -> None:
+        self._chain.append(self._scope_count)
+        self._declared.append([])
+        self._scope_count += 1
+
+    def _pop_scope(self) -> None:
+        self._chain.pop()
+        for symbol in self._declared.pop():
+            self._state.pop(symbol, None)
+
+    def _enter_body(self) -> tuple[Any, ...]:
+        saved = (self._state, self._reachable, self._entries, self._body_start)
+        self._state, self._reachable, self._entries = {}, True, {}
+        self._push_scope()
+        self._body_start = len(self._chain) - 1
+        return saved
+
+    def _leave_body(self, saved: tuple[Any, ...]) -> None:
+        self._pop_scope()
+        self._state, self._reachable, self._entries, self._body_start = saved
+
+    def _note_scope(self, binding: Binding, name: str) -> int:
+        """Chain index of `binding`'s scope, recording the symbol's scope on first sight."""
+        index = len(self._chain) - 1 - binding.depth
+        if binding.symbol not in self._scope_of:
+            self._scope_of[binding.symbol] = self._chain[index]
+            self._declared[index].append(binding.symbol)
+            self._symbols_by_name.setdefault(name, set()).add(binding.symbol)
+        return index
+
+    def _entry(self, symbol: int, name: str) -> SSADef:
+        definition = self._entries.get(symbol)
+        if definition is None:
+            definition = self._entries[symbol] = self._new_def(symbol, name, SSA_ENTRY)
+        return definition
+
+    def _new_def(self, symbol: int, name: str, kind: str, **fields: Any) -> SSADef:
+        version = self._versions.get(symbol, 0)
+        self._versions[symbol] = version + 1
+        definition = SSADef(symbol=symbol, name=name, version=version, kind=kind, **fields)
+        self._defs.append(definition)
+        return definition
+
+    def _finish(self) -> SSAForm:
+        alias: dict[SSADef, SSADef] = {}
+
+        def resolve(definition: SSADef) -> SSADef:
+            while definition in alias:
+                definition = alias[definition]
+            return definition
+
+        phis = [definition for definition in self._defs if definition.kind == SSA_PHI]
+        changed = True
+        while changed:
+            changed = False
+            for phi in phis:
+                if phi in alias:
+                    continue
+                operands = {resolve(operand) for operand in phi.operands} - {phi}
+                if len(operands) == 1:
+                    alias[phi] = operands.pop()
+                    changed = True
+
+        defs = [definition for definition in self._defs if definition not in alias]
+        for definition in defs:
+            definition.operands = [resolve(operand) for operand in definition.operands]
+            for operand in dict.fromkeys(definition.operands):
+                operand.phi_uses.append(definition)
+            if definition.copy_of is not None:
+                definition.copy_of = resolve(definition.copy_of)
+        use_def: dict[int, SSADef] = {}
+        for ref, definition in self._uses:
+            definition = resolve(definition)
+            definition.uses.append(ref)
+            use_def[id(ref)] = definition
+        copies = {
+            id(ref): binding
+            for ref, copied, current, binding in self._copy_checks
+            if resolve(copied) is resolve(current)
+        }
+        return SSAForm(
+            defs=defs,
+            use_def=use_def,
+            copies=copies,
+            captured=self._captured,
+            unbound_names=self._unbound_names,
+            symbols_by_name=self._symbols_by_name,
+            iterator_names=self._iterator_names,
+        )
+
+
+def _assigned_outside(block: list[IRStmt], nesting: int) -> dict[int, str]:
+    """Variables assigned in `block`, `nesting` scopes inside a loop, that live outside the loop."""
+    assigned: dict[int, str] = {}
+    for stmt in block:
+        if isinstance(stmt, IRAssignment) and stmt.binding is not None and stmt.binding.depth > nesting:
+            assigned.setdefault(stmt.binding.symbol, stmt.name)
+        elif isinstance(stmt, IRIf):
+            assigned.update(_assigned_outside(stmt.then_block, nesting + 1))
+            assigned.update(_assigned_outside(stmt.else_block, nesting + 1))
+        elif isinstance(stmt, IRLoop):
+            assigned.update(_assigned_outside(stmt.body, nesting + 1))
+    return assigned
+
+
+def _same_literal(left: IRLiteral, right: IRLiteral | None) -> bool:
+    return (
+        right is not None
+        and type(left.value) is type(right.value)
+        and left.value == right.value
+        and left.expr_type == right.expr_type
+    )
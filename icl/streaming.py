@@ -0,0 +1,297 @@
+"""Statement-at-a-time compile pipeline for very large single modules."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from icl.ast import FunctionDefStmt, Param, Program, Stmt, assign_node_ids
+from icl.ir import IRBuilder
+from icl.language_pack import EmissionContext, PackRegistry
+from icl.lexer import iter_tokens
+from icl.lowering import LoweredStmt, Lowerer
+from icl.main import build_pack_registry, build_plugin_manager
+from icl.parser import Parser
+from icl.plugin import PluginManager
+from icl.resolver import Resolver, resolve_program
+from icl.semantic import SemanticAnalyzer, SemanticResult, infer_types
+from icl.tokens import Token, TokenType
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class TokenWindow:
+    """Indexable view over a lazily produced token stream.
+
+    Tokens are pulled from the underlying iterator on demand and kept only
+    until `release` discards everything before a given absolute index.
+    """
+
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self._source = iter(tokens)
+        self._buffer: list[Token] = []
+        self._offset = 0
+        self._last: Token | None = None
+
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            # Parser only reads `tokens[-1]` once the stream is exhausted.
+            if self._last is None:
+                raise IndexError(index)
+            return self._last
+        relative = index - self._offset
+        if relative < 0:
+            raise IndexError(f"Token {index} was already released from the window.")
+        buffer = self._buffer
+        while relative >= len(buffer):
+            token = next(self._source, None)
+            if token is None:
+                raise IndexError(index)
+            buffer.append(token)
+            self._last = token
+        return buffer[relative]
+
+    def release(self, index: int) -> None:
+        """Discard buffered tokens before absolute `index`."""
+        drop = index - self._offset
+        if drop > 0:
+            del self._buffer[:drop]
+            self._offset = index
+
+    def buffered(self) -> int:
+        """Return how many tokens are currently held in memory."""
+        return len(self._buffer)
+
+
+class SignatureScanner:
+    """On-demand top-level function signature pre-scan over a token window.
+
+    Batch analysis registers every top-level signature before checking bodies.
+    In streaming mode the scan only runs ahead of the parser when a name fails
+    to resolve, so valid forward calls work without reading the whole input.
+    """
+
+    def __init__(self, window: TokenWindow, parser: Parser) -> None:
+        self._window = window
+        self._parser = parser
+        self._index = 0
+        self._depth = 0
+        self._headers: dict[str, FunctionDefStmt] = {}
+
+    def lookup(self, name: str) -> FunctionDefStmt | None:
+        """Return the header of the next top-level function named `name`."""
+        if name in self._headers:
+            return self._headers.pop(name)
+        if self._index < self._parser.pos:
+            # The parser only hands out complete top-level statements, so its
+            # position is always at brace depth zero.
+            self._index = self._parser.pos
+            self._depth = 0
+
+        window = self._window
+        while True:
+            token = window[self._index]
+            if token.token_type == TokenType.EOF:
+                return None
+            if token.token_type == TokenType.LBRACE:
+                self._depth += 1
+            elif token.token_type == TokenType.RBRACE:
+                self._depth -= 1
+            elif token.token_type == TokenType.FN and self._depth == 0:
+                header = self._read_header(self._index)
+                if header is not None:
+                    if header.name == name:
+                        self._index += 1
+                        return header
+                    self._headers.setdefault(header.name, header)
+            self._index += 1
+
+    def _read_header(self, index: int) -> FunctionDefStmt | None:
+        window = self._window
+        fn_token = window[index]
+        name_token = window[index + 1]
+        if name_token.token_type != TokenType.IDENT or window[index + 2].token_type != TokenType.LPAR:
+            return None
+
+        cursor = index + 3
+        params: list[Param] = []
+        if window[cursor].token_type != TokenType.RPAR:
+            while True:
+                param_token = window[cursor]
+                if param_token.token_type != TokenType.IDENT:
+                    return None
+                cursor += 1
+                type_hint: str | None = None
+                if window[cursor].token_type == TokenType.COLON:
+                    if window[cursor + 1].token_type != TokenType.IDENT:
+                        return None
+                    type_hint = window[cursor + 1].value
+                    cursor += 2
+                params.append(Param(name=param_token.value, type_hint=type_hint))
+                if window[cursor].token_type != TokenType.COMMA:
+                    break
+                cursor += 1
+        if window[cursor].token_type != TokenType.RPAR:
+            return None
+
+        return_type: str | None = None
+        if window[cursor + 1].token_type == TokenType.COLON and window[cursor + 2].token_type == TokenType.IDENT:
+            return_type = window[cursor + 2].value
+
+        return FunctionDefStmt(
+            span=fn_token.span,
+            name=name_token.value,
+            params=params,
+            body=[],
+            expr_body=None,
+            return_type=return_type,
+        )
+
+
+def iter_lowered_statements(
+    chunks: Iterable[str],
+    *,
+    filename: str,
+    target: str,
+    feature_coverage: dict[str, bool] | None,
+    plugin_manager: PluginManager,
+    whole_module: bool = False,
+) -> Iterator[LoweredStmt]:
+    """Run the frontend and lowering on each top-level statement as it is parsed.
+
+    With `whole_module`, statements are still checked as they arrive, but
+    lowering waits for the end of input so concrete types are solved over the
+    whole module, as `compile_source` does.
+    """
+    window = TokenWindow(iter_tokens(chunks, filename=filename))
+    parser = Parser(window)
+    analyzer = SemanticAnalyzer()
+    scope = analyzer.begin_module(signature_lookup=SignatureScanner(window, parser).lookup)
+    resolver = Resolver()
+    resolution = resolver.begin_module()
+    ir_builder = IRBuilder(resolution=resolution)
+    lowerer = Lowerer()
+    pending: list[tuple[Stmt, SemanticResult]] = []
+
+    for stmt in parser.iter_statements():
+        window.release(parser.pos - 1)
+        if parser.errors:
+            # Keep parsing so the final error reports the full count, but do not
+            # analyze statements that follow a syntax error.
+            continue
+
+        program = Program(span=stmt.span, statements=[stmt])
+        program = plugin_manager.transform_program(program)
+        program = plugin_manager.expand_macros(program)
+        assign_node_ids(program, parser.node_ids)
+        for item in program.statements:
+            semantic = analyzer.analyze_statement(item, scope)
+            resolver.resolve_statement(item)
+            if whole_module:
+                pending.append((item, semantic))
+                continue
+            ir_stmt = ir_builder.build_statement(item, semantic)
+            resolver.release_statements()
+            yield lowerer.lower_statement(ir_stmt, target=target, feature_coverage=feature_coverage)
+
+    if pending:
+        module = Program(span=pending[0][0].span, statements=[item for item, _ in pending])
+        # The incremental resolver saw functions only once they were defined;
+        # resolving the complete module binds forward references as well.
+        resolution = resolve_program(module)
+        ir_builder = IRBuilder(resolution=resolution, types=infer_types(module, resolution))
+        for item, semantic in pending:
+            ir_stmt = ir_builder.build_statement(item, semantic)
+            yield lowerer.lower_statement(ir_stmt, target=target, feature_coverage=feature_coverage)
+
+
+def compile_stream(
+    chunks: Iterable[str],
+    *,
+    filename: str = "<input>",
+    target: str = "python",
+    plugin_manager: PluginManager | None = None,
+    plugin_specs: list[str] | None = None,
+    natural_aliases: bool = False,
+    alias_mode: str = "core",
+    pack_registry: PackRegistry | None = None,
+    pack_specs: list[str] | None = None,
+    debug: bool = False,
+) -> Iterator[str]:
+    """Compile source arriving in chunks, yielding target code as it is produced.
+
+    Each top-level statement is lexed, parsed, checked, lowered and emitted
+    before the next one is read. Differences from `compile_source`:
+    diagnostics surface in source order, streamed JS/web output always
+    includes the runtime helpers, packs without a streaming emitter (Rust)
+    buffer their output and lower only once the input ends, and syntax preprocess plugins require the full text.
+    """
+    manager = plugin_manager or build_plugin_manager(
+        plugin_specs,
+        natural_aliases=natural_aliases,
+        alias_mode=alias_mode,
+    )
+    registry = pack_registry or build_pack_registry(pack_specs)
+    pack = registry.get(target)
+
+    if manager.has_syntax_plugins():
+        chunks = [manager.preprocess_source("".join(chunks))]
+
+    statements = iter_lowered_statements(
+        chunks,
+        filename=filename,
+        target=pack.manifest.target,
+        feature_coverage=pack.manifest.feature_coverage,
+        plugin_manager=manager,
+        whole_module=pack.buffers_stream,
+    )
+    context = EmissionContext(
+        target=pack.manifest.target,
+        debug=debug,
+        metadata={"filename": filename, "source_target": target},
+    )
+    yield from pack.emit_stream(statements, context)
+
+
+def read_chunks(path: str | Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded text chunks from a UTF-8 file, with newlines translated to `\\n`."""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def compile_file_stream(
+    input_path: str | Path,
+    output: TextIO,
+    *,
+    target: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    plugin_manager: PluginManager | None = None,
+    plugin_specs: list[str] | None = None,
+    natural_aliases: bool = False,
+    alias_mode: str = "core",
+    pack_registry: PackRegistry | None = None,
+    pack_specs: list[str] | None = None,
+    debug: bool = False,
+) -> int:
+    """Stream-compile an `.icl` file into `output`; return characters written."""
+    written = 0
+    for code in compile_stream(
+        read_chunks(input_path, chunk_size),
+        filename=str(input_path),
+        target=target,
+        plugin_manager=plugin_manager,
+        plugin_specs=plugin_specs,
+        natural_aliases=natural_aliases,
+        alias_mode=alias_mode,
+        pack_registry=pack_registry,
+        pack_specs=pack_specs,
+        debug=debug,
+    ):
+        output.write(code)
+        written += len(code)
+    return written
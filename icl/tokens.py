@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
 from enum import Enum, auto
+from typing import Iterator, Sequence, overload
 
-from icl.source_map import SourceSpan
+from icl.source_map import SourceFile, SourceSpan
 
 
 class TokenType(Enum):
@@ -81,3 +83,158 @@ class Token:
 
     def __str__(self) -> str:
         return f"{self.token_type.name}({self.value!r})@{self.span.line}:{self.span.column}"
+
+
+_TOKEN_TYPES: tuple[TokenType, ...] = tuple(TokenType)
+TOKEN_TYPE_CODES: dict[TokenType, int] = {token_type: code for code, token_type in enumerate(_TOKEN_TYPES)}
+
+# Materialized tokens kept per buffer, in slots keyed by index modulo the
+# limit; the parser only revisits tokens near its cursor, so this sliding
+# window avoids rebuilding them.
+_TOKEN_CACHE_LIMIT = 64
+
+
+class TokenBuffer(Sequence[Token]):
+    """Compact token store backed by parallel arrays.
+
+    Token types are kept as `array('B')` codes, source ranges as `array('I')`
+    start/end offsets, and values as indexes into an interned string table.
+    `Token` objects are built only when indexed, with offset-based spans that
+    share the buffer's `SourceFile` line index.
+    """
+
+    def __init__(self, filename: str, *, first_line: int = 1, line_start: int = 0) -> None:
+        # Line-start index shared by every span built from this buffer.
+        self.source = SourceFile(filename, first_line=first_line, line_start=line_start)
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.value_ids = array("I")
+        self.values: list[str] = []
+        self._value_index: dict[str, int] = {}
+        self._cache: list[Token | None] = [None] * _TOKEN_CACHE_LIMIT
+        self._cache_indexes: list[int] = [-1] * _TOKEN_CACHE_LIMIT
+
+    @property
+    def filename(self) -> str:
+        return self.source.name
+
+    def rebind(self, source: SourceFile) -> None:
+        """Give tokens materialized from now on spans into `source`.
+
+        `source` must use the same offset origin as the buffer.
+        """
+        self.source = source
+        self._cache_indexes = [-1] * _TOKEN_CACHE_LIMIT
+
+    def section(self, start: int, end: int) -> TokenBuffer:
+        """Return tokens `[start, end)` followed by this buffer's final token.
+
+        The section shares the string table and line index, so its spans are
+        the same as the original tokens'. The buffer should end with EOF.
+        """
+        section = TokenBuffer.__new__(TokenBuffer)
+        section.source = self.source
+        section.types = self.types[start:end]
+        section.starts = self.starts[start:end]
+        section.ends = self.ends[start:end]
+        section.value_ids = self.value_ids[start:end]
+        for column, source in (
+            (section.types, self.types),
+            (section.starts, self.starts),
+            (section.ends, self.ends),
+            (section.value_ids, self.value_ids),
+        ):
+            column.append(source[-1])
+        section.values = self.values
+        section._value_index = self._value_index
+        section._cache = [None] * _TOKEN_CACHE_LIMIT
+        section._cache_indexes = [-1] * _TOKEN_CACHE_LIMIT
+        return section
+
+    def append(self, token_type: TokenType, value: str, start: int, end: int) -> None:
+        """Append one token covering source offsets `[start, end)`."""
+        self.types.append(TOKEN_TYPE_CODES[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.value_ids.append(self.intern(value))
+
+    def intern(self, value: str) -> int:
+        """Return the string table index for `value`, adding it if new."""
+        index = self._value_index.get(value)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self._value_index[value] = index
+        return index
+
+    def add_line_start(self, offset: int) -> None:
+        """Record that a new source line begins at `offset`."""
+        self.source.add_line_start(offset)
+
+    def token_type(self, index: int) -> TokenType:
+        """Return the type of the token at `index` without materializing it."""
+        return _TOKEN_TYPES[self.types[index]]
+
+    def value(self, index: int) -> str:
+        """Return the value of the token at `index` without materializing it."""
+        return self.values[self.value_ids[index]]
+
+    def span(self, index: int) -> SourceSpan:
+        """Return the offset-based source span of the token at `index`."""
+        return SourceSpan.from_offsets(self.source, self.starts[index], self.ends[index])
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the 1-based line and column of an absolute source offset."""
+        return self.source.position(offset)
+
+    def last_line(self) -> tuple[int, int]:
+        """Return the number and start offset of the last recorded line."""
+        return self.source.last_line()
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the arrays (excluding the string table)."""
+        arrays = (self.types, self.starts, self.ends, self.value_ids, self.source.line_starts)
+        return sum(item.itemsize * len(item) for item in arrays)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Token]: ...
+
+    def __getitem__(self, index: int | slice) -> Token | list[Token]:
+        if isinstance(index, slice):
+            return [self[item] for item in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self.types)
+        slot = index % _TOKEN_CACHE_LIMIT
+        if self._cache_indexes[slot] == index:
+            return self._cache[slot]  # type: ignore[return-value]
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+        token = Token(
+            _TOKEN_TYPES[self.types[index]],
+            self.values[self.value_ids[index]],
+            SourceSpan.from_offsets(self.source, self.starts[index], self.ends[index]),
+        )
+        self._cache[slot] = token
+        self._cache_indexes[slot] = index
+        return token
+
+    def __iter__(self) -> Iterator[Token]:
+        source = self.source
+        values = self.values
+        from_offsets = SourceSpan.from_offsets
+        for code, start, end, value_id in zip(self.types, self.starts, self.ends, self.value_ids):
+            yield Token(_TOKEN_TYPES[code], values[value_id], from_offsets(source, start, end))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TokenBuffer, list, tuple)):
+            return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
@@ -0,0 +1,52 @@
+"""Visitor base with per-node-type dispatch tables for AST, IR and lowered nodes."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, ClassVar
+
+
+class _DispatchTable(dict):
+    """Handler per node type for one visitor class, resolved on first use."""
+
+    def __init__(self, visitor_type: type[NodeVisitor]) -> None:
+        super().__init__()
+        self.visitor_type = visitor_type
+
+    def __missing__(self, node_type: type) -> Callable[[Any, Any], Any]:
+        handler = self.visitor_type.generic_visit
+        for klass in node_type.__mro__:
+            found = getattr(self.visitor_type, f"visit_{klass.__name__}", None)
+            if found is not None:
+                handler = found
+                break
+        self[node_type] = handler
+        return handler
+
+
+class NodeVisitor:
+    """Dispatches `visit(node)` to the `visit_<ClassName>` handler for the node's type.
+
+    The handler is found once per visitor class and node type, walking the
+    node type's MRO (so `visit_IRExpr` covers every IR expression without a
+    handler of its own), and cached; after that a visit costs one dict
+    lookup, however many node classes the visitor handles. Types without a
+    handler go to `generic_visit`.
+
+    `visit` takes the node only, which keeps the call cheap; state a walk
+    needs (indentation, the current target) lives on the visitor.
+    """
+
+    _dispatch: ClassVar[_DispatchTable]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = _DispatchTable(cls)
+
+    def visit(self, node: Any) -> Any:
+        return self._dispatch[type(node)](self, node)
+
+    def generic_visit(self, node: Any) -> Any:
+        raise TypeError(f"{type(self).__name__} has no handler for {type(node).__name__}.")
+
+
+NodeVisitor._dispatch = _DispatchTable(NodeVisitor)
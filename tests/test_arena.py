@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pickle
+import unittest
+
+from icl.arena import AstArena, NodeKind
+from icl.ast import BinaryExpr, ExpressionStmt, LiteralExpr, Program
+from icl.lexer import TableLexer
+from icl.parser import Parser
+from icl.source_map import SourceSpan
+
+
+SOURCE = '''
+fn add(a:Num, b:Num):Num => a + b;
+fn fact(n) { if n <= 1 ? { ret 1; } : { ret n * @fact(n - 1); } }
+inc := lam(x:Num):Num => x + 1;
+loop i in 0..3 { @print(-i, "café", true, 1.0, 1); }
+#echo(add(1, 2)(3));
+ret;
+'''
+
+
+def parse(source: str) -> Parser:
+    return Parser(TableLexer(source, 'a.icl').tokenize_buffer())
+
+
+class AstArenaTests(unittest.TestCase):
+    def test_views_match_dataclass_program(self) -> None:
+        program = parse(SOURCE).parse_program()
+        arena = AstArena.from_program(program)
+        self.assertEqual(arena.program(), program)
+        self.assertEqual(parse(SOURCE).parse_arena().program(), program)
+        self.assertEqual(parse('').parse_arena().program(), parse('').parse_program())
+
+    def test_views_are_cached_and_map_back_to_handles(self) -> None:
+        arena = parse(SOURCE).parse_arena()
+        loop = arena.statements[3]
+        self.assertEqual(arena.kind(loop), NodeKind.LOOP)
+        view = arena.node(loop)
+        self.assertIs(arena.program().statements[3], view)
+        self.assertEqual(arena.handle_of(view.body[0]), arena.child_handles(loop)[2])
+        self.assertEqual(list(arena.subtree(arena.root)), list(range(len(arena))))
+        literals = [arena.payload(handle) for handle in arena.subtree(loop) if arena.kind(handle) == NodeKind.LITERAL]
+        self.assertEqual([type(value) for value in literals], [int, int, str, bool, float, int])
+
+    def test_handles_survive_pickling(self) -> None:
+        arena = parse(SOURCE).parse_arena()
+        restored = pickle.loads(pickle.dumps(arena))
+        self.assertEqual(restored.program(), arena.program())
+        for handle in range(len(arena)):
+            self.assertEqual(restored.kind(handle), arena.kind(handle))
+            self.assertEqual(restored.payload(handle), arena.payload(handle))
+            self.assertEqual(restored.span(handle).to_dict(), arena.span(handle).to_dict())
+
+    def test_deep_expressions_and_coordinate_spans(self) -> None:
+        span = SourceSpan('gen.icl', 1, 1, 1, 2)
+        expr = LiteralExpr(span=span, value=0)
+        for idx in range(1, 5000):
+            expr = BinaryExpr(span=span, left=expr, operator='+', right=LiteralExpr(span=span, value=idx))
+        arena = AstArena.from_program(Program(span=span, statements=[ExpressionStmt(span=span, expr=expr)]))
+        self.assertEqual(len(arena), 10001)
+        self.assertEqual(arena.span(0), span)
+        root = arena.program().statements[0].expr
+        self.assertEqual((root.operator, root.right.value), ('+', 4999))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,7 +37,7 @@ class StructuredLoweringErrorsTests(unittest.TestCase):
         module = IRModule(
             ir_id="mod0",
             span=None,
-            schema_version="2.0",
+            schema_version="3.0",
             statements=[UnsupportedStmt(ir_id="stmt0", span=None)],
             inferred_types={},
         )
@@ -38,10 +38,28 @@ class ExpanderTests(unittest.TestCase):
     def test_rust_backend_emits_expected_constructs(self) -> None:
         artifacts = compile_source(PROGRAM, target='rust')
         code = artifacts.code
-        self.assertIn('fn add(a: f64, b: f64) -> f64 {', code)
+        self.assertIn('fn add(a: i64, b: i64) -> i64 {', code)
         self.assertIn('fn main() {', code)
+        self.assertIn('let mut x: i64 = 1;', code)
+        self.assertIn('for i in (0)..(3) {', code)
+
+    def test_rust_backend_widens_inferred_numbers(self) -> None:
+        source = 'fn half(v:Num):Num => v / 2; x := 1; x := x + @half(3); n := 0; loop i in 0..4 { n := n + i; } @print(n);'
+        code = compile_source(source, target='rust').code
+        self.assertIn('fn half(v: i64) -> f64 {', code)
+        self.assertIn('return ((v as f64) / 2.0);', code)
         self.assertIn('let mut x: f64 = 1.0;', code)
-        self.assertIn('for i in ((0.0 as i64))..((3.0 as i64)) {', code)
+        self.assertIn('x = (x + half(3));', code)
+        self.assertIn('n = (n + i);', code)
+
+    def test_rust_backend_suffixes_integers_outside_i32(self) -> None:
+        code = compile_source('@print(3000000000); @print(-5); x := 3000000000; @print(x * 3);', target='rust').code
+        self.assertIn('println!("{:?}", 3000000000i64);', code)
+        self.assertIn('let mut x: i64 = 3000000000i64;', code)
+        self.assertIn('println!("{:?}", (x * 3));', code)
+        self.assertNotIn('5i64', code)
+        folded = compile_source('x := 3000000000; @print(x * 3);', target='rust', opt_level=2).code
+        self.assertIn('println!("{:?}", 9000000000i64);', folded)
 
     def test_lambda_emits_for_stable_backends(self) -> None:
         py = compile_source(LAMBDA_PROGRAM, target='python').code
@@ -50,7 +68,7 @@ class ExpanderTests(unittest.TestCase):
 
         self.assertIn('lambda n:', py)
         self.assertIn('=>', js)
-        self.assertIn('|n|', rust)
+        self.assertIn('|n: i64| (n + 1)', rust)
 
 
 if __name__ == '__main__':
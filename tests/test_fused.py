@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.fused import FusedIRBuilder
+from icl.graph import IntentGraphBuilder
+from icl.ir import IRBuilder, assign_content_hashes, ir_to_dict
+from icl.lexer import Lexer
+from icl.lowering import collect_ir_features
+from icl.parser import Parser
+from icl.resolver import resolve_program
+from icl.semantic import SemanticAnalyzer, infer_types
+
+
+SOURCE = '''
+scale := 2;
+fn twice(a) => a * scale;
+fn area(w:Num, h:Num):Num { ret w * h; }
+inc := lam(x) => x + 1;
+if @twice(3) > 4 ? { @print(@area(1.5, 2)); } : { @print(inc(1)); }
+loop i in 0..3 { total:Num := i - -1; @print(!(total == 2) && true); }
+'''
+
+
+def parse(source: str):
+    program = Parser(Lexer(source).tokenize()).parse_program()
+    return program, SemanticAnalyzer().analyze(program)
+
+
+class FusedIRBuilderTests(unittest.TestCase):
+    def test_matches_separate_passes(self) -> None:
+        program, semantic = parse(SOURCE)
+        resolution = resolve_program(program)
+        expected = IRBuilder(semantic, resolution, infer_types(program, resolution)).build(program)
+        graph_builder = IntentGraphBuilder()
+        graph_builder.build(program)
+
+        builder = FusedIRBuilder(semantic, resolve_program(program))
+        module = builder.build(program)
+
+        self.assertEqual(ir_to_dict(module), ir_to_dict(expected))
+        self.assertEqual(assign_content_hashes(module), assign_content_hashes(expected))
+        self.assertEqual(builder.source_map.to_dict(), graph_builder.source_map.to_dict())
+        self.assertEqual(builder.features, collect_ir_features(expected))
+
+    def test_types_flow_from_later_calls(self) -> None:
+        program, semantic = parse('fn half(a) => a / 2; fn id(a) => a; @print(@half(@id(2)));')
+        module = FusedIRBuilder(semantic, resolve_program(program)).build(program)
+        half, ident = module.statements[0], module.statements[1]
+        self.assertEqual(half.params[0].inferred_type, 'Int')
+        self.assertEqual(half.inferred_return_type, 'Float')
+        self.assertEqual(ident.expr_body.expr_type, 'Int')
+
+
+if __name__ == '__main__':
+    unittest.main()
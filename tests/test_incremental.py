@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import random
+import unittest
+from pathlib import Path
+
+from icl.errors import CompilerError, LexError, ParseError
+from icl.incremental import IncrementalDocument, TextEdit
+from icl.lexer import TableLexer
+from icl.main import ast_to_dict
+from icl.parser import Parser
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def parse_full(source: str):
+    return Parser(TableLexer(source, 'doc.icl').tokenize_buffer()).parse_program()
+
+
+class IncrementalDocumentTests(unittest.TestCase):
+    def test_edit_reparses_only_touched_statement(self) -> None:
+        source = 'a := 1;\nb := 2;\nc := 3;\n'
+        doc = IncrementalDocument(source, 'doc.icl')
+        before = doc.program.statements
+
+        after = doc.edit(9, 13, 'b := 20 + 1').statements
+        self.assertEqual(doc.reparsed_statements, 1)
+        self.assertIs(after[0], before[0])
+        self.assertIsNot(after[1], before[1])
+        self.assertIs(after[2], before[2])
+        self.assertEqual(doc.program, parse_full(doc.text))
+
+    def test_spans_after_edit_follow_new_text(self) -> None:
+        doc = IncrementalDocument('a := 1;\nb := 2; c := 3;\n', 'doc.icl')
+        program = doc.apply(TextEdit(start=0, end=0, text='z := 0;\n\n'))
+        expected = parse_full(doc.text)
+        self.assertEqual(ast_to_dict(program), ast_to_dict(expected))
+        c_span = program.statements[-1].span
+        self.assertEqual((c_span.line, c_span.column, c_span.start), (4, 9, 25))
+
+        program = doc.edit(10, 10, 'aa')
+        self.assertEqual(ast_to_dict(program), ast_to_dict(parse_full(doc.text)))
+        self.assertEqual(program.statements[-1].span.column, 9)
+
+    def test_errors_surface_and_clear(self) -> None:
+        doc = IncrementalDocument('a := 1;\nb := 2;\n', 'doc.icl')
+        with self.assertRaises(ParseError):
+            doc.edit(13, 14, ')')
+        self.assertEqual(len(doc.errors), 1)
+        with self.assertRaises(LexError):
+            doc.edit(0, 0, '"')
+        with self.assertRaises(ParseError):
+            doc.edit(0, 1, '')
+        program = doc.edit(13, 14, '2')
+        self.assertEqual(program, parse_full('a := 1;\nb := 2;\n'))
+        self.assertEqual(doc.errors, [])
+
+    def test_random_edits_match_full_parse(self) -> None:
+        source = (ROOT / 'examples' / 'functions.icl').read_text(encoding='utf-8')
+        source += (ROOT / 'examples' / 'control_flow.icl').read_text(encoding='utf-8')
+        pieces = [';', '}', '{', 'x', ' ', '\n', '1', '+', '"', ':', '//', '(', ')', 'y := 2;', '']
+        rng = random.Random(7)
+        for _ in range(40):
+            doc = IncrementalDocument(source, 'doc.icl')
+            text = source
+            for _ in range(8):
+                start = rng.randrange(len(text) + 1)
+                end = min(len(text), start + rng.choice([0, 1, 3]))
+                insert = rng.choice(pieces)
+                text = text[:start] + insert + text[end:]
+                try:
+                    expected = ast_to_dict(parse_full(text))
+                except CompilerError as exc:
+                    expected = str(exc)
+                try:
+                    actual = ast_to_dict(doc.edit(start, end, insert))
+                except CompilerError as exc:
+                    actual = str(exc)
+                self.assertEqual(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.ir import IRLiteral, assign_content_hashes
+from icl.main import compile_source
+
+
+FUNCTION = 'fn area(w:Num, h:Num):Num { ret w * h; }'
+
+
+def function_ir(source: str):
+    module = compile_source(source, target='python').ir
+    assign_content_hashes(module)
+    return module, next(stmt for stmt in module.statements if getattr(stmt, 'name', None) == 'area')
+
+
+class ContentHashTests(unittest.TestCase):
+    def test_equal_code_hashes_equally_across_modules(self) -> None:
+        first_module, first = function_ir(f'{FUNCTION} @print(@area(2, 3));')
+        second_module, second = function_ir(f'x := 1;\n\n  {FUNCTION} @print(@area(4, 5));')
+        self.assertNotEqual(first.ir_id, second.ir_id)
+        self.assertNotEqual(first.span, second.span)
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertNotEqual(first_module.content_hash, second_module.content_hash)
+
+    def test_module_reads_do_not_depend_on_unrelated_globals(self) -> None:
+        def function_hash(source: str) -> str:
+            module = compile_source(source, target='python').ir
+            assign_content_hashes(module)
+            return next(stmt for stmt in module.statements if getattr(stmt, 'name', None) == 'f').content_hash
+
+        first = function_hash('g := 1; fn f(a) => a + g; @print(f(2));')
+        second = function_hash('h := 2; g := 1; fn f(a) => a + g; @print(f(2) + h);')
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, function_hash('g := 1; fn f(a) => g + a; @print(f(2));'))
+
+    def test_any_change_below_a_node_changes_its_hash(self) -> None:
+        _, base = function_ir(f'{FUNCTION} @print(@area(2, 3));')
+        _, edited = function_ir(f'{FUNCTION.replace("w * h", "w + h")} @print(@area(2, 3));')
+        self.assertNotEqual(base.content_hash, edited.content_hash)
+
+    def test_literals_of_different_types_differ(self) -> None:
+        digests = {assign_content_hashes(IRLiteral(ir_id='e', span=None, value=value)) for value in (1, 1.0, True, '1')}
+        self.assertEqual(len(digests), 4)
+
+    def test_rehash_after_mutation(self) -> None:
+        module = compile_source('x := 1; y := 2;', target='python').ir
+        self.assertEqual(module.content_hash, '')
+        before = assign_content_hashes(module)
+        module.statements[1].value.value = 1
+        self.assertEqual(assign_content_hashes(module), assign_content_hashes(compile_source('x := 1; y := 1;', target='python').ir))
+        self.assertNotEqual(module.content_hash, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import unittest
 
-from icl.errors import LexError
-from icl.lexer import Lexer
-from icl.tokens import TokenType
+from icl.errors import CLIError, LexError
+from icl.lexer import BytesLexer, Lexer, TableLexer, create_lexer, iter_tokens
+from icl.tokens import TokenBuffer, TokenType
 
 
 class LexerTests(unittest.TestCase):
@@ -48,5 +48,106 @@ class LexerTests(unittest.TestCase):
         self.assertIn(TokenType.LAM, token_types)
 
 
+class TableLexerTests(unittest.TestCase):
+    SOURCES = [
+        'fn add(a:Num, b:Num):Num => a + b;\nx := @add(1, 2.5); // sum\n',
+        'loop i in 0..3 { if i >= 1 && i != 2 ? { @print("i\\n\\"q\\""); } }',
+        'caf\u00e9 := 1; n\u00b2 := 2; \u0661\u0662 := 3;',
+        'msg := "line one\nline two";\r\n\ty := 1.5;',
+    ]
+
+    def test_matches_scanning_lexer(self) -> None:
+        for source in self.SOURCES:
+            with self.subTest(source=source):
+                self.assertEqual(TableLexer(source, 'a.icl').tokenize(), Lexer(source, 'a.icl').tokenize())
+
+    def test_errors_match_scanning_lexer(self) -> None:
+        for source, code in [('x := 1 $ 2', 'LEX001'), ('x := \u00a0;', 'LEX001'), ('\nmsg := "open', 'LEX002')]:
+            with self.subTest(source=source):
+                with self.assertRaises(LexError) as expected:
+                    Lexer(source).tokenize()
+                with self.assertRaises(LexError) as actual:
+                    TableLexer(source).tokenize()
+                self.assertEqual(actual.exception.code, code)
+                self.assertEqual(actual.exception.span, expected.exception.span)
+
+    def test_collect_errors_skips_bad_characters(self) -> None:
+        lexer = TableLexer('x := 1 $ 2;\ny := "open\nz := 3;', collect_errors=True)
+        tokens = lexer.tokenize()
+        self.assertEqual([(error.code, error.span.line) for error in lexer.errors], [('LEX001', 1), ('LEX002', 2)])
+        self.assertEqual([token.value for token in tokens if token.token_type == TokenType.IDENT], ['x', 'y', 'z'])
+
+    def test_iter_tokens_matches_across_chunk_boundaries(self) -> None:
+        for source in self.SOURCES:
+            expected = Lexer(source, 'a.icl').tokenize()
+            for size in (1, 2, 5):
+                with self.subTest(source=source, size=size):
+                    chunks = [source[idx : idx + size] for idx in range(0, len(source), size)]
+                    self.assertEqual(list(iter_tokens(chunks, 'a.icl')), expected)
+
+    def test_create_lexer_selects_engine(self) -> None:
+        self.assertIsInstance(create_lexer('x := 1;', engine='table'), TableLexer)
+        self.assertIsInstance(create_lexer('x := 1;'), Lexer)
+        with self.assertRaises(CLIError) as ctx:
+            create_lexer('x := 1;', engine='nope')
+        self.assertEqual(ctx.exception.code, 'LEX003')
+
+
+class BytesLexerTests(unittest.TestCase):
+    def test_matches_text_lexer(self) -> None:
+        sources = [*TableLexerTests.SOURCES, '// \u00fcber \u65e5\u672c\ns := "\u65e5\n\u672c"; t := caf\u00e9 + 1;', '']
+        for source in sources:
+            with self.subTest(source=source):
+                actual = list(BytesLexer(source.encode('utf-8'), 'a.icl').tokenize_buffer())
+                expected = list(TableLexer(source, 'a.icl').tokenize_buffer())
+                self.assertEqual(actual, expected)
+                self.assertEqual([token.span.start for token in actual], [token.span.start for token in expected])
+
+    def test_lone_cr_breaks_lines(self) -> None:
+        source = 'x := 1; // one\ny := "a\nb";\n@print(y);\n'
+        expected = [(token.span.line, token.span.column) for token in TableLexer(source).tokenize_buffer()]
+        for newline in ('\r', '\r\n'):
+            with self.subTest(newline=newline):
+                tokens = BytesLexer(source.replace('\n', newline).encode('utf-8')).tokenize_buffer()
+                self.assertEqual([(token.span.line, token.span.column) for token in tokens], expected)
+                self.assertIn('a\nb', [tokens.value(idx) for idx in range(len(tokens))])
+
+    def test_errors_match_text_lexer(self) -> None:
+        for source in ['x := "\u00e9" $ 2', 'x := \u00a0;', '\u00e9 := 1;\nmsg := "open\u00e9\n']:
+            with self.subTest(source=source):
+                with self.assertRaises(LexError) as expected:
+                    TableLexer(source).tokenize_buffer()
+                with self.assertRaises(LexError) as actual:
+                    BytesLexer(source.encode('utf-8')).tokenize_buffer()
+                self.assertEqual(actual.exception.code, expected.exception.code)
+                self.assertEqual(actual.exception.span, expected.exception.span)
+
+
+class TokenBufferTests(unittest.TestCase):
+    def test_buffer_materializes_same_tokens(self) -> None:
+        source = 'fn f(a) {\n  ret "x\ny" + a;\n}\nb := @f(1); b := b;'
+        expected = Lexer(source, 'a.icl').tokenize()
+        tokens = TableLexer(source, 'a.icl').tokenize_buffer()
+        self.assertIsInstance(tokens, TokenBuffer)
+        self.assertEqual(len(tokens), len(expected))
+        self.assertEqual(list(tokens), expected)
+        self.assertEqual([tokens[idx] for idx in range(len(tokens))], expected)
+        self.assertEqual(tokens[-1].token_type, TokenType.EOF)
+        self.assertEqual(tokens.token_type(0), TokenType.FN)
+
+    def test_recent_tokens_stay_cached(self) -> None:
+        tokens = TableLexer('x := 1;\n' * 40).tokenize_buffer()
+        recent = [tokens[idx] for idx in range(len(tokens))][-8:]
+        self.assertTrue(all(tokens[len(tokens) - 8 + idx] is token for idx, token in enumerate(recent)))
+        self.assertEqual(tokens[0], Lexer('x').tokenize()[0])
+        self.assertEqual(tokens.token_type(len(tokens) - 1), TokenType.EOF)
+
+    def test_values_are_interned(self) -> None:
+        tokens = TableLexer('b := b + b;').tokenize_buffer()
+        self.assertEqual(tokens.values.count('b'), 1)
+        self.assertEqual(tokens.types.itemsize, 1)
+        self.assertEqual(len(tokens.value_ids), len(tokens))
+
+
 if __name__ == '__main__':
     unittest.main()
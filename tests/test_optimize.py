@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.ir import IRLiteral, assign_content_hashes
+from icl.main import compile_source, compile_targets
+from icl.optimize import IRPassManager
+from icl.resolver import Binding
+
+
+SOURCE = (
+    'x := 2 * 3 + 1; unused := 4 * 5; '
+    'if 1 < 2 ? { @print(x); } : { @print(0); } '
+    'if false ? { y := 1; @print(y); } '
+    'fn f(a) { ret a + 1; @print(a); } '
+    '@print(@f(7 % 0));'
+)
+
+
+class IROptimizationTests(unittest.TestCase):
+    def test_optimizations_reach_every_target(self) -> None:
+        multi = compile_targets(SOURCE, targets=['python', 'js', 'rust'], opt_level=1)
+        python, js, rust = (multi.targets[name].code for name in ('python', 'js', 'rust'))
+        self.assertEqual(python, 'x = 7\nprint(x)\ndef f(a):\n    return (a + 1)\nprint(f((7 % 0)))\n')
+        self.assertIn('let x = 7;\nprint(x);\nfunction f(a) {\n    return (a + 1);\n}\n', js)
+        self.assertIn('let mut x: i64 = 7;\n    println!("{:?}", x);\n', rust)
+        for code in (python, js, rust):
+            self.assertNotIn('unused', code)
+            self.assertNotIn('print(0)', code)
+            self.assertNotIn('print(a)', code)
+        report = multi.targets['rust'].optimization
+        self.assertEqual((report.folded_operations, report.removed_assignments, report.pruned_branches), (4, 1, 3))
+        # Spliced out of its block, the read of `x` now addresses the module scope directly.
+        self.assertEqual(multi.ir.statements[1].expr.args[0].binding, Binding(0, 1, 1))
+
+    def test_o0_leaves_output_unchanged(self) -> None:
+        for target in ('python', 'js', 'rust'):
+            plain = compile_source(SOURCE, target=target)
+            level0 = compile_source(SOURCE, target=target, opt_level=0)
+            self.assertEqual(level0.code, plain.code)
+            self.assertIsNone(level0.optimization)
+
+    def test_folding_keeps_target_dependent_operations(self) -> None:
+        artifacts = compile_source('a := 7 % 0; b := -7 % 2; c := 9007199254740992 * 2; @print(a); @print(b); @print(c);', opt_level=1)
+        self.assertIn('a = (7 % 0)\nb = (-7 % 2)\nc = (9007199254740992 * 2)\n', artifacts.code)
+        # JS would print these as -0.
+        signed = compile_source('d := 0 * -1; e := -(0); f := 0 * 3; @print(d); @print(e); @print(f);', target='js', opt_level=1)
+        self.assertIn('let d = (0 * -1);\nlet e = (-0);\nlet f = 0;\n', signed.code)
+
+    def test_o2_repeats_until_stable(self) -> None:
+        source = 'b := 1; a := b; @print(2);'
+        self.assertEqual(compile_source(source, opt_level=1).code, 'b = 1\nprint(2)\n')
+        level2 = compile_source(source, opt_level=2)
+        self.assertEqual(level2.code, 'print(2)\n')
+        self.assertEqual(level2.optimization.removed_assignments, 2)
+
+    def test_pass_manager_copies_and_hashes(self) -> None:
+        artifacts = compile_source('v := 1 + 2; @print(v);')
+        assign_content_hashes(artifacts.ir)
+        optimized, report = IRPassManager(1).run(artifacts.ir)
+        literal = optimized.statements[0].value
+        self.assertIsInstance(literal, IRLiteral)
+        self.assertEqual((literal.value, literal.folded_from), (3, '+'))
+        self.assertNotEqual(optimized.content_hash, artifacts.ir.content_hash)
+        self.assertEqual(artifacts.ir.statements[0].value.operator, '+')
+        self.assertEqual(report.notes[0], f'Folded {literal.ir_id} (+).')
+        with self.assertRaises(ValueError):
+            IRPassManager(3)
+
+    def test_inlines_expression_functions_and_lambdas(self) -> None:
+        source = (
+            'bias := 2; fn sq(x:Num):Num => x * x; fn add(a:Num, b:Num):Num => a + b + bias; '
+            'total := 0; loop i in 0..4 { total := @add(total, @sq(i)); } @print(total); '
+            'twice := lam(v:Num) => v * 2; @print(@twice(@sq(3)));'
+        )
+        multi = compile_targets(source, targets=['python', 'js'], opt_level=1)
+        self.assertIn('    total = ((total + (i * i)) + bias)\nprint(total)\nprint(18)\n', multi.targets['python'].code)
+        self.assertIn('    total = ((total + (i * i)) + bias);\n', multi.targets['js'].code)
+        self.assertEqual(multi.targets['python'].optimization.inlined_calls, 4)
+
+    def test_inlining_renames_capturing_variables(self) -> None:
+        source = 'bias := 2; fn add(a:Num):Num => a + bias; fn g(q:Num):Num { bias := 10; ret @add(q + bias); } @print(@g(1));'
+        code = compile_source(source, opt_level=1).code
+        self.assertIn('def g(q):\n    bias_1 = 10\n    return ((q + bias_1) + bias)\n', code)
+        # A parameter of the same name cannot be renamed, so the call stays.
+        shadowed = 'bias := 2; fn add(a:Num):Num => a + bias; fn g(bias:Num):Num => @add(bias); @print(@g(1));'
+        self.assertIn('return add(bias)', compile_source(shadowed, opt_level=1).code)
+
+    def test_inlining_keeps_calls_it_cannot_substitute(self) -> None:
+        source = (
+            'fn fact(n:Num):Num => n * @fact(n - 1); fn both(a:Bool, b:Bool):Bool => a && b; '
+            'fn dup(v:Num):Num => v + v; fn tick():Num { @print(0); ret 1; } '
+            '@print(@fact(3)); @print(@both(false, @tick() > 0)); @print(@dup(@tick())); @print(@both(@tick() > 0, true));'
+        )
+        code = compile_source(source, opt_level=2).code
+        self.assertIn('print(fact(3))\nprint(both(False, (tick() > 0)))\nprint(dup(tick()))\nprint(((tick() > 0) and True))\n', code)
+
+    def test_drop_unused_functions(self) -> None:
+        source = 'fn sq(x:Num):Num => x * x; fn keep(x:Num):Num => x; @print(@sq(3)); @print(keep);'
+        kept = compile_source(source, opt_level=1).code
+        self.assertIn('def sq(x):', kept)
+        artifacts = compile_source(source, opt_level=1, drop_unused_functions=True)
+        self.assertEqual(artifacts.code, 'def keep(x):\n    return x\nprint(9)\nprint(keep)\n')
+        self.assertEqual(artifacts.optimization.removed_functions, 1)
+
+    def test_evaluates_pure_calls_with_constant_arguments(self) -> None:
+        source = (
+            'fn add(a:Num, b:Num):Num { ret a + b; } '
+            'fn fib(n:Num):Num { a := 0; b := 1; loop i in 0..n { t := a + b; a := b; b := t; } ret a; } '
+            'fn label(n:Num):Str { if n > 2 ? { ret "big"; } : { ret "small"; } } '
+            'fn half(n:Num):Num { ret n / 2; } '
+            'out := @add(1, 2); @print(out); @print(@fib(10)); @print(@label(@add(1, 1) + 2)); @print(@half(3));'
+        )
+        multi = compile_targets(source, targets=['python', 'rust'], opt_level=1, drop_unused_functions=True)
+        self.assertEqual(multi.targets['python'].code, "out = 3\nprint(out)\nprint(55)\nprint('big')\nprint(1.5)\n")
+        self.assertIn('println!("{:?}", 55);', multi.targets['rust'].code)
+        report = multi.targets['python'].optimization
+        self.assertEqual((report.evaluated_calls, report.removed_functions), (5, 4))
+        literal = multi.ir.statements[0].value
+        self.assertIsInstance(literal, IRLiteral)
+        self.assertEqual((literal.value, literal.expr_type), (3, 'Int'))
+
+    def test_partial_evaluation_keeps_impure_and_unbounded_calls(self) -> None:
+        source = (
+            'k := 2; fn loud(n:Num):Num { @print(n); ret n; } fn scaled(n:Num):Num { ret n * k; } '
+            'fn down(n:Num):Num { if n < 1 ? { ret 0; } ret @down(n - 1); } '
+            'fn count(n:Num):Num { c := 0; loop i in 0..n { c := c + 1; } ret c; } '
+            '@print(@loud(3)); @print(@scaled(3)); @print(@down(3)); @print(@count(100000)); @print(@count(k));'
+        )
+        artifacts = compile_source(source, opt_level=1)
+        self.assertIn('print(loud(3))\nprint(scaled(3))\nprint(down(3))\nprint(count(100000))\nprint(count(k))\n', artifacts.code)
+        self.assertEqual(artifacts.optimization.evaluated_calls, 0)
+        self.assertIn('step budget exhausted', artifacts.optimization.notes[-1])
+        # -O2 reduces the loop in `count` and propagates `k`, after which the calls can be evaluated.
+        self.assertIn('print(100000)\nprint(2)\n', compile_source(source, opt_level=2).code)
+
+    def test_unrolls_small_loops_and_removes_zero_trip_loops(self) -> None:
+        source = 'fn f(n:Num):Num { s := n; loop i in 0..3 { s := s + i * i * n; } loop j in 4..4 { s := 0; } ret s; } @print(@f(@f(2)));'
+        level1 = compile_source(source, opt_level=1)
+        self.assertIn('    for i in range(0, 3):\n        s = (s + ((i * i) * n))\n    return s\n', level1.code)
+        self.assertEqual((level1.optimization.removed_loops, level1.optimization.unrolled_loops), (1, 0))
+        multi = compile_targets(source, targets=['python', 'js'], opt_level=2)
+        self.assertIn('    s = (n + (0 * n))\n    s = (s + (1 * n))\n    s = (s + (4 * n))\n    return s\n', multi.targets['python'].code)
+        self.assertIn('    s = (s + (4 * n));\n    return s;\n', multi.targets['js'].code)
+        self.assertEqual(multi.targets['python'].optimization.unrolled_loops, 1)
+
+    def test_hoists_loop_bounds_and_invariant_expressions(self) -> None:
+        source = (
+            'fn f(a:Num, b:Num):Num { t := 0; loop i in 0..a * 2 { t := t + a * b + i; if t > a - b ? { t := t - 1; } } ret t; } '
+            '@print(@f(3, 4));'
+        )
+        multi = compile_targets(source, targets=['python', 'js', 'rust'], opt_level=2)
+        self.assertIn(
+            '    i_end_1 = (a * 2)\n    i_inv_1 = (a * b)\n    i_inv_2 = (a - b)\n'
+            '    for i in range(0, i_end_1):\n        t = ((t + i_inv_1) + i)\n        if (t > i_inv_2):\n',
+            multi.targets['python'].code,
+        )
+        self.assertIn('    for (let i = 0; i < i_end_1; i++) {\n', multi.targets['js'].code)
+        self.assertIn('    let mut i_end_1: i64 = (a * 2);\n', multi.targets['rust'].code)
+        self.assertEqual(multi.targets['python'].optimization.hoisted_expressions, 3)
+
+    def test_loop_optimization_keeps_what_could_change_behavior(self) -> None:
+        source = (
+            'fn f(n:Num, d:Num):Num { s := 0; loop i in 0..n { s := s + n / d; } loop i in 0..2 { x := i * 2; s := s + x * x; } '
+            'loop k in 0..n - s { s := s + 1; } ret s; } @print(@f(0, 0));'
+        )
+        code = compile_source(source, opt_level=2).code
+        # `/` could fail in a loop that never runs, a body declaring `x` is not unrolled and `n - s` changes.
+        self.assertIn('        s = (s + (n / d))\n', code)
+        self.assertIn('    for i in range(0, 2):\n        x = (i * 2)\n', code)
+        self.assertIn('    for k in range(0, (n - s)):\n', code)
+    def test_reduces_accumulator_loops_to_closed_form(self) -> None:
+        source = (
+            'fn g(k:Num):Num { s := 0; loop i in 0..1000 { s := s + 3 * i - k; } ret s; } '
+            'fn h(n:Num):Num { s := 7; t := 1; loop i in 0..n { s := s - 2; t := n + t; } ret s * 1000 + t; } '
+            'fn sq(n:Num):Num { s := 0; loop i in 0..n { s := s + i; } ret s; } '
+            'p := 1; loop i in 1..11 { p := p * i; } @print(p); @print(@g(@sq(3))); @print(@h(@sq(3)));'
+        )
+        multi = compile_targets(source, targets=['python', 'rust'], opt_level=2)
+        python = multi.targets['python'].code
+        self.assertIn('def g(k):\n    s = 0\n    s = (s + (1498500 + ((-k) * 1000)))\n', python)
+        # Symbolic bounds are guarded; `i` itself would need integer division, so that loop stays.
+        self.assertIn('    if (0 < n):\n        s = (s + (-2 * n))\n        t = (1 + (n * n))\n', python)
+        self.assertIn('    for i in range(0, n):\n        s = (s + i)\n', python)
+        self.assertIn('print(3628800)\n', python)
+        self.assertIn('    if (0 < n) {\n        s = (s + (-2 * n));\n', multi.targets['rust'].code)
+        self.assertEqual(multi.targets['python'].optimization.reduced_loops, 3)
+
+    def test_closed_forms_stay_within_exact_float_range(self) -> None:
+        wide = 's := 0; loop i in 0..100000 { s := s + i * 1000000000; } @print(s);'
+        artifacts = compile_source(wide, target='js', opt_level=2)
+        self.assertIn('for (let i = 0; i < 100000; i++) {', artifacts.code)
+        self.assertEqual(artifacts.optimization.reduced_loops, 0)
+        offset = 's := 0; loop i in 0..100000 { s := s + 100000000000 + i; } @print(s);'
+        self.assertEqual(compile_source(offset, target='js', opt_level=2).optimization.reduced_loops, 0)
+        narrow = 's := 0; loop i in 0..100000 { s := s + i * 1000; } @print(s);'
+        self.assertIn('print(4999950000000);', compile_source(narrow, target='js', opt_level=2).code)
+
+
+if __name__ == '__main__':
+    unittest.main()
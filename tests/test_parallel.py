@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from icl.ast import iter_nodes
+from icl.errors import ParseError
+from icl.lexer import TableLexer
+from icl.parallel import split_statement_ranges, statement_boundaries
+from icl.parser import Parser
+
+
+EXAMPLES = Path(__file__).resolve().parents[1] / 'examples'
+
+
+def tokenize(source: str):
+    return TableLexer(source, 'big.icl').tokenize_buffer()
+
+
+class ParallelParseTests(unittest.TestCase):
+    def test_boundaries_follow_top_level_statements(self) -> None:
+        source = 'x := 1;; if x ? { y := 2; } : { y := 3; } fn f() { ret 1; } z := f()'
+        tokens = tokenize(source)
+        ends = [tokens[index - 1].value for index in statement_boundaries(tokens)]
+        self.assertEqual(ends, [';', ';', '}', '}'])
+        self.assertIsNone(statement_boundaries(tokenize('x := 1; }')))
+        self.assertIsNone(split_statement_ranges(tokenize('fn f() { ret 1;'), 4))
+
+    def test_matches_sequential_parse(self) -> None:
+        text = '\n'.join(path.read_text(encoding='utf-8') for path in sorted(EXAMPLES.glob('*.icl')))
+        tokens = tokenize('\n'.join([text] * 20))
+        self.assertGreater(len(split_statement_ranges(tokens, 8)), 2)
+        expected = Parser(tokens, workers=1).parse_program()
+        actual = Parser(tokens, workers=2).parse_program()
+        self.assertEqual(actual, expected)
+        self.assertEqual([node.node_id for node in iter_nodes(actual)], [node.node_id for node in iter_nodes(expected)])
+        for left, right in zip(actual.statements, expected.statements):
+            self.assertIs(left.span.source, tokens.source)
+            self.assertEqual((left.span.start, left.span.end), (right.span.start, right.span.end))
+
+    def test_errors_match_sequential_parse(self) -> None:
+        source = 'a := 1;\n' * 50 + 'b := (1;\nc := 2;\n' + 'd := 3 +;\n' + 'e := 4;\n' * 50
+        with self.assertRaises(ParseError) as expected:
+            Parser(tokenize(source), workers=1).parse_program()
+        with self.assertRaises(ParseError) as actual:
+            Parser(tokenize(source), workers=2).parse_program()
+        self.assertEqual(actual.exception.message, expected.exception.message)
+        self.assertEqual(actual.exception.span, expected.exception.span)
+        self.assertIn('1 additional parse error', actual.exception.message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import unittest
 
-from icl.ast import AssignmentStmt, FunctionDefStmt, IfStmt, LambdaExpr, LoopStmt
+from icl.arena import AstArena
+from icl.ast import AssignmentStmt, BinaryExpr, CallExpr, ErrorStmt, FunctionDefStmt, IfStmt, LambdaExpr, LoopStmt, UnaryExpr, iter_nodes
 from icl.errors import ParseError
-from icl.lexer import Lexer
+from icl.lexer import Lexer, TableLexer
 from icl.parser import Parser
 
 
@@ -36,6 +37,21 @@ class ParserTests(unittest.TestCase):
         with self.assertRaises(ParseError):
             parse_source('if true ? { x := 1; ')
 
+    def test_recovery_skips_stray_token_after_semicolon(self) -> None:
+        with self.assertRaises(ParseError) as ctx:
+            parse_source('x := 1; ) y := 2;')
+        self.assertEqual(ctx.exception.code, 'PAR001')
+
+    def test_collect_errors_keeps_parsing_past_failures(self) -> None:
+        parser = Parser(Lexer('x := 1 +; fn g( { } y := 2;').tokenize(), collect_errors=True)
+        program = parser.parse_program()
+        self.assertEqual([error.code for error in parser.errors], ['PAR001', 'PAR002'])
+        first, second, third = program.statements
+        self.assertIsInstance(first, ErrorStmt)
+        self.assertEqual((first.name, first.is_function), ('x', False))
+        self.assertEqual((second.name, second.is_function), ('g', True))
+        self.assertIsInstance(third, AssignmentStmt)
+
     def test_lambda_expression_assignment(self) -> None:
         program = parse_source('inc := lam(n:Num):Num => n + 1;')
         stmt = program.statements[0]
@@ -43,5 +59,53 @@ class ParserTests(unittest.TestCase):
         self.assertIsInstance(stmt.value, LambdaExpr)
 
 
+    def test_operator_precedence_and_associativity(self) -> None:
+        expr = parse_source('x := -a * f(b)(c) + d - e % g || !h && i < j == k;').statements[0].value
+        self.assertEqual(expr.operator, '||')
+        left = expr.left
+        self.assertEqual(left.operator, '-')
+        self.assertEqual(left.right.operator, '%')
+        self.assertEqual(left.left.operator, '+')
+        product = left.left.left
+        self.assertIsInstance(product.left, UnaryExpr)
+        self.assertIsInstance(product.right, CallExpr)
+        self.assertIsInstance(product.right.callee, CallExpr)
+        right = expr.right
+        self.assertEqual(right.operator, '&&')
+        self.assertIsInstance(right.left, UnaryExpr)
+        self.assertEqual(right.right.operator, '==')
+        self.assertEqual(right.right.left.operator, '<')
+
+    def test_long_operator_chains_do_not_recurse(self) -> None:
+        terms = 10000
+        source = 'x := ' + ' + '.join(f'a{i} * {i}' for i in range(terms)) + ' - ' + '-' * 5000 + '1;'
+        expr = Parser(TableLexer(source).tokenize_buffer()).parse_program().statements[0].value
+        self.assertEqual(expr.operator, '-')
+        depth = 0
+        node = expr.left
+        while isinstance(node, BinaryExpr) and node.operator == '+':
+            depth += 1
+            node = node.left
+        self.assertEqual(depth, terms - 1)
+        self.assertEqual(node.operator, '*')
+        negations = 0
+        node = expr.right
+        while isinstance(node, UnaryExpr):
+            negations += 1
+            node = node.operand
+        self.assertEqual(negations, 5000)
+
+    def test_node_ids_are_deterministic_post_order(self) -> None:
+        source = 'fn f(n) { if n <= 1 ? { ret 1; } : { ret n * @f(n - 1); } } g := lam(x) => -x; @print(@g(2));'
+        program = parse_source(source)
+        ids = [node.node_id for node in iter_nodes(program)]
+        self.assertEqual(sorted(ids), list(range(len(ids))))
+        self.assertEqual(program.node_id, len(ids) - 1)
+        self.assertEqual(ids, [node.node_id for node in iter_nodes(parse_source(source))])
+        arena = AstArena.from_program(program)
+        for view in iter_nodes(arena.program()):
+            self.assertEqual(arena.handle_of(view), view.node_id)
+
+
 if __name__ == '__main__':
     unittest.main()
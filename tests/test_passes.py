@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.ast import LiteralExpr
+from icl.ir import IRLiteral, IRModule, iter_ir_nodes
+from icl.main import build_plugin_manager, compile_source
+from icl.passes import STAGE_AST, STAGE_IR, STAGE_LOWERED, CompilerPass, PassContext, PassManager, count_nodes
+
+
+class _Named(CompilerPass):
+    def __init__(self, name: str, log: list[str], *, requires: tuple[str, ...] = (), after: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.requires = requires
+        self.after = after
+        self.log = log
+
+    def run(self, unit, context) -> bool:
+        self.log.append(self.name)
+        return False
+
+
+class _IncrementLiterals(CompilerPass):
+    """Adds one to every int literal below 3, one step per run."""
+
+    name = 'increment'
+    stage = STAGE_IR
+    fixpoint = True
+
+    def run(self, unit, context) -> bool:
+        changed = False
+        for node in iter_ir_nodes(unit):
+            if isinstance(node, IRLiteral) and type(node.value) is int and node.value < 3:
+                node.value += 1
+                changed = True
+        return changed
+
+
+class _DoubleAstLiterals(CompilerPass):
+    name = 'double'
+    stage = STAGE_AST
+
+    def run(self, unit, context) -> bool:
+        for stmt in unit.statements:
+            if isinstance(getattr(stmt, 'value', None), LiteralExpr):
+                stmt.value.value *= 2
+        return True
+
+
+class _UppercaseNames(CompilerPass):
+    name = 'upper'
+    stage = STAGE_LOWERED
+
+    def run(self, unit, context) -> bool:
+        unit.statements[0].name = f'{unit.statements[0].name}_{context.target}'
+        return True
+
+
+def _module() -> IRModule:
+    return compile_source('a := 0; @print(a);').ir
+
+
+class PassManagerTests(unittest.TestCase):
+    def test_dependencies_reorder_registration(self) -> None:
+        log: list[str] = []
+        manager = PassManager(
+            STAGE_IR,
+            [
+                _Named('c', log, requires=('b',)),
+                _Named('a', log, after=('missing-is-fine',)),
+                _Named('b', log, after=('a',)),
+            ],
+        )
+        self.assertEqual([item.name for item in manager.ordered()], ['a', 'b', 'c'])
+        context = PassContext()
+        manager.run(_module(), context)
+        self.assertEqual(log, ['a', 'b', 'c'])
+        self.assertEqual([record.name for record in context.report.records], ['a', 'b', 'c'])
+
+    def test_invalid_schedules_are_rejected(self) -> None:
+        log: list[str] = []
+        with self.assertRaisesRegex(ValueError, 'requires unscheduled'):
+            PassManager(STAGE_IR, [_Named('a', log, requires=('b',))]).ordered()
+        with self.assertRaisesRegex(ValueError, 'cycle'):
+            PassManager(STAGE_IR, [_Named('a', log, after=('b',)), _Named('b', log, after=('a',))]).ordered()
+        with self.assertRaisesRegex(ValueError, 'already scheduled'):
+            PassManager(STAGE_IR, [_Named('a', log), _Named('a', log)])
+        with self.assertRaises(ValueError):
+            PassManager(STAGE_AST, [_Named('a', log)])
+
+    def test_fixpoint_pass_records_iterations_and_sizes(self) -> None:
+        module = _module()
+        context = PassContext()
+        self.assertTrue(PassManager(STAGE_IR, [_IncrementLiterals()]).run(module, context))
+        record = context.report.records[0]
+        self.assertEqual(module.statements[0].value.value, 3)
+        # Three changing runs, then one that finds nothing left to do.
+        self.assertEqual(record.iterations, 4)
+        self.assertEqual(record.nodes_visited, 4 * count_nodes(module))
+        self.assertEqual(record.node_delta, 0)
+
+    def test_plugin_passes_run_in_every_stage_and_are_reported(self) -> None:
+        manager = build_plugin_manager()
+        for compiler_pass in (_DoubleAstLiterals(), _IncrementLiterals(), _UppercaseNames()):
+            manager.register_pass(compiler_pass)
+        artifacts = compile_source('a := 1; @print(a);', plugin_manager=manager)
+        self.assertEqual(artifacts.code, 'a_python = 3\nprint(a)\n')
+        names = [record.name for record in artifacts.passes.records]
+        for name in ('lex', 'parse', 'double', 'semantic', 'ir-build', 'increment', 'lower', 'upper', 'emit'):
+            self.assertIn(name, names)
+        self.assertLess(names.index('double'), names.index('semantic'))
+        self.assertEqual(artifacts.passes.records[names.index('upper')].target, 'python')
+        self.assertGreaterEqual(artifacts.passes.total_seconds, 0)
+
+
+    def test_node_counts_are_only_taken_on_request(self) -> None:
+        source = 'a := 1 + 2; @print(a);'
+        plain = {record.name: record for record in compile_source(source).passes.records}
+        counted = {record.name: record for record in compile_source(source, pass_metrics=True).passes.records}
+        self.assertEqual(plain['ir-build'].nodes_after, 0)
+        self.assertEqual(counted['ir-build'].nodes_after, count_nodes(compile_source(source).ir))
+        self.assertGreater(counted['lower'].nodes_after, 0)
+
+if __name__ == '__main__':
+    unittest.main()
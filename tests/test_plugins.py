@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import unittest
 
+from icl.ast import iter_nodes
 from icl.main import build_plugin_manager, compile_source
 
 
@@ -17,6 +18,13 @@ class PluginTests(unittest.TestCase):
         self.assertIn('print("dbg:")', artifacts.code)
         self.assertIn('print(7)', artifacts.code)
 
+    def test_macro_expanded_nodes_get_unique_ids(self) -> None:
+        manager = build_plugin_manager(['icl.plugins.std_macros'])
+        artifacts = compile_source('x := 1; #dbg(x + 1); #dbg(x + 1);', target='python', plugin_manager=manager)
+        ids = [node.node_id for node in iter_nodes(artifacts.program)]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertTrue(all(node_id >= 0 for node_id in ids))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.ast import AssignmentStmt, IdentifierExpr, iter_nodes
+from icl.lexer import TableLexer
+from icl.main import compile_source
+from icl.parser import Parser
+from icl.resolver import SYMBOL_FUNCTION, SYMBOL_ITERATOR, SYMBOL_PARAM, SYMBOL_VARIABLE, Binding, resolve_program
+
+
+def resolve(source: str):
+    program = Parser(TableLexer(source, 'r.icl').tokenize_buffer()).parse_program()
+    resolution = resolve_program(program)
+    refs = [
+        (node.name, resolution.bindings.get(node.node_id))
+        for node in iter_nodes(program)
+        if isinstance(node, IdentifierExpr)
+    ]
+    assigns = [
+        (node.name, resolution.bindings[node.node_id])
+        for node in iter_nodes(program)
+        if isinstance(node, AssignmentStmt)
+    ]
+    return resolution, refs, assigns
+
+
+class ResolverTests(unittest.TestCase):
+    def test_blocks_rebind_visible_names_and_keep_new_ones_local(self) -> None:
+        resolution, refs, assigns = resolve('total := 0; loop i in 0..3 { total := total + i; tmp := i; } @print(total);')
+        table = resolution.table
+        self.assertEqual(table.names, ['total', 'i', 'tmp'])
+        self.assertEqual(table.kinds, [SYMBOL_VARIABLE, SYMBOL_ITERATOR, SYMBOL_VARIABLE])
+        self.assertEqual(list(table.scope_parents), [-1, 0])
+        self.assertEqual(list(table.slots), [0, 0, 1])
+        # Pre-order: the loop body comes before the trailing print.
+        self.assertEqual(
+            assigns,
+            [('total', Binding(0, 0, 0)), ('total', Binding(1, 0, 0)), ('tmp', Binding(0, 1, 2))],
+        )
+        self.assertIn(('i', Binding(0, 0, 1)), refs)
+        self.assertIn(('print', None), refs)
+
+    def test_functions_read_but_do_not_rebind_module_names(self) -> None:
+        source = 'scale := 2; fn f(a) { scale := a * scale; ret @g(scale); } fn g(b) => b; h := lam(x) => x + scale;'
+        resolution, refs, assigns = resolve(source)
+        table = resolution.table
+        self.assertEqual(table.kinds[:2], [SYMBOL_FUNCTION, SYMBOL_FUNCTION])
+        self.assertEqual(assigns[1], ('scale', Binding(0, 1, 4)))
+        self.assertEqual(table.kinds[3], SYMBOL_PARAM)
+        # `a * scale` reads the module variable before the local is declared.
+        self.assertIn(('scale', Binding(1, 2, 2)), refs)
+        self.assertIn(('g', Binding(1, 1, 1)), refs)
+        self.assertIn(('x', Binding(0, 0, 6)), refs)
+        self.assertIn(('scale', Binding(1, 2, 2)), refs[-2:])
+
+    def test_bindings_reach_ir_and_backend_graph(self) -> None:
+        artifacts = compile_source('n := 1; if n > 0 ? { n := n + 1; } : { m := 2; } @print(n);', target='rust')
+        assignment = artifacts.ir.statements[0]
+        self.assertEqual(assignment.binding, Binding(0, 0, 0))
+        nested = artifacts.lowered.statements[1].then_block[0]
+        self.assertEqual((nested.binding, nested.value.left.binding), (Binding(1, 0, 0), Binding(1, 0, 0)))
+        self.assertIn('n = (n + 1);', artifacts.code)
+        self.assertIn('let mut m: i64 = 2;', artifacts.code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import pickle
 import unittest
+from dataclasses import replace
 
 from icl.errors import SemanticError
+from icl.incremental import IncrementalDocument
+from icl.ir import IRBuilder
 from icl.lexer import Lexer
 from icl.parser import Parser
-from icl.semantic import SemanticAnalyzer
+from icl.resolver import resolve_program
+from icl.semantic import SemanticAnalyzer, infer_types
 
 
 def analyze(source: str) -> None:
@@ -35,6 +40,34 @@ class SemanticTests(unittest.TestCase):
             analyze('x:Num := "hello";')
         self.assertEqual(ctx.exception.code, 'SEM002')
 
+    def test_collect_errors_reports_each_failure_once(self) -> None:
+        tokens = Lexer('x := y; z := x + 1; fn f(a:Num):Num { ret "s"; } q := @f(1, 2); w := @nope(x);').tokenize()
+        analyzer = SemanticAnalyzer(collect_errors=True)
+        analyzer.analyze(Parser(tokens).parse_program())
+        self.assertEqual(
+            [error.code for error in analyzer.errors],
+            ['SEM011', 'SEM009', 'SEM007', 'SEM019', 'SEM011'],
+        )
+
+    def test_infer_types_solves_int_and_float_through_calls(self) -> None:
+        source = (
+            'fn fact(n:Num):Num { if n <= 1 ? { ret 1; } ret n * @fact(n - 1); } '
+            'x := @fact(5); y := x / 2; w := 1; w := w + 0.5; '
+            'sq := lam(q) => q * q; k := @sq(3); fn id(a) => a; alias := id;'
+        )
+        program = Parser(Lexer(source).tokenize()).parse_program()
+        SemanticAnalyzer().analyze(program)
+        resolution = resolve_program(program)
+        types = infer_types(program, resolution)
+        by_name = {resolution.table.names[symbol]: found for symbol, found in types.symbol_types.items()}
+        self.assertEqual(
+            {name: by_name[name] for name in ('n', 'x', 'y', 'w', 'q', 'k', 'a')},
+            {'n': 'Int', 'x': 'Int', 'y': 'Float', 'w': 'Float', 'q': 'Int', 'k': 'Int', 'a': 'Any'},
+        )
+        fact = program.statements[0]
+        self.assertEqual(types.return_types[fact.node_id], 'Int')
+        self.assertEqual(types.param_types(resolution, fact.node_id), ['Int'])
+
     def test_lambda_value_is_callable(self) -> None:
         analyze('inc := lam(n:Num):Num => n + 1; out := inc(2);')
 
@@ -43,6 +76,49 @@ class SemanticTests(unittest.TestCase):
             analyze('bad := lam(n:Num):Bool => n + 1;')
         self.assertEqual(ctx.exception.code, 'SEM021')
 
+    def test_inferred_types_are_keyed_by_node_id(self) -> None:
+        program = Parser(Lexer('x := 1 + 2; y := "a";').tokenize()).parse_program()
+        result = SemanticAnalyzer().analyze(program)
+        value = program.statements[0].value
+        self.assertEqual(result.inferred_expr_types[value.node_id], 'Num')
+
+        restored = pickle.loads(pickle.dumps(result))
+        copied = replace(program, statements=[replace(stmt) for stmt in program.statements])
+        ir = IRBuilder(restored).build(copied)
+        self.assertEqual(ir.statements[0].value.expr_type, 'Num')
+        self.assertEqual(ir.statements[1].value.expr_type, 'Str')
+        self.assertEqual(ir.inferred_types[str(value.node_id)], 'Num')
+
+
+    def test_reanalyze_only_invalidated_statements(self) -> None:
+        source = 'limit := 10;\n' + ''.join(f'fn f{i}(a) {{ ret @f{i - 1}(a) + limit; }}\n' for i in range(1, 50))
+        doc = IncrementalDocument('fn f0(a) { ret a; }\n' + source, 'doc.icl')
+        analyzer = SemanticAnalyzer()
+        result = analyzer.analyze(doc.program)
+
+        def edit(old: str, new: str) -> None:
+            nonlocal result
+            start = doc.text.index(old)
+            program = doc.edit(start, start + len(old), new)
+            result = analyzer.reanalyze(program, result)
+            expected = SemanticAnalyzer().analyze(program)
+            self.assertEqual(result.inferred_expr_types, expected.inferred_expr_types)
+            self.assertEqual(result.global_scope, expected.global_scope)
+
+        edit('ret @f9(a) + limit;', 'ret @f9(a) * 2 + limit;')
+        self.assertEqual(analyzer.reanalyzed_statements, doc.reparsed_statements)
+        edit('limit := 10;', 'limit := 11;')
+        self.assertEqual(analyzer.reanalyzed_statements, doc.reparsed_statements)
+        # The new parameter type reaches the one caller of f20.
+        edit('fn f20(a)', 'fn f20(a:Num)')
+        self.assertEqual(analyzer.reanalyzed_statements, doc.reparsed_statements + 1)
+        with self.assertRaises(SemanticError) as ctx:
+            edit('fn f30(a)', 'fn f30(a, b)')
+        self.assertEqual(ctx.exception.code, 'SEM019')
+        with self.assertRaises(SemanticError) as ctx:
+            edit('limit := 11;', 'limit := "x";')
+        self.assertEqual(ctx.exception.code, 'SEM014')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from icl.ir import ir_to_dict
+from icl.lowering import lowered_to_dict
+from icl.main import compile_source
+from icl.serialization import BINARY_MAGIC, module_from_binary, module_to_binary, read_module, write_module
+
+
+SOURCE = (
+    'fn area(w:Num, h:Num):Num { ret w * h; }\n'
+    'sq := lam(n:Num):Num => n * n;\n'
+    'total := 0; loop i in 0..3 { if i > 1 ? { total := total + @area(i, 2.5); } : { total := -1; } }\n'
+    '@print("café" + "!"); @print(@sq(total) != 12345678901234);\n'
+)
+
+
+class BinaryModuleTests(unittest.TestCase):
+    def test_ir_round_trip(self) -> None:
+        ir = compile_source(SOURCE, target='rust').ir
+        data = module_to_binary(ir)
+        self.assertTrue(data.startswith(BINARY_MAGIC))
+        decoded = module_from_binary(data)
+        self.assertEqual(decoded, ir)
+        self.assertEqual(ir_to_dict(decoded), ir_to_dict(ir))
+        self.assertEqual(decoded.content_hash, ir.content_hash)
+        self.assertEqual(decoded.statements[2].binding, ir.statements[2].binding)
+
+    def test_lowered_round_trip_and_files(self) -> None:
+        lowered = compile_source(SOURCE, target='python').lowered
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'module.iclb'
+            write_module(lowered, path)
+            self.assertEqual(lowered_to_dict(read_module(path)), lowered_to_dict(lowered))
+
+    def test_smaller_than_json_and_pickle(self) -> None:
+        ir = compile_source(SOURCE, target='python').ir
+        data = module_to_binary(ir)
+        self.assertLess(len(data), len(json.dumps(ir_to_dict(ir), separators=(',', ':'))) // 2)
+        self.assertLess(len(data), len(pickle.dumps(ir)))
+
+    def test_rejects_other_versions_and_garbage(self) -> None:
+        data = bytearray(module_to_binary(compile_source('x := 1;', target='python').ir))
+        for corrupt in (b'JSON' + bytes(data[4:]), bytes(data[:4]) + b'\xff' + bytes(data[5:]), bytes(data) + b'\x00'):
+            with self.subTest(corrupt=corrupt[:6]):
+                with self.assertRaises(ValueError):
+                    module_from_binary(corrupt)
+
+
+if __name__ == '__main__':
+    unittest.main()
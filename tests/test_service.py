@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import tempfile
 import unittest
+from pathlib import Path
 
-from icl.main import explain_source
-from icl.service import capabilities_request, compile_request, diff_request
+from icl.main import compile_file, explain_source
+from icl.service import capabilities_request, compile_request, compress_request, diff_request, safe_dispatch
 
 
 class ServiceTests(unittest.TestCase):
@@ -12,6 +14,35 @@ class ServiceTests(unittest.TestCase):
         self.assertIn("x = (1 + 2)", result["code"])
         self.assertEqual(result["target"], "python")
         self.assertGreater(result["metrics"]["tokens"], 0)
+        passes = {record["name"]: record for record in result["metrics"]["passes"]}
+        self.assertEqual(passes["lex"]["nodes_after"], result["metrics"]["tokens"])
+        self.assertEqual(passes["ir-build"]["stage"], "ir")
+
+    def test_input_path_is_compiled_from_mapped_file(self) -> None:
+        source = "// caf\u00e9\nname := \"\u00fcber\";\nx := 1 + 2;\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "input.icl"
+            path.write_text(source, encoding="utf-8")
+            (Path(tmp) / "empty.icl").write_text("", encoding="utf-8")
+
+            result = compile_request({"input_path": str(path), "target": "python", "include_source_map": True})
+            expected = compile_request({"source": source, "filename": str(path), "target": "python", "include_source_map": True})
+            # Pass timings differ between runs; their names and sizes do not.
+            for response in (result, expected):
+                for record in response["metrics"]["passes"]:
+                    record.pop("ms")
+            self.assertEqual(result, expected)
+            self.assertEqual(compile_file(path, target="python").code, result["code"])
+            self.assertEqual(compress_request({"input_path": str(path)})["compressed"], 'name:="\u00fcber"\nx:=(1+2)\n')
+            self.assertEqual(compile_file(Path(tmp) / "empty.icl", target="python").program.statements, [])
+
+    def test_mapped_file_translates_crlf_in_strings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "crlf.icl"
+            path.write_bytes(b'x := "a\r\nb\rc";\r\n@print(x);\r\n')
+            code = compile_file(path, target="python").code
+            self.assertEqual(code, compile_request({"source": 'x := "a\nb\nc";\n@print(x);\n', "target": "python"})["code"])
+            self.assertIn("'a\\nb\\nc'", code)
 
     def test_compile_request_with_macro_plugin(self) -> None:
         result = compile_request(
@@ -33,6 +64,12 @@ class ServiceTests(unittest.TestCase):
         self.assertIn("main.py", result["outputs"]["python"]["bundle"]["files"])
         self.assertIn("index.html", result["outputs"]["web"]["bundle"]["files"])
 
+    def test_check_request_returns_all_diagnostics(self) -> None:
+        ok, response = safe_dispatch('check', {'source': 'x := 1 +;\ny := z;\n@print(1) $;'})
+        self.assertFalse(ok)
+        codes = [(item['code'], item['span']['line']) for item in response['diagnostics']]
+        self.assertEqual(codes, [('LEX001', 3), ('PAR001', 1), ('SEM011', 2)])
+
     def test_capabilities_request(self) -> None:
         caps = capabilities_request({})
         self.assertIn("compile", caps["methods"])
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import copy
+import dataclasses
+import pickle
+import unittest
+
+from icl.lexer import Lexer, TableLexer
+from icl.main import compile_source
+from icl.parser import Parser
+from icl.source_map import SourceFile, SourceSpan, merge_spans
+
+
+class SourceSpanTests(unittest.TestCase):
+    def test_offset_span_resolves_lazily(self) -> None:
+        source = SourceFile.from_text('a.icl', 'x := 1;\ny := 22;\n')
+        span = source.span(13, 15)
+        self.assertEqual(span.file_id, source.file_id)
+        self.assertEqual((span.start, span.end), (13, 15))
+        self.assertEqual((span.line, span.column, span.end_line, span.end_column), (2, 6, 2, 8))
+        self.assertEqual(span, SourceSpan('a.icl', 2, 6, 2, 8))
+        self.assertEqual(hash(span), hash(SourceSpan('a.icl', 2, 6, 2, 8)))
+        self.assertEqual(
+            span.to_dict(),
+            {'file': 'a.icl', 'line': 2, 'column': 6, 'end_line': 2, 'end_column': 8},
+        )
+
+    def test_span_is_immutable_and_portable(self) -> None:
+        span = SourceFile.from_text('a.icl', 'x := 1;').span(0, 1)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            span.line = 3  # type: ignore[misc]
+        self.assertIs(copy.deepcopy(span), span)
+        restored = pickle.loads(pickle.dumps(span))
+        self.assertEqual(restored, span)
+        self.assertIsNone(restored.source)
+        self.assertEqual(repr(restored), repr(span))
+
+    def test_merge_keeps_offsets_within_one_file(self) -> None:
+        source = SourceFile.from_text('a.icl', 'ab\ncd')
+        merged = merge_spans(source.span(0, 1), source.span(3, 5))
+        self.assertIs(merged.source, source)
+        self.assertEqual((merged.line, merged.column, merged.end_line, merged.end_column), (1, 1, 2, 3))
+        mixed = merge_spans(source.span(0, 1), SourceSpan('a.icl', 2, 1, 2, 3))
+        self.assertEqual(mixed, merged)
+
+    def test_parsed_spans_match_coordinate_spans(self) -> None:
+        source = 'fn f(a) {\n  ret "x\ny" + a;\n}\nb := @f(1);'
+        expected = Parser(Lexer(source, 'a.icl').tokenize()).parse_program()
+        actual = Parser(TableLexer(source, 'a.icl').tokenize_buffer()).parse_program()
+        self.assertEqual(actual, expected)
+        self.assertIsNotNone(actual.statements[0].span.source)
+
+    def test_source_map_json_shape(self) -> None:
+        artifacts = compile_source('x := 1;\nprint(x);', target='python', filename='m.icl')
+        entry = artifacts.source_map.to_dict()['entries'][0]
+        self.assertEqual(set(entry), {'node_id', 'span', 'note'})
+        self.assertEqual(set(entry['span']), {'file', 'line', 'column', 'end_line', 'end_column'})
+        self.assertEqual(entry['span']['file'], 'm.icl')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.main import compile_source
+from icl.ssa import SSA_ASSIGN, SSA_ENTRY, SSA_PHI, build_ssa
+
+
+class SSATests(unittest.TestCase):
+    def _ssa(self, source: str):
+        ir = compile_source(source).ir
+        return ir, build_ssa(ir)
+
+    def test_phis_at_if_joins_and_loop_headers(self) -> None:
+        ir, ssa = self._ssa(
+            'x := 1; y := 2; if x > 0 ? { y := 3; } : { z := 4; @print(z); } '
+            'loop i in 0..3 { x := x + i; } @print(x + y);'
+        )
+        defs = {definition.label: definition for definition in ssa.defs}
+        self.assertEqual([operand.label for operand in defs['y.2'].operands], ['y.1', 'y.0'])
+        self.assertEqual(defs['y.2'].kind, SSA_PHI)
+        # The loop header merges the value before the loop with the one at the end of the body.
+        self.assertEqual([operand.label for operand in defs['x.1'].operands], ['x.0', 'x.2'])
+        self.assertEqual(defs['i.0'].kind, SSA_ENTRY)
+        x_read, y_read = ir.statements[4].expr.args[0].left, ir.statements[4].expr.args[0].right
+        self.assertIs(ssa.reaching(x_read), defs['x.1'])
+        self.assertIs(ssa.reaching(y_read), defs['y.2'])
+        self.assertEqual(defs['x.1'].phi_uses, [])
+        self.assertEqual([phi.label for phi in defs['x.2'].phi_uses], ['x.1'])
+        # `z` is local to the else block and never merged.
+        self.assertNotIn('z.1', defs)
+
+    def test_trivial_phis_and_unreachable_branches_fold(self) -> None:
+        _, ssa = self._ssa('fn f(a:Num):Num { b := 1; if a > 0 ? { b := 2; ret b; } loop i in 0..a { @print(b); } ret b; }')
+        labels = {definition.label: definition.kind for definition in ssa.defs}
+        self.assertEqual(labels, {'a.0': SSA_ENTRY, 'b.0': SSA_ASSIGN, 'b.1': SSA_ASSIGN})
+        self.assertEqual(len(next(d for d in ssa.defs if d.label == 'b.0').uses), 2)
+
+    def test_captured_variables_stay_live(self) -> None:
+        _, ssa = self._ssa('k := 3; g := lam(v:Num) => v + k; k := 4; @print(@g(1));')
+        self.assertEqual({definition.name for definition in ssa.defs if definition.symbol in ssa.captured}, {'k'})
+        self.assertEqual(
+            sorted(definition.label for definition in ssa.live_defs() if definition.kind == SSA_ASSIGN),
+            ['g.0', 'k.0', 'k.2'],
+        )
+
+    def test_copies_only_while_the_source_is_unchanged(self) -> None:
+        ir, ssa = self._ssa('a := 1; b := a; @print(b); a := 5; @print(b);')
+        first, second = ir.statements[2].expr.args[0], ir.statements[4].expr.args[0]
+        self.assertIn(id(first), ssa.copies)
+        self.assertNotIn(id(second), ssa.copies)
+
+    def test_o2_propagates_and_removes_single_assignments(self) -> None:
+        source = 'a := 1; b := a; a := 5; @print(b); @print(a); x := 1; x := 2; @print(x);'
+        artifacts = compile_source(source, opt_level=2)
+        self.assertEqual(artifacts.code, 'print(1)\nprint(5)\nprint(2)\n')
+        loop = 'a := 1; loop i in 0..3 { b := a; a := a + 1; @print(b); } @print(a);'
+        self.assertEqual(
+            compile_source(loop, opt_level=2).code,
+            'a = 1\nfor i in range(0, 3):\n    b = a\n    a = (a + 1)\n    print(b)\nprint(a)\n',
+        )
+
+    def test_names_shared_with_loop_iterators_are_not_propagated(self) -> None:
+        # Python's loop variable stays bound after the loop, so `i` is not the outer variable there.
+        code = compile_source('i := 100; loop i in 0..30 { x := i; } @print(i);', opt_level=2).code
+        self.assertIn('print(i)\n', code)
+        unrolled = compile_source('i := 7; loop i in 0..2 { @print(i); } @print(i);', opt_level=2)
+        self.assertEqual(unrolled.code, 'i = 7\nfor i in range(0, 2):\n    print(i)\nprint(i)\n')
+        self.assertEqual(unrolled.optimization.propagated_constants, 0)
+
+    def test_o1_removes_overwritten_stores_but_keeps_declarations(self) -> None:
+        source = (
+            'fn t():Bool { @print(0); ret true; } x := 1; x := 2; @print(x); '
+            'y := 1; if @t() ? { y := 2; } : { y := 3; } @print(y); y := 4;'
+        )
+        artifacts = compile_source(source, target='js', opt_level=1)
+        self.assertIn('let x = 2;\nprint(x);\nlet y = 1;\nif (t()) {\n    y = 2;\n', artifacts.code)
+        self.assertNotIn('y = 4', artifacts.code)
+        self.assertEqual(artifacts.optimization.removed_assignments, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import io
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from icl.errors import CompilerError, ParseError
+from icl.main import compile_source
+from icl.streaming import compile_file_stream, compile_stream
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _chunks(source: str, size: int) -> list[str]:
+    return [source[idx : idx + size] for idx in range(0, len(source), size)]
+
+
+class StreamingCompileTests(unittest.TestCase):
+    def test_matches_batch_output_for_examples(self) -> None:
+        for path in sorted((PROJECT_ROOT / "examples").glob("*.icl")):
+            source = path.read_text(encoding="utf-8")
+            for target in ("python", "rust", "typescript"):
+                with self.subTest(example=path.name, target=target):
+                    try:
+                        expected = compile_source(source, target=target).code
+                    except CompilerError as err:
+                        with self.assertRaises(CompilerError) as ctx:
+                            "".join(compile_stream(_chunks(source, 7), target=target))
+                        self.assertEqual(ctx.exception.code, err.code)
+                        continue
+                    self.assertEqual("".join(compile_stream(_chunks(source, 7), target=target)), expected)
+
+    def test_forward_function_reference_uses_signature_prescan(self) -> None:
+        source = "x := @add(1, 2); fn add(a:Num, b:Num):Num => a + b; @print(x);"
+        streamed = "".join(compile_stream(_chunks(source, 3), target="js"))
+        self.assertIn("let x = add(1, 2);", streamed)
+        self.assertIn("function add(a, b) {", streamed)
+
+        with self.assertRaises(CompilerError) as ctx:
+            "".join(compile_stream(["y := @add(1); fn add(a, b) => a + b;"]))
+        self.assertEqual(ctx.exception.code, "SEM019")
+
+    def test_whole_module_rust_resolves_forward_references(self) -> None:
+        source = "x := f(2); @print(x); fn f(a) => a * 3;"
+        streamed = "".join(compile_stream(_chunks(source, 5), target="rust"))
+        self.assertEqual(streamed, compile_source(source, target="rust").code)
+        self.assertIn("fn f(a: i64) -> i64", streamed)
+
+    def test_emits_output_before_input_is_exhausted(self) -> None:
+        consumed: list[int] = []
+
+        def source():
+            for idx in range(100):
+                consumed.append(idx)
+                yield f"x{idx} := {idx} + 1;\n"
+
+        stream = compile_stream(source())
+        self.assertEqual(next(stream), "x0 = (0 + 1)\n")
+        self.assertLess(len(consumed), 5)
+
+    def test_peak_memory_does_not_grow_with_module_size(self) -> None:
+        def source(count: int):
+            yield "fn f(a) { b := a * 2; ret b; }\n"
+            for idx in range(count):
+                yield f"x{idx % 20} := f({idx}); loop j in 0..3 {{ x{idx % 20} := x{idx % 20} + j; }}\n"
+
+        def peak(count: int) -> int:
+            tracemalloc.start()
+            try:
+                for _ in compile_stream(source(count)):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        self.assertLess(peak(800), 1.5 * peak(200))
+
+    def test_parse_errors_are_reported_after_draining(self) -> None:
+        with self.assertRaises(ParseError) as ctx:
+            "".join(compile_stream(["x := 1 +; y := ); z := 3;"]))
+        self.assertIn("additional parse error", ctx.exception.message)
+
+    def test_compile_file_stream_writes_output(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "big.icl"
+            path.write_text("".join(f"v := {idx};\n" for idx in range(50)), encoding="utf-8")
+            output = io.StringIO()
+            written = compile_file_stream(path, output, target="python", chunk_size=16)
+        self.assertEqual(written, len(output.getvalue()))
+        self.assertTrue(output.getvalue().endswith("v = 49\n"))
+
+    def test_compile_file_stream_translates_crlf_in_strings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "crlf.icl"
+            path.write_bytes(b'x := "a\r\nb";\r\n@print(x);\r\n')
+            output = io.StringIO()
+            compile_file_stream(path, output, target="python", chunk_size=7)
+        self.assertEqual(output.getvalue(), compile_source('x := "a\nb";\n@print(x);\n').code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import unittest
+
+from icl.ir import IRBinary, IRExpr, IRLiteral, IRRef
+from icl.lowering import LoweredReturn, Lowerer, _contains_print_call
+from icl.main import compile_source
+from icl.visitor import NodeVisitor
+
+
+class _Kinds(NodeVisitor):
+    def visit_IRLiteral(self, node: IRLiteral) -> str:
+        return 'literal'
+
+    def visit_IRExpr(self, node: IRExpr) -> str:
+        return 'expr'
+
+    def generic_visit(self, node: object) -> str:
+        return 'other'
+
+
+class _Subclass(_Kinds):
+    def visit_IRRef(self, node: IRRef) -> str:
+        return 'ref'
+
+
+class VisitorTests(unittest.TestCase):
+    def test_dispatch_follows_mro_and_falls_back_to_generic_visit(self) -> None:
+        visitor = _Kinds()
+        self.assertEqual(visitor.visit(IRLiteral(ir_id='e1', span=None, expr_type='Int', value=1)), 'literal')
+        self.assertEqual(visitor.visit(IRRef(ir_id='e2', span=None, expr_type='Int', name='x')), 'expr')
+        self.assertEqual(visitor.visit(3), 'other')
+
+    def test_tables_are_cached_per_visitor_class(self) -> None:
+        ref = IRRef(ir_id='e2', span=None, expr_type='Int', name='x')
+        self.assertEqual(_Subclass().visit(ref), 'ref')
+        self.assertEqual(_Kinds().visit(ref), 'expr')
+        self.assertIs(_Kinds._dispatch[IRRef], _Kinds.visit_IRExpr)
+        self.assertNotIn(IRBinary, _Subclass._dispatch)
+
+    def test_base_visitor_rejects_unhandled_nodes(self) -> None:
+        with self.assertRaises(TypeError):
+            NodeVisitor().visit(object())
+
+    def test_lowering_walkers_share_dispatch(self) -> None:
+        artifacts = compile_source('fn f(a) { ret a + 1; } @print(@f(2));', target='web')
+        self.assertIn('print', artifacts.lowered.required_helpers)
+        self.assertFalse(_contains_print_call([LoweredReturn(lowered_id='s1', span=None, value=None)]))
+        lowered = Lowerer().lower(artifacts.ir, target='python')
+        self.assertTrue(_contains_print_call(lowered.statements))
+
+
+if __name__ == '__main__':
+    unittest.main()